@@ -0,0 +1,12 @@
+"""
+离线性能基准
+
+- gateway.py: 进程内的 Tool Gateway 替身（httpx.MockTransport），可注入延迟、抖动与错误
+- run.py: 在替身网关上跑完整的 Agent Graph，测量端到端/各节点延迟、内存分配与吞吐，
+  并与 baseline.json 对比
+
+Usage:
+    python -m benchmarks.run
+    python -m benchmarks.run --latency-ms 20 --jitter-ms 10 --error-rate 0.05
+    python -m benchmarks.run --update-baseline
+"""
@@ -0,0 +1,200 @@
+"""
+进程内 Tool Gateway 替身
+
+通过 httpx.MockTransport 挂到 GatewayClient 上，服务 call_tool 请求的
+POST {TOOL_GATEWAY_URL}/tools/{domain}/{action} 路由，返回与 tools/*.py mock 数据同构的
+确定性响应。每个请求可注入固定延迟 + 均匀抖动，以及按比例注入 503 / 超时。
+"""
+
+import asyncio
+import random
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+import orjson
+
+from src.tools.catalog import _mock_offer_card
+from src.tools.http_client import GatewayClient, set_gateway_client
+
+Handler = Callable[[dict[str, Any]], dict[str, Any]]
+
+
+@dataclass
+class GatewayProfile:
+    """
+    注入参数
+
+    Args:
+        latency_ms: 每个请求的固定延迟
+        jitter_ms: 额外延迟，在 [0, jitter_ms] 内均匀分布
+        error_rate: 返回 503 的比例
+        timeout_rate: 抛出 ReadTimeout 的比例
+        tool_latency_ms: 按工具覆盖 latency_ms
+    """
+
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    timeout_rate: float = 0.0
+    tool_latency_ms: dict[str, float] = field(default_factory=dict)
+
+
+class MockGateway:
+    """Tool Gateway 替身"""
+
+    def __init__(self, profile: GatewayProfile | None = None, seed: int = 0):
+        self.profile = profile or GatewayProfile()
+        self.random = random.Random(seed)
+        self.requests: Counter[str] = Counter()
+        self.injected_errors: Counter[str] = Counter()
+        self.handlers: dict[str, Handler] = {
+            "catalog.search_offers": _search_offers,
+            "catalog.get_offer_card": lambda p: _mock_offer_card(p["offer_id"]),
+            "catalog.get_offer_cards": _get_offer_cards,
+            "pricing.get_realtime_quote": _realtime_quote,
+            "pricing.get_realtime_quotes": _realtime_quotes,
+            "compliance.check_item": _check_item,
+            "compliance.policy_ruleset_version": lambda p: {"version": "cr_2025_12_20"},
+            "shipping.quote_options": _quote_options,
+            "shipping.validate_address": _validate_address,
+            "cart.create": lambda p: {"cart_id": "cart_bench", "status": "active", "items": []},
+            "cart.add_item": lambda p: {"cart_id": p["cart_id"], "items": [p]},
+            "checkout.compute_total": _compute_total,
+            "checkout.create_draft_order": _create_draft_order,
+            "evidence.create_snapshot": lambda p: {"snapshot_id": "ev_bench"},
+            "evidence.attach_to_draft_order": lambda p: p,
+        }
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    def install(self, **client_kwargs: Any) -> GatewayClient:
+        """替换全局 GatewayClient，之后所有 call_tool 请求都由替身处理"""
+        client = GatewayClient(transport=self.transport(), **client_kwargs)
+        set_gateway_client(client)
+        return client
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        parts = request.url.path.strip("/").split("/")
+        if len(parts) != 3 or parts[0] != "tools":
+            return httpx.Response(404)
+        tool_name = f"{parts[1]}.{parts[2]}"
+        handler = self.handlers.get(tool_name)
+        if handler is None:
+            return httpx.Response(404)
+
+        self.requests[tool_name] += 1
+        profile = self.profile
+        delay = profile.tool_latency_ms.get(tool_name, profile.latency_ms)
+        delay += self.random.uniform(0, profile.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+        roll = self.random.random()
+        if roll < profile.timeout_rate:
+            self.injected_errors["timeout"] += 1
+            raise httpx.ReadTimeout("injected timeout", request=request)
+        if roll < profile.timeout_rate + profile.error_rate:
+            self.injected_errors["503"] += 1
+            return httpx.Response(503)
+
+        params = orjson.loads(request.content).get("params", {})
+        return httpx.Response(
+            200,
+            content=orjson.dumps({"ok": True, "data": handler(params), "warnings": []}),
+            headers={"content-type": "application/json"},
+        )
+
+
+def _search_offers(params: dict[str, Any]) -> dict[str, Any]:
+    limit = min(params.get("limit") or 50, 50)
+    offer_ids = [f"of_{i:06d}" for i in range(1, limit + 1)]
+    return {
+        "offer_ids": offer_ids,
+        "scores": [0.95 - i * 0.01 for i in range(len(offer_ids))],
+        "total_count": 100,
+        "has_more": True,
+    }
+
+
+def _get_offer_cards(params: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "offer_cards": [_mock_offer_card(offer_id) for offer_id in params["offer_ids"]],
+        "errors": {},
+    }
+
+
+def _realtime_quote(params: dict[str, Any]) -> dict[str, Any]:
+    # 按 sku 确定性定价，基准结果可复现
+    base_price = 10 + sum(map(ord, params["sku_id"])) % 90
+    return {
+        "sku_id": params["sku_id"],
+        "quantity": params.get("quantity", 1),
+        "unit_price": float(base_price),
+        "currency": "USD",
+        "price_components": [{"type": "base_price", "amount": float(base_price)}],
+        "stock": {"status": "in_stock", "quantity_available": 50},
+        "quote_expire_at": "2024-12-24T18:00:00Z",
+    }
+
+
+def _realtime_quotes(params: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "quotes": [_realtime_quote(item) for item in params["items"]],
+        "errors": {},
+    }
+
+
+def _check_item(params: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "allowed": True,
+        "reason_codes": [],
+        "required_docs": [],
+        "mitigations": [],
+        "ruleset_version": "cr_2025_12_20",
+    }
+
+
+def _quote_options(params: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "options": [
+            {
+                "shipping_option_id": "ship_standard",
+                "carrier": "Standard Shipping",
+                "service_level": "standard",
+                "price": 5.99,
+                "currency": "USD",
+                "eta_min_days": 7,
+                "eta_max_days": 14,
+                "tracking_supported": True,
+                "constraints": [],
+            },
+            {
+                "shipping_option_id": "ship_express",
+                "carrier": "Express Shipping",
+                "service_level": "express",
+                "price": 15.99,
+                "currency": "USD",
+                "eta_min_days": 3,
+                "eta_max_days": 5,
+                "tracking_supported": True,
+                "constraints": [],
+            },
+        ],
+        "quote_expire_at": "2024-12-24T18:00:00Z",
+    }
+
+
+def _validate_address(params: dict[str, Any]) -> dict[str, Any]:
+    return {"normalized_address": params, "is_deliverable": True, "suggestions": []}
+
+
+def _compute_total(params: dict[str, Any]) -> dict[str, Any]:
+    return {"total": {"amount": 0.0, "currency": "USD"}, "line_items": []}
+
+
+def _create_draft_order(params: dict[str, Any]) -> dict[str, Any]:
+    return {"draft_order_id": "do_bench", "status": "draft"}
@@ -0,0 +1,285 @@
+"""
+Agent Graph 性能基准
+
+在进程内 Tool Gateway 替身上跑完整的 Agent Graph（不走 MOCK_TOOLS 捷径，
+请求经过 call_tool → 熔断/重试 → GatewayClient → HTTP 序列化的完整路径）：
+
+1. 串行运行，按 stream 更新测量端到端与各节点延迟
+2. 并发运行，测量吞吐
+3. tracemalloc 下运行，测量每个 Mission 的内存分配
+
+结果与 baseline.json 对比，任一指标超出容差即以非零状态退出。
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+from typing import Any
+
+# 必须在导入 src 之前设置：tools/*.py 在导入时读取 MOCK_TOOLS
+os.environ["MOCK_TOOLS"] = "false"
+os.environ.pop("OPENAI_API_KEY", None)
+
+import orjson  # noqa: E402
+import structlog  # noqa: E402
+from langchain_core.messages import HumanMessage  # noqa: E402
+
+from src.batch import percentile  # noqa: E402
+from src.graph import get_graph_runtime  # noqa: E402
+from src.observability import Telemetry, set_telemetry  # noqa: E402
+from src.resilience import Resilience, set_resilience  # noqa: E402
+from src.tools import catalog, pricing  # noqa: E402
+from src.tools.cache import set_response_cache  # noqa: E402
+
+from .gateway import GatewayProfile, MockGateway  # noqa: E402
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+
+# 越大越好的指标；其余指标越小越好
+HIGHER_IS_BETTER = {"throughput_per_second"}
+# 样本少时波动大，只展示不参与回归判断
+REPORT_ONLY = {"e2e_p99_ms"}
+# 基线低于该值的节点延迟只有几毫秒，相对容差会被运行噪声触发，只展示
+NODE_LATENCY_FLOOR_MS = 10.0
+
+QUERIES = [
+    "wireless charger for iPhone, budget $50, shipping to Germany",
+    "phone case, budget $20, shipping to Japan",
+    "USB-C charger with US plug, budget $30, shipping to California",
+]
+
+
+def _initial_state(query: str) -> dict[str, Any]:
+    return {
+        "messages": [HumanMessage(content=query)],
+        "mission": None,
+        "candidates": [],
+        "verified_candidates": [],
+        "plans": [],
+        "current_step": "start",
+        "token_used": 0,
+        "error": None,
+    }
+
+
+async def _run_timed(graph: Any, query: str) -> tuple[float, dict[str, float], bool]:
+    """运行一个 Mission，返回 (端到端 ms, 各节点 ms, 是否成功)"""
+    runtime = get_graph_runtime()
+    node_ms: dict[str, float] = {}
+    ok = True
+    started = last = time.perf_counter()
+    async for update in graph.astream(
+        _initial_state(query), runtime.new_config(), stream_mode="updates"
+    ):
+        now = time.perf_counter()
+        for node, values in update.items():
+            node_ms[node] = node_ms.get(node, 0.0) + (now - last) * 1000
+            if isinstance(values, dict) and values.get("error"):
+                ok = False
+        last = now
+    return (time.perf_counter() - started) * 1000, node_ms, ok
+
+
+async def measure_latency(graph: Any, missions: int) -> dict[str, Any]:
+    e2e: list[float] = []
+    nodes: dict[str, list[float]] = defaultdict(list)
+    failures = 0
+    for i in range(missions):
+        total_ms, node_ms, ok = await _run_timed(graph, QUERIES[i % len(QUERIES)])
+        e2e.append(total_ms)
+        failures += not ok
+        for node, ms in node_ms.items():
+            nodes[node].append(ms)
+
+    metrics: dict[str, Any] = {
+        "e2e_p50_ms": percentile(e2e, 50),
+        "e2e_p95_ms": percentile(e2e, 95),
+        "e2e_p99_ms": percentile(e2e, 99),
+        "mission_error_rate": failures / missions,
+    }
+    for node, values in sorted(nodes.items()):
+        metrics[f"node.{node}.p50_ms"] = percentile(values, 50)
+    return metrics
+
+
+async def measure_throughput(graph: Any, missions: int, concurrency: int) -> dict[str, Any]:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            await _run_timed(graph, QUERIES[i % len(QUERIES)])
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(missions)))
+    return {"throughput_per_second": missions / (time.perf_counter() - started)}
+
+
+async def measure_allocations(graph: Any, missions: int) -> dict[str, Any]:
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        for i in range(missions):
+            await _run_timed(graph, QUERIES[i % len(QUERIES)])
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "alloc_peak_kb": (peak - before) / 1024,
+        "alloc_retained_kb_per_mission": (current - before) / 1024 / missions,
+    }
+
+
+async def measure_tool_calls(graph: Any, missions: int) -> dict[str, Any]:
+    """单独一轮挂上内存指标统计工具调用，避免指标 SDK 的开销混进延迟与吞吐"""
+    telemetry = Telemetry.in_memory(spans=False)
+    set_telemetry(telemetry)
+    try:
+        for i in range(missions):
+            await _run_timed(graph, QUERIES[i % len(QUERIES)])
+    finally:
+        set_telemetry(None)
+    return {
+        "tool_calls_per_mission": telemetry.metric_total("agent.tool.calls") / missions,
+        "tool_cache_hits_per_mission": (
+            telemetry.metric_total("agent.tool.cache", result="hit") / missions
+        ),
+    }
+
+
+async def run_benchmark(
+    profile: GatewayProfile,
+    missions: int = 30,
+    concurrency: int = 8,
+    use_cache: bool = False,
+) -> dict[str, Any]:
+    """跑完整套基准，返回扁平化的指标"""
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(40))
+    gateway = MockGateway(profile)
+    gateway.install()
+    if not use_cache:
+        set_response_cache(None)
+    set_resilience(Resilience.from_settings())
+    catalog._batch_supported = None
+    pricing._batch_supported = None
+
+    graph = get_graph_runtime().graph
+    await _run_timed(graph, QUERIES[0])  # 预热：建立连接、填充惰性初始化
+
+    alloc_missions = max(1, missions // 3)
+    metrics = await measure_latency(graph, missions)
+    metrics.update(await measure_throughput(graph, missions, concurrency))
+    metrics.update(await measure_allocations(graph, alloc_missions))
+
+    total_missions = 1 + missions * 2 + alloc_missions
+    metrics["gateway_requests_per_mission"] = sum(gateway.requests.values()) / total_missions
+    # call_tool 次数与网关请求数之差即缓存 / 请求合并节省的请求
+    metrics.update(await measure_tool_calls(graph, max(1, missions // 3)))
+    return metrics
+
+
+def _gated(name: str, expected: float) -> bool:
+    """指标是否参与回归判断"""
+    if name in REPORT_ONLY:
+        return False
+    return not (name.startswith("node.") and expected < NODE_LATENCY_FLOOR_MS)
+
+
+def compare(
+    metrics: dict[str, float],
+    baseline: dict[str, float],
+    tolerance: float,
+) -> list[str]:
+    """返回超出容差的指标说明；baseline 中不存在的指标不参与比较"""
+    regressions = []
+    for name, expected in baseline.items():
+        actual = metrics.get(name)
+        if actual is None or not _gated(name, expected):
+            continue
+        if expected == 0:
+            regressed = actual > 0
+        elif name in HIGHER_IS_BETTER:
+            regressed = actual < expected * (1 - tolerance)
+        else:
+            regressed = actual > expected * (1 + tolerance)
+        if regressed:
+            change = f" ({(actual - expected) / expected:+.0%})" if expected else ""
+            regressions.append(f"{name}: {expected:.2f} -> {actual:.2f}{change}")
+    return regressions
+
+
+def _print_metrics(metrics: dict[str, float], baseline: dict[str, float]) -> None:
+    print(f"{'metric':<36}{'current':>12}{'baseline':>12}")
+    print("-" * 60)
+    for name, value in metrics.items():
+        expected = baseline.get(name)
+        expected_s = f"{expected:>12.2f}" if expected is not None else f"{'-':>12}"
+        print(f"{name:<36}{value:>12.2f}{expected_s}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Agent graph performance benchmark")
+    parser.add_argument("--missions", type=int, default=30)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--jitter-ms", type=float, default=2.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    parser.add_argument("--cache", action="store_true", help="启用工具响应缓存")
+    parser.add_argument("--tolerance", type=float, help="允许的相对退化，默认取 baseline 中的值")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    profile = GatewayProfile(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        timeout_rate=args.timeout_rate,
+    )
+    profile_args = {
+        "missions": args.missions,
+        "concurrency": args.concurrency,
+        "latency_ms": args.latency_ms,
+        "jitter_ms": args.jitter_ms,
+        "error_rate": args.error_rate,
+        "timeout_rate": args.timeout_rate,
+        "cache": args.cache,
+    }
+    metrics = asyncio.run(
+        run_benchmark(profile, args.missions, args.concurrency, use_cache=args.cache)
+    )
+
+    stored = orjson.loads(args.baseline.read_bytes()) if args.baseline.exists() else {}
+    baseline = stored.get("metrics", {})
+    tolerance = args.tolerance if args.tolerance is not None else stored.get("tolerance", 0.25)
+    _print_metrics(metrics, baseline)
+
+    if args.update_baseline:
+        args.baseline.write_bytes(
+            orjson.dumps(
+                {"tolerance": tolerance, "profile": profile_args, "metrics": metrics},
+                option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS,
+            )
+            + b"\n"
+        )
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    regressions = compare(metrics, baseline, tolerance)
+    if regressions:
+        print(f"\nRegressions beyond {tolerance:.0%}:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print("\nNo regressions." if baseline else "\nNo baseline; run with --update-baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
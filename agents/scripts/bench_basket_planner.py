@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+多商品篮子规划基准
+
+合成 slots × candidates 的篮子实例（每个槽位一个价位，候选随机分布在若干商家，
+商家有基础运费、单件略有浮动），测量分支定界求解的延迟分位数、搜索节点数，
+以及在节点上限内证明最优的比例。
+
+Usage:
+    python scripts/bench_basket_planner.py --slots 5 10 20 --candidates 50 --rounds 20
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.batch import percentile  # noqa: E402
+from src.execution.basket import BasketOption, solve_basket  # noqa: E402
+
+
+def synthesize(n_slots: int, n_candidates: int, n_merchants: int, seed: int) -> list:
+    rng = random.Random(seed)
+    base_shipping = [rng.uniform(3, 12) for _ in range(n_merchants)]
+    slots = []
+    for _ in range(n_slots):
+        level = rng.uniform(5, 50)
+        options = []
+        for _ in range(n_candidates):
+            merchant = rng.randrange(n_merchants)
+            options.append(BasketOption(
+                price=round(level * rng.uniform(0.7, 1.5), 2),
+                shipping=round(base_shipping[merchant] + rng.uniform(0, 2), 2),
+                eta_days=rng.randint(3, 20),
+                group=(f"m_{merchant:03d}", "CN"),
+            ))
+        slots.append(options)
+    return slots
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--slots", type=int, nargs="+", default=[5, 10, 20])
+    parser.add_argument("--candidates", type=int, default=50)
+    parser.add_argument("--merchants", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    header = f"{'slots':>8}{'p50 ms':>10}{'p99 ms':>10}{'p50 nodes':>12}{'optimal':>10}"
+    print(header)
+    print("-" * len(header))
+    for n_slots in args.slots:
+        samples, nodes, optimal = [], [], 0
+        for seed in range(args.rounds):
+            slots = synthesize(n_slots, args.candidates, args.merchants, seed)
+            t = time.perf_counter()
+            solution = solve_basket(slots)
+            samples.append((time.perf_counter() - t) * 1000)
+            nodes.append(solution.nodes)
+            optimal += solution.optimal
+        print(
+            f"{n_slots:>8}{percentile(samples, 50):>10.1f}{percentile(samples, 99):>10.1f}"
+            f"{percentile(nodes, 50):>12.0f}{optimal / args.rounds:>10.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+本地商品检索基准
+
+以种子 AROC 为模板合成 N 个 offer（随机价格 / 库存 / 追加词），构建 CatalogIndex，
+测量构建耗时与各类查询（纯关键词 / 中文 / 类目过滤 / 价格 + 有货过滤 / 浏览）的延迟分位数。
+
+Usage:
+    python scripts/bench_catalog_search.py --offers 50000 --queries 2000
+"""
+
+import argparse
+import copy
+import random
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import orjson  # noqa: E402
+import structlog  # noqa: E402
+
+from src.batch import percentile  # noqa: E402
+from src.retrieval.catalog_index import (  # noqa: E402
+    DEFAULT_AROC_PATH,
+    DEFAULT_CATEGORIES_PATH,
+    CatalogIndex,
+    CategoryTree,
+)
+
+structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(40))
+
+EXTRA_WORDS = [
+    "premium", "portable", "mini", "pro", "max", "lite", "fast", "kids", "outdoor", "travel",
+    "新款", "便携", "专业", "旗舰", "儿童", "户外", "快充", "防水", "轻薄", "大容量",
+]
+
+QUERIES = {
+    "keyword": {"query": "wireless earbuds noise cancelling"},
+    "zh": {"query": "无线降噪耳机"},
+    "category": {"query": "charger", "category_id": "cat_electronics"},
+    "price+stock": {"query": "phone case", "price_max": 15.0, "must_in_stock": True},
+    "browse": {"query": "", "category_id": "cat_toys", "sort": "rating"},
+}
+
+
+def synthesize(n: int, seed: int = 42) -> list[dict]:
+    rng = random.Random(seed)
+    templates = orjson.loads(DEFAULT_AROC_PATH.read_bytes())["offers"]
+    offers = []
+    for i in range(n):
+        offer = copy.deepcopy(templates[i % len(templates)])
+        offer["offer_id"] = f"of_{i:07d}"
+        extra = " ".join(rng.sample(EXTRA_WORDS, 3))
+        offer["titles"] = {lang: f"{text} {extra}" for lang, text in offer["titles"].items()}
+        scale = rng.uniform(0.5, 2.0)
+        for variant in offer.get("variants") or []:
+            variant["price"] = round(variant["price"] * scale, 2)
+            variant["stock"] = rng.choice([0, 0, 5, 50, 500])
+        offer["rating"] = round(rng.uniform(3.0, 5.0), 1)
+        offers.append(offer)
+    return offers
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--offers", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    offers = synthesize(args.offers)
+    started = time.perf_counter()
+    index = CatalogIndex(CategoryTree.from_file(DEFAULT_CATEGORIES_PATH))
+    index.add_offers(offers)
+    index.search("warmup")
+    build_ms = (time.perf_counter() - started) * 1000
+    print(f"offers={len(index)} build={build_ms:.0f}ms")
+
+    header = f"{'query':<14}{'hits':>8}{'p50 ms':>10}{'p99 ms':>10}"
+    print(header)
+    print("-" * len(header))
+    for name, params in QUERIES.items():
+        samples = []
+        for _ in range(args.queries):
+            t = time.perf_counter()
+            result = index.search(limit=args.limit, **params)
+            samples.append((time.perf_counter() - t) * 1000)
+        print(
+            f"{name:<14}{result['total_count']:>8}"
+            f"{percentile(samples, 50):>10.3f}{percentile(samples, 99):>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
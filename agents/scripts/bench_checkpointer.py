@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Checkpointer 写放大基准
+
+在 mock 模式下跑完整的 Agent Graph，对比各个 checkpointer 后端：
+- 每次节点转移（put）序列化的字节数与写入的 blob 数
+- 每次 put_writes 序列化的字节数
+- 跑完 N 个 mission 后仍保留的 checkpoint / blob 数（衡量内存是否有界）
+
+Usage:
+    python scripts/bench_checkpointer.py --runs 50
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+os.environ["MOCK_TOOLS"] = "true"
+os.environ.pop("OPENAI_API_KEY", None)
+
+import structlog  # noqa: E402
+from langchain_core.messages import HumanMessage  # noqa: E402
+from langgraph.checkpoint.memory import InMemorySaver  # noqa: E402
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer  # noqa: E402
+
+from src.graph.builder import build_agent_graph  # noqa: E402
+from src.graph.checkpoint import BoundedMemorySaver, SqliteCheckpointSaver  # noqa: E402
+from src.graph.runtime import GraphRuntime  # noqa: E402
+
+structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(40))
+
+
+class CountingSerde(JsonPlusSerializer):
+    """统计序列化次数与字节数"""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+        self.bytes = 0
+
+    def dumps_typed(self, obj):
+        type_, data = super().dumps_typed(obj)
+        self.calls += 1
+        self.bytes += len(data)
+        return type_, data
+
+
+def _instrument(saver):
+    """包装 put / put_writes，按调用统计序列化量"""
+    counters = {"puts": 0, "put_bytes": 0, "put_blobs": 0, "writes": 0, "write_bytes": 0}
+    serde = saver.serde
+    put, put_writes = saver.put, saver.put_writes
+
+    def counted_put(config, checkpoint, metadata, new_versions):
+        before = serde.bytes
+        result = put(config, checkpoint, metadata, new_versions)
+        counters["puts"] += 1
+        counters["put_bytes"] += serde.bytes - before
+        counters["put_blobs"] += len(new_versions)
+        return result
+
+    def counted_put_writes(config, writes, task_id, task_path=""):
+        before = serde.bytes
+        put_writes(config, writes, task_id, task_path)
+        counters["writes"] += 1
+        counters["write_bytes"] += serde.bytes - before
+
+    saver.put, saver.put_writes = counted_put, counted_put_writes
+    return counters
+
+
+def _retained(saver) -> tuple[int, int]:
+    """后端当前保留的 (checkpoint 数, blob 数)"""
+    if isinstance(saver, SqliteCheckpointSaver):
+        checkpoints = saver.conn.execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0]
+        blobs = saver.conn.execute("SELECT COUNT(*) FROM blobs").fetchone()[0]
+        return checkpoints, blobs
+    checkpoints = sum(len(ns) for thread in saver.storage.values() for ns in thread.values())
+    return checkpoints, len(saver.blobs)
+
+
+def _initial_state(query: str) -> dict:
+    return {
+        "messages": [HumanMessage(content=query)],
+        "mission": None,
+        "candidates": [],
+        "verified_candidates": [],
+        "plans": [],
+        "current_step": "start",
+        "token_used": 0,
+        "error": None,
+    }
+
+
+async def bench(name: str, saver, runs: int) -> dict:
+    counters = _instrument(saver)
+    graph = build_agent_graph().builder.compile(checkpointer=saver)
+
+    started = time.perf_counter()
+    for i in range(runs):
+        await graph.ainvoke(
+            _initial_state("wireless charger for iPhone, budget $50, shipping to Germany"),
+            GraphRuntime.new_config(f"bench_{i}"),
+        )
+    elapsed = time.perf_counter() - started
+
+    checkpoints, blobs = _retained(saver)
+    puts = counters["puts"] or 1
+    return {
+        "backend": name,
+        "puts_per_run": counters["puts"] / runs,
+        "bytes_per_put": counters["put_bytes"] / puts,
+        "blobs_per_put": counters["put_blobs"] / puts,
+        "bytes_per_put_writes": counters["write_bytes"] / max(counters["writes"], 1),
+        "retained_checkpoints": checkpoints,
+        "retained_blobs": blobs,
+        "ms_per_run": elapsed / runs * 1000,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--max-threads", type=int, default=20)
+    parser.add_argument("--max-per-thread", type=int, default=2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        backends = {
+            "memory (unbounded)": InMemorySaver(serde=CountingSerde()),
+            "memory_lru": BoundedMemorySaver(
+                max_threads=args.max_threads,
+                max_checkpoints_per_thread=args.max_per_thread,
+                serde=CountingSerde(),
+            ),
+            "sqlite": SqliteCheckpointSaver(
+                str(Path(tmp) / "bench.db"),
+                max_checkpoints_per_thread=args.max_per_thread,
+                serde=CountingSerde(),
+            ),
+        }
+        rows = [await bench(name, saver, args.runs) for name, saver in backends.items()]
+        backends["sqlite"].close()
+
+    header = (
+        f"{'backend':<20}{'puts/run':>10}{'B/put':>10}{'blobs/put':>11}"
+        f"{'B/writes':>10}{'kept ckpt':>11}{'kept blob':>11}{'ms/run':>9}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in rows:
+        print(
+            f"{r['backend']:<20}{r['puts_per_run']:>10.1f}{r['bytes_per_put']:>10.0f}"
+            f"{r['blobs_per_put']:>11.2f}{r['bytes_per_put_writes']:>10.0f}"
+            f"{r['retained_checkpoints']:>11}{r['retained_blobs']:>11}{r['ms_per_run']:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
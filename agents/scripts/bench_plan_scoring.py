@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+方案评分基准
+
+合成 N 个核验结果（随机价格 / 送达天数 / 警告数），测量列式评分 + Pareto 前沿 +
+cheapest / fastest / best_value 选取的延迟分位数，以及前沿大小。
+
+Usage:
+    python scripts/bench_plan_scoring.py --candidates 100 1000 10000 --rounds 200
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.batch import percentile  # noqa: E402
+from src.execution.scoring import score_candidates  # noqa: E402
+
+
+def synthesize(n: int, seed: int = 42) -> list[dict]:
+    rng = random.Random(seed)
+    return [
+        {
+            "offer_id": f"of_{i:07d}",
+            "checks": {
+                "pricing": {"total_price": round(rng.uniform(5, 500), 2)},
+                "shipping": {
+                    "fastest_days": rng.randint(1, 30),
+                    "cheapest_price": rng.choice([0.0, 3.99, 5.99, 9.99]),
+                },
+            },
+            "warnings": ["w"] * rng.choice([0, 0, 0, 1, 2]),
+        }
+        for i in range(n)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--candidates", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    header = f"{'candidates':>12}{'frontier':>10}{'p50 ms':>10}{'p99 ms':>10}"
+    print(header)
+    print("-" * len(header))
+    for n in args.candidates:
+        candidates = synthesize(n)
+        samples = []
+        for _ in range(args.rounds):
+            t = time.perf_counter()
+            scores = score_candidates(candidates)
+            scores.cheapest(), scores.fastest(), scores.best_value()
+            samples.append((time.perf_counter() - t) * 1000)
+        print(
+            f"{n:>12}{int(scores.pareto.sum()):>10}"
+            f"{percentile(samples, 50):>10.3f}{percentile(samples, 99):>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+向量近邻索引基准：recall@k 与延迟
+
+用 bench_catalog_search 的合成 offer 计算 hashing embedding，增量加入 IVFIndex
+（分批 add，中途触发训练 / 重新训练），然后对一组查询比较：
+- 精确扫描（brute force）的 Top-K 作为真值
+- 不同 n_probe 下 IVF 的 recall@k 与 p50 / p99 延迟
+
+合成数据里有大量得分相同的向量，recall 按得分计：返回结果中不低于真值第 K 名得分的个数 / K。
+
+Usage:
+    python scripts/bench_vector_index.py --offers 50000 --queries 500 --k 20
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import structlog  # noqa: E402
+from bench_catalog_search import EXTRA_WORDS, synthesize  # noqa: E402
+
+from src.batch import percentile  # noqa: E402
+from src.retrieval.embeddings import HashingTextEmbedder, offer_text  # noqa: E402
+from src.retrieval.vector_index import IVFIndex  # noqa: E402
+
+structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(40))
+
+LONG_TAIL_QUERIES = [
+    "something to listen to music on the train without noise",
+    "charging brick for my laptop and phone",
+    "gift for a 10 year old who likes building things",
+    "a watch that tracks my running and sleep",
+    "给孩子的益智玩具",
+    "可以防水的户外音响",
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--offers", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--batch", type=int, default=5000)
+    parser.add_argument("--dim", type=int, default=256)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    embedder = HashingTextEmbedder(args.dim)
+    offers = synthesize(args.offers)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = IVFIndex(args.dim, tmp)
+        started = time.perf_counter()
+        for start in range(0, len(offers), args.batch):
+            batch = offers[start : start + args.batch]
+            index.add(
+                [o["offer_id"] for o in batch],
+                embedder.embed([offer_text(o) for o in batch]),
+            )
+        index.save()
+        build_s = time.perf_counter() - started
+
+        opened = IVFIndex.open(tmp)
+        texts = [
+            rng.choice(LONG_TAIL_QUERIES) + " " + " ".join(rng.sample(EXTRA_WORDS, 2))
+            for _ in range(args.queries)
+        ]
+        queries = embedder.embed(texts)
+        print(
+            f"vectors={len(opened)} dim={args.dim} lists={len(opened._lists)} "
+            f"build={build_s:.1f}s (embedding + incremental add)"
+        )
+
+        exact, exact_ms = [], []
+        for query in queries:
+            t = time.perf_counter()
+            exact.append(opened.brute_force(query, args.k)[-1][1])
+            exact_ms.append((time.perf_counter() - t) * 1000)
+
+        header = f"{'search':<14}{'recall@' + str(args.k):>11}{'p50 ms':>10}{'p99 ms':>10}"
+        print(header)
+        print("-" * len(header))
+        print(
+            f"{'brute force':<14}{1.0:>11.3f}"
+            f"{percentile(exact_ms, 50):>10.3f}{percentile(exact_ms, 99):>10.3f}"
+        )
+        for n_probe in (1, 4, 8, 16, 32):
+            hits, samples = 0, []
+            for query, kth_score in zip(queries, exact, strict=True):
+                t = time.perf_counter()
+                found = opened.search(query, args.k, n_probe=n_probe)
+                samples.append((time.perf_counter() - t) * 1000)
+                hits += sum(score >= kth_score - 1e-6 for _, score in found)
+            recall = hits / (args.k * len(queries))
+            print(
+                f"{'ivf n_probe=' + str(n_probe):<14}{recall:>11.3f}"
+                f"{percentile(samples, 50):>10.3f}{percentile(samples, 99):>10.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,379 @@
+"""
+批量 Mission 运行器
+
+读取 JSONL 文件中的用户消息，在共享的已编译 graph 上并发运行，
+结果逐条写入 JSONL（边跑边写），结束时输出吞吐、延迟分位数与错误率报告。
+用于夜间回放线上流量与容量规划。
+
+输入每行一个 JSON 对象：{"id": "...", "message": "..."}（也接受 "query" 字段或纯字符串），
+缺少 id 时使用行号；无法解析的行记为 INVALID_ARGUMENT 错误结果，不中断整批运行。
+
+Usage:
+    python -m src.batch missions.jsonl -o results.jsonl --concurrency 16 --timeout 60
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from collections import Counter
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import IO, Any
+
+import orjson
+import structlog
+
+from .config import get_settings
+
+logger = structlog.get_logger()
+
+MissionRunner = Callable[[str], Awaitable[dict]]
+
+
+@dataclass
+class MissionInput:
+    """一条待运行的用户消息"""
+
+    mission_id: str
+    message: str
+    # 输入行无法解析时的错误信息，运行器直接记为 error 结果
+    error: str | None = None
+
+
+@dataclass
+class MissionResult:
+    """单条 Mission 的运行结果（写入输出 JSONL）"""
+
+    id: str
+    status: str  # ok | error | timeout
+    latency_ms: float
+    current_step: str | None = None
+    error: str | None = None
+    error_code: str | None = None
+    candidates_count: int = 0
+    plans_count: int = 0
+    draft_order_id: str | None = None
+    token_used: int = 0
+    # 阶段 → total_tokens
+    tokens_by_stage: dict[str, int] = field(default_factory=dict)
+    budget_skipped_steps: list[str] = field(default_factory=list)
+
+
+@dataclass
+class BatchReport:
+    """批量运行报告"""
+
+    total: int = 0
+    ok: int = 0
+    errors: int = 0
+    timeouts: int = 0
+    wall_seconds: float = 0.0
+    throughput_per_second: float = 0.0
+    latency_ms: dict[str, float] = field(default_factory=dict)
+    error_rate: float = 0.0
+    error_codes: dict[str, int] = field(default_factory=dict)
+    # 每条 Mission 的 token：total / mean / p95 / max；以及按阶段汇总
+    tokens: dict[str, float] = field(default_factory=dict)
+    tokens_by_stage: dict[str, int] = field(default_factory=dict)
+    budget_skipped: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """nearest-rank 分位数，values 为空时返回 0"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[min(int(rank), len(ordered)) - 1]
+
+
+def parse_line(line: str, line_no: int) -> MissionInput | None:
+    """解析一行输入，空行返回 None"""
+    line = line.strip()
+    if not line:
+        return None
+    record = orjson.loads(line)
+    if isinstance(record, str):
+        return MissionInput(mission_id=str(line_no), message=record)
+    if not isinstance(record, dict):
+        raise ValueError(f"line {line_no}: expected object or string")
+    message = record.get("message") or record.get("query")
+    if not message:
+        raise ValueError(f"line {line_no}: missing 'message'")
+    return MissionInput(mission_id=str(record.get("id", line_no)), message=message)
+
+
+def read_missions(path: str | Path) -> Iterable[MissionInput]:
+    """逐行读取输入文件，不一次性加载到内存；无法解析的行产出带 error 的 MissionInput"""
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            try:
+                mission = parse_line(line, line_no)
+            except ValueError as e:
+                logger.warning("batch.invalid_line", line_no=line_no, error=str(e))
+                mission = MissionInput(mission_id=str(line_no), message="", error=str(e))
+            if mission is not None:
+                yield mission
+
+
+async def _default_runner(message: str) -> dict:
+    from .main import run_agent
+
+    return await run_agent(message)
+
+
+class BatchRunner:
+    """
+    有界并发的批量运行器
+
+    Args:
+        runner: 运行单条消息并返回最终状态，默认使用 main.run_agent
+        concurrency: 同时运行的 Mission 数
+        timeout: 单条 Mission 的超时（秒）；None 表示不限制
+    """
+
+    def __init__(
+        self,
+        runner: MissionRunner | None = None,
+        concurrency: int | None = None,
+        timeout: float | None = None,
+    ):
+        settings = get_settings()
+        self.runner = runner or _default_runner
+        self.concurrency = max(1, concurrency or settings.batch_concurrency)
+        self.timeout = timeout if timeout is not None else settings.batch_mission_timeout_seconds
+        self.timeout = self.timeout or None
+
+    async def run_one(self, mission: MissionInput) -> MissionResult:
+        if mission.error is not None:
+            return MissionResult(
+                id=mission.mission_id,
+                status="error",
+                latency_ms=0.0,
+                error=mission.error,
+                error_code="INVALID_ARGUMENT",
+            )
+        started = time.perf_counter()
+        try:
+            state = await asyncio.wait_for(self.runner(mission.message), self.timeout)
+        except TimeoutError:
+            return MissionResult(
+                id=mission.mission_id,
+                status="timeout",
+                latency_ms=(time.perf_counter() - started) * 1000,
+                error=f"Mission exceeded {self.timeout}s",
+                error_code="TIMEOUT",
+            )
+        except Exception as e:
+            return MissionResult(
+                id=mission.mission_id,
+                status="error",
+                latency_ms=(time.perf_counter() - started) * 1000,
+                error=str(e),
+                error_code="INTERNAL_ERROR",
+            )
+
+        latency_ms = (time.perf_counter() - started) * 1000
+        return MissionResult(
+            id=mission.mission_id,
+            status="error" if state.get("error") else "ok",
+            latency_ms=latency_ms,
+            current_step=state.get("current_step"),
+            error=state.get("error"),
+            error_code=state.get("error_code"),
+            candidates_count=len(state.get("candidates") or []),
+            plans_count=len(state.get("plans") or []),
+            draft_order_id=state.get("draft_order_id"),
+            token_used=state.get("token_used") or 0,
+            tokens_by_stage={
+                stage: usage.get("total_tokens", 0)
+                for stage, usage in (state.get("token_usage_by_stage") or {}).items()
+            },
+            budget_skipped_steps=list(state.get("budget_skipped_steps") or []),
+        )
+
+    async def stream(self, missions: Iterable[MissionInput]) -> AsyncIterator[MissionResult]:
+        """
+        并发运行并按完成顺序产出结果
+
+        使用固定数量的 worker 消费有界队列，输入可以是惰性迭代器，内存占用与文件大小无关。
+        迭代输入时抛出的异常在 worker 退出后由本方法重新抛出。
+        """
+        queue: asyncio.Queue[MissionInput | None] = asyncio.Queue(maxsize=self.concurrency * 2)
+        results: asyncio.Queue[MissionResult | None] = asyncio.Queue()
+
+        async def produce() -> None:
+            error: Exception | None = None
+            try:
+                for mission in missions:
+                    await queue.put(mission)
+            except Exception as e:
+                error = e
+            # 出错时也要放入结束标记，否则 worker 永远等待
+            for _ in range(self.concurrency):
+                await queue.put(None)
+            if error is not None:
+                raise error
+
+        async def work() -> None:
+            while (mission := await queue.get()) is not None:
+                await results.put(await self.run_one(mission))
+            await results.put(None)
+
+        tasks = [asyncio.create_task(produce())]
+        tasks += [asyncio.create_task(work()) for _ in range(self.concurrency)]
+        try:
+            finished = 0
+            while finished < self.concurrency:
+                result = await results.get()
+                if result is None:
+                    finished += 1
+                else:
+                    yield result
+            await tasks[0]
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def run(
+        self,
+        missions: Iterable[MissionInput],
+        output: IO[bytes] | None = None,
+    ) -> BatchReport:
+        """运行全部 Mission，结果逐条写入 output（JSONL），返回汇总报告"""
+        latencies: list[float] = []
+        tokens: list[float] = []
+        error_codes: Counter[str] = Counter()
+        tokens_by_stage: Counter[str] = Counter()
+        report = BatchReport()
+        started = time.perf_counter()
+
+        async for result in self.stream(missions):
+            report.total += 1
+            latencies.append(result.latency_ms)
+            tokens.append(result.token_used)
+            tokens_by_stage.update(result.tokens_by_stage)
+            if result.budget_skipped_steps:
+                report.budget_skipped += 1
+            if result.status == "ok":
+                report.ok += 1
+            else:
+                if result.status == "timeout":
+                    report.timeouts += 1
+                else:
+                    report.errors += 1
+                error_codes[result.error_code or "UNKNOWN"] += 1
+            if output is not None:
+                output.write(orjson.dumps(asdict(result)) + b"\n")
+                output.flush()
+
+        report.wall_seconds = time.perf_counter() - started
+        if report.wall_seconds > 0:
+            report.throughput_per_second = report.total / report.wall_seconds
+        report.latency_ms = {
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "max": max(latencies, default=0.0),
+        }
+        if report.total:
+            report.error_rate = (report.errors + report.timeouts) / report.total
+        report.error_codes = dict(error_codes)
+        report.tokens = {
+            "total": sum(tokens),
+            "mean": sum(tokens) / len(tokens) if tokens else 0.0,
+            "p95": percentile(tokens, 95),
+            "max": max(tokens, default=0.0),
+        }
+        report.tokens_by_stage = dict(tokens_by_stage)
+
+        logger.info(
+            "batch.complete",
+            total=report.total,
+            error_rate=round(report.error_rate, 4),
+            throughput=round(report.throughput_per_second, 2),
+            p95_ms=round(report.latency_ms["p95"], 1),
+        )
+        return report
+
+
+def format_report(report: BatchReport) -> str:
+    """可读的报告文本"""
+    lat = report.latency_ms
+    lines = [
+        f"Missions:    {report.total} (ok {report.ok}, errors {report.errors}, "
+        f"timeouts {report.timeouts})",
+        f"Error rate:  {report.error_rate:.2%}",
+        f"Wall time:   {report.wall_seconds:.2f}s",
+        f"Throughput:  {report.throughput_per_second:.2f} missions/s",
+        f"Latency ms:  p50 {lat.get('p50', 0):.1f} / p95 {lat.get('p95', 0):.1f} / "
+        f"p99 {lat.get('p99', 0):.1f} / max {lat.get('max', 0):.1f}",
+    ]
+    tok = report.tokens
+    if tok.get("total"):
+        lines.append(
+            f"Tokens:      total {tok['total']:.0f} / mean {tok['mean']:.0f} / "
+            f"p95 {tok['p95']:.0f} / max {tok['max']:.0f} per mission"
+        )
+        stages = ", ".join(f"{k}={v}" for k, v in sorted(report.tokens_by_stage.items()))
+        lines.append(f"By stage:    {stages}")
+    if report.budget_skipped:
+        lines.append(f"Budget:      {report.budget_skipped} missions skipped LLM steps")
+    if report.error_codes:
+        codes = ", ".join(f"{k}={v}" for k, v in sorted(report.error_codes.items()))
+        lines.append(f"Error codes: {codes}")
+    return "\n".join(lines)
+
+
+async def run_batch(
+    input_path: str | Path,
+    output_path: str | Path | None = None,
+    concurrency: int | None = None,
+    timeout: float | None = None,
+) -> BatchReport:
+    """运行一个输入文件，包含 graph 预热与连接池关闭"""
+    from .graph import get_graph_runtime
+    from .llm import shutdown_llm_pool
+    from .observability import get_telemetry
+    from .tools import shutdown_gateway_client
+
+    await get_graph_runtime().warmup()
+    runner = BatchRunner(concurrency=concurrency, timeout=timeout)
+    try:
+        if output_path is None:
+            return await runner.run(read_missions(input_path))
+        with open(output_path, "wb") as output:
+            return await runner.run(read_missions(input_path), output)
+    finally:
+        await shutdown_gateway_client()
+        await shutdown_llm_pool()
+        get_telemetry().shutdown()
+
+
+def main(argv: list[str] | None = None) -> None:
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="Run shopping missions from a JSONL file")
+    parser.add_argument("input", help="输入 JSONL，每行一条用户消息")
+    parser.add_argument("-o", "--output", help="结果 JSONL 输出路径")
+    parser.add_argument("-c", "--concurrency", type=int, help="并发 Mission 数")
+    parser.add_argument("-t", "--timeout", type=float, help="单条 Mission 超时（秒）")
+    parser.add_argument("--report", help="将汇总报告写入 JSON 文件")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run_batch(args.input, args.output, args.concurrency, args.timeout))
+    print(format_report(report))
+    if args.report:
+        Path(args.report).write_bytes(
+            orjson.dumps(report.to_dict(), option=orjson.OPT_INDENT_2)
+        )
+    if report.total == 0:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,12 +4,14 @@ Candidate Agent Node implementation.
 基于 Mission 召回候选商品。
 """
 
+import asyncio
 from datetime import UTC
 
 import structlog
 
+from ..config import get_settings
 from ..graph.state import AgentState
-from ..tools.catalog import get_offer_card, search_offers
+from ..tools.catalog import get_offer_cards, search_offers
 
 logger = structlog.get_logger()
 
@@ -21,6 +23,7 @@ async def candidate_node(state: AgentState) -> AgentState:
     基于 Mission 召回候选商品
     """
     logger.info("candidate_node.start")
+    settings = get_settings()
 
     try:
         mission = state.get("mission")
@@ -32,6 +35,10 @@ async def candidate_node(state: AgentState) -> AgentState:
                 "current_step": "candidate",
             }
 
+        basket = mission.get("basket") or []
+        if len(basket) > 1:
+            return await _basket_candidates(state, mission, basket)
+
         # 构建搜索查询
         search_query = mission.get("search_query", "")
 
@@ -51,7 +58,7 @@ async def candidate_node(state: AgentState) -> AgentState:
             query=search_query.strip(),
             category_id=None,
             price_max=mission.get("budget_amount"),
-            limit=20,  # 召回 20 个候选
+            limit=settings.candidate_recall_limit,
         )
 
         if not search_result.get("ok"):
@@ -77,21 +84,32 @@ async def candidate_node(state: AgentState) -> AgentState:
                 "error_code": "NOT_FOUND",
             }
 
-        # 获取每个 offer 的详细信息（限制前 10 个以控制成本）
+        # 批量获取 offer 的详细信息（限制数量以控制成本）
+        hydrate_ids = offer_ids[: settings.candidate_hydrate_limit]
+        scores = search_result.get("data", {}).get("scores", [])
+
+        cards_result = await get_offer_cards(offer_ids=hydrate_ids)
+        if not cards_result.get("ok"):
+            error_msg = cards_result.get("error", {}).get("message", "Get offer cards failed")
+            logger.error("candidate_node.get_arocs_failed", error=error_msg)
+            return {
+                **state,
+                "error": error_msg,
+                "error_code": "UPSTREAM_ERROR",
+                "current_step": "candidate",
+            }
+
+        cards_data = cards_result.get("data", {})
+        for offer_id, error in cards_data.get("errors", {}).items():
+            logger.warning("candidate_node.get_aroc_failed", offer_id=offer_id, error=error)
+
+        # offer_cards 与 hydrate_ids 按位置对齐，直接用下标取搜索分数
         candidates = []
-        for offer_id in offer_ids[:10]:
-            try:
-                aroc = await get_offer_card(offer_id=offer_id)
-                if aroc.get("ok"):
-                    candidate_data = aroc.get("data", {})
-                    # 添加搜索分数
-                    idx = offer_ids.index(offer_id)
-                    scores = search_result.get("data", {}).get("scores", [])
-                    candidate_data["search_score"] = scores[idx] if idx < len(scores) else 0.5
-                    candidates.append(candidate_data)
-            except Exception as e:
-                logger.warning("candidate_node.get_aroc_failed", offer_id=offer_id, error=str(e))
+        for idx, candidate_data in enumerate(cards_data.get("offer_cards", [])):
+            if candidate_data is None:
                 continue
+            candidate_data["search_score"] = scores[idx] if idx < len(scores) else 0.5
+            candidates.append(candidate_data)
 
         logger.info("candidate_node.complete", candidates_count=len(candidates))
 
@@ -122,6 +140,114 @@ async def candidate_node(state: AgentState) -> AgentState:
         }
 
 
+async def _basket_candidates(state: AgentState, mission: dict, basket: list[dict]) -> AgentState:
+    """
+    多商品任务：每个槽位单独召回，按槽位轮流排列后一次批量拉取 AROC
+
+    每个槽位最多拉取 candidate_hydrate_limit / 槽位数 个候选（至少 1 个）；轮流排列保证
+    下游按数量截断时各槽位均衡。候选附带 basket_slot（槽位下标）与 basket_quantity。
+    """
+    settings = get_settings()
+    results = await asyncio.gather(*(
+        search_offers(
+            query=slot.get("search_query", ""),
+            category_id=None,
+            price_max=mission.get("budget_amount"),
+            limit=settings.candidate_recall_limit,
+        )
+        for slot in basket
+    ))
+
+    per_slot = max(1, settings.candidate_hydrate_limit // len(basket))
+    slot_hits: list[list[tuple[str, float]]] = []
+    tool_calls = state.get("tool_calls", [])
+    for slot, result in zip(basket, results, strict=True):
+        data = result.get("data", {}) if result.get("ok") else {}
+        if not result.get("ok"):
+            logger.warning(
+                "candidate_node.slot_search_failed",
+                query=slot.get("search_query"),
+                error=result.get("error", {}).get("message"),
+            )
+        offer_ids = data.get("offer_ids", [])
+        scores = data.get("scores", [])
+        slot_hits.append([
+            (offer_id, scores[idx] if idx < len(scores) else 0.5)
+            for idx, offer_id in enumerate(offer_ids[:per_slot])
+        ])
+        tool_calls.append({
+            "tool_name": "catalog.search_offers",
+            "request": {"query": slot.get("search_query", "")},
+            "response_summary": {"count": len(offer_ids)},
+            "called_at": _now_iso(),
+        })
+
+    if not any(result.get("ok") for result in results):
+        return {
+            **state,
+            "error": "Search failed",
+            "error_code": "UPSTREAM_ERROR",
+            "current_step": "candidate",
+        }
+
+    # (槽位, offer_id, 搜索分数)，按名次轮流取各槽位
+    order = [
+        (slot_index, *hits[rank])
+        for rank in range(per_slot)
+        for slot_index, hits in enumerate(slot_hits)
+        if rank < len(hits)
+    ]
+    logger.info("candidate_node.basket_search_results", slots=len(basket), count=len(order))
+    if not order:
+        return {
+            **state,
+            "candidates": [],
+            "current_step": "candidate_complete",
+            "error": "No products found matching your requirements",
+            "error_code": "NOT_FOUND",
+        }
+
+    # 同一商品可能命中多个槽位，只拉取一次
+    hydrate_ids = list(dict.fromkeys(offer_id for _, offer_id, _ in order))
+    cards_result = await get_offer_cards(offer_ids=hydrate_ids)
+    if not cards_result.get("ok"):
+        error_msg = cards_result.get("error", {}).get("message", "Get offer cards failed")
+        logger.error("candidate_node.get_arocs_failed", error=error_msg)
+        return {
+            **state,
+            "error": error_msg,
+            "error_code": "UPSTREAM_ERROR",
+            "current_step": "candidate",
+        }
+
+    cards_data = cards_result.get("data", {})
+    for offer_id, error in cards_data.get("errors", {}).items():
+        logger.warning("candidate_node.get_aroc_failed", offer_id=offer_id, error=error)
+    cards = dict(zip(hydrate_ids, cards_data.get("offer_cards", []), strict=False))
+
+    candidates = []
+    for slot_index, offer_id, score in order:
+        card = cards.get(offer_id)
+        if card is None:
+            continue
+        candidates.append({
+            **card,
+            "search_score": score,
+            "basket_slot": slot_index,
+            "basket_quantity": basket[slot_index].get("quantity", 1),
+        })
+
+    logger.info("candidate_node.complete", candidates_count=len(candidates), slots=len(basket))
+
+    return {
+        **state,
+        "candidates": candidates,
+        "current_step": "candidate_complete",
+        "tool_calls": tool_calls,
+        "error": None,
+    }
+
+
 def _now_iso() -> str:
     """返回当前时间的 ISO 格式"""
     from datetime import datetime
@@ -10,7 +10,11 @@ import sys
 import structlog
 from langchain_core.messages import HumanMessage
 
-from .graph import AgentState, build_agent_graph
+from .config import get_settings
+from .graph import AgentState, get_graph_runtime
+from .llm import shutdown_llm_pool
+from .observability import get_telemetry
+from .tools import shutdown_gateway_client
 
 logger = structlog.get_logger()
 
@@ -38,19 +42,19 @@ async def run_agent(user_message: str) -> dict:
         "execution_result": None,
         "draft_order_id": None,
         "current_step": "start",
+        "token_budget": get_settings().token_budget_total,
         "token_used": 0,
+        "token_usage_by_stage": {},
+        "budget_skipped_steps": [],
         "tool_calls": [],
         "needs_clarification": False,
         "error": None,
         "error_code": None,
     }
 
-    # 构建 Agent Graph
-    graph = build_agent_graph()
-
-    # 运行
-    config = {"configurable": {"thread_id": "cli-test-1"}}
-    result = await graph.ainvoke(initial_state, config)
+    # 复用已编译的 Agent Graph，每次运行独立 thread
+    runtime = get_graph_runtime()
+    result = await runtime.ainvoke(initial_state, runtime.new_config())
 
     return result
 
@@ -119,6 +123,14 @@ def print_result(result: dict) -> None:
     token_used = result.get("token_used", 0)
     if token_used:
         print(f"\n💰 Token 使用: {token_used}")
+        for stage, usage in (result.get("token_usage_by_stage") or {}).items():
+            print(
+                f"   {stage}: {usage['total_tokens']} "
+                f"(输入 {usage['input_tokens']} / 输出 {usage['output_tokens']}, {usage['calls']} 次调用)"
+            )
+    skipped = result.get("budget_skipped_steps")
+    if skipped:
+        print(f"   ⚠️ 预算不足已跳过: {', '.join(skipped)}")
 
     # Tool Calls
     tool_calls = result.get("tool_calls", [])
@@ -128,8 +140,30 @@ def print_result(result: dict) -> None:
     print("\n" + "=" * 60)
 
 
+async def run_once(user_message: str) -> dict:
+    """单次运行，负责连接池的启动与释放"""
+    await get_graph_runtime().warmup()
+    try:
+        return await run_agent(user_message)
+    finally:
+        await shutdown_gateway_client()
+        await shutdown_llm_pool()
+        get_telemetry().shutdown()
+
+
 async def interactive_mode():
     """交互模式"""
+    await get_graph_runtime().warmup()
+    try:
+        await _interactive_loop()
+    finally:
+        await shutdown_gateway_client()
+        await shutdown_llm_pool()
+        get_telemetry().shutdown()
+
+
+async def _interactive_loop():
+    """交互循环"""
     print("\n" + "=" * 60)
     print("🛒 Shopping Agent - 交互模式")
     print("=" * 60)
@@ -161,7 +195,7 @@ def main():
     if len(sys.argv) > 1:
         # 命令行模式
         user_message = " ".join(sys.argv[1:])
-        result = asyncio.run(run_agent(user_message))
+        result = asyncio.run(run_once(user_message))
         print_result(result)
     else:
         # 交互模式
@@ -7,6 +7,14 @@ Cross-border Compliance Agent - 跨境合规
 - 提供合规建议和替代方案
 """
 
-# 合规检查逻辑主要在 tools/compliance.py 中实现
+# 网关调用在 tools/compliance.py 中实现；engine.py 是本地编译的规则引擎（COMPLIANCE_BACKEND=local）
 # 复杂场景可添加专门的合规 Agent 节点
 
+from .engine import ComplianceEngine, ItemFacts, clear_compliance_engines, get_compliance_engine
+
+__all__ = [
+    "ComplianceEngine",
+    "ItemFacts",
+    "clear_compliance_engines",
+    "get_compliance_engine",
+]
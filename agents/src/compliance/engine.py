@@ -0,0 +1,446 @@
+"""
+本地合规规则引擎
+
+把 data/seeds/compliance_rules.json 的声明式规则编译为谓词，按 (目的国, 类目) 建索引，
+在进程内评估任意多个 SKU，替代每个 SKU 一次的 compliance.check_item 网关调用：
+
+- condition 编译为闭包：attribute + operator（in / not_in / == / != / > / >= / < / <= / exists）、
+  category（含子类目），以及 custom 尺寸表达式（AST 白名单校验后编译为 code object）
+- applies_to 的 countries × categories 展开为索引键，"*" 为通配；
+  查询时只取 (国家|*, 商品类目链|*) 命中的规则，结果按 (国家, 类目链) 缓存
+- 引擎按 (规则文件, ruleset_version（compliance.policy_ruleset_version）) 缓存，版本变化时重新编译；
+  结果同时记录网关版本（ruleset_version）与实际编译的规则文件自身的版本（rules_file_version）
+
+评估结果与 compliance.check_item 的 data 字段相同，规则动作按网关
+（apps/tool-gateway/src/routes/compliance.ts）的语义处理：
+- require_certification：缺少该证书时进入 issues 与 required_docs
+- restrict_shipping：记入 mitigations；只有指定的运输方式被禁运时才进入 issues（阻断）
+- add_warning：进入 warnings；require_document：进入 required_docs
+- issues 中存在 severity 为 error 的条目时 allowed=False；其他动作（如 add_surcharge）不影响结果
+商品的 risk_tags 按网关的方式映射为属性（如 battery_included → attr_battery_type）。
+"""
+
+import ast
+import operator
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+import orjson
+import structlog
+
+from ..retrieval.catalog_index import DEFAULT_CATEGORIES_PATH, CategoryTree
+from ..seeds import SEEDS_DIR, normalize_country
+
+logger = structlog.get_logger()
+
+DEFAULT_RULES_PATH = SEEDS_DIR / "compliance_rules.json"
+
+WILDCARD = "*"
+
+# 网关用 risk_tags 判定的属性条件
+_RISK_TAG_ATTRIBUTES: dict[str, tuple[str, Any]] = {
+    "battery_included": ("attr_battery_type", "Built-in Lithium"),
+    "contains_liquid": ("attr_contains_liquid", True),
+    "contains_magnet": ("attr_contains_magnet", True),
+    "small_parts": ("attr_small_parts", True),
+}
+
+Predicate = Callable[["ItemFacts"], bool]
+
+
+# ==============================================
+# 商品事实
+# ==============================================
+@dataclass(frozen=True)
+class ItemFacts:
+    """规则评估所需的商品信息（兼容种子 AROC 与 catalog.get_offer_card 两种结构）"""
+
+    sku_id: str | None
+    categories: tuple[str, ...]
+    attributes: dict[str, Any]
+    dimensions_mm: tuple[float, float, float] | None
+    certifications: frozenset[str]
+
+    @classmethod
+    def from_item(cls, item: dict[str, Any], tree: CategoryTree | None = None) -> "ItemFacts":
+        variants = item.get("variants")
+        skus = variants.get("skus", []) if isinstance(variants, dict) else variants or []
+        first_sku = skus[0] if skus else {}
+
+        category_id = item.get("category_id") or (item.get("category") or {}).get("cat_id")
+        categories = tuple(tree.lineage(category_id)) if tree and category_id else ()
+        if category_id and not categories:
+            categories = (category_id,)
+
+        attributes: dict[str, Any] = {}
+        for attr in item.get("attributes") or []:
+            value = attr.get("value")
+            if isinstance(value, dict):
+                value = value.get("normalized", value.get("value"))
+            attr_id = attr.get("attr_id", "")
+            attributes[attr_id if attr_id.startswith("attr_") else f"attr_{attr_id}"] = value
+
+        risk_tags = set(item.get("risk_tags") or [])
+        risk_tags.update(first_sku.get("risk_tags") or [])
+        for tag in risk_tags:
+            if tag in _RISK_TAG_ATTRIBUTES:
+                attr_id, value = _RISK_TAG_ATTRIBUTES[tag]
+                attributes[attr_id] = value
+
+        packaging = first_sku.get("packaging") or {}
+        weight_g = item.get("weight_g") or packaging.get("weight_g")
+        if weight_g is not None:
+            attributes.setdefault("attr_weight", weight_g)
+
+        dims = item.get("dimensions_mm") or packaging.get("dim_mm")
+        if isinstance(dims, dict):
+            dims = (dims.get("l", 0), dims.get("w", 0), dims.get("h", 0))
+
+        certifications = set(item.get("certifications") or [])
+        certifications.update(first_sku.get("compliance_tags") or [])
+        return cls(
+            sku_id=item.get("sku_id") or first_sku.get("sku_id"),
+            categories=categories,
+            attributes=attributes,
+            dimensions_mm=tuple(float(d) for d in dims) if dims else None,
+            certifications=frozenset(certifications),
+        )
+
+
+# ==============================================
+# 条件编译
+# ==============================================
+_COMPARATORS: dict[str, Callable[[Any, Any], bool]] = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+
+# custom 表达式允许的语法节点与变量
+_CUSTOM_NODES = (
+    ast.Expression,
+    ast.BoolOp,
+    ast.And,
+    ast.Or,
+    ast.UnaryOp,
+    ast.Not,
+    ast.USub,
+    ast.Compare,
+    ast.BinOp,
+    ast.Add,
+    ast.Sub,
+    ast.Mult,
+    ast.Div,
+    ast.Gt,
+    ast.GtE,
+    ast.Lt,
+    ast.LtE,
+    ast.Eq,
+    ast.NotEq,
+    ast.Name,
+    ast.Load,
+    ast.Constant,
+)
+_CUSTOM_NAMES = {"length", "width", "height", "longest_side", "weight"}
+
+
+def _compile_custom(expression: str) -> Predicate:
+    """'longest_side > 1200 OR (length + 2*width + 2*height) > 3000' → 谓词"""
+    source = expression.replace(" OR ", " or ").replace(" AND ", " and ").replace("NOT ", "not ")
+    tree = ast.parse(source, mode="eval")
+    for node in ast.walk(tree):
+        if not isinstance(node, _CUSTOM_NODES):
+            raise ValueError(f"Unsupported syntax in custom condition: {expression}")
+        if isinstance(node, ast.Name) and node.id not in _CUSTOM_NAMES:
+            raise ValueError(f"Unknown variable '{node.id}' in custom condition: {expression}")
+    code = compile(tree, "<compliance>", "eval")
+
+    def predicate(facts: ItemFacts) -> bool:
+        if facts.dimensions_mm is None:
+            return False
+        length, width, height = facts.dimensions_mm
+        variables = {
+            "length": length,
+            "width": width,
+            "height": height,
+            "longest_side": max(facts.dimensions_mm),
+            "weight": facts.attributes.get("attr_weight") or 0,
+        }
+        return bool(eval(code, {"__builtins__": {}}, variables))  # AST 已按白名单校验
+
+    return predicate
+
+
+def _compile_attribute(attribute: str, op: str, expected: Any) -> Predicate:
+    """属性条件；商品缺少该属性时除 exists 外一律不命中"""
+    if op == "exists":
+        return lambda facts: facts.attributes.get(attribute) is not None
+    if op in ("in", "not_in"):
+        values = frozenset(expected if isinstance(expected, list) else [expected])
+        negate = op == "not_in"
+
+        def membership(facts: ItemFacts) -> bool:
+            value = facts.attributes.get(attribute)
+            if value is None:
+                return False
+            items = value if isinstance(value, list) else [value]
+            return any(v in values for v in items) != negate
+
+        return membership
+
+    compare = _COMPARATORS.get(op)
+    if compare is None:
+        raise ValueError(f"Unknown operator: {op}")
+
+    def comparison(facts: ItemFacts) -> bool:
+        value = facts.attributes.get(attribute)
+        if value is None:
+            return False
+        try:
+            return compare(value, expected)
+        except TypeError:
+            return False
+
+    return comparison
+
+
+def compile_condition(condition: dict[str, Any]) -> Predicate:
+    """规则 condition → 谓词"""
+    if "custom" in condition:
+        return _compile_custom(condition["custom"])
+    if "attribute" in condition:
+        return _compile_attribute(
+            condition["attribute"], condition.get("operator", "=="), condition.get("value")
+        )
+    if "category" in condition:
+        category = condition["category"]
+        return lambda facts: category in facts.categories
+    return lambda facts: True
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    rule_id: str
+    rule_type: str
+    name: dict[str, str]
+    priority: int
+    severity: str
+    action: dict[str, Any]
+    predicate: Predicate
+
+    @classmethod
+    def compile(cls, rule: dict[str, Any]) -> "CompiledRule":
+        return cls(
+            rule_id=rule["id"],
+            rule_type=rule.get("rule_type", ""),
+            name=rule.get("name") or {},
+            priority=rule.get("priority", 100),
+            severity=rule.get("severity", "warning"),
+            action=rule.get("action") or {},
+            predicate=compile_condition(rule.get("condition") or {}),
+        )
+
+
+# ==============================================
+# 引擎
+# ==============================================
+class ComplianceEngine:
+    """
+    编译后的规则集
+
+    Args:
+        ruleset: compliance_rules.json 的内容
+        ruleset_version: 网关的规则版本（缺省使用 ruleset["version"]）
+        categories: 类目树，用于规则按父类目命中子类目商品
+    """
+
+    def __init__(
+        self,
+        ruleset: dict[str, Any],
+        ruleset_version: str | None = None,
+        categories: CategoryTree | None = None,
+    ):
+        self.rules_file_version: str = ruleset.get("version", "")
+        self.ruleset_version = ruleset_version or self.rules_file_version
+        self.categories = categories
+        self.rules = [CompiledRule.compile(rule) for rule in ruleset.get("rules", [])]
+
+        # (国家, 类目) → 规则下标；"*" 为通配
+        index: dict[tuple[str, str], list[int]] = {}
+        for position, rule in enumerate(ruleset.get("rules", [])):
+            applies = rule.get("applies_to") or {}
+            countries = [normalize_country(c) for c in applies.get("countries") or [WILDCARD]]
+            for country in dict.fromkeys(countries):
+                for category in applies.get("categories") or [WILDCARD]:
+                    index.setdefault((country, category), []).append(position)
+        self._index = index
+        self.rules_for = lru_cache(maxsize=4096)(self._rules_for)
+
+    @classmethod
+    def from_file(
+        cls,
+        path: str | Path = DEFAULT_RULES_PATH,
+        ruleset_version: str | None = None,
+        categories_path: str | Path | None = DEFAULT_CATEGORIES_PATH,
+    ) -> "ComplianceEngine":
+        ruleset = orjson.loads(Path(path).read_bytes())
+        categories = None
+        if categories_path and Path(categories_path).exists():
+            categories = CategoryTree.from_file(categories_path)
+        engine = cls(ruleset, ruleset_version, categories)
+        logger.info(
+            "compliance_engine.compiled",
+            path=str(path),
+            ruleset_version=engine.ruleset_version,
+            rules_file_version=engine.rules_file_version,
+            rules=len(engine.rules),
+            index_keys=len(engine._index),
+        )
+        return engine
+
+    def _rules_for(self, country: str, categories: tuple[str, ...]) -> tuple[CompiledRule, ...]:
+        """(目的国, 商品类目链) 可能适用的规则，按 priority 排序"""
+        positions: set[int] = set()
+        for country_key in (normalize_country(country), WILDCARD):
+            for category in (*categories, WILDCARD):
+                positions.update(self._index.get((country_key, category), ()))
+        return tuple(
+            sorted((self.rules[p] for p in positions), key=lambda r: (r.priority, r.rule_id))
+        )
+
+    def facts(self, item: dict[str, Any]) -> ItemFacts:
+        return ItemFacts.from_item(item, self.categories)
+
+    def check(
+        self,
+        item: dict[str, Any] | ItemFacts,
+        destination_country: str,
+        shipping_method: str | None = None,
+    ) -> dict[str, Any]:
+        """
+        评估一个商品
+
+        Args:
+            item: AROC / offer card，或已提取的 ItemFacts
+            destination_country: 目的国
+            shipping_method: 运输方式（如 air_express）；未指定时只报告禁运方式，不产生 issue
+
+        Returns:
+            与 compliance.check_item 相同结构的 data
+        """
+        facts = item if isinstance(item, ItemFacts) else self.facts(item)
+        issues: list[dict[str, Any]] = []
+        warnings: list[str] = []
+        required_docs: list[str] = []
+        mitigations: list[dict[str, Any]] = []
+        blocked_methods: set[str] = set()
+
+        for rule in self.rules_for(destination_country, facts.categories):
+            if not rule.predicate(facts):
+                continue
+            action = rule.action
+            action_type = action.get("type", "")
+            message = action.get("message") or rule.name
+
+            severity = rule.severity
+            blocking = False
+            if action_type == "require_certification":
+                certification = action.get("certification")
+                if certification and certification not in facts.certifications:
+                    required_docs.append(certification)
+                    blocking = True
+            elif action_type == "restrict_shipping":
+                blocked = set(action.get("blocked_methods") or [])
+                blocked_methods |= blocked
+                mitigations.append(
+                    {
+                        "rule_id": rule.rule_id,
+                        "type": "restrict_shipping",
+                        "allowed_methods": action.get("allowed_methods", []),
+                        "blocked_methods": sorted(blocked),
+                    }
+                )
+                # 指定的运输方式被禁运：不论规则 severity，一律阻断
+                if shipping_method and shipping_method in blocked:
+                    severity, blocking = "error", True
+            elif action_type == "add_warning":
+                warnings.append(message.get("en", rule.rule_id))
+            elif action_type == "require_document":
+                # 网关只读 certification 字段；种子规则用 document 字段写文件名
+                required_docs.append(
+                    action.get("certification") or action.get("document") or "Unknown"
+                )
+
+            if blocking:
+                issues.append(
+                    {
+                        "rule_id": rule.rule_id,
+                        "rule_type": rule.rule_type,
+                        "action_type": action_type,
+                        "severity": severity,
+                        "message_en": message.get("en", rule.rule_id),
+                        "message_zh": message.get("zh", ""),
+                    }
+                )
+
+        errors = [issue for issue in issues if issue["severity"] == "error"]
+        return {
+            "sku_id": facts.sku_id,
+            "allowed": not errors,
+            "reason_codes": [issue["rule_id"] for issue in errors],
+            "issues": issues,
+            "warnings": list(dict.fromkeys(warnings)),
+            "required_docs": list(dict.fromkeys(required_docs)),
+            "mitigations": mitigations,
+            "blocked_shipping_methods": sorted(blocked_methods),
+            "ruleset_version": self.ruleset_version,
+            "rules_file_version": self.rules_file_version,
+        }
+
+    def check_many(
+        self,
+        items: Iterable[dict[str, Any] | ItemFacts],
+        destination_country: str,
+        shipping_method: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """批量评估（同一目的国），结果与 items 按位置对齐"""
+        return [self.check(item, destination_country, shipping_method) for item in items]
+
+
+# ==============================================
+# 按 (规则文件, 规则版本) 缓存
+# ==============================================
+# 只保留最近几个版本：版本切换期间新旧请求可能并存
+_MAX_ENGINES = 4
+_engines: dict[tuple[str, str], ComplianceEngine] = {}
+
+
+def get_compliance_engine(
+    ruleset_version: str | None = None,
+    rules_path: str | Path | None = None,
+) -> ComplianceEngine:
+    """
+    获取指定规则文件、规则版本的引擎；首次遇到该组合时从规则文件编译
+
+    ruleset_version 为 None 时使用规则文件自身的 version。
+    """
+    path = Path(rules_path or DEFAULT_RULES_PATH)
+    key = (str(path.resolve()), ruleset_version or "")
+    engine = _engines.get(key)
+    if engine is None:
+        engine = ComplianceEngine.from_file(path, ruleset_version)
+        _engines[key] = engine
+        while len(_engines) > _MAX_ENGINES:
+            del _engines[next(iter(_engines))]
+    return engine
+
+
+def clear_compliance_engines() -> None:
+    """清空已编译的引擎（规则文件更新或测试时使用）"""
+    _engines.clear()
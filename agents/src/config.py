@@ -43,10 +43,143 @@ class Settings(BaseSettings):
     # 💰 便宜: GPT-4o-mini, Claude-3-Haiku, Gemini-2.0-Flash
     # 🚀 强力: Claude-3.5-Sonnet, Claude-Sonnet-4, GPT-4o
 
+    # LLM client 池：共享连接池 / 请求超时（秒）/ SDK 内置重试次数
+    llm_max_connections: int = Field(default=50, alias="LLM_MAX_CONNECTIONS")
+    llm_max_keepalive_connections: int = Field(default=20, alias="LLM_MAX_KEEPALIVE_CONNECTIONS")
+    llm_keepalive_expiry: float = Field(default=60.0, alias="LLM_KEEPALIVE_EXPIRY")
+    llm_request_timeout: float = Field(default=30.0, alias="LLM_REQUEST_TIMEOUT")
+    llm_max_retries: int = Field(default=2, alias="LLM_MAX_RETRIES")
+
+    # LLM 结构化输出缓存：schema 列表逗号分隔，"*" 表示全部；TTL 0 表示不过期
+    llm_cache_enabled: bool = Field(default=True, alias="LLM_CACHE_ENABLED")
+    llm_cache_schemas: str = Field(default="MissionParseResult", alias="LLM_CACHE_SCHEMAS")
+    llm_cache_semantic_schemas: str = Field(default="", alias="LLM_CACHE_SEMANTIC_SCHEMAS")
+    llm_cache_similarity_threshold: float = Field(
+        default=0.95, alias="LLM_CACHE_SIMILARITY_THRESHOLD"
+    )
+    llm_cache_max_entries: int = Field(default=5000, alias="LLM_CACHE_MAX_ENTRIES")
+    llm_cache_ttl_seconds: float = Field(default=3600.0, alias="LLM_CACHE_TTL_SECONDS")
+
     # Token Budget
+    # 单个 Mission 的 token 上限；可选的 LLM 步骤在剩余预算不足（prompt 估算 + 输出预留）时跳过
     token_budget_total: int = Field(default=50000, alias="TOKEN_BUDGET_TOTAL")
+    llm_output_token_reserve: int = Field(default=1024, alias="LLM_OUTPUT_TOKEN_RESERVE")
+
+    # Tool Gateway HTTP client
+    # 连接池 / keepalive / HTTP/2（需安装 h2）/ 超时（秒）
+    gateway_max_connections: int = Field(default=100, alias="GATEWAY_MAX_CONNECTIONS")
+    gateway_max_keepalive_connections: int = Field(default=20, alias="GATEWAY_MAX_KEEPALIVE_CONNECTIONS")
+    gateway_keepalive_expiry: float = Field(default=30.0, alias="GATEWAY_KEEPALIVE_EXPIRY")
+    gateway_http2: bool = Field(default=False, alias="GATEWAY_HTTP2")
+    gateway_connect_timeout: float = Field(default=5.0, alias="GATEWAY_CONNECT_TIMEOUT")
+    gateway_read_timeout: float = Field(default=30.0, alias="GATEWAY_READ_TIMEOUT")
+    gateway_pool_timeout: float = Field(default=5.0, alias="GATEWAY_POOL_TIMEOUT")
+    # 工具级超时覆盖，格式 "tool=connect/read,..."
+    gateway_tool_timeouts: str = Field(default="", alias="GATEWAY_TOOL_TIMEOUTS")
+
+    # 容错：重试 / 重试预算 / 熔断 / 对冲
+    tool_retry_max_attempts: int = Field(default=3, alias="TOOL_RETRY_MAX_ATTEMPTS")
+    tool_retry_backoff_base: float = Field(default=0.1, alias="TOOL_RETRY_BACKOFF_BASE")
+    tool_retry_backoff_cap: float = Field(default=2.0, alias="TOOL_RETRY_BACKOFF_CAP")
+    # 每个请求向预算存入 ratio 个令牌，每次重试/对冲消耗 1 个
+    retry_budget_ratio: float = Field(default=0.1, alias="RETRY_BUDGET_RATIO")
+    retry_budget_max_tokens: float = Field(default=10.0, alias="RETRY_BUDGET_MAX_TOKENS")
+    breaker_failure_threshold: int = Field(default=5, alias="BREAKER_FAILURE_THRESHOLD")
+    breaker_recovery_seconds: float = Field(default=30.0, alias="BREAKER_RECOVERY_SECONDS")
+    # 只读工具的对冲延迟，0 表示关闭；建议设为该工具的 p95 延迟
+    tool_hedge_delay_seconds: float = Field(default=0.0, alias="TOOL_HEDGE_DELAY_SECONDS")
+
+    # Tool 响应缓存
+    # backend: memory（进程内 LRU）| redis（共享存储）| none（关闭）
+    tool_cache_backend: str = Field(default="memory", alias="TOOL_CACHE_BACKEND")
+    tool_cache_max_entries: int = Field(default=10000, alias="TOOL_CACHE_MAX_ENTRIES")
+    tool_cache_stale_seconds: float = Field(default=30.0, alias="TOOL_CACHE_STALE_SECONDS")
+    tool_cache_redis_url: str = Field(default="redis://localhost:6379/0", alias="TOOL_CACHE_REDIS_URL")
+
+    # Single-flight 请求合并
+    # tools 为逗号分隔的工具名（per-tool opt-in），留空表示所有只读工具
+    tool_single_flight: bool = Field(default=True, alias="TOOL_SINGLE_FLIGHT")
+    tool_single_flight_tools: str = Field(
+        default="catalog.get_offer_card,compliance.check_item,pricing.get_realtime_quote,shipping.quote_options",
+        alias="TOOL_SINGLE_FLIGHT_TOOLS",
+    )
+
+    # Intent 规则解析：单轮请求的 confidence 不低于阈值时跳过 LLM
+    intent_rules_enabled: bool = Field(default=True, alias="INTENT_RULES_ENABLED")
+    intent_rules_min_confidence: float = Field(default=0.85, alias="INTENT_RULES_MIN_CONFIDENCE")
+
+    # Candidate
+    # 召回数量 / 拉取 AROC 的候选数量 / 批量接口不可用时的并发上限
+    candidate_recall_limit: int = Field(default=20, alias="CANDIDATE_RECALL_LIMIT")
+    candidate_hydrate_limit: int = Field(default=10, alias="CANDIDATE_HYDRATE_LIMIT")
+    catalog_fetch_concurrency: int = Field(default=16, alias="CATALOG_FETCH_CONCURRENCY")
+    # 搜索后端：gateway（工具网关）| local（进程内 BM25 索引）
+    # 索引文件留空表示仓库自带的 data/seeds/sample_aroc.json，也可以是数据库导出的 JSONL
+    catalog_search_backend: str = Field(default="gateway", alias="CATALOG_SEARCH_BACKEND")
+    catalog_index_path: str = Field(default="", alias="CATALOG_INDEX_PATH")
+    # local 后端的混合召回（BM25 + 向量近邻，RRF 融合）
+    # embedding：hashing（本地 feature hashing）| openai（OpenAI 兼容 embeddings 接口）
+    # 索引目录留空表示只在内存中构建；非空时向量以 memmap 保存，重启后只为新增 offer 计算 embedding
+    catalog_vector_enabled: bool = Field(default=False, alias="CATALOG_VECTOR_ENABLED")
+    catalog_vector_embedding: str = Field(default="hashing", alias="CATALOG_VECTOR_EMBEDDING")
+    catalog_vector_embedding_model: str = Field(
+        default="text-embedding-3-small", alias="CATALOG_VECTOR_EMBEDDING_MODEL"
+    )
+    catalog_vector_dim: int = Field(default=256, alias="CATALOG_VECTOR_DIM")
+    catalog_vector_index_dir: str = Field(default="", alias="CATALOG_VECTOR_INDEX_DIR")
+    catalog_vector_n_probe: int = Field(default=16, alias="CATALOG_VECTOR_N_PROBE")
+    catalog_vector_min_similarity: float = Field(default=0.15, alias="CATALOG_VECTOR_MIN_SIMILARITY")
+    catalog_hybrid_rrf_k: int = Field(default=60, alias="CATALOG_HYBRID_RRF_K")
+
+    # Verifier
+    # 核验阶段并发：所有候选 × 三项检查共享一个信号量，整体受 deadline 约束
+    verify_max_candidates: int = Field(default=10, alias="VERIFY_MAX_CANDIDATES")
+    verify_concurrency: int = Field(default=16, alias="VERIFY_CONCURRENCY")
+    verify_deadline_seconds: float = Field(default=20.0, alias="VERIFY_DEADLINE_SECONDS")
+    # 整批候选一次批量报价；网关没有批量接口时逐个报价的并发上限
+    pricing_quote_concurrency: int = Field(default=16, alias="PRICING_QUOTE_CONCURRENCY")
+
+    # Compliance
+    # 检查后端：gateway（逐个 SKU 调用 compliance.check_item）| local（进程内规则引擎，
+    # 需调用方传入商品信息）；规则文件留空使用 data/seeds/compliance_rules.json；
+    # 规则版本（compliance.policy_ruleset_version）的缓存时间（秒），版本变化时重新编译
+    compliance_backend: str = Field(default="gateway", alias="COMPLIANCE_BACKEND")
+    compliance_rules_path: str = Field(default="", alias="COMPLIANCE_RULES_PATH")
+    compliance_ruleset_ttl_seconds: float = Field(
+        default=300.0, alias="COMPLIANCE_RULESET_TTL_SECONDS"
+    )
+
+    # Shipping
+    # 报价后端：gateway（逐个请求 shipping.quote_options）| local（带包装信息的请求在本地处理：
+    # 费率表覆盖的目的国在进程内报价，其余按 (目的国, 邮编前缀, 重量档, 尺寸档, 服务等级) 缓存网关报价）
+    # 费率表留空使用 data/seeds/shipping_rates.json；关闭费率表时只做包裹画像缓存
+    shipping_quote_backend: str = Field(default="gateway", alias="SHIPPING_QUOTE_BACKEND")
+    shipping_rate_tables_enabled: bool = Field(default=True, alias="SHIPPING_RATE_TABLES_ENABLED")
+    shipping_rates_path: str = Field(default="", alias="SHIPPING_RATES_PATH")
+    shipping_quote_cache_max_entries: int = Field(
+        default=10000, alias="SHIPPING_QUOTE_CACHE_MAX_ENTRIES"
+    )
+
+    # Landed cost
+    # 到手成本税率表（各国增值税 / 按类目关税 / 免税额），留空使用 data/seeds/landed_cost.json
+    landed_cost_tables_path: str = Field(default="", alias="LANDED_COST_TABLES_PATH")
+
+    # Checkpointer
+    checkpointer_backend: str = Field(default="memory_lru", alias="CHECKPOINTER_BACKEND")
+    checkpoint_max_threads: int = Field(default=1000, alias="CHECKPOINT_MAX_THREADS")
+    checkpoint_max_per_thread: int = Field(default=10, alias="CHECKPOINT_MAX_PER_THREAD")
+    checkpoint_ttl_seconds: float = Field(default=3600.0, alias="CHECKPOINT_TTL_SECONDS")
+    checkpoint_sqlite_path: str = Field(default="checkpoints.db", alias="CHECKPOINT_SQLITE_PATH")
+
+    # 流式执行：事件队列容量，消费方跟不上时 graph 暂停推进
+    stream_buffer_size: int = Field(default=64, alias="STREAM_BUFFER_SIZE")
+
+    # Batch runner
+    batch_concurrency: int = Field(default=8, alias="BATCH_CONCURRENCY")
+    batch_mission_timeout_seconds: float = Field(default=120.0, alias="BATCH_MISSION_TIMEOUT_SECONDS")
 
     # Observability
+    otel_enabled: bool = Field(default=False, alias="OTEL_ENABLED")
     otel_exporter_otlp_endpoint: str = Field(
         default="http://localhost:4317",
         alias="OTEL_EXPORTER_OTLP_ENDPOINT",
@@ -0,0 +1,255 @@
+"""
+多商品篮子规划
+
+多商品任务（"charger + cable + case under $60"）的每个槽位有若干核验通过的候选，
+从每个槽位选一个，使到手成本（商品总价 + 运费）最低，并且不超过预算。
+
+同一 (商家, 发货地) 的商品合并发货，运费按组内最贵的单件运费估计，组合的成本因此
+不可按槽位拆分，用分支定界求解：
+
+- 送达期限由调用方逐候选处理：每个候选取期限内最便宜的物流选项，没有则不参与
+- 槽位内支配剔除：另一候选连同运费的成本不超过本候选的商品价时，本候选不可能更优
+- 下界取两者中较大者：
+  已选成本 + 其余槽位最低商品价之和 + 单个剩余槽位相对于已开包裹的最大额外成本；
+  已选成本 + Σ_剩余槽位 min(商品价 + 分摊权重 × 边际运费)，同组运费只付一次，
+  权重按分组归一（见 _shipping_shares），在根节点用次梯度上升求得
+- 初始上界为预算与启发式解（贪心后逐槽位替换）中较小者；子节点按边际成本升序展开
+
+搜索节点数超过 max_nodes 时返回当前最优解，并标记 optimal=False。
+"""
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+import numpy as np
+
+MAX_NODES = 50_000
+
+# 浮点误差容差：预算边界上的解视为可行
+_EPS = 1e-9
+
+
+@dataclass(frozen=True)
+class BasketOption:
+    """槽位中的一个候选：商品总价、选定物流的运费与送达天数、合并发货的分组"""
+
+    price: float
+    shipping: float
+    eta_days: int = 0
+    group: tuple[str, str] = ("", "")
+
+
+@dataclass(frozen=True)
+class BasketSolution:
+    """每个槽位选中的候选下标（对应输入顺序）及估算成本"""
+
+    picks: tuple[int, ...]
+    cost: float
+    eta_days: int
+    optimal: bool
+    nodes: int
+
+
+def basket_cost(options: Sequence[BasketOption]) -> float:
+    """商品价之和 + 每个 (商家, 发货地) 分组一次运费（组内取最贵）"""
+    shipping: dict[tuple[str, str], float] = {}
+    for option in options:
+        shipping[option.group] = max(shipping.get(option.group, 0.0), option.shipping)
+    return sum(option.price for option in options) + sum(shipping.values())
+
+
+def solve_basket(
+    slots: Sequence[Sequence[BasketOption]],
+    budget: float | None = None,
+    max_nodes: int = MAX_NODES,
+) -> BasketSolution | None:
+    """
+    每个槽位选一个候选，使 basket_cost 最低
+
+    任一槽位没有候选，或最低成本超过预算时返回 None。
+    """
+    if not slots or any(not options for options in slots):
+        return None
+
+    # 槽位内剔除被支配的候选，保留原下标；候选少的槽位先分支
+    kept = [_undominated(options) for options in slots]
+    order = sorted(range(len(slots)), key=lambda s: len(kept[s]))
+    groups = {option.group for options in slots for option in options}
+    group_ids = {group: i for i, group in enumerate(sorted(groups))}
+
+    n_slots = len(slots)
+    width = max(len(kept[s]) for s in order)
+    price = np.full((n_slots, width), np.inf)
+    shipping = np.zeros((n_slots, width))
+    group = np.zeros((n_slots, width), dtype=np.intp)
+    for row, s in enumerate(order):
+        for col, index in enumerate(kept[s]):
+            option = slots[s][index]
+            price[row, col] = option.price
+            shipping[row, col] = option.shipping
+            group[row, col] = group_ids[option.group]
+    min_price = price.min(axis=1)
+    # rest[k]：第 k 行及之后各槽位最低商品价之和
+    rest = np.concatenate([np.cumsum(min_price[::-1])[::-1], [0.0]]).tolist()
+    # 运费分摊权重：每个 (槽位, 分组) 一个权重，各分组的权重之和不超过 1
+    share = _shipping_shares(price, shipping, group, len(group_ids))
+
+    open_max = np.zeros(len(group_ids))
+    picks = [0] * n_slots
+    best_cost = budget + _EPS if budget is not None else np.inf
+    best_picks: list[int] | None = None
+
+    # 初始解：逐槽位取边际成本最低的候选，再逐槽位替换直到不能更便宜
+    for row in range(n_slots):
+        marginal = price[row] + np.maximum(shipping[row] - open_max[group[row]], 0.0)
+        picks[row] = int(np.argmin(marginal))
+        open_max[group[row, picks[row]]] = max(
+            open_max[group[row, picks[row]]], shipping[row, picks[row]]
+        )
+    open_max[:] = 0.0
+    cost = _improve(picks, price, shipping, group)
+    if cost < best_cost:
+        best_cost, best_picks = cost, list(picks)
+
+    nodes = 0
+
+    def search(row: int, cost: float) -> None:
+        nonlocal nodes, best_cost, best_picks
+        if row == n_slots:
+            if cost < best_cost:
+                best_cost, best_picks = cost, list(picks)
+            return
+        nodes += 1
+        if nodes > max_nodes:
+            return
+
+        extra_shipping = np.maximum(shipping[row:] - open_max[group[row:]], 0.0)
+        marginal = price[row:] + extra_shipping
+        # 两个下界取大：单个槽位的边际成本全额计入；或各槽位的边际运费按分摊权重计入
+        extra = float((marginal.min(axis=1) - min_price[row:]).max())
+        shared = float((price[row:] + share[row:] * extra_shipping).min(axis=1).sum())
+        if max(cost + rest[row] + extra, cost + shared) >= best_cost:
+            return
+
+        costs = marginal[0]
+        for col in np.argsort(costs, kind="stable").tolist():
+            child = cost + float(costs[col])
+            if child + rest[row + 1] >= best_cost:
+                break
+            g = group[row, col]
+            previous = open_max[g]
+            open_max[g] = max(previous, shipping[row, col])
+            picks[row] = col
+            search(row + 1, child)
+            open_max[g] = previous
+
+    search(0, 0.0)
+    if best_picks is None:
+        return None
+
+    chosen = [0] * n_slots
+    for row, s in enumerate(order):
+        chosen[s] = kept[s][best_picks[row]]
+    selected = [slots[s][index] for s, index in enumerate(chosen)]
+    return BasketSolution(
+        picks=tuple(chosen),
+        cost=round(basket_cost(selected), 2),
+        eta_days=max(option.eta_days for option in selected),
+        optimal=nodes <= max_nodes,
+        nodes=nodes,
+    )
+
+
+def _shipping_shares(
+    price: np.ndarray,
+    shipping: np.ndarray,
+    group: np.ndarray,
+    n_groups: int,
+    iterations: int = 100,
+) -> np.ndarray:
+    """
+    每个候选的运费分摊权重（与 price 同形状）
+
+    权重 w[槽位, 分组] ≥ 0 且每个分组在所有槽位上的权重之和不超过 1 时，
+    Σ_槽位 min_候选(商品价 + w · 边际运费) 是剩余槽位成本的下界：同组运费只付一次，
+    而组内各槽位按权重分摊的运费之和不超过它。对任意剩余槽位子集仍然成立，
+    因此只在根节点用投影次梯度上升求一次使下界最大的权重，各节点复用。
+    """
+    rows = np.arange(len(price))
+    weights = np.full((len(price), n_groups), 1.0 / len(price))
+    best, best_bound = weights, -np.inf
+    step = 1.0
+    for _ in range(iterations):
+        total = price + weights[rows[:, None], group] * shipping
+        cols = total.argmin(axis=1)
+        bound = float(total[rows, cols].sum())
+        if bound > best_bound:
+            best, best_bound = weights, bound
+        gradient = np.zeros_like(weights)
+        gradient[rows, group[rows, cols]] = shipping[rows, cols]
+        scale = gradient.max()
+        if scale <= 0:
+            break
+        weights = _project_columns(weights + step * gradient / scale)
+        step *= 0.96
+    return best[rows[:, None], group]
+
+
+def _project_columns(weights: np.ndarray) -> np.ndarray:
+    """把每一列投影到 {w ≥ 0, Σw ≤ 1}"""
+    weights = np.maximum(weights, 0.0)
+    for g in np.flatnonzero(weights.sum(axis=0) > 1.0):
+        column = weights[:, g]
+        ordered = np.sort(column)[::-1]
+        excess = np.cumsum(ordered) - 1.0
+        rho = np.flatnonzero(ordered - excess / np.arange(1, len(ordered) + 1) > 0)[-1]
+        weights[:, g] = np.maximum(column - excess[rho] / (rho + 1), 0.0)
+    return weights
+
+
+def _improve(
+    picks: list[int], price: np.ndarray, shipping: np.ndarray, group: np.ndarray
+) -> float:
+    """逐槽位替换为使总成本最低的候选（原地修改 picks），直到没有改进，返回总成本"""
+    rows = range(len(picks))
+
+    def total() -> float:
+        costs: dict[int, float] = {}
+        for row in rows:
+            g = int(group[row, picks[row]])
+            costs[g] = max(costs.get(g, 0.0), float(shipping[row, picks[row]]))
+        return float(sum(price[row, picks[row]] for row in rows)) + sum(costs.values())
+
+    best = total()
+    improved = True
+    while improved:
+        improved = False
+        for row in rows:
+            current = picks[row]
+            for col in np.flatnonzero(np.isfinite(price[row])).tolist():
+                if col == current:
+                    continue
+                picks[row] = col
+                cost = total()
+                if cost < best - _EPS:
+                    best, current, improved = cost, col, True
+            picks[row] = current
+    return best
+
+
+def _undominated(options: Sequence[BasketOption]) -> list[int]:
+    """
+    槽位内未被支配的候选下标
+
+    候选 b 的商品价 + 运费不超过候选 a 的商品价时，任何组合里把 a 换成 b 都不会更贵。
+    """
+    by_price = sorted(range(len(options)), key=lambda i: options[i].price)
+    kept = []
+    best_full = np.inf
+    for i in by_price:
+        option = options[i]
+        if best_full <= option.price:
+            continue
+        kept.append(i)
+        best_full = min(best_full, option.price + option.shipping)
+    return kept
@@ -4,19 +4,34 @@ Plan Agent Node implementation.
 基于核验后的候选生成 2-3 个可执行方案。
 """
 
+import asyncio
+
 import structlog
 
 from ..config import get_settings
 from ..graph.state import AgentState
+from ..landed_cost import category_of, get_landed_cost_table
+from ..llm.budget import TokenBudget
 from ..llm.client import call_llm_and_parse
 from ..llm.prompts import PLAN_PROMPT
 from ..llm.schemas import (
     DeliveryEstimate,
     PlanItem,
     PlanRecommendation,
+    PlanShipment,
     PurchasePlan,
     TotalBreakdown,
 )
+from ..shipping import (
+    ShipmentGroup,
+    ShippingSelection,
+    group_items,
+    packaging_of,
+    select_shipping,
+)
+from ..tools.shipping import quote_shipping_options
+from .basket import BasketOption, solve_basket
+from .scoring import score_candidates
 
 logger = structlog.get_logger()
 
@@ -50,102 +65,20 @@ async def plan_node(state: AgentState) -> AgentState:
                 "plans": [],
             }
 
-        destination_country = mission.get("destination_country", "US")
-        quantity = mission.get("quantity", 1)
-
-        # 生成方案
-        plans = []
-
-        # 按价格排序找最便宜
-        by_price = sorted(
-            verified_candidates,
-            key=lambda x: x.get("checks", {}).get("pricing", {}).get("total_price", float("inf"))
-        )
-
-        # 按送达时间排序找最快
-        by_speed = sorted(
-            verified_candidates,
-            key=lambda x: x.get("checks", {}).get("shipping", {}).get("fastest_days", 999)
-        )
-
-        # 综合评分（加权）
-        weights = mission.get("objective_weights", {"price": 0.4, "speed": 0.3, "risk": 0.3})
-
-        def compute_score(candidate):
-            pricing = candidate.get("checks", {}).get("pricing", {})
-            shipping = candidate.get("checks", {}).get("shipping", {})
-
-            # 归一化分数（简化版）
-            price = pricing.get("total_price", 100)
-            days = shipping.get("fastest_days", 14)
-            warnings_count = len(candidate.get("warnings", []))
-
-            price_score = max(0, 1 - price / 500)  # 假设 $500 是最大值
-            speed_score = max(0, 1 - days / 30)  # 假设 30 天是最大值
-            risk_score = max(0, 1 - warnings_count / 5)  # 假设 5 个警告是最大值
-
-            return (
-                weights.get("price", 0.4) * price_score +
-                weights.get("speed", 0.3) * speed_score +
-                weights.get("risk", 0.3) * risk_score
-            )
-
-        by_score = sorted(verified_candidates, key=compute_score, reverse=True)
-
-        # 生成 Plan 1: 最便宜
-        if by_price:
-            cheapest = by_price[0]
-            plans.append(_create_plan(
-                candidate=cheapest,
-                plan_name="Budget Saver",
-                plan_type="cheapest",
-                quantity=quantity,
-                destination_country=destination_country,
-            ))
-
-        # 生成 Plan 2: 最快
-        if by_speed and (not by_price or by_speed[0].get("offer_id") != by_price[0].get("offer_id")):
-            fastest = by_speed[0]
-            plans.append(_create_plan(
-                candidate=fastest,
-                plan_name="Express Delivery",
-                plan_type="fastest",
-                quantity=quantity,
-                destination_country=destination_country,
-            ))
-
-        # 生成 Plan 3: 最佳价值
-        if by_score:
-            best = by_score[0]
-            # 确保不重复
-            existing_offer_ids = [p.items[0].offer_id for p in plans if p.items]
-            if best.get("offer_id") not in existing_offer_ids:
-                plans.append(_create_plan(
-                    candidate=best,
-                    plan_name="Best Value",
-                    plan_type="best_value",
-                    quantity=quantity,
-                    destination_country=destination_country,
-                ))
-
-        # 如果只有一个商品，只生成一个方案
-        if len(plans) == 0 and verified_candidates:
-            plans.append(_create_plan(
-                candidate=verified_candidates[0],
-                plan_name="Recommended",
-                plan_type="best_value",
-                quantity=quantity,
-                destination_country=destination_country,
-            ))
+        if len(mission.get("basket") or []) > 1:
+            plans = await _basket_plans(verified_candidates, mission)
+        else:
+            plans = await _single_item_plans(verified_candidates, mission)
 
         # 可选：使用 LLM 优化方案
         settings = get_settings()
         recommendation = plans[0].plan_name if plans else "No plans available"
         recommendation_reason = "Based on your requirements"
 
+        budget = TokenBudget.from_state(state)
         if settings.openai_api_key and plans:
             try:
-                llm_result = await _llm_optimize_plans(mission, verified_candidates, plans)
+                llm_result = await _llm_optimize_plans(mission, plans, budget)
                 if llm_result:
                     recommendation = llm_result.recommended_plan
                     recommendation_reason = llm_result.recommendation_reason
@@ -161,6 +94,7 @@ async def plan_node(state: AgentState) -> AgentState:
             "recommendation_reason": recommendation_reason,
             "current_step": "plan_complete",
             "error": None,
+            **budget.state_updates(),
         }
 
     except Exception as e:
@@ -173,43 +107,263 @@ async def plan_node(state: AgentState) -> AgentState:
         }
 
 
-def _create_plan(
-    candidate: dict,
+async def _single_item_plans(verified_candidates: list[dict], mission: dict) -> list[PurchasePlan]:
+    """单商品任务：按 Pareto 前沿选出 最便宜 / 最快 / 最佳价值 三个候选"""
+    quantity = mission.get("quantity", 1)
+
+    # 列式评分：价格 / 送达天数 / 风险按本批候选归一化，三类方案都从 Pareto 前沿中选取
+    scores = score_candidates(
+        verified_candidates,
+        mission.get("objective_weights"),
+        destination_country=mission.get("destination_country"),
+    )
+    cheapest = verified_candidates[scores.cheapest()]
+    fastest = verified_candidates[scores.fastest()]
+    best = verified_candidates[scores.best_value()]
+
+    # 生成 Plan 1: 最便宜
+    plans = [await _build_plan(
+        lines=[(cheapest, quantity)],
+        plan_name="Budget Saver",
+        plan_type="cheapest",
+        mission=mission,
+    )]
+
+    # 生成 Plan 2: 最快
+    if fastest.get("offer_id") != cheapest.get("offer_id"):
+        plans.append(await _build_plan(
+            lines=[(fastest, quantity)],
+            plan_name="Express Delivery",
+            plan_type="fastest",
+            mission=mission,
+        ))
+
+    # 生成 Plan 3: 最佳价值（确保不重复）
+    existing_offer_ids = [p.items[0].offer_id for p in plans if p.items]
+    if best.get("offer_id") not in existing_offer_ids:
+        plans.append(await _build_plan(
+            lines=[(best, quantity)],
+            plan_name="Best Value",
+            plan_type="best_value",
+            mission=mission,
+        ))
+    return plans
+
+
+async def _basket_plans(verified_candidates: list[dict], mission: dict) -> list[PurchasePlan]:
+    """
+    多商品任务：每个槽位选一个候选，三个方案分别在不同送达期限下求到手成本最低的组合
+
+    - Budget Saver：不限期限
+    - Express Delivery：期限为最早能到齐的天数（各槽位最快候选中最慢的一个）
+    - Best Value：期限为 arrival_days_max
+    选出的组合相同时只保留一个方案；没有核验通过候选的槽位不参与，在方案风险中注明。
+    """
+    basket = mission["basket"]
+    slots: list[list[dict]] = [[] for _ in basket]
+    for verified in verified_candidates:
+        slot = verified.get("candidate", {}).get("basket_slot")
+        if slot is not None and 0 <= slot < len(slots):
+            slots[slot].append(verified)
+
+    filled = [i for i, slot in enumerate(slots) if slot]
+    if not filled:
+        return []
+    missing = [
+        f"No verified candidate for: {basket[i].get('search_query', '')}"
+        for i, slot in enumerate(slots)
+        if not slot
+    ]
+
+    earliest = max(
+        min(o.get("eta_max_days", 0) for v in slots[i] for o in _verified_options(v))
+        for i in filled
+    )
+    budget = mission.get("budget_amount")
+    plans = []
+    chosen: list[tuple[int, ...]] = []
+    for plan_name, plan_type, max_days in (
+        ("Budget Saver", "cheapest", None),
+        ("Express Delivery", "fastest", earliest),
+        ("Best Value", "best_value", mission.get("arrival_days_max")),
+    ):
+        candidates = [slots[i] for i in filled]
+        options = [[_basket_option(v, max_days) for v in slot] for slot in candidates]
+        indexes = [[j for j, o in enumerate(slot) if o is not None] for slot in options]
+        feasible = [[options[s][j] for j in slot] for s, slot in enumerate(indexes)]
+        solution = solve_basket(feasible, budget) or solve_basket(feasible)
+        if solution is None:
+            continue
+        picks = tuple(indexes[s][j] for s, j in enumerate(solution.picks))
+        if picks in chosen:
+            continue
+        chosen.append(picks)
+        logger.info(
+            "plan_node.basket_solved",
+            plan_type=plan_type,
+            cost=solution.cost,
+            nodes=solution.nodes,
+            optimal=solution.optimal,
+        )
+
+        lines = [
+            (candidates[s][j], candidates[s][j].get("quantity") or basket[i].get("quantity", 1))
+            for s, (i, j) in enumerate(zip(filled, picks, strict=True))
+        ]
+        risks = list(missing)
+        if budget is not None and solution.cost > budget:
+            risks.append(f"Basket exceeds budget ${budget}")
+        plans.append(await _build_plan(lines, plan_name, plan_type, mission, risks))
+    return plans
+
+
+def _basket_option(verified: dict, max_days: int | None) -> BasketOption | None:
+    """候选在送达期限内最便宜的物流选项；没有报价或期限内无选项时返回 None"""
+    total_price = verified.get("checks", {}).get("pricing", {}).get("total_price")
+    options = [
+        o for o in _verified_options(verified)
+        if max_days is None or o.get("eta_max_days", 0) <= max_days
+    ]
+    if total_price is None or not options:
+        return None
+    option = min(options, key=lambda o: (o.get("price", 0.0), o.get("eta_max_days", 0)))
+    candidate = verified.get("candidate", {})
+    return BasketOption(
+        price=total_price,
+        shipping=option.get("price", 0.0),
+        eta_days=option.get("eta_max_days", 0),
+        group=(candidate.get("merchant_id") or "", _ship_from(candidate)),
+    )
+
+
+async def _build_plan(
+    lines: list[tuple[dict, int]],
     plan_name: str,
     plan_type: str,
-    quantity: int,
-    destination_country: str,
+    mission: dict,
+    risks: list[str] | None = None,
 ) -> PurchasePlan:
-    """创建购买方案"""
-    offer_id = candidate.get("offer_id", "")
-    sku_id = candidate.get("sku_id", "")
-    candidate.get("candidate", {})
+    """
+    为一组 (核验结果, 数量) 生成方案
 
-    pricing = candidate.get("checks", {}).get("pricing", {})
-    shipping = candidate.get("checks", {}).get("shipping", {})
+    商品按 (商家, 发货地) 合并发货；物流组合按方案类型选择：
+    cheapest 取最低运费，fastest 取最早送达，best_value 取满足 arrival_days_max 的最低运费。
+    risks 为调用方附加的方案风险（如篮子缺少的槽位），与核验警告一起计入置信度。
+    """
+    groups = await _shipment_groups(lines, mission)
+    objective = "fastest" if plan_type == "fastest" else "cheapest"
+    max_days = mission.get("arrival_days_max") if plan_type == "best_value" else None
+    selection = select_shipping(groups, objective, max_days=max_days)
+    return _create_plan(
+        lines=lines,
+        plan_name=plan_name,
+        plan_type=plan_type,
+        destination_country=mission.get("destination_country", "US"),
+        groups=groups,
+        selection=selection,
+        risks=risks,
+    )
+
+
+async def _shipment_groups(lines: list[tuple[dict, int]], mission: dict) -> list[ShipmentGroup]:
+    """
+    分组并取得各组物流选项
+
+    只有一个商品且数量与核验时相同的分组直接复用核验阶段的报价；
+    其余分组（多商品合并 / 数量变化）并发报价，每组一次。
+    """
+    items = []
+    for verified, quantity in lines:
+        candidate = verified.get("candidate", {})
+        sku_ref = verified.get("sku_id") or verified.get("offer_id")
+        items.append({
+            "sku_id": sku_ref,
+            "qty": quantity,
+            **(packaging_of(candidate, sku_ref) or {}),
+            "merchant_id": candidate.get("merchant_id") or "",
+            "ship_from": _ship_from(candidate),
+            "verified": verified,
+        })
+
+    groups = group_items(items)
+    to_quote = []
+    for group in groups:
+        item = group.items[0]
+        verified_quantity = item["verified"].get("quantity") or mission.get("quantity", 1)
+        if len(group.items) == 1 and item["qty"] == verified_quantity:
+            group.options = _verified_options(group.items[0]["verified"])
+        else:
+            to_quote.append(group)
+
+    if to_quote:
+        results = await asyncio.gather(
+            *(
+                quote_shipping_options(
+                    items=[
+                        {k: v for k, v in item.items() if k != "verified"} for item in group.items
+                    ],
+                    destination_country=mission.get("destination_country", "US"),
+                    destination_postal_code=mission.get("destination_postal_code"),
+                )
+                for group in to_quote
+            ),
+            return_exceptions=True,
+        )
+        for group, result in zip(to_quote, results, strict=True):
+            if isinstance(result, BaseException) or not result.get("ok"):
+                logger.warning("plan_node.shipping_quote_failed", merchant_id=group.merchant_id)
+                group.options = _fallback_options(group.items[0]["verified"])
+            else:
+                group.options = result.get("data", {}).get("options", [])
+    return groups
+
+
+def _ship_from(candidate: dict) -> str:
+    """候选的发货地；AROC 中为列表时取第一个"""
+    ship_from = candidate.get("ship_from") or ""
+    if isinstance(ship_from, list):
+        ship_from = ship_from[0] if ship_from else ""
+    return ship_from
 
-    unit_price = pricing.get("unit_price", 0)
-    total_price = pricing.get("total_price", unit_price * quantity)
 
-    # 估算运费和税费
-    shipping_cost = shipping.get("cheapest_price", 9.99)
-    tax_rate = 0.08 if destination_country == "US" else 0.15
-    tax_estimate = total_price * tax_rate
-    total_landed = total_price + shipping_cost + tax_estimate
+def _verified_options(verified: dict) -> list[dict]:
+    """核验阶段的物流选项；旧的核验结果只有摘要时按摘要构造一个选项"""
+    shipping = verified.get("checks", {}).get("shipping", {})
+    return shipping.get("options") or _fallback_options(verified)
 
-    # 送达时间
+
+def _fallback_options(verified: dict) -> list[dict]:
+    """没有可用报价时的估算选项（与核验摘要一致：最低运费 + 最快时效）"""
+    shipping = verified.get("checks", {}).get("shipping", {})
     fastest_days = shipping.get("fastest_days", 7)
+    return [{
+        "shipping_option_id": "ship_standard",
+        "carrier": "Standard Shipping",
+        "price": shipping.get("cheapest_price", 9.99),
+        "eta_min_days": fastest_days,
+        "eta_max_days": fastest_days + 7,
+    }]
 
-    # 警告和确认项
-    warnings = candidate.get("warnings", [])
-    compliance = candidate.get("checks", {}).get("compliance", {})
-    if compliance.get("required_docs"):
-        warnings.append(f"Required certifications: {', '.join(compliance['required_docs'])}")
 
-    return PurchasePlan(
-        plan_name=plan_name,
-        plan_type=plan_type,
-        items=[
+def _create_plan(
+    lines: list[tuple[dict, int]],
+    plan_name: str,
+    plan_type: str,
+    destination_country: str,
+    groups: list[ShipmentGroup],
+    selection: ShippingSelection | None,
+    risks: list[str] | None = None,
+) -> PurchasePlan:
+    """创建购买方案"""
+    plan_items = []
+    warnings: list[str] = []
+    for verified, quantity in lines:
+        offer_id = verified.get("offer_id", "")
+        sku_id = verified.get("sku_id", "")
+        pricing = verified.get("checks", {}).get("pricing", {})
+        unit_price = pricing.get("unit_price", 0)
+        total_price = pricing.get("total_price", unit_price * quantity)
+        plan_items.append(
             PlanItem(
                 offer_id=offer_id,
                 sku_id=sku_id or f"{offer_id}_default",
@@ -217,19 +371,75 @@ def _create_plan(
                 unit_price=unit_price,
                 subtotal=total_price,
             )
-        ],
-        shipping_option_id="ship_standard",
-        shipping_option_name="Standard Shipping",
+        )
+
+        # 警告和确认项
+        warnings.extend(verified.get("warnings", []))
+        compliance = verified.get("checks", {}).get("compliance", {})
+        if compliance.get("required_docs"):
+            warnings.append(f"Required certifications: {', '.join(compliance['required_docs'])}")
+
+    # 运费来自选定的物流组合；每个物流分组是一个包裹，没有物流组合时整单视为一个包裹
+    shipments = []
+    consignment_of: dict[int, int] = {}
+    if selection is not None:
+        for group, option in zip(groups, selection.options, strict=True):
+            shipments.append(
+                PlanShipment(
+                    merchant_id=group.merchant_id,
+                    ship_from=group.ship_from,
+                    sku_ids=[item["sku_id"] for item in group.items],
+                    shipping_option_id=option.get("shipping_option_id", ""),
+                    shipping_option_name=option.get("carrier", ""),
+                    price=option.get("price", 0.0),
+                    eta_min_days=option.get("eta_min_days", 0),
+                    eta_max_days=option.get("eta_max_days", 0),
+                )
+            )
+        consignment_of = {
+            id(item["verified"]): index
+            for index, group in enumerate(groups)
+            for item in group.items
+        }
+        freight = [option.get("price", 0.0) for option in selection.options]
+        delivery = DeliveryEstimate(
+            min_days=selection.eta_min_days,
+            max_days=selection.eta_max_days,
+        )
+    else:
+        freight = [9.99]
+        delivery = DeliveryEstimate(min_days=7, max_days=14)
+        warnings.append("No shipping option available for all items")
+
+    # 多个包裹时方案级的运输选项为各包裹选项的组合
+    option_ids = list(dict.fromkeys(s.shipping_option_id for s in shipments)) or ["ship_standard"]
+    option_names = list(dict.fromkeys(s.shipping_option_name for s in shipments))
+
+    # 关税 / 税费按包裹计算（免税额按包裹货值判断）
+    landed = get_landed_cost_table().calculate(
+        destination_country,
+        goods=[item.subtotal for item in plan_items],
+        shipping=freight,
+        categories=[category_of(verified.get("candidate", {})) for verified, _ in lines],
+        consignments=[consignment_of.get(id(verified), 0) for verified, _ in lines],
+    ).breakdown()
+    warnings.extend(risks or [])
+
+    return PurchasePlan(
+        plan_name=plan_name,
+        plan_type=plan_type,
+        items=plan_items,
+        shipping_option_id="+".join(option_ids),
+        shipping_option_name=" + ".join(option_names) or "Standard Shipping",
+        shipments=shipments,
         total=TotalBreakdown(
-            subtotal=round(total_price, 2),
-            shipping_cost=round(shipping_cost, 2),
-            tax_estimate=round(tax_estimate, 2),
-            total_landed_cost=round(total_landed, 2),
-        ),
-        delivery=DeliveryEstimate(
-            min_days=fastest_days,
-            max_days=fastest_days + 7,
+            subtotal=float(landed["goods"]),
+            shipping_cost=float(landed["shipping"]),
+            tax_estimate=float(landed["tax"]),
+            duty_estimate=float(landed["duty"]),
+            total_landed_cost=float(landed["total"]),
         ),
+        delivery=delivery,
         risks=warnings,
         confidence=0.8 if not warnings else 0.6,
         confirmation_items=[
@@ -239,10 +449,10 @@ def _create_plan(
     )
 
 
-async def _llm_optimize_plans(mission: dict, candidates: list, plans: list) -> PlanRecommendation | None:
-    """使用 LLM 优化方案推荐"""
-    del candidates  # unused
-
+async def _llm_optimize_plans(
+    mission: dict, plans: list, budget: TokenBudget
+) -> PlanRecommendation | None:
+    """使用 LLM 优化方案推荐；预算不足时跳过，返回 None"""
     try:
         # 简化数据
         plans_summary = [
@@ -261,12 +471,18 @@ async def _llm_optimize_plans(mission: dict, candidates: list, plans: list) -> P
             {"role": "user", "content": f"Mission: {mission}\n\nAvailable plans: {plans_summary}\n\nWhich plan do you recommend?"},
         ]
 
+        if not budget.allows("plan.optimize", messages):
+            return None
+
+        usage: dict[str, int] = {}
         result = await call_llm_and_parse(
             messages=messages,
             output_schema=PlanRecommendation,
             model_type="planner",
             temperature=0.1,
+            usage=usage,
         )
+        budget.record("plan", usage)
         return result
 
     except Exception as e:
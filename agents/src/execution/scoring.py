@@ -0,0 +1,163 @@
+"""
+方案多目标评分
+
+把核验后的候选展开为列式数组（到手价格 / 送达天数 / 风险），一次性完成：
+
+- 归一化：按本批候选的实际分布做 min-max（不再假设 $500 / 30 天上限），缺失值视为最差
+- 加权评分：score = Σ weight × (1 - 归一化值)，越大越好
+- Pareto 前沿：按 (价格, 天数, 风险) 字典序排序后单遍扫描；风险按取值离散化，
+  维护"已扫描点在各风险档及以下的最小天数"，一个点被支配当且仅当存在价格不高、
+  风险不高、天数更短（或相同但不完全重合）的已扫描点
+
+cheapest / fastest / best_value 都从前沿中选取，数百个候选也只需一次排序。
+"""
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from ..landed_cost import category_of, get_landed_cost_table
+
+DEFAULT_WEIGHTS = {"price": 0.4, "speed": 0.3, "risk": 0.3}
+
+
+@dataclass
+class CandidateScores:
+    """候选的列式指标与评分，下标与输入候选对齐"""
+
+    price: np.ndarray
+    eta_days: np.ndarray
+    risk: np.ndarray
+    score: np.ndarray
+    pareto: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.price)
+
+    def cheapest(self) -> int:
+        """到手价最低（同价取更快、风险更低）"""
+        return int(np.lexsort((self.risk, self.eta_days, self.price))[0])
+
+    def fastest(self) -> int:
+        """送达最快（同天数取更便宜、风险更低）"""
+        return int(np.lexsort((self.risk, self.price, self.eta_days))[0])
+
+    def best_value(self) -> int:
+        """前沿上加权评分最高的候选"""
+        frontier = np.flatnonzero(self.pareto)
+        return int(frontier[np.argmax(self.score[frontier])])
+
+
+def candidate_columns(
+    candidates: Sequence[dict[str, Any]],
+    destination_country: str | None = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    从核验结果提取 (价格, 送达天数, 风险) 三列
+
+    价格为商品总价加最低运费，给出目的国时再加上关税与税费（整批一次计算）；
+    风险为警告条数。缺失的价格 / 天数记为 inf。
+    """
+    n = len(candidates)
+    price = np.full(n, np.inf)
+    eta_days = np.full(n, np.inf)
+    risk = np.zeros(n)
+    priced: list[int] = []
+    goods: list[float] = []
+    freight: list[float] = []
+    for i, candidate in enumerate(candidates):
+        checks = candidate.get("checks", {})
+        total_price = checks.get("pricing", {}).get("total_price")
+        shipping = checks.get("shipping", {})
+        if total_price is not None:
+            priced.append(i)
+            goods.append(total_price)
+            freight.append(shipping.get("cheapest_price", 0.0))
+        if shipping.get("fastest_days") is not None:
+            eta_days[i] = shipping["fastest_days"]
+        risk[i] = len(candidate.get("warnings", []))
+
+    if destination_country and priced:
+        landed = get_landed_cost_table().calculate(
+            destination_country,
+            goods=goods,
+            shipping=freight,
+            categories=[category_of(candidates[i].get("candidate", {})) for i in priced],
+        )
+        price[priced] = landed.total / 100
+    elif priced:
+        price[priced] = np.add(goods, freight)
+    return price, eta_days, risk
+
+
+def normalize(values: np.ndarray) -> np.ndarray:
+    """按实际分布 min-max 归一化到 [0, 1]，非有限值（缺失）记为 1"""
+    finite = np.isfinite(values)
+    result = np.ones_like(values, dtype=float)
+    if not finite.any():
+        return result
+    lo = values[finite].min()
+    span = values[finite].max() - lo
+    result[finite] = (values[finite] - lo) / span if span > 0 else 0.0
+    return result
+
+
+def pareto_frontier(price: np.ndarray, eta_days: np.ndarray, risk: np.ndarray) -> np.ndarray:
+    """三个目标都越小越好，返回非支配点的布尔掩码（完全相同的点互不支配）"""
+    n = len(price)
+    mask = np.zeros(n, dtype=bool)
+    if n == 0:
+        return mask
+
+    order = np.lexsort((risk, eta_days, price))
+    # 天数与风险都按取值离散化为名次（缺失的 inf 也有名次）；扫描用 Python 标量，避免逐元素的 numpy 开销
+    eta_levels, eta_rank = np.unique(eta_days, return_inverse=True)
+    risk_levels, risk_rank = np.unique(risk, return_inverse=True)
+    points = list(zip(price.tolist(), eta_days.tolist(), risk.tolist(), strict=True))
+    eta_ranks = eta_rank.tolist()
+    risk_ranks = risk_rank.tolist()
+    n_risk = len(risk_levels)
+
+    # min_eta[r]：已扫描点中风险档 ≤ r 的最小天数名次（前缀最小值），初始为"没有点"
+    min_eta = [len(eta_levels)] * n_risk
+    keep = [False] * n
+    previous = -1
+    for i in order.tolist():
+        if previous >= 0 and points[i] == points[previous]:
+            keep[i] = keep[previous]
+            continue
+        # 已扫描点价格都不高于当前点；天数不长于当前点即被支配（完全相同的点已在上面处理）
+        r, e = risk_ranks[i], eta_ranks[i]
+        if min_eta[r] > e:
+            keep[i] = True
+            for level in range(r, n_risk):
+                if min_eta[level] <= e:
+                    break
+                min_eta[level] = e
+        previous = i
+    mask[:] = keep
+    return mask
+
+
+def score_candidates(
+    candidates: Sequence[dict[str, Any]],
+    weights: dict[str, float] | None = None,
+    destination_country: str | None = None,
+) -> CandidateScores:
+    """列式评分 + Pareto 前沿；给出目的国时价格按到手成本计"""
+    weights = weights or DEFAULT_WEIGHTS
+    price, eta_days, risk = candidate_columns(candidates, destination_country)
+    score = (
+        weights.get("price", DEFAULT_WEIGHTS["price"]) * (1 - normalize(price))
+        + weights.get("speed", DEFAULT_WEIGHTS["speed"]) * (1 - normalize(eta_days))
+        + weights.get("risk", DEFAULT_WEIGHTS["risk"]) * (1 - normalize(risk))
+    )
+    return CandidateScores(
+        price=price,
+        eta_days=eta_days,
+        risk=risk,
+        score=score,
+        pareto=pareto_frontier(price, eta_days, risk),
+    )
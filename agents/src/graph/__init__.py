@@ -3,6 +3,7 @@ LangGraph state machine definitions.
 """
 
 from .state import AgentState
+from .streaming import StreamEvent
 
 
 def build_agent_graph(*args, **kwargs):
@@ -11,5 +12,17 @@ def build_agent_graph(*args, **kwargs):
     return _build(*args, **kwargs)
 
 
-__all__ = ["AgentState", "build_agent_graph"]
+def get_agent_graph():
+    """获取进程级共享的已编译 graph"""
+    from .builder import get_agent_graph as _get
+    return _get()
+
+
+def get_graph_runtime():
+    """获取进程级 GraphRuntime"""
+    from .runtime import get_graph_runtime as _get
+    return _get()
+
+
+__all__ = ["AgentState", "StreamEvent", "build_agent_graph", "get_agent_graph", "get_graph_runtime"]
 
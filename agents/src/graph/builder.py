@@ -2,13 +2,14 @@
 LangGraph graph builder.
 """
 
-from langgraph.checkpoint.memory import MemorySaver
 from langgraph.graph import END, StateGraph
 
 from ..candidate import candidate_node
 from ..execution import execution_node, plan_node
 from ..intent import intent_node
+from ..observability import instrument_node
 from ..verifier import verifier_node
+from .checkpoint import create_checkpointer
 from .state import AgentState
 
 
@@ -109,16 +110,16 @@ def build_agent_graph():
     # 创建状态图
     graph = StateGraph(AgentState)
 
-    # 添加节点
-    graph.add_node("intent", intent_node)
-    graph.add_node("candidate", candidate_node)
-    graph.add_node("verify", verifier_node)
-    graph.add_node("plan", plan_node)
-    graph.add_node("execute", execution_node)
-    graph.add_node("error_handler", error_handler_node)
-    graph.add_node("no_results", no_results_node)
-    graph.add_node("no_valid_candidates", no_valid_candidates_node)
-    graph.add_node("wait_user", wait_user_node)
+    # 添加节点（每个节点都带 span 与延迟指标）
+    graph.add_node("intent", instrument_node("intent", intent_node))
+    graph.add_node("candidate", instrument_node("candidate", candidate_node))
+    graph.add_node("verify", instrument_node("verify", verifier_node))
+    graph.add_node("plan", instrument_node("plan", plan_node))
+    graph.add_node("execute", instrument_node("execute", execution_node))
+    graph.add_node("error_handler", instrument_node("error_handler", error_handler_node))
+    graph.add_node("no_results", instrument_node("no_results", no_results_node))
+    graph.add_node("no_valid_candidates", instrument_node("no_valid_candidates", no_valid_candidates_node))
+    graph.add_node("wait_user", instrument_node("wait_user", wait_user_node))
 
     # 设置入口点
     graph.set_entry_point("intent")
@@ -171,21 +172,14 @@ def build_agent_graph():
     graph.add_edge("no_valid_candidates", END)
     graph.add_edge("wait_user", END)
 
-    # 编译图，启用 checkpointing
-    memory = MemorySaver()
-    app = graph.compile(checkpointer=memory)
+    # 编译图，启用 checkpointing（后端由 CHECKPOINTER_BACKEND 决定）
+    app = graph.compile(checkpointer=create_checkpointer())
 
     return app
 
 
-# 默认 graph 实例
-agent_graph = None
-
-
 def get_agent_graph():
-    """获取或创建 Agent Graph 实例"""
-    global agent_graph
-    if agent_graph is None:
-        agent_graph = build_agent_graph()
-    return agent_graph
+    """获取进程级共享的 Agent Graph 实例（只编译一次）"""
+    from .runtime import get_graph_runtime
+    return get_graph_runtime().graph
 
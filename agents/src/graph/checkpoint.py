@@ -0,0 +1,614 @@
+"""
+Checkpointer 后端
+
+MemorySaver 会为每个 thread_id 永久保留所有 checkpoint，长时间运行的 worker 内存只增不减。
+这里提供两个替代后端：
+
+- BoundedMemorySaver: 进程内 LRU，按 thread 数量上限淘汰最久未访问的 thread，
+  每个 thread 只保留最近 N 个 checkpoint，超过 TTL 未访问的 thread 整体删除
+- SqliteCheckpointSaver: 本地 SQLite 文件持久化（WAL），进程重启后可恢复，
+  同样支持每个 thread 的保留上限与按时间清理
+
+两者都只为本步变化的 channel 写入 blob（与 InMemorySaver 相同），
+写放大可用 scripts/bench_checkpointer.py 对比。
+"""
+
+import asyncio
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Iterator, Sequence
+from typing import Any
+
+import structlog
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    SerializerProtocol,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+    writes_sort_key,
+)
+from langgraph.checkpoint.memory import InMemorySaver
+
+from ..config import get_settings
+
+logger = structlog.get_logger()
+
+
+class BoundedMemorySaver(InMemorySaver):
+    """
+    有界的进程内 checkpointer
+
+    Args:
+        max_threads: 最多保留的 thread 数，超出时淘汰最久未访问的 thread
+        max_checkpoints_per_thread: 每个 thread/namespace 保留的最近 checkpoint 数
+        ttl_seconds: thread 超过该时间未访问即被删除；None 表示不过期
+    """
+
+    def __init__(
+        self,
+        *,
+        max_threads: int = 1000,
+        max_checkpoints_per_thread: int = 10,
+        ttl_seconds: float | None = 3600.0,
+        serde: SerializerProtocol | None = None,
+    ) -> None:
+        super().__init__(serde=serde)
+        self.max_threads = max_threads
+        self.max_checkpoints_per_thread = max(1, max_checkpoints_per_thread)
+        self.ttl_seconds = ttl_seconds
+        self.evictions = {"lru": 0, "ttl": 0, "pruned_checkpoints": 0}
+        # thread_id -> 最后访问时间，按访问顺序排列
+        self._access: OrderedDict[str, float] = OrderedDict()
+        # (thread_id, ns, checkpoint_id) -> channel_versions，用于回收不再引用的 blob
+        self._versions: dict[tuple[str, str, str], ChannelVersions] = {}
+        # (thread_id, ns) -> 该 namespace 下的 blob key
+        self._blob_keys: dict[tuple[str, str], set[tuple]] = {}
+        self._lock = threading.RLock()
+
+    def get_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        thread_id = config["configurable"]["thread_id"]
+        with self._lock:
+            self._expire()
+            if thread_id not in self.storage:
+                return None
+            self._touch(thread_id)
+            return super().get_tuple(config)
+
+    def list(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> Iterator[CheckpointTuple]:
+        with self._lock:
+            self._expire()
+            if config and config["configurable"]["thread_id"] not in self.storage:
+                return iter(())
+            return iter(list(super().list(config, filter=filter, before=before, limit=limit)))
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        with self._lock:
+            result = super().put(config, checkpoint, metadata, new_versions)
+            self._versions[(thread_id, checkpoint_ns, checkpoint["id"])] = dict(
+                checkpoint["channel_versions"]
+            )
+            self._blob_keys.setdefault((thread_id, checkpoint_ns), set()).update(
+                (thread_id, checkpoint_ns, k, v) for k, v in new_versions.items()
+            )
+            self._touch(thread_id)
+            self._prune(thread_id, checkpoint_ns)
+            self._evict_lru()
+            self._expire()
+            return result
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        with self._lock:
+            super().put_writes(config, writes, task_id, task_path)
+            self._touch(config["configurable"]["thread_id"])
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            super().delete_thread(thread_id)
+            self._access.pop(thread_id, None)
+            for key in [k for k in self._versions if k[0] == thread_id]:
+                del self._versions[key]
+            for key in [k for k in self._blob_keys if k[0] == thread_id]:
+                del self._blob_keys[key]
+
+    def stats(self) -> dict[str, int]:
+        """当前占用情况"""
+        with self._lock:
+            return {
+                "threads": len(self.storage),
+                "checkpoints": sum(
+                    len(ns) for thread in self.storage.values() for ns in thread.values()
+                ),
+                "blobs": len(self.blobs),
+                "writes": sum(len(w) for w in self.writes.values()),
+                **self.evictions,
+            }
+
+    def _touch(self, thread_id: str) -> None:
+        self._access[thread_id] = time.monotonic()
+        self._access.move_to_end(thread_id)
+
+    def _prune(self, thread_id: str, checkpoint_ns: str) -> None:
+        """只保留最近 N 个 checkpoint，并回收不再被引用的 blob"""
+        checkpoints = self.storage[thread_id][checkpoint_ns]
+        excess = len(checkpoints) - self.max_checkpoints_per_thread
+        if excess <= 0:
+            return
+
+        for checkpoint_id in sorted(checkpoints)[:excess]:
+            del checkpoints[checkpoint_id]
+            self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+            self._versions.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+        self.evictions["pruned_checkpoints"] += excess
+
+        referenced = {
+            (thread_id, checkpoint_ns, channel, version)
+            for checkpoint_id in checkpoints
+            for channel, version in self._versions.get(
+                (thread_id, checkpoint_ns, checkpoint_id), {}
+            ).items()
+        }
+        blob_keys = self._blob_keys.get((thread_id, checkpoint_ns), set())
+        for key in blob_keys - referenced:
+            self.blobs.pop(key, None)
+        blob_keys &= referenced
+
+    def _evict_lru(self) -> None:
+        while len(self._access) > self.max_threads:
+            thread_id = next(iter(self._access))
+            self.delete_thread(thread_id)
+            self.evictions["lru"] += 1
+
+    def _expire(self) -> None:
+        if self.ttl_seconds is None:
+            return
+        cutoff = time.monotonic() - self.ttl_seconds
+        while self._access:
+            thread_id, last_access = next(iter(self._access.items()))
+            if last_access > cutoff:
+                break
+            self.delete_thread(thread_id)
+            self.evictions["ttl"] += 1
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    type TEXT,
+    checkpoint BLOB,
+    metadata_type TEXT,
+    metadata BLOB,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    channel TEXT NOT NULL,
+    version TEXT NOT NULL,
+    type TEXT NOT NULL,
+    blob BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT,
+    blob BLOB,
+    task_path TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+"""
+
+
+class SqliteCheckpointSaver(BaseCheckpointSaver[str]):
+    """
+    SQLite checkpointer
+
+    Args:
+        path: 数据库文件路径，":memory:" 表示内存数据库
+        max_checkpoints_per_thread: 每个 thread/namespace 保留的最近 checkpoint 数；None 不限制
+    """
+
+    def __init__(
+        self,
+        path: str = "checkpoints.db",
+        *,
+        max_checkpoints_per_thread: int | None = None,
+        serde: SerializerProtocol | None = None,
+    ) -> None:
+        super().__init__(serde=serde)
+        self.path = path
+        self.max_checkpoints_per_thread = max_checkpoints_per_thread
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+
+    # ----------------------------------------
+    # 读
+    # ----------------------------------------
+    def get_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = get_checkpoint_id(config)
+        query = (
+            "SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata "
+            "FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?"
+        )
+        params: list[Any] = [thread_id, checkpoint_ns]
+        if checkpoint_id:
+            query += " AND checkpoint_id = ?"
+            params.append(checkpoint_id)
+        else:
+            query += " ORDER BY checkpoint_id DESC LIMIT 1"
+
+        with self._lock:
+            row = self.conn.execute(query, params).fetchone()
+            if row is None:
+                return None
+            return self._load_tuple(thread_id, checkpoint_ns, row)
+
+    def list(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> Iterator[CheckpointTuple]:
+        query = (
+            "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, "
+            "type, checkpoint, metadata_type, metadata FROM checkpoints"
+        )
+        where: list[str] = []
+        params: list[Any] = []
+        if config:
+            where.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                where.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                where.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            where.append("checkpoint_id < ?")
+            params.append(before_id)
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += " ORDER BY checkpoint_id DESC"
+
+        results = []
+        with self._lock:
+            for thread_id, checkpoint_ns, *row in self.conn.execute(query, params).fetchall():
+                if limit is not None and len(results) >= limit:
+                    break
+                metadata = self.serde.loads_typed((row[4], row[5]))
+                if filter and not all(metadata.get(k) == v for k, v in filter.items()):
+                    continue
+                results.append(self._load_tuple(thread_id, checkpoint_ns, row))
+        return iter(results)
+
+    def _load_tuple(self, thread_id: str, checkpoint_ns: str, row: tuple) -> CheckpointTuple:
+        checkpoint_id, parent_checkpoint_id, type_, checkpoint_b, metadata_type, metadata_b = row
+        checkpoint: Checkpoint = self.serde.loads_typed((type_, checkpoint_b))
+
+        channel_values: dict[str, Any] = {}
+        versions = checkpoint["channel_versions"]
+        if versions:
+            rows = self.conn.execute(
+                "SELECT channel, version, type, blob FROM blobs "
+                "WHERE thread_id = ? AND checkpoint_ns = ? AND channel IN ({})".format(
+                    ",".join("?" * len(versions))
+                ),
+                [thread_id, checkpoint_ns, *versions],
+            ).fetchall()
+            for channel, version, blob_type, blob in rows:
+                if str(versions[channel]) == version and blob_type != "empty":
+                    channel_values[channel] = self.serde.loads_typed((blob_type, blob))
+
+        writes = self.conn.execute(
+            "SELECT task_id, idx, channel, type, blob, task_path FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        writes.sort(key=lambda w: writes_sort_key(w[5], w[0], w[1]))
+
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint={**checkpoint, "channel_values": channel_values},
+            metadata=self.serde.loads_typed((metadata_type, metadata_b)),
+            pending_writes=[
+                (task_id, channel, self.serde.loads_typed((type_, blob)))
+                for task_id, _, channel, type_, blob, _ in writes
+            ],
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_checkpoint_id,
+                    }
+                }
+                if parent_checkpoint_id
+                else None
+            ),
+        )
+
+    # ----------------------------------------
+    # 写
+    # ----------------------------------------
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        c = checkpoint.copy()
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        values: dict[str, Any] = c.pop("channel_values")  # type: ignore[misc]
+
+        blob_rows = []
+        for channel, version in new_versions.items():
+            type_, blob = (
+                self.serde.dumps_typed(values[channel]) if channel in values else ("empty", b"")
+            )
+            blob_rows.append((thread_id, checkpoint_ns, channel, str(version), type_, blob))
+        type_, checkpoint_b = self.serde.dumps_typed(c)
+        metadata_type, metadata_b = self.serde.dumps_typed(
+            get_checkpoint_metadata(config, metadata)
+        )
+
+        with self._lock, self.conn:
+            self.conn.execute("BEGIN")
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?, ?, ?)", blob_rows
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    thread_id,
+                    checkpoint_ns,
+                    checkpoint["id"],
+                    config["configurable"].get("checkpoint_id"),
+                    type_,
+                    checkpoint_b,
+                    metadata_type,
+                    metadata_b,
+                    time.time(),
+                ),
+            )
+            if self.max_checkpoints_per_thread:
+                self._prune(thread_id, checkpoint_ns, self.max_checkpoints_per_thread)
+
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        # 普通写入幂等（重复忽略），特殊写入（错误/中断等，idx < 0）覆盖
+        replace = all(channel in WRITES_IDX_MAP for channel, _ in writes)
+        rows = []
+        for idx, (channel, value) in enumerate(writes):
+            type_, blob = self.serde.dumps_typed(value)
+            rows.append((
+                thread_id,
+                checkpoint_ns,
+                checkpoint_id,
+                task_id,
+                WRITES_IDX_MAP.get(channel, idx),
+                channel,
+                type_,
+                blob,
+                task_path,
+            ))
+        verb = "INSERT OR REPLACE" if replace else "INSERT OR IGNORE"
+        with self._lock, self.conn:
+            self.conn.executemany(
+                f"{verb} INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock, self.conn:
+            for table in ("checkpoints", "blobs", "writes"):
+                self.conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+
+    def prune_older_than(self, seconds: float) -> int:
+        """删除最近一次写入早于 seconds 秒前的 thread，返回删除的 thread 数"""
+        cutoff = time.time() - seconds
+        with self._lock:
+            stale = [
+                row[0]
+                for row in self.conn.execute(
+                    "SELECT thread_id FROM checkpoints GROUP BY thread_id HAVING MAX(created_at) < ?",
+                    (cutoff,),
+                ).fetchall()
+            ]
+        for thread_id in stale:
+            self.delete_thread(thread_id)
+        return len(stale)
+
+    def _prune(self, thread_id: str, checkpoint_ns: str, keep: int) -> None:
+        """只保留最近 keep 个 checkpoint，回收不再引用的 blob（调用方持有锁与事务）"""
+        old_ids = [
+            row[0]
+            for row in self.conn.execute(
+                "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                "ORDER BY checkpoint_id DESC LIMIT -1 OFFSET ?",
+                (thread_id, checkpoint_ns, keep),
+            ).fetchall()
+        ]
+        if not old_ids:
+            return
+
+        placeholders = ",".join("?" * len(old_ids))
+        for table in ("checkpoints", "writes"):
+            self.conn.execute(
+                f"DELETE FROM {table} WHERE thread_id = ? AND checkpoint_ns = ? "
+                f"AND checkpoint_id IN ({placeholders})",
+                (thread_id, checkpoint_ns, *old_ids),
+            )
+
+        referenced: set[tuple[str, str]] = set()
+        for type_, checkpoint_b in self.conn.execute(
+            "SELECT type, checkpoint FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?",
+            (thread_id, checkpoint_ns),
+        ).fetchall():
+            versions = self.serde.loads_typed((type_, checkpoint_b))["channel_versions"]
+            referenced.update((channel, str(version)) for channel, version in versions.items())
+
+        stale_blobs = [
+            (thread_id, checkpoint_ns, channel, version)
+            for channel, version in self.conn.execute(
+                "SELECT channel, version FROM blobs WHERE thread_id = ? AND checkpoint_ns = ?",
+                (thread_id, checkpoint_ns),
+            ).fetchall()
+            if (channel, version) not in referenced
+        ]
+        self.conn.executemany(
+            "DELETE FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? "
+            "AND channel = ? AND version = ?",
+            stale_blobs,
+        )
+
+    # ----------------------------------------
+    # 异步接口：SQLite 调用放到线程池，避免阻塞 event loop
+    # ----------------------------------------
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    def get_next_version(self, current: str | None, channel: None) -> str:
+        """与 InMemorySaver 相同的字符串版本号：单调递增的整数部分 + 随机后缀"""
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+
+def create_checkpointer(backend: str | None = None) -> BaseCheckpointSaver:
+    """
+    根据配置创建 checkpointer
+
+    backend: memory_lru（默认）| sqlite | memory（不受限的 MemorySaver，仅用于调试）
+    """
+    settings = get_settings()
+    backend = (backend or settings.checkpointer_backend).lower()
+
+    if backend == "sqlite":
+        saver: BaseCheckpointSaver = SqliteCheckpointSaver(
+            settings.checkpoint_sqlite_path,
+            max_checkpoints_per_thread=settings.checkpoint_max_per_thread,
+        )
+    elif backend == "memory":
+        saver = InMemorySaver()
+    else:
+        saver = BoundedMemorySaver(
+            max_threads=settings.checkpoint_max_threads,
+            max_checkpoints_per_thread=settings.checkpoint_max_per_thread,
+            ttl_seconds=settings.checkpoint_ttl_seconds or None,
+        )
+
+    logger.info("checkpointer.created", backend=backend)
+    return saver
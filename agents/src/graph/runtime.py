@@ -0,0 +1,92 @@
+"""
+Graph runtime - 进程级共享的已编译 Agent Graph
+
+编译后的 LangGraph 本身无状态，状态按 thread_id 存在 checkpointer 中，
+因此同一个实例可以被并发的 asyncio task 共享，只要每次运行使用不同的 thread_id。
+"""
+
+import threading
+import time
+import uuid
+from collections.abc import AsyncIterator, Callable
+from typing import Any
+
+import structlog
+
+from ..config import get_settings
+from .streaming import StreamEvent, stream_graph
+
+logger = structlog.get_logger()
+
+
+class GraphRuntime:
+    """编译一次、全进程复用的 Agent Graph"""
+
+    def __init__(self, builder: Callable[[], Any] | None = None):
+        self._builder = builder
+        self._graph: Any = None
+        self._lock = threading.Lock()
+        self.compile_seconds: float | None = None
+
+    @property
+    def graph(self) -> Any:
+        """已编译的 graph，首次访问时编译"""
+        if self._graph is None:
+            with self._lock:
+                if self._graph is None:
+                    self._graph = self._compile()
+        return self._graph
+
+    def _compile(self) -> Any:
+        builder = self._builder
+        if builder is None:
+            from .builder import build_agent_graph as builder
+
+        started = time.perf_counter()
+        graph = builder()
+        self.compile_seconds = time.perf_counter() - started
+        logger.info("graph_runtime.compiled", compile_ms=round(self.compile_seconds * 1000, 2))
+        return graph
+
+    async def warmup(self) -> None:
+        """预热：编译 graph、生成图结构、建立 Tool Gateway 连接池"""
+        from ..tools import startup_gateway_client
+
+        self.graph.get_graph()
+        await startup_gateway_client()
+        logger.info("graph_runtime.warmed_up")
+
+    @staticmethod
+    def new_config(thread_id: str | None = None) -> dict:
+        """每次运行使用独立的 thread_id，避免并发运行共享 checkpoint"""
+        return {"configurable": {"thread_id": thread_id or f"run_{uuid.uuid4().hex}"}}
+
+    async def ainvoke(self, state: dict, config: dict | None = None) -> dict:
+        """运行 graph"""
+        return await self.graph.ainvoke(state, config or self.new_config())
+
+    def astream(
+        self,
+        state: dict,
+        config: dict | None = None,
+        buffer_size: int | None = None,
+    ) -> AsyncIterator[StreamEvent]:
+        """流式运行 graph，逐个产出阶段事件（见 graph/streaming.py）"""
+        if buffer_size is None:
+            buffer_size = get_settings().stream_buffer_size
+        return stream_graph(self.graph, state, config or self.new_config(), buffer_size)
+
+
+# GraphRuntime 单例
+_runtime: GraphRuntime | None = None
+_runtime_lock = threading.Lock()
+
+
+def get_graph_runtime() -> GraphRuntime:
+    """获取进程级 GraphRuntime"""
+    global _runtime
+    if _runtime is None:
+        with _runtime_lock:
+            if _runtime is None:
+                _runtime = GraphRuntime()
+    return _runtime
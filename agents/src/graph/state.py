@@ -56,6 +56,10 @@ class AgentState(TypedDict):
     # ========================================
     token_budget: int
     token_used: int
+    # 按阶段拆分的实际用量 {stage: {input_tokens, output_tokens, total_tokens, calls}}
+    token_usage_by_stage: dict[str, dict[str, int]]
+    # 因预算不足跳过的 LLM 步骤（如 verify.rank / plan.optimize）
+    budget_skipped_steps: list[str]
 
     # ========================================
     # 流程控制
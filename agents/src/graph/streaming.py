@@ -0,0 +1,252 @@
+"""
+流式执行 - 按阶段推送事件
+
+基于 LangGraph 的 astream(stream_mode=["updates", "custom"])：
+- updates：每个节点完成后转换为阶段事件（Mission 解析完成、候选召回、方案生成、草稿订单创建等）
+- custom：节点内部通过 get_event_writer() 推送的细粒度事件（如每个候选核验完成）
+
+graph 在后台 task 中运行，事件经有界队列交给消费方：消费方处理不过来时队列写满，
+后台 task 停止拉取 astream，graph 在步骤边界暂停（背压）。消费方提前退出
+（break / aclose / 所在 task 被取消）时，后台 task 被取消，正在执行的节点随之取消。
+"""
+
+import asyncio
+import time
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass, field
+from typing import Any, Literal
+
+import structlog
+from langgraph.config import get_stream_writer
+
+logger = structlog.get_logger()
+
+EventType = Literal[
+    "mission_parsed",
+    "clarification_needed",
+    "candidates_recalled",
+    "candidate_verified",
+    "verification_complete",
+    "plans_ready",
+    "draft_created",
+    "stopped",
+    "error",
+    "completed",
+]
+
+# 结束节点 → stopped 事件的 reason
+_STOP_NODES = {"error_handler", "no_results", "no_valid_candidates", "wait_user"}
+
+
+@dataclass
+class StreamEvent:
+    """流式事件"""
+
+    type: EventType
+    node: str | None
+    data: dict[str, Any]
+    seq: int = 0
+    elapsed_ms: float = 0.0
+    # completed 事件携带最终 state（与 run_agent 的返回值相同），不参与序列化
+    state: dict[str, Any] | None = field(default=None, repr=False)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "type": self.type,
+            "node": self.node,
+            "seq": self.seq,
+            "elapsed_ms": round(self.elapsed_ms, 2),
+            "data": self.data,
+        }
+
+
+def get_event_writer() -> Callable[..., None]:
+    """
+    节点内推送自定义事件：write("candidate_verified", offer_id=...)
+
+    不在 graph 中运行（如单测直接调用节点）或未开启 custom 流时为 no-op。
+    """
+    try:
+        writer = get_stream_writer()
+    except RuntimeError:
+        return _noop
+
+    def write(event_type: EventType, **data: Any) -> None:
+        writer({"event": event_type, **data})
+
+    return write
+
+
+def _noop(*args: Any, **kwargs: Any) -> None:
+    return None
+
+
+# ==============================================
+# 节点输出 → 事件
+# ==============================================
+def _candidate_summary(candidate: dict) -> dict[str, Any]:
+    titles = candidate.get("titles") or [{}]
+    return {
+        "offer_id": candidate.get("offer_id"),
+        "title": titles[0].get("text", ""),
+        "search_score": candidate.get("search_score"),
+    }
+
+
+def events_from_update(node: str, update: dict[str, Any] | None) -> list[tuple[EventType, dict]]:
+    """把一个节点的输出转换为 (事件类型, 数据) 列表"""
+    if not isinstance(update, dict):
+        return []
+
+    if update.get("error") and node != "error_handler":
+        return [("error", {"error": update["error"], "error_code": update.get("error_code")})]
+
+    if node == "intent":
+        if update.get("needs_clarification"):
+            messages = update.get("messages") or []
+            question = messages[-1].content if messages else ""
+            return [("clarification_needed", {"question": question})]
+        if update.get("mission"):
+            return [("mission_parsed", {"mission": update["mission"]})]
+    elif node == "candidate":
+        candidates = update.get("candidates") or []
+        return [
+            (
+                "candidates_recalled",
+                {"count": len(candidates), "candidates": [_candidate_summary(c) for c in candidates]},
+            )
+        ]
+    elif node == "verify":
+        return [
+            (
+                "verification_complete",
+                {
+                    "verified_count": len(update.get("verified_candidates") or []),
+                    "rejected_count": len(update.get("rejected_candidates") or []),
+                    "verified_offer_ids": [
+                        c.get("offer_id") for c in update.get("verified_candidates") or []
+                    ],
+                },
+            )
+        ]
+    elif node == "plan":
+        return [
+            (
+                "plans_ready",
+                {
+                    "plans": update.get("plans") or [],
+                    "recommended_plan": update.get("recommended_plan"),
+                    "recommendation_reason": update.get("recommendation_reason"),
+                },
+            )
+        ]
+    elif node == "execute":
+        return [
+            (
+                "draft_created",
+                {
+                    "draft_order_id": update.get("draft_order_id"),
+                    "execution_result": update.get("execution_result"),
+                },
+            )
+        ]
+    elif node in _STOP_NODES:
+        return [
+            (
+                "stopped",
+                {
+                    "reason": node,
+                    "current_step": update.get("current_step"),
+                    "error": update.get("error"),
+                    "error_code": update.get("error_code"),
+                },
+            )
+        ]
+    return []
+
+
+# ==============================================
+# 流式运行
+# ==============================================
+_DONE = object()
+
+
+async def stream_graph(
+    graph: Any,
+    state: dict[str, Any],
+    config: dict[str, Any],
+    buffer_size: int = 64,
+) -> AsyncIterator[StreamEvent]:
+    """
+    流式运行 graph，按发生顺序产出 StreamEvent
+
+    最后一个事件总是 completed（携带最终 state）或 error（运行异常）。
+
+    Args:
+        graph: 已编译的 graph（需要 checkpointer，用于读取最终 state）
+        state: 初始 state
+        config: LangGraph 配置（包含 thread_id）
+        buffer_size: 事件队列容量，写满后 graph 暂停推进
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, buffer_size))
+    started = time.perf_counter()
+    seq = 0
+
+    def make(event_type: EventType, node: str | None, data: dict, final: dict | None = None) -> StreamEvent:
+        nonlocal seq
+        seq += 1
+        return StreamEvent(
+            type=event_type,
+            node=node,
+            data=data,
+            seq=seq,
+            elapsed_ms=(time.perf_counter() - started) * 1000,
+            state=final,
+        )
+
+    async def produce() -> None:
+        try:
+            async for mode, chunk in graph.astream(state, config, stream_mode=["updates", "custom"]):
+                if mode == "custom":
+                    if isinstance(chunk, dict) and "event" in chunk:
+                        data = {k: v for k, v in chunk.items() if k != "event"}
+                        await queue.put(make(chunk["event"], data.pop("node", None), data))
+                    continue
+                for node, update in chunk.items():
+                    for event_type, data in events_from_update(node, update):
+                        await queue.put(make(event_type, node, data))
+
+            snapshot = await graph.aget_state(config)
+            final = dict(snapshot.values)
+            await queue.put(
+                make(
+                    "completed",
+                    None,
+                    {
+                        "current_step": final.get("current_step"),
+                        "draft_order_id": final.get("draft_order_id"),
+                        "error": final.get("error"),
+                        "error_code": final.get("error_code"),
+                    },
+                    final,
+                )
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("stream.error", error=str(e))
+            await queue.put(make("error", None, {"error": str(e), "error_code": "INTERNAL_ERROR"}))
+        await queue.put(_DONE)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                break
+            yield item
+    finally:
+        if not producer.done():
+            producer.cancel()
+            logger.info("stream.cancelled", events_sent=seq)
+        await asyncio.gather(producer, return_exceptions=True)
@@ -3,11 +3,12 @@ Intent & Preference Agent - 意图解析与偏好建模
 
 职责:
 - 解析用户自然语言为结构化 MissionSpec
-- 识别硬约束与软偏好
+- 识别硬约束与软偏好（格式化请求由规则解析，不调用 LLM）
 - 必要时发起澄清问题
 """
 
 from .node import intent_node
+from .rules import RuleParse, parse_intent
 
-__all__ = ["intent_node"]
+__all__ = ["intent_node", "parse_intent", "RuleParse"]
 
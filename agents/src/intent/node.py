@@ -10,9 +10,11 @@ from langchain_core.messages import AIMessage, HumanMessage
 
 from ..config import get_settings
 from ..graph.state import AgentState
+from ..llm.budget import TokenBudget
 from ..llm.client import call_llm_and_parse
 from ..llm.prompts import INTENT_PROMPT
 from ..llm.schemas import MissionParseResult
+from .rules import parse_intent
 
 logger = structlog.get_logger()
 
@@ -52,6 +54,34 @@ async def intent_node(state: AgentState) -> AgentState:
                 "current_step": "intent",
             }
 
+        # 单轮、格式化的请求走规则解析，置信度足够且给出了预算时不调用 LLM
+        # 多轮对话（澄清后的回复）需要结合上下文，仍交给 LLM；没有预算时由 LLM 追问或补全
+        single_turn = sum(isinstance(msg, HumanMessage) for msg in messages) == 1
+        if settings.intent_rules_enabled and single_turn:
+            parsed = parse_intent(user_message)
+            confident = parsed.confidence >= settings.intent_rules_min_confidence
+            if confident and parsed.result.budget_amount is not None:
+                mission_dict = _mission_from_result(parsed.result, user_message)
+                logger.info(
+                    "intent_node.rules_complete",
+                    confidence=parsed.confidence,
+                    fields=parsed.fields,
+                    destination_country=mission_dict["destination_country"],
+                )
+                return {
+                    **state,
+                    "mission": mission_dict,
+                    "current_step": "intent_complete",
+                    "needs_clarification": False,
+                    "error": None,
+                }
+            logger.info(
+                "intent_node.rules_low_confidence",
+                confidence=parsed.confidence,
+                coverage=parsed.coverage,
+                missing_budget=parsed.result.budget_amount is None,
+            )
+
         # 检查是否有 API Key
         if not settings.openai_api_key:
             logger.warning("intent_node.no_api_key", msg="Using mock response")
@@ -71,17 +101,25 @@ async def intent_node(state: AgentState) -> AgentState:
             elif isinstance(msg, AIMessage):
                 prompt_messages.insert(-1, {"role": "assistant", "content": msg.content})
 
+        # 预算不足以覆盖一次解析时，直接使用规则解析结果
+        budget = TokenBudget.from_state(state)
+        if not budget.allows("intent.parse", prompt_messages):
+            return _mock_intent_response(state, user_message, budget)
+
         # 调用 LLM 并解析结果
+        usage: dict[str, int] = {}
         result = await call_llm_and_parse(
             messages=prompt_messages,
             output_schema=MissionParseResult,
             model_type="planner",
             temperature=0.1,
+            usage=usage,
         )
+        budget.record("intent", usage)
 
         if result is None:
             logger.warning("intent_node.llm_parse_failed", msg="Falling back to mock")
-            return _mock_intent_response(state, user_message)
+            return _mock_intent_response(state, user_message, budget)
 
         # 检查是否需要澄清
         if result.needs_clarification:
@@ -100,23 +138,11 @@ async def intent_node(state: AgentState) -> AgentState:
                 "current_step": "awaiting_clarification",
                 "needs_clarification": True,
                 "error": None,
+                **budget.state_updates(),
             }
 
         # 构建 Mission 字典
-        mission_dict = {
-            "destination_country": result.destination_country,
-            "budget_amount": result.budget_amount,
-            "budget_currency": result.budget_currency,
-            "quantity": result.quantity,
-            "arrival_days_max": result.arrival_days_max,
-            "hard_constraints": [c.model_dump() for c in result.hard_constraints],
-            "soft_preferences": [p.model_dump() for p in result.soft_preferences],
-            "objective_weights": result.objective_weights.model_dump(),
-            "search_query": result.search_query or user_message,
-        }
-
-        # 估算 token 使用量（结构化输出没有直接返回 usage）
-        token_used = state.get("token_used", 0) + 500  # 估算值
+        mission_dict = _mission_from_result(result, user_message)
 
         logger.info(
             "intent_node.complete",
@@ -129,9 +155,9 @@ async def intent_node(state: AgentState) -> AgentState:
             **state,
             "mission": mission_dict,
             "current_step": "intent_complete",
-            "token_used": token_used,
             "needs_clarification": False,
             "error": None,
+            **budget.state_updates(),
         }
 
     except Exception as e:
@@ -144,63 +170,52 @@ async def intent_node(state: AgentState) -> AgentState:
         }
 
 
-def _mock_intent_response(state: AgentState, user_message: str) -> AgentState:
+def _mission_from_result(result: MissionParseResult, user_message: str) -> dict:
+    """MissionParseResult → state 中的 mission 字典"""
+    return {
+        "destination_country": result.destination_country,
+        "budget_amount": result.budget_amount,
+        "budget_currency": result.budget_currency,
+        "quantity": result.quantity,
+        "arrival_days_max": result.arrival_days_max,
+        "hard_constraints": [c.model_dump() for c in result.hard_constraints],
+        "soft_preferences": [p.model_dump() for p in result.soft_preferences],
+        "objective_weights": result.objective_weights.model_dump(),
+        "search_query": result.search_query or user_message,
+        "basket": [slot.model_dump() for slot in result.basket],
+    }
+
+
+def _mock_intent_response(
+    state: AgentState,
+    user_message: str,
+    budget: TokenBudget | None = None,
+) -> AgentState:
     """
-    Mock 响应用于测试（无 API Key 时使用）
+    Mock 响应用于测试（无 API Key、预算不足或 LLM 解析失败时使用）
+
+    使用规则解析的结果（不论置信度），缺失的字段填默认值。
     """
-    # 简单的关键词提取
-    message_lower = user_message.lower()
-
-    # 检测目的国
-    destination_country = "US"  # 默认
-    if "germany" in message_lower or "德国" in user_message:
-        destination_country = "DE"
-    elif "uk" in message_lower or "england" in message_lower or "英国" in user_message:
-        destination_country = "GB"
-    elif "japan" in message_lower or "日本" in user_message:
-        destination_country = "JP"
-    elif "china" in message_lower or "中国" in user_message:
-        destination_country = "CN"
-
-    # 检测预算
-    budget_amount = 100.0  # 默认
-    import re
-    budget_match = re.search(r"\$?(\d+(?:\.\d{2})?)", user_message)
-    if budget_match:
-        budget_amount = float(budget_match.group(1))
-
-    # 检测约束
-    hard_constraints = []
-    if "iphone" in message_lower:
-        hard_constraints.append({"type": "compatibility", "value": "iPhone", "operator": "eq"})
-    if "wireless" in message_lower or "无线" in user_message:
-        hard_constraints.append({"type": "feature", "value": "wireless", "operator": "eq"})
-    if "charger" in message_lower or "充电" in user_message:
-        hard_constraints.append({"type": "category", "value": "charger", "operator": "eq"})
-
-    mission_dict = {
-        "destination_country": destination_country,
-        "budget_amount": budget_amount,
-        "budget_currency": "USD",
-        "quantity": 1,
-        "arrival_days_max": 14,
-        "hard_constraints": hard_constraints,
-        "soft_preferences": [],
-        "objective_weights": {"price": 0.4, "speed": 0.3, "risk": 0.3},
-        "search_query": user_message,
-    }
+    result = parse_intent(user_message).result
+    result.destination_country = result.destination_country or "US"
+    if result.budget_amount is None:
+        result.budget_amount = 100.0
+    result.arrival_days_max = result.arrival_days_max or 14
+    result.search_query = user_message
+
+    mission_dict = _mission_from_result(result, user_message)
 
     logger.info(
         "intent_node.mock_complete",
-        destination_country=destination_country,
-        budget=budget_amount,
+        destination_country=mission_dict["destination_country"],
+        budget=mission_dict["budget_amount"],
     )
 
     return {
         **state,
         "mission": mission_dict,
         "current_step": "intent_complete",
-        "token_used": 0,
         "needs_clarification": False,
         "error": None,
+        **(budget.state_updates() if budget else {}),
     }
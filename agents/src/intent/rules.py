@@ -0,0 +1,626 @@
+"""
+规则 / 语法意图解析
+
+大部分请求是格式化的（"wireless charger for iPhone, budget $50, ship to Germany"），
+用规则即可得到完整的 MissionParseResult，不必调用 LLM。覆盖：
+- 目的国：英文名、中文名、"to DE" 形式的 ISO 代码；"from China" 这类来源国会被忽略
+- 预算与货币：$ € £ ¥ 符号、USD/EUR 等代码、"美元" 等中文单位、"budget 50" / "100以内"
+- 数量："3 pcs"、"2 phone cases"、"两个"
+- 多商品："charger + cable + case"：不同品类各成一个槽位（basket），修饰词与数量归属其后的品类
+- 到货期限："within 5 days"、"2 weeks"、"一周内"、"next week"
+- 约束词表：品类、功能、兼容设备、认证、电压、品牌（含排除）、颜色（含排除）
+- 目标权重：便宜 / 加急 / 正品 等信号
+
+confidence 由四部分组成：识别到目的国、识别到商品、识别到预算，以及文本覆盖率
+（被规则或停用词解释的词占比）。措辞自由、含大量未知词的请求覆盖率低，交给 LLM。
+"""
+
+import re
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+
+from ..llm.schemas import (
+    BasketSlot,
+    HardConstraint,
+    MissionParseResult,
+    ObjectiveWeights,
+    SoftPreference,
+)
+
+# confidence 权重：目的国 / 商品 / 预算 / 覆盖率
+_WEIGHT_COUNTRY = 0.35
+_WEIGHT_PRODUCT = 0.35
+_WEIGHT_BUDGET = 0.05
+_WEIGHT_COVERAGE = 0.25
+
+
+@dataclass
+class RuleParse:
+    """规则解析结果"""
+
+    result: MissionParseResult
+    confidence: float
+    coverage: float
+    # 命中的字段名，用于日志
+    fields: list[str] = field(default_factory=list)
+
+
+# ==============================================
+# 词表
+# ==============================================
+# (ISO 代码, 英文名, 中文名)
+COUNTRIES: list[tuple[str, tuple[str, ...], tuple[str, ...]]] = [
+    ("US", ("united states", "usa", "u.s.a.", "u.s.", "america"), ("美国",)),
+    ("GB", ("united kingdom", "uk", "u.k.", "britain", "great britain", "england"), ("英国",)),
+    ("DE", ("germany", "deutschland"), ("德国",)),
+    ("FR", ("france",), ("法国",)),
+    ("IT", ("italy",), ("意大利",)),
+    ("ES", ("spain",), ("西班牙",)),
+    ("NL", ("netherlands", "holland"), ("荷兰",)),
+    ("JP", ("japan",), ("日本",)),
+    ("KR", ("south korea", "korea"), ("韩国",)),
+    ("CN", ("china", "mainland china"), ("中国",)),
+    ("CA", ("canada",), ("加拿大",)),
+    ("AU", ("australia",), ("澳大利亚", "澳洲")),
+    ("MX", ("mexico",), ("墨西哥",)),
+    ("BR", ("brazil",), ("巴西",)),
+    ("IN", ("india",), ("印度",)),
+    ("SG", ("singapore",), ("新加坡",)),
+]
+
+_ISO_CODES = {code for code, _, _ in COUNTRIES}
+
+# 品类：(规范值, 同义词)；长词优先匹配，"portable charger" 不会被拆成 "charger"
+CATEGORIES: list[tuple[str, tuple[str, ...]]] = [
+    ("charger", ("charger", "charging pad", "charging stand", "充电器", "充电头")),
+    ("power_bank", ("power bank", "portable charger", "powerbank", "充电宝", "移动电源")),
+    ("cable", ("cable", "charging cable", "cord", "数据线", "充电线")),
+    ("phone_case", ("phone case", "case", "手机壳", "保护壳")),
+    ("screen_protector", ("screen protector", "tempered glass", "钢化膜", "贴膜")),
+    ("headphones", ("headphones", "headphone", "headset", "头戴耳机")),
+    ("earbuds", ("earbuds", "earphones", "耳机")),
+    ("keyboard", ("keyboard", "键盘")),
+    ("mouse", ("mouse", "鼠标")),
+    ("adapter", ("adapter", "travel adapter", "plug adapter", "转换器", "转换插头", "转接头", "适配器")),
+    ("speaker", ("speaker", "bluetooth speaker", "音箱", "音响")),
+    ("smartwatch", ("smartwatch", "smart watch", "智能手表")),
+    ("watch_band", ("watch band", "watch strap", "表带")),
+    ("hub", ("usb hub", "hub", "docking station", "扩展坞", "集线器")),
+    ("stand", ("phone stand", "laptop stand", "stand", "支架")),
+    ("backpack", ("backpack", "背包", "双肩包")),
+]
+
+FEATURES: list[tuple[str, tuple[str, ...]]] = [
+    ("wireless", ("wireless", "无线")),
+    ("fast_charging", ("fast charging", "fast charge", "quick charge", "快充")),
+    ("magnetic", ("magsafe", "magnetic", "磁吸")),
+    ("waterproof", ("waterproof", "water resistant", "防水")),
+    ("noise_cancelling", ("noise cancelling", "noise canceling", "anc", "降噪")),
+    ("bluetooth", ("bluetooth", "蓝牙")),
+    ("foldable", ("foldable", "折叠")),
+]
+
+COMPATIBILITY: list[tuple[str, tuple[str, ...]]] = [
+    ("iPhone", ("iphone", "苹果手机")),
+    ("iPad", ("ipad",)),
+    ("MacBook", ("macbook",)),
+    ("Samsung", ("samsung", "galaxy", "三星")),
+    ("Pixel", ("pixel",)),
+    ("Android", ("android", "安卓")),
+    ("USB-C", ("usb-c", "usb c", "type-c", "type c")),
+    ("Lightning", ("lightning",)),
+]
+
+BRANDS: list[tuple[str, tuple[str, ...]]] = [
+    ("Anker", ("anker",)),
+    ("Belkin", ("belkin",)),
+    ("Apple", ("apple", "苹果")),
+    ("Ugreen", ("ugreen", "绿联")),
+    ("Baseus", ("baseus", "倍思")),
+    ("Xiaomi", ("xiaomi", "小米")),
+    ("Sony", ("sony", "索尼")),
+    ("Logitech", ("logitech", "罗技")),
+    ("JBL", ("jbl",)),
+]
+
+COLORS: list[tuple[str, tuple[str, ...]]] = [
+    ("black", ("black", "黑色")),
+    ("white", ("white", "白色")),
+    ("blue", ("blue", "蓝色")),
+    ("red", ("red", "红色")),
+    ("pink", ("pink", "粉色")),
+    ("green", ("green", "绿色")),
+    ("grey", ("grey", "gray", "灰色")),
+    ("silver", ("silver", "银色")),
+    ("gold", ("gold", "金色")),
+    ("purple", ("purple", "紫色")),
+]
+
+# 认证大小写敏感（避免把单词 "ul" 之类误判）
+_CERT_RE = re.compile(r"(?<![A-Za-z])(CE|FCC|UL|RoHS|ROHS|MFi|MFI|PSE|UKCA)(?![A-Za-z])")
+_VOLTAGE_RE = re.compile(r"(?<!\d)(100|110|120|127|220|230|240)\s*[vV](?![A-Za-z])")
+
+# 目标信号
+OBJECTIVE_SIGNALS: dict[str, tuple[str, ...]] = {
+    "price": ("cheapest", "cheap", "lowest price", "affordable", "budget-friendly", "inexpensive",
+              "最便宜", "便宜", "性价比", "省钱"),
+    "speed": ("asap", "urgent", "urgently", "fastest", "fast shipping", "fast delivery", "express",
+              "quickly", "as soon as possible", "尽快", "加急", "最快", "急用"),
+    "risk": ("reliable", "high quality", "quality", "genuine", "authentic", "trusted", "original",
+             "正品", "质量好", "靠谱", "原装"),
+}
+
+_NEGATION_RE = re.compile(
+    r"(?:\bno|\bnot|\bavoid|\bexcept|\bwithout|\bnon|\bdon'?t want|\banything but|不要|别|除了|不买)"
+    r"[\s-]*$",
+    re.IGNORECASE,
+)
+_PREFER_RE = re.compile(r"(?:\bprefer(?:ably|red)?|\bideally|\bif possible|最好|优先|偏好)\s*$", re.IGNORECASE)
+_DESTINATION_CUE_RE = re.compile(
+    r"(?:\bto|\binto|\bdeliver(?:ed)? to|\bship(?:ped|ping)? to|寄到|发往|送到|运到|到)\s*(?:the\s+)?$",
+    re.IGNORECASE,
+)
+_ORIGIN_CUE_RE = re.compile(r"(?:\bfrom|\bmade in|从|产自)\s*(?:the\s+)?$", re.IGNORECASE)
+
+# 预算与货币
+_AMOUNT = r"\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?"
+_SYMBOL_CURRENCY = {"us$": "USD", "$": "USD", "€": "EUR", "£": "GBP", "¥": None, "￥": None}
+_WORD_CURRENCY = {
+    "usd": "USD", "dollar": "USD", "dollars": "USD", "bucks": "USD", "美元": "USD", "美金": "USD", "刀": "USD",
+    "eur": "EUR", "euro": "EUR", "euros": "EUR", "欧元": "EUR",
+    "gbp": "GBP", "pound": "GBP", "pounds": "GBP", "英镑": "GBP",
+    "jpy": "JPY", "yen": "JPY", "日元": "JPY",
+    "cny": "CNY", "rmb": "CNY", "yuan": "CNY", "人民币": "CNY", "元": "CNY", "块": "CNY",
+}
+_SYMBOL_RE = re.compile(rf"(?P<sym>US\$|\$|€|£|¥|￥)\s*(?P<amt>{_AMOUNT})(?P<k>k\b)?", re.IGNORECASE)
+_WORD_RE_CURRENCY = re.compile(
+    rf"(?P<amt>{_AMOUNT})(?P<k>k)?\s*(?P<cur>"
+    + "|".join(sorted((re.escape(w) for w in _WORD_CURRENCY), key=len, reverse=True))
+    + r")(?![A-Za-z])",
+    re.IGNORECASE,
+)
+_BUDGET_CUE_RE = re.compile(
+    rf"(?:budget(?:\s+is|\s+of)?|under|below|less than|max(?:imum)?|up to|no more than|at most|"
+    rf"预算|不超过|不高于|最多)\s*[:：]?\s*(?P<amt>{_AMOUNT})(?![\d.]|\s*(?:天|周|days?|weeks?|pcs|个|件))",
+    re.IGNORECASE,
+)
+_BUDGET_SUFFIX_RE = re.compile(rf"(?P<amt>{_AMOUNT})\s*(?:以内|以下|之内)")
+
+# 数量
+_NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7, "eight": 8,
+    "nine": 9, "ten": 10, "a pair of": 2, "a couple of": 2,
+}
+_ZH_DIGITS = {"一": 1, "二": 2, "两": 2, "三": 3, "四": 4, "五": 5, "六": 6, "七": 7, "八": 8, "九": 9, "十": 10}
+_QTY_UNIT_RE = re.compile(
+    r"(?:(?:qty|quantity)\s*[:=]?\s*(?P<q1>\d+))|(?:(?P<q2>\d+)\s*(?:x\b|pcs\b|pieces?\b|units?\b|packs?\b|sets?\b))",
+    re.IGNORECASE,
+)
+_QTY_ZH_RE = re.compile(r"(?P<q>\d+|[一二两三四五六七八九十]+)\s*(?:个|件|只|台|套|条|副|盒|把|双|张)")
+_QTY_BEFORE_RE = re.compile(
+    r"(?<![\w.$])(?P<q>\d+|" + "|".join(_NUMBER_WORDS) + r")\s+(?:[a-z-]+\s+){0,2}$",
+    re.IGNORECASE,
+)
+# 紧跟在型号系列名后的数字是型号而不是数量（iPhone 15 / Pixel 8 / Galaxy S 24 / Switch 2）
+_MODEL_PREFIX_RE = re.compile(
+    r"\b(?:iphone|ipad|pixel|galaxy(?:\s+[a-z]{1,2})?|switch|xbox|playstation|ps|note|mate|"
+    r"redmi|macbook|watch|series|gen|model|[a-z]+\d+[a-z]*)\s*$",
+    re.IGNORECASE,
+)
+
+# 到货期限
+_DEADLINE_RE = re.compile(
+    r"(?:(?:within|in|under|less than|no more than|max(?:imum)?|at most)\s+)?"
+    r"(?P<n>\d+|" + "|".join(w for w in _NUMBER_WORDS if " " not in w) + r")\s*"
+    r"(?:business\s+|working\s+)?(?P<unit>days?|weeks?|months?)",
+    re.IGNORECASE,
+)
+_DEADLINE_ZH_RE = re.compile(
+    r"(?P<n>\d+|[一二两三四五六七八九十]+)\s*(?:个)?\s*(?P<unit>天|日|周|星期|礼拜|月)(?:内|以内|之内)?"
+)
+_DEADLINE_FIXED = [
+    (re.compile(r"\bnext week\b|下周", re.IGNORECASE), 7),
+    (re.compile(r"\b(?:by )?tomorrow\b|明天", re.IGNORECASE), 1),
+    (re.compile(r"\bthis week\b|本周|这周", re.IGNORECASE), 5),
+]
+_UNIT_DAYS = {"day": 1, "days": 1, "week": 7, "weeks": 7, "month": 30, "months": 30,
+              "天": 1, "日": 1, "周": 7, "星期": 7, "礼拜": 7, "月": 30}
+
+# 覆盖率：不携带信息、可以忽略的词
+_STOPWORDS = {
+    "i", "im", "i'm", "we", "need", "needs", "want", "wants", "looking", "look", "for", "a", "an", "the",
+    "to", "ship", "shipping", "shipped", "deliver", "delivered", "delivery", "send", "sent", "buy", "get",
+    "order", "please", "pls", "with", "and", "or", "of", "my", "me", "our", "it", "is", "are", "be",
+    "that", "this", "budget", "under", "below", "within", "in", "by", "at", "around", "about", "max",
+    "maximum", "up", "less", "than", "more", "no", "not", "should", "must", "arrive", "arrival",
+    "can", "you", "find", "some", "any", "total", "each", "per", "day", "days", "week", "weeks",
+    "business", "would", "like", "compatible", "supports", "support", "new", "good", "one", "also",
+    "prefer", "preferably", "ideally", "price", "cost", "costs", "which", "have", "has", "help",
+    "destination", "country", "address", "home", "quantity", "qty", "pcs",
+    "我", "要", "想", "需", "买", "帮", "请", "给", "一", "个", "的", "寄", "到", "发", "送", "往",
+    "在", "内", "以", "预", "算", "左", "右", "找", "款", "能", "支", "持", "用", "于", "和", "与",
+    "或", "件", "只", "台", "天", "周", "下", "最", "好", "多", "少", "不", "超", "过", "元", "块",
+}
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:['.\-][a-z0-9]+)*|[一-鿿]", re.IGNORECASE)
+
+
+# ==============================================
+# 匹配工具
+# ==============================================
+@dataclass
+class _Match:
+    start: int
+    end: int
+    value: str
+
+
+class _Vocab:
+    """
+    词表 → 单个正则
+
+    所有同义词按长度降序合并为一个交替式，同一位置优先匹配最长的词
+    （"portable charger" 不会被拆成 "charger"），一次扫描即可找出全部命中。
+    英文按词边界匹配并允许复数 s，中文直接匹配。
+    """
+
+    def __init__(self, entries: list[tuple[str, tuple[str, ...]]]):
+        self.lookup = {phrase.lower(): value for value, phrases in entries for phrase in phrases}
+        by_length = sorted(self.lookup, key=len, reverse=True)
+        ascii_part = "|".join(re.escape(p) for p in by_length if p.isascii())
+        cjk_part = "|".join(re.escape(p) for p in by_length if not p.isascii())
+        alternatives = [rf"(?<![a-z0-9])(?P<en>{ascii_part})(?:e?s)?(?![a-z0-9])"]
+        if cjk_part:
+            alternatives.append(rf"(?P<zh>{cjk_part})")
+        self.pattern = re.compile("|".join(alternatives), re.IGNORECASE)
+
+    def finditer(self, text: str) -> Iterator[_Match]:
+        for m in self.pattern.finditer(text):
+            phrase = m.group("en") or m.group("zh")
+            yield _Match(m.start(), m.end(), self.lookup[phrase.lower()])
+
+
+_CATEGORIES = _Vocab(CATEGORIES)
+_FEATURES = _Vocab(FEATURES)
+_COMPATIBILITY = _Vocab(COMPATIBILITY)
+_BRANDS = _Vocab(BRANDS)
+_COLORS = _Vocab(COLORS)
+_COUNTRIES = _Vocab([(code, en + zh) for code, en, zh in COUNTRIES])
+_OBJECTIVES = _Vocab(list(OBJECTIVE_SIGNALS.items()))
+
+
+class _Spans:
+    """已被消费的字符区间；后匹配的规则不能与之重叠"""
+
+    def __init__(self) -> None:
+        self.ranges: list[tuple[int, int]] = []
+
+    def free(self, start: int, end: int) -> bool:
+        return all(end <= s or start >= e for s, e in self.ranges)
+
+    def take(self, start: int, end: int) -> None:
+        self.ranges.append((start, end))
+
+    def covers(self, start: int, end: int) -> bool:
+        return any(start < e and end > s for s, e in self.ranges)
+
+
+def _find_vocab(text: str, vocab: _Vocab, spans: _Spans) -> list[_Match]:
+    """查找词表中未与已消费区间重叠的词，并消费对应区间"""
+    found = []
+    for match in vocab.finditer(text):
+        if spans.free(match.start, match.end):
+            spans.take(match.start, match.end)
+            found.append(match)
+    return found
+
+
+def _to_int(token: str) -> int | None:
+    token = token.lower()
+    if token.isdigit():
+        return int(token)
+    if token in _NUMBER_WORDS:
+        return _NUMBER_WORDS[token]
+    if token and all(ch in _ZH_DIGITS for ch in token):
+        # 十 / 十二 / 二十 这类简单中文数字
+        if token == "十":
+            return 10
+        if token.startswith("十"):
+            return 10 + _ZH_DIGITS[token[1]]
+        if token.endswith("十"):
+            return _ZH_DIGITS[token[0]] * 10
+        if "十" in token:
+            tens, ones = token.split("十")
+            return _ZH_DIGITS[tens] * 10 + _ZH_DIGITS[ones]
+        return _ZH_DIGITS[token] if len(token) == 1 else None
+    return None
+
+
+def _amount(text: str, k: str | None = None) -> float:
+    value = float(text.replace(",", ""))
+    return value * 1000 if k else value
+
+
+def _has_cjk(text: str) -> bool:
+    return any("一" <= ch <= "鿿" for ch in text)
+
+
+# ==============================================
+# 各字段的规则
+# ==============================================
+def _parse_budget(text: str, spans: _Spans) -> tuple[float | None, str | None]:
+    """返回 (金额, 货币)；货币无法确定时为 None"""
+    found: list[tuple[int, int, float, str | None]] = []
+    for m in _SYMBOL_RE.finditer(text):
+        symbol = m.group("sym").lower()
+        currency = _SYMBOL_CURRENCY.get(symbol)
+        if symbol in ("¥", "￥"):
+            currency = "CNY" if _has_cjk(text) else "JPY"
+        found.append((m.start(), m.end(), _amount(m.group("amt"), m.group("k")), currency))
+    for m in _WORD_RE_CURRENCY.finditer(text):
+        found.append((m.start(), m.end(), _amount(m.group("amt"), m.group("k")), _WORD_CURRENCY[m.group("cur").lower()]))
+    if not found:
+        for regex in (_BUDGET_CUE_RE, _BUDGET_SUFFIX_RE):
+            for m in regex.finditer(text):
+                found.append((m.start(), m.end(), _amount(m.group("amt")), None))
+
+    for start, end, amount, currency in sorted(found):
+        if spans.free(start, end):
+            spans.take(start, end)
+            return amount, currency
+    return None, None
+
+
+def _parse_deadline(text: str, spans: _Spans) -> int | None:
+    for regex in (_DEADLINE_RE, _DEADLINE_ZH_RE):
+        for m in regex.finditer(text):
+            n = _to_int(m.group("n"))
+            if n is None or not spans.free(m.start(), m.end()):
+                continue
+            spans.take(m.start(), m.end())
+            return n * _UNIT_DAYS[m.group("unit").lower()]
+    for regex, days in _DEADLINE_FIXED:
+        m = regex.search(text)
+        if m and spans.free(m.start(), m.end()):
+            spans.take(m.start(), m.end())
+            return days
+    return None
+
+
+def _is_model_number(text: str, start: int) -> bool:
+    """start 处的数字是否紧跟在型号系列名之后"""
+    return _MODEL_PREFIX_RE.search(text[:start]) is not None
+
+
+def _parse_quantity(
+    text: str, spans: _Spans, products: list[_Match]
+) -> tuple[int | None, bool]:
+    """返回 (数量, 是否有歧义)：商品名前的数字可能是型号，此时不当作数量并标记歧义"""
+    ambiguous = False
+    for regex, group in ((_QTY_UNIT_RE, None), (_QTY_ZH_RE, "q")):
+        for m in regex.finditer(text):
+            raw = m.group(group) if group else (m.group("q1") or m.group("q2"))
+            n = _to_int(raw)
+            if n and spans.free(m.start(), m.end()):
+                spans.take(m.start(), m.end())
+                return n, False
+    # "2 phone cases" / "two wireless chargers"：数字出现在商品名前 0-2 个词
+    for product in products:
+        m = _QTY_BEFORE_RE.search(text[: product.start])
+        if m is None:
+            continue
+        start = m.start("q")
+        end = m.end("q")
+        n = _to_int(m.group("q"))
+        if not n or not spans.free(start, end):
+            continue
+        if _is_model_number(text, start):
+            ambiguous = True
+            continue
+        spans.take(start, end)
+        return n, ambiguous
+    return None, ambiguous
+
+
+def _parse_basket(
+    text: str, spans: _Spans, products: list[_Match], query_terms: list[tuple[int, str]]
+) -> list[BasketSlot]:
+    """
+    两个及以上不同品类时按品类切分槽位
+
+    每个槽位取上一个品类之后、本品类之前的修饰词（功能 / 兼容设备 / 品牌）与数量，
+    须在 _parse_quantity 之前调用：数量的区间此时尚未被占用，预算 / 期限已被占用。
+    """
+    if len({p.value for p in products}) < 2:
+        return []
+    slots: dict[str, BasketSlot] = {}
+    previous_end = 0
+    for product in products:
+        segment = text[previous_end: product.start]
+        terms = [
+            term for start, term in sorted(query_terms) if previous_end <= start <= product.start
+        ]
+        quantity = 1
+        m = _QTY_BEFORE_RE.search(segment) or _QTY_ZH_RE.search(segment)
+        start = previous_end + m.start("q") if m is not None else 0
+        if (
+            m is not None
+            and spans.free(start, previous_end + m.end("q"))
+            and not _is_model_number(text, start)
+        ):
+            quantity = _to_int(m.group("q")) or 1
+        previous_end = product.end
+        if product.value in slots:
+            continue
+        slots[product.value] = BasketSlot(
+            category=product.value,
+            search_query=" ".join(dict.fromkeys(terms)),
+            quantity=quantity,
+        )
+    return list(slots.values())
+
+
+def _parse_country(text: str, spans: _Spans) -> tuple[str | None, bool]:
+    """返回 (ISO 代码, 是否有歧义)"""
+    matches = list(_COUNTRIES.finditer(text))
+    # "to DE" / "to JP"：大写 ISO 代码只在目的地提示后接受
+    for m in re.finditer(r"\b(?:to|ship to|deliver to)\s+([A-Z]{2})\b", text):
+        if m.group(1) in _ISO_CODES:
+            matches.append(_Match(m.start(1), m.end(1), m.group(1)))
+
+    destinations = []
+    others = []
+    for match in matches:
+        if not spans.free(match.start, match.end):
+            continue
+        prefix = text[max(0, match.start - 24): match.start]
+        if _ORIGIN_CUE_RE.search(prefix):
+            spans.take(match.start, match.end)
+            continue
+        spans.take(match.start, match.end)
+        if _DESTINATION_CUE_RE.search(prefix):
+            destinations.append(match)
+        else:
+            others.append(match)
+
+    if destinations:
+        return destinations[-1].value, len({m.value for m in destinations}) > 1
+    if others:
+        return others[-1].value, len({m.value for m in others}) > 1
+    return None, False
+
+
+def _parse_objectives(text: str, spans: _Spans) -> ObjectiveWeights:
+    signaled = []
+    for match in _find_vocab(text, _OBJECTIVES, spans):
+        if match.value not in signaled:
+            signaled.append(match.value)
+    if not signaled:
+        return ObjectiveWeights()
+    # 被提到的目标平分剩余权重，其余各 0.2
+    share = round((1.0 - 0.2 * (3 - len(signaled))) / len(signaled), 2)
+    weights = {k: (share if k in signaled else 0.2) for k in ("price", "speed", "risk")}
+    return ObjectiveWeights(**weights)
+
+
+def _coverage(text: str, spans: _Spans) -> float:
+    tokens = list(_TOKEN_RE.finditer(text))
+    if not tokens:
+        return 0.0
+    covered = sum(
+        1 for t in tokens if spans.covers(t.start(), t.end()) or t.group().lower() in _STOPWORDS
+    )
+    return covered / len(tokens)
+
+
+# ==============================================
+# 入口
+# ==============================================
+def parse_intent(text: str) -> RuleParse:
+    """
+    规则解析用户请求
+
+    Args:
+        text: 用户消息
+
+    Returns:
+        RuleParse，confidence 在 0-1 之间
+    """
+    spans = _Spans()
+    fields: list[str] = []
+
+    # 先匹配带数字的结构（金额、期限），避免 "5 days" 里的 5 被当成数量
+    budget_amount, budget_currency = _parse_budget(text, spans)
+    arrival_days_max = _parse_deadline(text, spans)
+    country, ambiguous = _parse_country(text, spans)
+
+    hard_constraints: list[HardConstraint] = []
+    soft_preferences: list[SoftPreference] = []
+    query_terms: list[tuple[int, str]] = []
+
+    for match in _find_vocab(text, _BRANDS, spans):
+        prefix = text[max(0, match.start - 16): match.start]
+        if _NEGATION_RE.search(prefix):
+            hard_constraints.append(HardConstraint(type="brand", value=match.value, operator="ne"))
+        elif _PREFER_RE.search(prefix):
+            soft_preferences.append(SoftPreference(type="brand", value=match.value, weight=0.8))
+        else:
+            hard_constraints.append(HardConstraint(type="brand", value=match.value))
+            query_terms.append((match.start, match.value))
+
+    for match in _find_vocab(text, _COMPATIBILITY, spans):
+        hard_constraints.append(HardConstraint(type="compatibility", value=match.value))
+        query_terms.append((match.start, match.value))
+
+    # 功能词先于品类匹配："fast charging" 不应被当作品类
+    features = _find_vocab(text, _FEATURES, spans)
+    for match in features:
+        hard_constraints.append(HardConstraint(type="feature", value=match.value))
+        query_terms.append((match.start, match.value.replace("_", " ")))
+
+    products = _find_vocab(text, _CATEGORIES, spans)
+    for match in products:
+        hard_constraints.append(HardConstraint(type="category", value=match.value))
+        query_terms.append((match.start, match.value.replace("_", " ")))
+
+    for m in _CERT_RE.finditer(text):
+        if spans.free(m.start(), m.end()):
+            spans.take(m.start(), m.end())
+            hard_constraints.append(HardConstraint(type="certification", value=m.group(1).upper()))
+    for m in _VOLTAGE_RE.finditer(text):
+        if spans.free(m.start(), m.end()):
+            spans.take(m.start(), m.end())
+            hard_constraints.append(HardConstraint(type="voltage", value=f"{m.group(1)}V"))
+
+    for match in _find_vocab(text, _COLORS, spans):
+        prefix = text[max(0, match.start - 16): match.start]
+        if _NEGATION_RE.search(prefix):
+            hard_constraints.append(HardConstraint(type="color", value=match.value, operator="ne"))
+        else:
+            soft_preferences.append(SoftPreference(type="color", value=match.value, weight=0.5))
+
+    basket = _parse_basket(text, spans, products, query_terms)
+    quantity, quantity_ambiguous = _parse_quantity(text, spans, products)
+    objective_weights = _parse_objectives(text, spans)
+
+    if budget_currency is None and budget_amount is not None:
+        budget_currency = "CNY" if _has_cjk(text) and not country else "USD"
+
+    coverage = _coverage(text, spans)
+    if quantity_ambiguous:
+        # 无法判断是型号还是数量：覆盖率记 0，交给 LLM
+        coverage = 0.0
+    for name, present in (
+        ("destination_country", country),
+        ("budget_amount", budget_amount),
+        ("quantity", quantity),
+        ("arrival_days_max", arrival_days_max),
+        ("product", products),
+    ):
+        if present:
+            fields.append(name)
+
+    country_score = 0.5 if ambiguous else 1.0
+    confidence = (
+        _WEIGHT_COUNTRY * (country_score if country else 0.0)
+        + _WEIGHT_PRODUCT * (1.0 if products else 0.0)
+        + _WEIGHT_BUDGET * (1.0 if budget_amount is not None else 0.0)
+        + _WEIGHT_COVERAGE * coverage
+    )
+
+    # "Samsung Galaxy" 之类的同义词连用只保留一条
+    hard_constraints = list({(c.type, c.value, c.operator): c for c in hard_constraints}.values())
+    terms = dict.fromkeys(term for _, term in sorted(query_terms))
+    search_query = " ".join(terms) or text.strip()
+    result = MissionParseResult(
+        destination_country=country,
+        budget_amount=budget_amount,
+        budget_currency=budget_currency or "USD",
+        quantity=quantity or 1,
+        arrival_days_max=arrival_days_max,
+        hard_constraints=hard_constraints,
+        soft_preferences=soft_preferences,
+        objective_weights=objective_weights,
+        search_query=search_query,
+        basket=basket,
+    )
+    return RuleParse(result=result, confidence=round(confidence, 3), coverage=round(coverage, 3), fields=fields)
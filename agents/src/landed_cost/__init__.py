@@ -0,0 +1,26 @@
+"""
+到手成本模块
+
+进程内的关税 / 增值税估算：按目的国税率表与商品类目，批量计算各包裹的
+商品货值、运费、关税与税费，供方案生成与候选评分使用，不需要逐个候选请求网关。
+"""
+
+from .calculator import (
+    CountryRates,
+    LandedCosts,
+    LandedCostTable,
+    category_of,
+    get_landed_cost_table,
+    set_landed_cost_table,
+    to_cents,
+)
+
+__all__ = [
+    "CountryRates",
+    "LandedCostTable",
+    "LandedCosts",
+    "category_of",
+    "get_landed_cost_table",
+    "set_landed_cost_table",
+    "to_cents",
+]
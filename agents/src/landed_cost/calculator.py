@@ -0,0 +1,276 @@
+"""
+到手成本计算
+
+从 data/seeds/landed_cost.json 加载各国增值税 / 消费税、按类目的关税税率与免税额，
+在进程内一次算完一批包裹（consignment）的 商品货值 / 运费 / 关税 / 税费：
+
+- 金额在入口转为整数分（两位小数以内的价格直接取整，其余经 Decimal 四舍五入），税率在加载时
+  经 Decimal 转为万分之一的整数单位（表中税率最多 4 位小数）；中间计算都是 int64 数组运算，
+  ROUND_HALF_UP 用整数除法完成，结果与逐条 Decimal 计算一致；出口再转回 Decimal
+- 关税：按商品类目链（含祖先类目）查目的国关税表，未命中取 "*"；
+  duty_base 为 cif 时运费也计征关税，税率取包裹内商品按货值加权的平均税率
+- 免税额按包裹的商品货值判断：不超过 duty_de_minimis / tax_de_minimis 时免征关税 / 税费
+- 税基由 tax_base 决定（goods / shipping / duty 的组合）
+
+未覆盖的目的国使用 "*" 条目（与原先的估算一致：商品货值的 15%）。
+单个包裹货值在 10 万美元以内时整数运算不会溢出。
+"""
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from decimal import ROUND_HALF_UP, Decimal
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import orjson
+import structlog
+
+from ..config import get_settings
+from ..retrieval.catalog_index import DEFAULT_CATEGORIES_PATH, CategoryTree
+from ..seeds import SEEDS_DIR, normalize_country
+
+logger = structlog.get_logger()
+
+DEFAULT_LANDED_COST_PATH = SEEDS_DIR / "landed_cost.json"
+
+WILDCARD = "*"
+
+# 税率单位：万分之一
+RATE_SCALE = 10_000
+
+_CENT = Decimal("0.01")
+_TAX_BASES = ("goods", "shipping", "duty")
+
+
+@dataclass(frozen=True)
+class CountryRates:
+    """某目的国的税率（万分之一）与免税额（分）"""
+
+    tax_name: str
+    tax_rate: int
+    tax_base: frozenset[str]
+    duty_rates: dict[str, int]
+    duty_cif: bool
+    duty_de_minimis: int
+    tax_de_minimis: int
+
+    def duty_rate(self, categories: Sequence[str]) -> int:
+        """类目链上最具体的关税税率，未命中取 "*"（没有关税表时为 0）"""
+        for category in categories:
+            rate = self.duty_rates.get(category)
+            if rate is not None:
+                return rate
+        return self.duty_rates.get(WILDCARD, 0)
+
+
+@dataclass(frozen=True)
+class LandedCosts:
+    """每个包裹的金额（整数分），下标为包裹编号"""
+
+    goods: np.ndarray
+    shipping: np.ndarray
+    duty: np.ndarray
+    tax: np.ndarray
+    currency: str = "USD"
+
+    def __len__(self) -> int:
+        return len(self.goods)
+
+    @property
+    def total(self) -> np.ndarray:
+        return self.goods + self.shipping + self.duty + self.tax
+
+    def breakdown(self, index: int | None = None) -> dict[str, Decimal]:
+        """单个包裹（None 表示所有包裹之和）的金额明细"""
+        columns = np.stack((self.goods, self.shipping, self.duty, self.tax))
+        cents = (columns.sum(axis=1) if index is None else columns[:, index]).tolist()
+        names = ("goods", "shipping", "duty", "tax", "total")
+        return {name: _decimal(c) for name, c in zip(names, [*cents, sum(cents)], strict=True)}
+
+
+class LandedCostTable:
+    """到手成本税率表"""
+
+    def __init__(self, data: dict[str, Any], categories: CategoryTree | None = None):
+        self.version: str = data.get("version", "")
+        self.currency: str = data.get("currency", "USD")
+        self.categories = categories
+        schedules = {
+            name: {category: _rate_units(rate) for category, rate in rates.items()}
+            for name, rates in data.get("duty_schedules", {}).items()
+        }
+        self.countries = {
+            normalize_country(code): _parse_country(entry, schedules)
+            for code, entry in data.get("countries", {}).items()
+        }
+        self.countries.setdefault(WILDCARD, _parse_country({"tax_rate": 0.15}, schedules))
+        self._lineages: dict[str, tuple[str, ...]] = {}
+
+    @classmethod
+    def from_file(
+        cls,
+        path: str | Path = DEFAULT_LANDED_COST_PATH,
+        categories_path: str | Path | None = DEFAULT_CATEGORIES_PATH,
+    ) -> "LandedCostTable":
+        categories = None
+        if categories_path and Path(categories_path).exists():
+            categories = CategoryTree.from_file(categories_path)
+        table = cls(orjson.loads(Path(path).read_bytes()), categories)
+        logger.info(
+            "landed_cost.table_loaded",
+            version=table.version,
+            countries=len(table.countries),
+        )
+        return table
+
+    def covers(self, country: str) -> bool:
+        return normalize_country(country) in self.countries
+
+    def rates(self, country: str) -> CountryRates:
+        """目的国税率，未覆盖的国家取 "*" 条目"""
+        return self.countries.get(normalize_country(country)) or self.countries[WILDCARD]
+
+    def lineage(self, category_id: str | None) -> tuple[str, ...]:
+        """类目自身及祖先，由具体到宽泛"""
+        if not category_id:
+            return ()
+        chain = self._lineages.get(category_id)
+        if chain is None:
+            chain = tuple(self.categories.lineage(category_id)) if self.categories else ()
+            chain = self._lineages[category_id] = chain or (category_id,)
+        return chain
+
+    def calculate(
+        self,
+        destination_country: str,
+        goods: Sequence[float],
+        shipping: Sequence[float],
+        categories: Sequence[str | None],
+        consignments: Sequence[int] | None = None,
+    ) -> LandedCosts:
+        """
+        批量计算到手成本
+
+        Args:
+            destination_country: 目的国
+            goods: 每个商品行的货值（单价 × 数量）
+            shipping: 每个包裹的运费
+            categories: 每个商品行的类目 ID
+            consignments: 每个商品行所属的包裹编号（0 起）；None 表示每行一个包裹
+
+        Returns:
+            LandedCosts，下标与包裹编号对齐
+        """
+        rates = self.rates(destination_country)
+        n_consignments = len(shipping)
+        cents = to_cents([*goods, *shipping])
+        line_goods, freight = cents[: len(goods)], cents[len(goods) :]
+        duty_units = np.array(
+            [rates.duty_rate(self.lineage(category)) for category in categories], dtype=np.int64
+        )
+        # Σ 货值 × 税率，单位为 分 × 万分之一
+        weighted = line_goods * duty_units
+        if consignments is None:
+            value = line_goods
+        else:
+            # bincount 按 float64 累加，单个包裹在 10 万美元以内时结果精确
+            value = _sum_by(consignments, line_goods, n_consignments)
+            weighted = _sum_by(consignments, weighted, n_consignments)
+
+        if rates.duty_cif:
+            # 运费按加权平均税率计征：Σ货值×税率 × (货值 + 运费) / 货值
+            duty = _round_half_up(
+                weighted * (value + freight), np.maximum(value, 1) * RATE_SCALE
+            )
+        else:
+            duty = _round_half_up(weighted, RATE_SCALE)
+        duty *= value > rates.duty_de_minimis
+
+        base = value
+        if "shipping" in rates.tax_base:
+            base = base + freight
+        if "duty" in rates.tax_base:
+            base = base + duty
+        tax = _round_half_up(base * rates.tax_rate, RATE_SCALE)
+        tax *= value > rates.tax_de_minimis
+
+        return LandedCosts(
+            goods=value, shipping=freight, duty=duty, tax=tax, currency=self.currency
+        )
+
+
+def category_of(item: dict[str, Any]) -> str | None:
+    """商品的类目 ID（兼容种子 AROC 的 category_id 与 offer card 的 category.cat_id）"""
+    return item.get("category_id") or (item.get("category") or {}).get("cat_id")
+
+
+def to_cents(values: Sequence[float]) -> np.ndarray:
+    """金额 → 整数分；不是整分的值（如 1.005）按 Decimal ROUND_HALF_UP 处理"""
+    scaled = np.multiply(values, 100.0)
+    cents = scaled.round()
+    error = np.abs(scaled - cents, out=scaled)
+    if len(error) and error.max() > 1e-6:
+        for i in np.flatnonzero(error > 1e-6).tolist():
+            cents[i] = _cents(repr(float(values[i])))
+    return cents.astype(np.int64)
+
+
+def _sum_by(index: Sequence[int], values: np.ndarray, size: int) -> np.ndarray:
+    return np.bincount(index, weights=values, minlength=size).astype(np.int64)
+
+
+def _round_half_up(numerator: np.ndarray, denominator: np.ndarray | int) -> np.ndarray:
+    """非负整数除法，ROUND_HALF_UP"""
+    return (2 * numerator + denominator) // (2 * denominator)
+
+
+def _decimal(cents: int) -> Decimal:
+    return Decimal(cents).scaleb(-2)
+
+
+def _rate_units(rate: float | str) -> int:
+    units = Decimal(str(rate)) * RATE_SCALE
+    if units != units.to_integral_value():
+        raise ValueError(f"Rate {rate} has more than 4 decimal places")
+    return int(units)
+
+
+def _cents(amount: float | str | None) -> int:
+    return int(Decimal(str(amount or 0)).quantize(_CENT, ROUND_HALF_UP) * 100)
+
+
+def _parse_country(entry: dict[str, Any], schedules: dict[str, dict[str, int]]) -> CountryRates:
+    tax_base = frozenset(entry.get("tax_base") or ["goods"])
+    unknown = tax_base.difference(_TAX_BASES)
+    if unknown:
+        raise ValueError(f"Unknown tax_base: {sorted(unknown)}")
+    schedule = entry.get("duty_schedule")
+    return CountryRates(
+        tax_name=entry.get("tax_name", "Tax"),
+        tax_rate=_rate_units(entry.get("tax_rate", 0)),
+        tax_base=tax_base,
+        duty_rates=schedules.get(schedule, {}) if schedule else {},
+        duty_cif=entry.get("duty_base", "fob") == "cif",
+        duty_de_minimis=_cents(entry.get("duty_de_minimis")),
+        tax_de_minimis=_cents(entry.get("tax_de_minimis")),
+    )
+
+
+# LandedCostTable 单例
+_table: LandedCostTable | None = None
+
+
+def get_landed_cost_table() -> LandedCostTable:
+    """加载税率表单例（LANDED_COST_TABLES_PATH 留空使用仓库自带的种子税率）"""
+    global _table
+    if _table is None:
+        path = get_settings().landed_cost_tables_path or DEFAULT_LANDED_COST_PATH
+        _table = LandedCostTable.from_file(path)
+    return _table
+
+
+def set_landed_cost_table(table: LandedCostTable | None) -> None:
+    """替换税率表单例（测试或热更新），None 表示下次使用时重新加载"""
+    global _table
+    _table = table
@@ -3,17 +3,27 @@ LLM 客户端模块
 
 提供统一的 LLM 调用接口，支持：
 - 多模型切换（planner/verifier）
+- 按模型复用 client 与连接池
+- 结构化输出缓存（精确 / 语义匹配）
 - Token 预算控制
 - 结构化输出
 - 重试与降级
 """
 
+from .budget import TokenBudget
+from .cache import get_llm_cache, set_llm_cache
 from .client import get_llm, get_llm_with_structured_output
+from .pool import get_llm_pool, shutdown_llm_pool
 from .prompts import INTENT_PROMPT, PLAN_PROMPT, VERIFIER_PROMPT
 
 __all__ = [
+    "TokenBudget",
     "get_llm",
     "get_llm_with_structured_output",
+    "get_llm_pool",
+    "get_llm_cache",
+    "set_llm_cache",
+    "shutdown_llm_pool",
     "INTENT_PROMPT",
     "PLAN_PROMPT",
     "VERIFIER_PROMPT",
@@ -0,0 +1,113 @@
+"""
+Token 预算
+
+每次 LLM 调用的实际用量（response.usage_metadata）累加到 state：
+- token_used：整个 Mission 的累计 token
+- token_usage_by_stage：按阶段拆分，{stage: {input_tokens, output_tokens, total_tokens, calls}}
+- budget_skipped_steps：因预算不足跳过的 LLM 步骤
+
+节点在开始时用 TokenBudget.from_state(state) 取得预算视图，调用 LLM 前先 allows()
+预估（prompt 字符数 / 4 + 输出预留）：剩余预算不够时跳过该步骤，使用规则结果降级，
+返回时把 state_updates() 合并进 state。
+"""
+
+from typing import Any
+
+import structlog
+
+from ..config import get_settings
+
+logger = structlog.get_logger()
+
+# 粗略估算：英文约 4 字符 / token，每条消息另有固定开销
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4
+
+_USAGE_KINDS = ("input_tokens", "output_tokens", "total_tokens")
+
+
+def estimate_tokens(messages: list[Any]) -> int:
+    """估算 prompt 的 token 数（dict / (role, content) 元组 / LangChain Message）"""
+    total = 0
+    for message in messages:
+        if isinstance(message, dict):
+            content = message.get("content", "")
+        elif isinstance(message, tuple | list):
+            content = message[1]
+        else:
+            content = getattr(message, "content", "")
+        total += len(str(content)) // CHARS_PER_TOKEN + MESSAGE_OVERHEAD_TOKENS
+    return total
+
+
+class TokenBudget:
+    """
+    单个节点内的预算视图
+
+    Args:
+        total: Mission 的 token 上限
+        used: 进入节点前已使用的 token
+        by_stage: 进入节点前的分阶段用量
+        skipped: 进入节点前已跳过的步骤
+        output_reserve: 每次调用为输出预留的 token
+    """
+
+    def __init__(
+        self,
+        total: int,
+        used: int = 0,
+        by_stage: dict[str, dict[str, int]] | None = None,
+        skipped: list[str] | None = None,
+        output_reserve: int = 1024,
+    ):
+        self.total = total
+        self.used = used
+        self.by_stage = {stage: dict(usage) for stage, usage in (by_stage or {}).items()}
+        self.skipped = list(skipped or [])
+        self.output_reserve = output_reserve
+
+    @classmethod
+    def from_state(cls, state: dict[str, Any]) -> "TokenBudget":
+        settings = get_settings()
+        return cls(
+            total=state.get("token_budget") or settings.token_budget_total,
+            used=state.get("token_used") or 0,
+            by_stage=state.get("token_usage_by_stage"),
+            skipped=state.get("budget_skipped_steps"),
+            output_reserve=settings.llm_output_token_reserve,
+        )
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self.total - self.used)
+
+    def allows(self, step: str, messages: list[Any]) -> bool:
+        """预估本次调用是否在预算内；不在时记录为跳过"""
+        estimate = estimate_tokens(messages) + self.output_reserve
+        if estimate <= self.remaining:
+            return True
+        self.skipped.append(step)
+        logger.info(
+            "token_budget.step_skipped",
+            step=step,
+            estimate=estimate,
+            remaining=self.remaining,
+            total=self.total,
+        )
+        return False
+
+    def record(self, stage: str, usage: dict[str, int]) -> None:
+        """累加一次 LLM 调用的实际用量（call_llm_and_parse 填充的 usage）"""
+        stage_usage = self.by_stage.setdefault(stage, dict.fromkeys((*_USAGE_KINDS, "calls"), 0))
+        for kind in _USAGE_KINDS:
+            stage_usage[kind] += usage.get(kind, 0)
+        stage_usage["calls"] += 1
+        self.used += usage.get("total_tokens", 0)
+
+    def state_updates(self) -> dict[str, Any]:
+        """合并进节点返回值的字段"""
+        return {
+            "token_used": self.used,
+            "token_usage_by_stage": self.by_stage,
+            "budget_skipped_steps": self.skipped,
+        }
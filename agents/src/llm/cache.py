@@ -0,0 +1,314 @@
+"""
+LLM 结构化输出缓存
+
+call_llm_and_parse 的结果按 (schema, model) 分区缓存，两级查找：
+
+1. 精确匹配：schema + model + temperature + 全部消息的 sha256
+2. 语义匹配（可选）：上下文（除最后一条用户消息外的全部消息，包括 system prompt）
+   完全相同时，比较最后一条用户消息的 embedding，余弦相似度不低于阈值即命中
+
+只有在 LLM_CACHE_SCHEMAS 中的 schema 会被缓存，语义匹配另需在 LLM_CACHE_SEMANTIC_SCHEMAS 中，
+两级共用一个 LRU 容量上限。缓存的是校验通过的 JSON，每次命中都重新 model_validate_json，
+调用方拿到的是独立的对象。
+
+语义匹配会把措辞相近的请求视为同一个：只对输出不依赖细节差异的 schema 开启，
+并把阈值设得足够高（"发往加州" 和 "发往德州" 不应命中同一条）。
+"""
+
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Protocol
+
+import numpy as np
+import structlog
+
+from ..config import get_settings
+
+logger = structlog.get_logger()
+
+_WORD_RE = re.compile(r"[a-z0-9]+(?:[.\-'][a-z0-9]+)*|[一-鿿]", re.IGNORECASE)
+
+
+class Embedder(Protocol):
+    """文本 → 单位向量"""
+
+    dim: int
+
+    def embed(self, text: str) -> np.ndarray: ...
+
+
+class HashingEmbedder:
+    """
+    本地确定性 embedding（feature hashing）
+
+    特征为小写单词、相邻词对，以及中文单字和相邻字对；每个特征经 blake2b 映射到
+    一个维度与符号。不依赖模型或网络，跨进程结果一致，适合测试与离线环境。
+    """
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def _features(self, text: str) -> list[str]:
+        tokens = [t.lower() for t in _WORD_RE.findall(text)]
+        bigrams = [f"{a} {b}" for a, b in zip(tokens, tokens[1:], strict=False)]
+        return tokens + bigrams
+
+    def embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature in self._features(text):
+            digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+            index = int.from_bytes(digest[:4], "little") % self.dim
+            vector[index] += 1.0 if digest[4] & 1 else -1.0
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else vector
+
+
+@dataclass
+class _Entry:
+    value: str
+    expires_at: float
+    partition: tuple[str, str]
+    context_hash: str | None = None
+
+
+class _SemanticBucket:
+    """同一 (schema, model, 上下文) 下的 embedding 矩阵"""
+
+    def __init__(self) -> None:
+        self.keys: list[str] = []
+        self.vectors: list[np.ndarray] = []
+        self._matrix: np.ndarray | None = None
+
+    def add(self, key: str, vector: np.ndarray) -> None:
+        self.keys.append(key)
+        self.vectors.append(vector)
+        self._matrix = None
+
+    def remove(self, key: str) -> None:
+        index = self.keys.index(key)
+        del self.keys[index]
+        del self.vectors[index]
+        self._matrix = None
+
+    def best(self, vector: np.ndarray) -> tuple[str, float] | None:
+        if not self.keys:
+            return None
+        if self._matrix is None:
+            self._matrix = np.stack(self.vectors)
+        scores = self._matrix @ vector
+        index = int(np.argmax(scores))
+        return self.keys[index], float(scores[index])
+
+
+def normalize_messages(messages: list[Any]) -> list[tuple[str, str]]:
+    """dict / (role, content) 元组 / LangChain Message 统一为 (role, content)"""
+    normalized = []
+    for message in messages:
+        if isinstance(message, dict):
+            normalized.append((str(message.get("role", "")), str(message.get("content", ""))))
+        elif isinstance(message, tuple | list):
+            normalized.append((str(message[0]), str(message[1])))
+        else:
+            normalized.append((getattr(message, "type", ""), str(message.content)))
+    return normalized
+
+
+def _digest(*parts: Any) -> str:
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(repr(part).encode())
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+class LLMResponseCache:
+    """
+    LLM 结构化输出缓存
+
+    Args:
+        schemas: 允许缓存的 schema 名；None 表示全部
+        semantic_schemas: 启用语义匹配的 schema 名
+        max_entries: 全部分区合计的条目上限，超出按 LRU 淘汰
+        ttl_seconds: 条目有效期，0 表示不过期
+        similarity_threshold: 语义匹配的余弦相似度阈值
+        embedder: embedding 实现，默认 HashingEmbedder
+    """
+
+    def __init__(
+        self,
+        schemas: set[str] | None = None,
+        semantic_schemas: set[str] | None = None,
+        max_entries: int = 5000,
+        ttl_seconds: float = 0,
+        similarity_threshold: float = 0.95,
+        embedder: Embedder | None = None,
+    ):
+        self.schemas = schemas
+        self.semantic_schemas = semantic_schemas or set()
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.embedder = embedder or HashingEmbedder()
+        self.stats = {"exact_hits": 0, "semantic_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._buckets: dict[tuple[str, str, str], _SemanticBucket] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> "LLMResponseCache":
+        settings = get_settings()
+        return cls(
+            schemas=_parse_names(settings.llm_cache_schemas),
+            semantic_schemas=_parse_names(settings.llm_cache_semantic_schemas) or set(),
+            max_entries=settings.llm_cache_max_entries,
+            ttl_seconds=settings.llm_cache_ttl_seconds,
+            similarity_threshold=settings.llm_cache_similarity_threshold,
+        )
+
+    def enabled_for(self, schema: str) -> bool:
+        return self.schemas is None or schema in self.schemas
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(
+        self,
+        schema: str,
+        model: str,
+        messages: list[Any],
+        temperature: float = 0.0,
+    ) -> tuple[str, str] | None:
+        """
+        查找缓存
+
+        Returns:
+            (缓存的 JSON, "exact" | "semantic")，未命中返回 None
+        """
+        if not self.enabled_for(schema):
+            return None
+
+        normalized = normalize_messages(messages)
+        key = _digest(schema, model, temperature, normalized)
+        now = time.time()
+        with self._lock:
+            entry = self._live(key, now)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats["exact_hits"] += 1
+                return entry.value, "exact"
+
+        if schema in self.semantic_schemas and normalized:
+            bucket_key = (schema, model, _digest(temperature, normalized[:-1]))
+            vector = self.embedder.embed(normalized[-1][1])
+            with self._lock:
+                bucket = self._buckets.get(bucket_key)
+                match = bucket.best(vector) if bucket else None
+                if match is not None and match[1] >= self.similarity_threshold:
+                    entry = self._live(match[0], now)
+                    if entry is not None:
+                        self._entries.move_to_end(match[0])
+                        self.stats["semantic_hits"] += 1
+                        logger.debug("llm_cache.semantic_hit", schema=schema, score=match[1])
+                        return entry.value, "semantic"
+
+        with self._lock:
+            self.stats["misses"] += 1
+        return None
+
+    def put(
+        self,
+        schema: str,
+        model: str,
+        messages: list[Any],
+        value: str,
+        temperature: float = 0.0,
+    ) -> None:
+        """写入校验通过的 JSON"""
+        if not self.enabled_for(schema):
+            return
+
+        normalized = normalize_messages(messages)
+        key = _digest(schema, model, temperature, normalized)
+        expires_at = time.time() + self.ttl_seconds if self.ttl_seconds > 0 else float("inf")
+        bucket_key = None
+        vector = None
+        if schema in self.semantic_schemas and normalized:
+            bucket_key = (schema, model, _digest(temperature, normalized[:-1]))
+            vector = self.embedder.embed(normalized[-1][1])
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(
+                value=value,
+                expires_at=expires_at,
+                partition=(schema, model),
+                context_hash=bucket_key[2] if bucket_key else None,
+            )
+            if bucket_key is not None:
+                self._buckets.setdefault(bucket_key, _SemanticBucket()).add(key, vector)
+            self.stats["stores"] += 1
+
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.stats["evictions"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+
+    def _live(self, key: str, now: float) -> _Entry | None:
+        """返回未过期的条目；过期的顺手删除（调用方持有锁）"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= now:
+            self._remove(key)
+            return None
+        return entry
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        if entry.context_hash is None:
+            return
+        bucket_key = (*entry.partition, entry.context_hash)
+        bucket = self._buckets.get(bucket_key)
+        if bucket is not None:
+            bucket.remove(key)
+            if not bucket.keys:
+                del self._buckets[bucket_key]
+
+
+def _parse_names(value: str) -> set[str] | None:
+    """"*" 表示全部；空字符串表示不启用"""
+    value = value.strip()
+    if value == "*":
+        return None
+    return {name.strip() for name in value.split(",") if name.strip()}
+
+
+# LLMResponseCache 单例
+_llm_cache: LLMResponseCache | None = None
+_llm_cache_initialized = False
+
+
+def get_llm_cache() -> LLMResponseCache | None:
+    """根据配置创建缓存单例，LLM_CACHE_ENABLED=false 时返回 None"""
+    global _llm_cache, _llm_cache_initialized
+    if not _llm_cache_initialized:
+        if get_settings().llm_cache_enabled:
+            _llm_cache = LLMResponseCache.from_settings()
+        _llm_cache_initialized = True
+    return _llm_cache
+
+
+def set_llm_cache(cache: LLMResponseCache | None) -> None:
+    """替换缓存单例（测试或自定义 embedder）"""
+    global _llm_cache, _llm_cache_initialized
+    _llm_cache = cache
+    _llm_cache_initialized = True
@@ -4,14 +4,20 @@ LLM 客户端封装
 提供统一的 LLM 调用接口，支持结构化输出。
 """
 
+import asyncio
 import re
+import time
 from typing import TypeVar
 
 import structlog
 from langchain_openai import ChatOpenAI
+from opentelemetry.trace import Status, StatusCode
 from pydantic import BaseModel
 
-from ..config import get_settings
+from ..observability import get_telemetry
+from ..resilience import get_resilience, jittered_backoff
+from .cache import get_llm_cache
+from .pool import get_llm_pool
 
 logger = structlog.get_logger()
 
@@ -53,7 +59,8 @@ def get_llm(model_type: str = "planner", temperature: float = 0.1) -> ChatOpenAI
     """
     获取 LLM 实例
 
-    支持 OpenAI 和 Poe API（通过 base_url 切换）
+    支持 OpenAI 和 Poe API（通过 base_url 切换）。
+    实例按 (model, temperature, base_url) 从 LLMClientPool 复用（见 llm/pool.py）。
 
     Args:
         model_type: "planner"（轻量）或 "verifier"（重量）
@@ -62,34 +69,7 @@ def get_llm(model_type: str = "planner", temperature: float = 0.1) -> ChatOpenAI
     Returns:
         ChatOpenAI 实例
     """
-    settings = get_settings()
-
-    model = (
-        settings.openai_model_planner
-        if model_type == "planner"
-        else settings.openai_model_verifier
-    )
-
-    # 支持自定义 base_url（用于 Poe API 等兼容服务）
-    base_url = settings.openai_base_url
-    if base_url == "https://api.openai.com/v1":
-        base_url = None  # 使用默认值
-
-    logger.info(
-        "llm.init",
-        model=model,
-        base_url=base_url or "default",
-        model_type=model_type,
-    )
-
-    return ChatOpenAI(
-        model=model,
-        api_key=settings.openai_api_key,
-        base_url=base_url,
-        temperature=temperature,
-        request_timeout=30,
-        max_retries=2,
-    )
+    return get_llm_pool().get(model_type=model_type, temperature=temperature)
 
 
 def get_llm_with_structured_output(
@@ -129,15 +109,20 @@ async def call_llm_with_retry(
         (响应内容, token 使用量)
     """
     last_error = None
+    get_resilience().retry_budget.deposit()
+    started = time.perf_counter()
 
     for attempt in range(max_retries):
         try:
             response = await llm.ainvoke(messages)
 
             # 获取 token 使用量
-            token_count = 0
-            if hasattr(response, "usage_metadata") and response.usage_metadata:
-                token_count = response.usage_metadata.get("total_tokens", 0)
+            usage: dict[str, int] = {}
+            _add_usage(usage, getattr(response, "usage_metadata", None))
+            token_count = usage.get("total_tokens", 0)
+            get_telemetry().record_llm(
+                "text", "custom", (time.perf_counter() - started) * 1000, ok=True, usage=usage
+            )
 
             content = response.content if hasattr(response, "content") else str(response)
             return content, token_count
@@ -151,9 +136,11 @@ async def call_llm_with_retry(
                 error=str(e),
             )
             if attempt < max_retries - 1:
-                # 简单的指数退避
-                import asyncio
-                await asyncio.sleep(2 ** attempt)
+                # 带抖动的指数退避，受全局重试预算约束
+                if not get_resilience().retry_budget.try_withdraw():
+                    logger.warning("llm.retry_budget_exhausted")
+                    break
+                await asyncio.sleep(jittered_backoff(attempt, base=1.0, cap=8.0))
 
     raise last_error or Exception("LLM call failed after retries")
 
@@ -164,11 +151,14 @@ async def call_llm_and_parse(
     model_type: str = "planner",
     temperature: float = 0.0,
     max_retries: int = 2,
+    usage: dict[str, int] | None = None,
 ) -> T | None:
     """
     调用 LLM 并解析为结构化输出
 
-    兼容不支持 function calling 的 API（如 Poe）
+    兼容不支持 function calling 的 API（如 Poe）。
+    schema 在 LLM_CACHE_SCHEMAS 中时先查 LLMResponseCache（见 llm/cache.py），
+    命中则不调用 LLM；解析成功的结果写回缓存。
 
     Args:
         messages: 消息列表
@@ -176,38 +166,84 @@ async def call_llm_and_parse(
         model_type: "planner" 或 "verifier"
         temperature: 温度参数
         max_retries: 最大重试次数
+        usage: 传入时填充本次调用（含重试）的实际 token 用量，缓存命中为空
 
     Returns:
         解析后的 Pydantic 模型实例，失败返回 None
     """
-    llm = get_llm(model_type=model_type, temperature=temperature)
-
-    for attempt in range(max_retries):
-        try:
-            response = await llm.ainvoke(messages)
-            content = response.content if hasattr(response, "content") else str(response)
+    schema = output_schema.__name__
+    telemetry = get_telemetry()
+
+    cache = get_llm_cache()
+    if cache is not None and cache.enabled_for(schema):
+        model = get_llm_pool().key_for(model_type, temperature).model
+        cached = cache.get(schema, model, messages, temperature)
+        telemetry.record_llm_cache(schema, f"{cached[1]}_hit" if cached else "miss")
+        if cached is not None:
+            logger.info("llm.cache_hit", schema=schema, match=cached[1])
+            return output_schema.model_validate_json(cached[0])
+    else:
+        cache = None
 
-            # 清理并解析 JSON
-            cleaned = clean_json_response(content)
-            result = output_schema.model_validate_json(cleaned)
-
-            logger.info(
-                "llm.parse_success",
-                schema=output_schema.__name__,
-                attempt=attempt + 1,
-            )
-            return result
-
-        except Exception as e:
-            logger.warning(
-                "llm.parse_failed",
-                schema=output_schema.__name__,
-                attempt=attempt + 1,
-                error=str(e),
-            )
-            if attempt < max_retries - 1:
-                import asyncio
-                await asyncio.sleep(1)
-
-    return None
+    llm = get_llm(model_type=model_type, temperature=temperature)
+    started = time.perf_counter()
+    call_usage: dict[str, int] = {}
+    result: T | None = None
+    attempts = 0
+
+    with telemetry.span(f"llm.{schema}", schema=schema, model_type=model_type) as span:
+        for attempt in range(max_retries):
+            attempts += 1
+            try:
+                response = await llm.ainvoke(messages)
+                _add_usage(call_usage, getattr(response, "usage_metadata", None))
+                content = response.content if hasattr(response, "content") else str(response)
+
+                # 清理并解析 JSON
+                cleaned = clean_json_response(content)
+                result = output_schema.model_validate_json(cleaned)
+
+                logger.info(
+                    "llm.parse_success",
+                    schema=schema,
+                    attempt=attempt + 1,
+                )
+                break
+
+            except Exception as e:
+                logger.warning(
+                    "llm.parse_failed",
+                    schema=schema,
+                    attempt=attempt + 1,
+                    error=str(e),
+                )
+                if attempt < max_retries - 1:
+                    await asyncio.sleep(jittered_backoff(attempt, base=0.5, cap=4.0))
+
+        span.set_attribute("attempts", attempts)
+        for kind, tokens in call_usage.items():
+            span.set_attribute(f"llm.{kind}", tokens)
+        if result is None:
+            span.set_status(Status(StatusCode.ERROR, "LLM output could not be parsed"))
+
+    telemetry.record_llm(
+        schema,
+        model_type,
+        (time.perf_counter() - started) * 1000,
+        ok=result is not None,
+        usage=call_usage,
+    )
+    if usage is not None:
+        usage.update(call_usage)
+    if cache is not None and result is not None:
+        cache.put(schema, model, messages, result.model_dump_json(), temperature)
+    return result
+
+
+def _add_usage(total: dict[str, int], usage_metadata: dict | None) -> None:
+    """累加 response.usage_metadata 中的 token 数"""
+    if not usage_metadata:
+        return
+    for kind in ("input_tokens", "output_tokens", "total_tokens"):
+        total[kind] = total.get(kind, 0) + (usage_metadata.get(kind) or 0)
 
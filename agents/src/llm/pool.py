@@ -0,0 +1,201 @@
+"""
+LLM client 池
+
+按 (model, temperature, base_url) 复用 ChatOpenAI 实例，同一 event loop 内的实例共享
+一个 httpx.AsyncClient 连接池，Intent / 核验排序 / 方案推荐不再每次调用都重新构造
+client、重新握手。
+
+ChatOpenAI 在构造时绑定 http client，而 httpx.AsyncClient 不能跨 event loop 使用，
+因此与 GatewayClient 一样按 loop 分别维护（CLI 的 asyncio.run 与测试各自一个 loop）。
+"""
+
+import asyncio
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+import structlog
+from langchain_openai import ChatOpenAI
+
+from ..config import get_settings
+
+logger = structlog.get_logger()
+
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
+
+
+@dataclass(frozen=True)
+class LLMKey:
+    """池的 key"""
+
+    model: str
+    temperature: float
+    base_url: str | None
+
+
+class _LoopClients:
+    """单个 event loop 内的共享 http client 与 ChatOpenAI 实例"""
+
+    def __init__(self, http_client: httpx.AsyncClient | None):
+        self.http_client = http_client
+        self.llms: dict[LLMKey, ChatOpenAI] = {}
+
+
+class LLMClientPool:
+    """ChatOpenAI 实例池"""
+
+    def __init__(
+        self,
+        max_connections: int = 50,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 60.0,
+        request_timeout: float = 30.0,
+        max_retries: int = 2,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.request_timeout = request_timeout
+        self.max_retries = max_retries
+        self.transport = transport
+        self.stats = {"created": 0, "reused": 0}
+
+        self._loops: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopClients] = (
+            weakref.WeakKeyDictionary()
+        )
+        # 没有运行中的 loop 时（同步构造）使用的实例，不共享 http client
+        self._sync = _LoopClients(None)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> "LLMClientPool":
+        settings = get_settings()
+        return cls(
+            max_connections=settings.llm_max_connections,
+            max_keepalive_connections=settings.llm_max_keepalive_connections,
+            keepalive_expiry=settings.llm_keepalive_expiry,
+            request_timeout=settings.llm_request_timeout,
+            max_retries=settings.llm_max_retries,
+        )
+
+    @staticmethod
+    def key_for(model_type: str, temperature: float) -> LLMKey:
+        """planner/verifier → 具体模型；官方 base_url 归一为 None（使用默认值）"""
+        settings = get_settings()
+        model = (
+            settings.openai_model_planner
+            if model_type == "planner"
+            else settings.openai_model_verifier
+        )
+        base_url = settings.openai_base_url
+        if base_url == DEFAULT_BASE_URL:
+            base_url = None
+        return LLMKey(model=model, temperature=temperature, base_url=base_url)
+
+    def get(self, model_type: str = "planner", temperature: float = 0.1) -> ChatOpenAI:
+        """获取（或惰性创建）对应 key 的 ChatOpenAI"""
+        key = self.key_for(model_type, temperature)
+        clients = self._clients_for_loop()
+        llm = clients.llms.get(key)
+        if llm is not None:
+            self.stats["reused"] += 1
+            return llm
+
+        with self._lock:
+            llm = clients.llms.get(key)
+            if llm is None:
+                llm = self._create(key, clients.http_client)
+                clients.llms[key] = llm
+                self.stats["created"] += 1
+                logger.info(
+                    "llm.init",
+                    model=key.model,
+                    base_url=key.base_url or "default",
+                    model_type=model_type,
+                    temperature=temperature,
+                )
+            else:
+                self.stats["reused"] += 1
+        return llm
+
+    def _clients_for_loop(self) -> _LoopClients:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return self._sync
+
+        clients = self._loops.get(loop)
+        if clients is None or (clients.http_client is not None and clients.http_client.is_closed):
+            with self._lock:
+                clients = self._loops.get(loop)
+                if clients is None or clients.http_client.is_closed:
+                    clients = _LoopClients(self._create_http_client())
+                    self._loops[loop] = clients
+        return clients
+
+    def _create_http_client(self) -> httpx.AsyncClient:
+        kwargs: dict[str, Any] = {
+            "limits": self.limits,
+            "timeout": httpx.Timeout(self.request_timeout),
+        }
+        if self.transport is not None:
+            kwargs["transport"] = self.transport
+        return httpx.AsyncClient(**kwargs)
+
+    def _create(self, key: LLMKey, http_client: httpx.AsyncClient | None) -> ChatOpenAI:
+        return ChatOpenAI(
+            model=key.model,
+            api_key=get_settings().openai_api_key,
+            base_url=key.base_url,
+            temperature=key.temperature,
+            request_timeout=self.request_timeout,
+            max_retries=self.max_retries,
+            http_async_client=http_client,
+        )
+
+    def size(self) -> int:
+        """当前缓存的 ChatOpenAI 实例数（所有 loop）"""
+        with self._lock:
+            return len(self._sync.llms) + sum(len(c.llms) for c in self._loops.values())
+
+    async def aclose(self) -> None:
+        """关闭当前 event loop 的连接池并丢弃该 loop 下的实例"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            clients = self._loops.pop(loop, None)
+        if clients is not None and clients.http_client is not None:
+            await clients.http_client.aclose()
+            logger.info("llm_pool.closed", instances=len(clients.llms))
+
+
+# LLMClientPool 单例
+_llm_pool: LLMClientPool | None = None
+_llm_pool_lock = threading.Lock()
+
+
+def get_llm_pool() -> LLMClientPool:
+    """获取 LLMClientPool 单例"""
+    global _llm_pool
+    if _llm_pool is None:
+        with _llm_pool_lock:
+            if _llm_pool is None:
+                _llm_pool = LLMClientPool.from_settings()
+    return _llm_pool
+
+
+def set_llm_pool(pool: LLMClientPool | None) -> None:
+    """替换 LLMClientPool 单例（测试或自定义 transport）"""
+    global _llm_pool
+    with _llm_pool_lock:
+        _llm_pool = pool
+
+
+async def shutdown_llm_pool() -> None:
+    """关闭钩子：释放当前 event loop 的 LLM 连接"""
+    if _llm_pool is not None:
+        await _llm_pool.aclose()
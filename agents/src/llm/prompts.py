@@ -32,6 +32,9 @@ Your task is to parse the user's natural language request into a structured Miss
    - speed: 0.0-1.0 (faster delivery is better)
    - risk: 0.0-1.0 (lower risk/higher quality is better)
    Sum should be 1.0
+8. **basket**: Only when the user needs several different product types in one order
+   (e.g. "charger + cable + case under $60"): one slot per product type with its own
+   search_query and quantity. Leave empty for single-product requests.
 
 ## Output Format
 
@@ -33,6 +33,13 @@ class ObjectiveWeights(BaseModel):
     risk: float = Field(default=0.3, ge=0.0, le=1.0, description="风险权重")
 
 
+class BasketSlot(BaseModel):
+    """多商品任务中的一个槽位：从该槽位的候选中选一个 SKU"""
+    category: str = Field(default="", description="品类")
+    search_query: str = Field(description="该槽位的搜索关键词")
+    quantity: int = Field(default=1, description="数量")
+
+
 class MissionParseResult(BaseModel):
     """Intent Agent 解析结果"""
     destination_country: str | None = Field(default=None, description="目的国 ISO 代码")
@@ -44,6 +51,7 @@ class MissionParseResult(BaseModel):
     soft_preferences: list[SoftPreference] = Field(default_factory=list, description="软性偏好")
     objective_weights: ObjectiveWeights = Field(default_factory=ObjectiveWeights, description="目标权重")
     search_query: str = Field(default="", description="搜索关键词")
+    basket: list[BasketSlot] = Field(default_factory=list, description="多商品任务的槽位，单商品任务为空")
     needs_clarification: bool = Field(default=False, description="是否需要澄清")
     clarification_questions: list[str] = Field(default_factory=list, description="澄清问题")
 
@@ -84,6 +92,7 @@ class TotalBreakdown(BaseModel):
     subtotal: float = Field(description="商品小计")
     shipping_cost: float = Field(description="运费")
     tax_estimate: float = Field(description="税费估算")
+    duty_estimate: float = Field(default=0.0, description="关税估算")
     total_landed_cost: float = Field(description="到手总价")
 
 
@@ -95,6 +104,18 @@ class DeliveryEstimate(BaseModel):
     max_date: str | None = None
 
 
+class PlanShipment(BaseModel):
+    """方案中的一个包裹（同一商家、同一发货地的商品合并发货）"""
+    merchant_id: str
+    ship_from: str
+    sku_ids: list[str]
+    shipping_option_id: str
+    shipping_option_name: str
+    price: float
+    eta_min_days: int
+    eta_max_days: int
+
+
 class PurchasePlan(BaseModel):
     """购买方案"""
     plan_name: str = Field(description="方案名称")
@@ -102,6 +123,7 @@ class PurchasePlan(BaseModel):
     items: list[PlanItem] = Field(default_factory=list)
     shipping_option_id: str = Field(description="运输选项 ID")
     shipping_option_name: str = Field(description="运输选项名称")
+    shipments: list[PlanShipment] = Field(default_factory=list, description="按商家 / 发货地拆分的包裹")
     total: TotalBreakdown
     delivery: DeliveryEstimate
     risks: list[str] = Field(default_factory=list, description="风险提示")
@@ -3,12 +3,16 @@ Agent 主入口
 """
 
 import asyncio
+from collections.abc import AsyncIterator
 
 import structlog
 from langchain_core.messages import HumanMessage
 
 from .config import get_settings
-from .graph import AgentState, build_agent_graph
+from .graph import AgentState, StreamEvent, get_graph_runtime
+from .llm import shutdown_llm_pool
+from .observability import get_telemetry
+from .tools import shutdown_gateway_client
 
 # 配置日志
 structlog.configure(
@@ -32,25 +36,9 @@ structlog.configure(
 logger = structlog.get_logger()
 
 
-async def run_agent(user_message: str, config: dict | None = None) -> dict:
-    """
-    运行 Agent
-
-    Args:
-        user_message: 用户消息
-        config: LangGraph 配置（包含 thread_id 等）
-
-    Returns:
-        Agent 最终状态
-    """
-    settings = get_settings()
-    logger.info("agent.start", message=user_message[:100])
-
-    # 构建 graph
-    graph = build_agent_graph()
-
-    # 初始状态
-    initial_state: AgentState = {
+def _initial_state(user_message: str) -> AgentState:
+    """一次 Mission 的初始 state"""
+    return {
         "messages": [HumanMessage(content=user_message)],
         "mission": None,
         "candidates": [],
@@ -62,8 +50,10 @@ async def run_agent(user_message: str, config: dict | None = None) -> dict:
         "draft_order": None,
         "evidence_snapshot_id": None,
         "tool_call_records": [],
-        "token_budget": settings.token_budget_total,
+        "token_budget": get_settings().token_budget_total,
         "token_used": 0,
+        "token_usage_by_stage": {},
+        "budget_skipped_steps": [],
         "current_step": "start",
         "needs_user_input": False,
         "user_confirmation": None,
@@ -72,11 +62,31 @@ async def run_agent(user_message: str, config: dict | None = None) -> dict:
         "recoverable": True,
     }
 
-    # 运行 graph
-    config = config or {"configurable": {"thread_id": "default"}}
+
+async def run_agent(user_message: str, config: dict | None = None) -> dict:
+    """
+    运行 Agent
+
+    Args:
+        user_message: 用户消息
+        config: LangGraph 配置（包含 thread_id 等）
+
+    Returns:
+        Agent 最终状态
+    """
+    logger.info("agent.start", message=user_message[:100])
+
+    # 复用进程级已编译的 graph
+    runtime = get_graph_runtime()
+
+    # 初始状态
+    initial_state = _initial_state(user_message)
+
+    # 运行 graph（未指定 thread_id 时每次运行使用独立的 thread）
+    config = config or runtime.new_config()
 
     try:
-        final_state = await graph.ainvoke(initial_state, config)
+        final_state = await runtime.ainvoke(initial_state, config)
         logger.info(
             "agent.complete",
             current_step=final_state.get("current_step"),
@@ -94,6 +104,40 @@ async def run_agent(user_message: str, config: dict | None = None) -> dict:
         }
 
 
+async def stream_agent(
+    user_message: str,
+    config: dict | None = None,
+    buffer_size: int | None = None,
+) -> AsyncIterator[StreamEvent]:
+    """
+    流式运行 Agent
+
+    每个阶段完成即产出事件：mission_parsed → candidates_recalled → candidate_verified（逐个）
+    → verification_complete → plans_ready → draft_created，最后是携带最终 state 的 completed。
+    提前退出迭代会取消仍在运行的 graph。
+
+    Args:
+        user_message: 用户消息
+        config: LangGraph 配置（包含 thread_id 等）
+        buffer_size: 事件队列容量，默认 STREAM_BUFFER_SIZE
+
+    Yields:
+        StreamEvent
+    """
+    logger.info("agent.stream_start", message=user_message[:100])
+    runtime = get_graph_runtime()
+
+    async for event in runtime.astream(_initial_state(user_message), config, buffer_size):
+        if event.type == "completed":
+            logger.info(
+                "agent.complete",
+                current_step=event.data.get("current_step"),
+                draft_order_id=event.data.get("draft_order_id"),
+                error=event.data.get("error"),
+            )
+        yield event
+
+
 async def main():
     """Demo 入口"""
     print("=" * 60)
@@ -101,6 +145,8 @@ async def main():
     print("=" * 60)
     print()
 
+    await get_graph_runtime().warmup()
+
     # 示例查询
     test_queries = [
         "给 10 岁孩子买生日礼物，STEM 玩具，预算 80 美元，三天内到美国",
@@ -118,7 +164,7 @@ async def main():
         print(f"Verified Candidates: {len(result.get('verified_candidates', []))}")
         print(f"Plans Generated: {len(result.get('plans', []))}")
         print(f"Draft Order ID: {result.get('draft_order_id')}")
-        print(f"Token Used: {result.get('token_used')}")
+        print(f"Token Used: {result.get('token_used')} {result.get('token_usage_by_stage') or ''}")
 
         if result.get("error"):
             print(f"Error: {result.get('error')}")
@@ -127,6 +173,10 @@ async def main():
         print("=" * 60)
         print()
 
+    await shutdown_gateway_client()
+    await shutdown_llm_pool()
+    get_telemetry().shutdown()
+
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -0,0 +1,7 @@
+"""
+可观测性：OpenTelemetry tracing 与 metrics
+"""
+
+from .telemetry import Telemetry, get_telemetry, instrument_node, set_telemetry
+
+__all__ = ["Telemetry", "get_telemetry", "instrument_node", "set_telemetry"]
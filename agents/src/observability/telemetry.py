@@ -0,0 +1,284 @@
+"""
+Tracing 与 Metrics
+
+所有 span 与指标都经由 Telemetry 单例发出：
+- 每个 graph 节点：span "node.<name>" + agent.node.duration 直方图
+- 每次 call_tool：span "tool.<name>" + agent.tool.duration 直方图 + agent.tool.calls 计数
+- 工具响应缓存：agent.tool.cache 计数（result=hit|stale|miss）
+- 每次 call_llm_and_parse：span "llm.<schema>" + agent.llm.duration 直方图
+  + agent.llm.tokens 计数（kind=input|output）
+- LLM 输出缓存：agent.llm.cache 计数（result=exact_hit|semantic_hit|miss）
+
+OTEL_ENABLED=false（默认）时使用 no-op provider，几乎没有开销；
+Telemetry.in_memory() 供测试与基准直接断言 span 和指标。
+"""
+
+import functools
+import inspect
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+import structlog
+from opentelemetry import metrics, trace
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader, PeriodicExportingMetricReader
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.trace import Status, StatusCode
+
+from ..config import get_settings
+
+logger = structlog.get_logger()
+
+INSTRUMENTATION_NAME = "shopping-agents"
+
+
+class Telemetry:
+    """持有 tracer / meter 与全部指标"""
+
+    def __init__(
+        self,
+        tracer_provider: trace.TracerProvider | None = None,
+        meter_provider: metrics.MeterProvider | None = None,
+    ):
+        # 未配置 tracer 时直接跳过 span，连 context 切换的开销也省掉
+        self.tracing = tracer_provider is not None
+        self.tracer_provider = tracer_provider or trace.NoOpTracerProvider()
+        self.meter_provider = meter_provider or metrics.NoOpMeterProvider()
+        self.tracer = self.tracer_provider.get_tracer(INSTRUMENTATION_NAME)
+        meter = self.meter_provider.get_meter(INSTRUMENTATION_NAME)
+
+        self.node_duration = meter.create_histogram(
+            "agent.node.duration", unit="ms", description="Graph node latency"
+        )
+        self.tool_duration = meter.create_histogram(
+            "agent.tool.duration", unit="ms", description="call_tool latency"
+        )
+        self.tool_calls = meter.create_counter(
+            "agent.tool.calls", description="call_tool invocations"
+        )
+        self.tool_cache = meter.create_counter(
+            "agent.tool.cache", description="Tool response cache lookups"
+        )
+        self.llm_duration = meter.create_histogram(
+            "agent.llm.duration", unit="ms", description="LLM call latency"
+        )
+        self.llm_tokens = meter.create_counter(
+            "agent.llm.tokens", unit="{token}", description="LLM tokens used"
+        )
+        self.llm_cache = meter.create_counter(
+            "agent.llm.cache", description="LLM structured output cache lookups"
+        )
+
+        self.span_exporter: InMemorySpanExporter | None = None
+        self.metric_reader: InMemoryMetricReader | None = None
+
+    # ----------------------------------------
+    # 构造
+    # ----------------------------------------
+    @classmethod
+    def from_settings(cls) -> "Telemetry":
+        settings = get_settings()
+        if not settings.otel_enabled:
+            return cls()
+
+        from opentelemetry.exporter.otlp.proto.grpc.metric_exporter import OTLPMetricExporter
+        from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+
+        resource = Resource.create({"service.name": settings.otel_service_name})
+        endpoint = settings.otel_exporter_otlp_endpoint
+        tracer_provider = TracerProvider(resource=resource)
+        tracer_provider.add_span_processor(
+            BatchSpanProcessor(OTLPSpanExporter(endpoint=endpoint, insecure=True))
+        )
+        meter_provider = MeterProvider(
+            resource=resource,
+            metric_readers=[
+                PeriodicExportingMetricReader(OTLPMetricExporter(endpoint=endpoint, insecure=True))
+            ],
+        )
+        logger.info("telemetry.enabled", endpoint=endpoint, service=settings.otel_service_name)
+        return cls(tracer_provider, meter_provider)
+
+    @classmethod
+    def in_memory(cls, spans: bool = True) -> "Telemetry":
+        """
+        span 与指标都留在内存中，供测试和基准读取
+
+        Args:
+            spans: 是否记录 span；长时间运行的基准只需要指标时关闭，避免 span 不断累积
+        """
+        span_exporter = None
+        tracer_provider = None
+        if spans:
+            span_exporter = InMemorySpanExporter()
+            tracer_provider = TracerProvider(resource=Resource.create({"service.name": "test"}))
+            tracer_provider.add_span_processor(SimpleSpanProcessor(span_exporter))
+        metric_reader = InMemoryMetricReader()
+        telemetry = cls(tracer_provider, MeterProvider(metric_readers=[metric_reader]))
+        telemetry.span_exporter = span_exporter
+        telemetry.metric_reader = metric_reader
+        return telemetry
+
+    def shutdown(self) -> None:
+        """flush 并关闭 exporter"""
+        for provider in (self.tracer_provider, self.meter_provider):
+            shutdown = getattr(provider, "shutdown", None)
+            if shutdown is not None:
+                shutdown()
+
+    # ----------------------------------------
+    # 记录
+    # ----------------------------------------
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[trace.Span]:
+        """开启 span；异常记录到 span 后继续抛出"""
+        if not self.tracing:
+            yield trace.INVALID_SPAN
+            return
+        with self.tracer.start_as_current_span(
+            name,
+            attributes={k: v for k, v in attributes.items() if v is not None},
+            record_exception=True,
+            set_status_on_exception=True,
+        ) as span:
+            yield span
+
+    def record_tool(self, tool_name: str, duration_ms: float, result: dict[str, Any]) -> None:
+        attributes = {"tool": tool_name, "ok": bool(result.get("ok"))}
+        if not result.get("ok"):
+            attributes["error_code"] = result.get("error", {}).get("code", "UNKNOWN")
+        self.tool_duration.record(duration_ms, attributes)
+        self.tool_calls.add(1, attributes)
+
+    def record_cache(self, tool_name: str, result: str) -> None:
+        self.tool_cache.add(1, {"tool": tool_name, "result": result})
+
+    def record_llm(
+        self,
+        schema: str,
+        model_type: str,
+        duration_ms: float,
+        ok: bool,
+        usage: dict[str, Any] | None = None,
+    ) -> None:
+        attributes = {"schema": schema, "model_type": model_type}
+        self.llm_duration.record(duration_ms, {**attributes, "ok": ok})
+        for kind in ("input", "output"):
+            tokens = (usage or {}).get(f"{kind}_tokens") or 0
+            if tokens:
+                self.llm_tokens.add(tokens, {**attributes, "kind": kind})
+
+    def record_llm_cache(self, schema: str, result: str) -> None:
+        self.llm_cache.add(1, {"schema": schema, "result": result})
+
+    # ----------------------------------------
+    # 读取（仅 in_memory）
+    # ----------------------------------------
+    def finished_spans(self) -> tuple[ReadableSpan, ...]:
+        return self.span_exporter.get_finished_spans() if self.span_exporter else ()
+
+    def metric_points(self, name: str) -> list[Any]:
+        """指定指标的全部数据点（每组属性一个）"""
+        if self.metric_reader is None:
+            return []
+        data = self.metric_reader.get_metrics_data()
+        if data is None:
+            return []
+        return [
+            point
+            for resource_metrics in data.resource_metrics
+            for scope_metrics in resource_metrics.scope_metrics
+            for metric in scope_metrics.metrics
+            if metric.name == name
+            for point in metric.data.data_points
+        ]
+
+    def metric_total(self, name: str, **attributes: Any) -> float:
+        """计数器求和 / 直方图计数，只统计属性匹配的数据点"""
+        total = 0.0
+        for point in self.metric_points(name):
+            if all(point.attributes.get(k) == v for k, v in attributes.items()):
+                total += getattr(point, "value", None) or getattr(point, "count", 0)
+        return total
+
+
+def instrument_node(name: str, fn: Callable) -> Callable:
+    """
+    包装 graph 节点：span + 延迟直方图
+
+    保留原函数签名，LangGraph 依据签名决定是否注入 config。
+    """
+    if inspect.iscoroutinefunction(fn):
+
+        @functools.wraps(fn)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            telemetry = get_telemetry()
+            started = time.perf_counter()
+            error = None
+            try:
+                with telemetry.span(f"node.{name}", node=name) as span:
+                    result = await fn(*args, **kwargs)
+                    _annotate_node_span(span, result)
+                    return result
+            except BaseException as e:
+                error = type(e).__name__
+                raise
+            finally:
+                _record_node(telemetry, name, started, error)
+
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def sync_wrapper(*args: Any, **kwargs: Any) -> Any:
+        telemetry = get_telemetry()
+        started = time.perf_counter()
+        error = None
+        try:
+            with telemetry.span(f"node.{name}", node=name) as span:
+                result = fn(*args, **kwargs)
+                _annotate_node_span(span, result)
+                return result
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            _record_node(telemetry, name, started, error)
+
+    return sync_wrapper
+
+
+def _annotate_node_span(span: trace.Span, result: Any) -> None:
+    """节点返回的 state 里带 error 时标记 span 为失败"""
+    if isinstance(result, dict) and result.get("error"):
+        span.set_status(Status(StatusCode.ERROR, str(result["error"])[:200]))
+        span.set_attribute("error_code", result.get("error_code") or "UNKNOWN")
+
+
+def _record_node(telemetry: Telemetry, name: str, started: float, error: str | None) -> None:
+    attributes = {"node": name}
+    if error:
+        attributes["exception"] = error
+    telemetry.node_duration.record((time.perf_counter() - started) * 1000, attributes)
+
+
+# Telemetry 单例
+_telemetry: Telemetry | None = None
+
+
+def get_telemetry() -> Telemetry:
+    """获取 Telemetry 单例，首次调用时按配置创建"""
+    global _telemetry
+    if _telemetry is None:
+        _telemetry = Telemetry.from_settings()
+    return _telemetry
+
+
+def set_telemetry(telemetry: Telemetry | None) -> None:
+    """替换 Telemetry 单例（测试或基准使用 Telemetry.in_memory()）"""
+    global _telemetry
+    _telemetry = telemetry
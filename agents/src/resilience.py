@@ -0,0 +1,304 @@
+"""
+容错层：熔断、重试预算、对冲请求
+
+Tool Gateway 降级时，逐个失败的请求不应该被重试放大成更多的请求：
+- CircuitBreaker: 按工具熔断，连续失败达到阈值后短路，冷却后半开试探
+- RetryBudget: 全局重试预算，重试量不超过正常请求量的固定比例
+- jittered_backoff: full-jitter 指数退避
+- hedged: 只读工具在首个请求迟迟未返回时发出对冲请求，取先成功的结果
+
+call_tool 通过 Resilience.call 使用这些组件，llm/client.py 复用退避与重试预算。
+"""
+
+import asyncio
+import random
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import structlog
+
+from .config import get_settings
+
+logger = structlog.get_logger()
+
+Envelope = dict[str, Any]
+
+# 可重试、且计入熔断的错误码（与 contracts/error-codes.yaml 的 retryable 一致）
+RETRYABLE_ERROR_CODES = {"TIMEOUT", "UPSTREAM_ERROR", "RATE_LIMITED", "CONFLICT"}
+
+
+def jittered_backoff(attempt: int, base: float = 0.1, cap: float = 2.0) -> float:
+    """full-jitter 指数退避：[0, min(cap, base * 2^attempt)] 内均匀分布"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def is_retryable(result: Envelope) -> bool:
+    """失败响应是否可重试：超时、限流、5xx 及连接失败"""
+    if result.get("ok"):
+        return False
+    error = result.get("error", {})
+    if error.get("code") not in RETRYABLE_ERROR_CODES:
+        return False
+    http_status = error.get("http_status")
+    return http_status is None or http_status >= 500 or http_status == 429
+
+
+class CircuitBreaker:
+    """单个工具的熔断器：closed → open → half_open → closed"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, recovery_seconds: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        """是否允许发出请求；半开状态只放行一个试探请求"""
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.recovery_seconds:
+                return False
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+        if self.state == self.HALF_OPEN:
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+        return True
+
+    def release(self) -> None:
+        """请求未得出结果（被取消）时释放试探名额，不改变熔断状态"""
+        self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> bool:
+        """记录失败，返回本次是否触发熔断"""
+        self.failures += 1
+        self._probe_in_flight = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            tripped = self.state != self.OPEN
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            return tripped
+        return False
+
+
+class RetryBudget:
+    """
+    令牌桶式重试预算
+
+    每个正常请求存入 ratio 个令牌，每次重试/对冲取出 1 个；
+    桶容量 max_tokens，初始满桶以便冷启动时也能重试。
+    """
+
+    def __init__(self, ratio: float = 0.1, max_tokens: float = 10.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+
+    def deposit(self) -> None:
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def try_withdraw(self) -> bool:
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+
+async def hedged(
+    fn: Callable[[], Awaitable[Envelope]],
+    delay: float,
+    on_hedge: Callable[[], bool],
+) -> tuple[Envelope, bool]:
+    """
+    对冲请求：delay 秒后首个请求仍未返回，且 on_hedge() 允许时再发一个
+
+    Returns:
+        (先成功的结果，或两者都失败时首个请求的结果, 是否由对冲请求胜出)
+    """
+    primary = asyncio.ensure_future(fn())
+    done, _ = await asyncio.wait({primary}, timeout=delay)
+    if done or not on_hedge():
+        return await primary, False
+
+    backup = asyncio.ensure_future(fn())
+    pending = {primary, backup}
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None and task.result().get("ok"):
+                    return task.result(), task is backup
+        return await primary, False
+    finally:
+        for task in (primary, backup):
+            if not task.done():
+                task.cancel()
+
+
+class Resilience:
+    """熔断 + 重试预算 + 对冲的组合，按工具名维护熔断器"""
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        backoff_base: float = 0.1,
+        backoff_cap: float = 2.0,
+        retry_budget: RetryBudget | None = None,
+        failure_threshold: int = 5,
+        recovery_seconds: float = 30.0,
+        hedge_delay: float = 0.0,
+    ):
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.retry_budget = retry_budget or RetryBudget()
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.hedge_delay = hedge_delay
+        self.breakers: dict[str, CircuitBreaker] = {}
+        self.stats = {
+            "calls": 0,
+            "retries": 0,
+            "retry_budget_exhausted": 0,
+            "short_circuited": 0,
+            "breaker_opened": 0,
+            "hedges": 0,
+            "hedge_wins": 0,
+        }
+
+    @classmethod
+    def from_settings(cls) -> "Resilience":
+        settings = get_settings()
+        return cls(
+            max_attempts=settings.tool_retry_max_attempts,
+            backoff_base=settings.tool_retry_backoff_base,
+            backoff_cap=settings.tool_retry_backoff_cap,
+            retry_budget=RetryBudget(
+                ratio=settings.retry_budget_ratio,
+                max_tokens=settings.retry_budget_max_tokens,
+            ),
+            failure_threshold=settings.breaker_failure_threshold,
+            recovery_seconds=settings.breaker_recovery_seconds,
+            hedge_delay=settings.tool_hedge_delay_seconds,
+        )
+
+    def breaker_for(self, tool_name: str) -> CircuitBreaker:
+        breaker = self.breakers.get(tool_name)
+        if breaker is None:
+            breaker = CircuitBreaker(self.failure_threshold, self.recovery_seconds)
+            self.breakers[tool_name] = breaker
+        return breaker
+
+    async def call(
+        self,
+        tool_name: str,
+        fn: Callable[[], Awaitable[Envelope]],
+        idempotent: bool,
+        hedge: bool = False,
+    ) -> Envelope:
+        """
+        执行工具调用
+
+        Args:
+            fn: 发起一次请求，返回标准 Envelope
+            idempotent: 是否允许重试（只读工具或带幂等键的写操作）
+            hedge: 是否允许对冲（仅只读工具）
+        """
+        self.stats["calls"] += 1
+        self.retry_budget.deposit()
+        breaker = self.breaker_for(tool_name)
+        attempts = self.max_attempts if idempotent else 1
+
+        result: Envelope = {}
+        for attempt in range(attempts):
+            if not breaker.allow():
+                self.stats["short_circuited"] += 1
+                logger.warning("resilience.short_circuited", tool=tool_name)
+                return result or _circuit_open_error(tool_name)
+
+            try:
+                result = await self._attempt(fn, hedge)
+            except asyncio.CancelledError:
+                # 取消（截止时间、批量超时、对冲落败）不代表工具失败，只归还试探名额
+                breaker.release()
+                raise
+            except BaseException:
+                if breaker.record_failure():
+                    self.stats["breaker_opened"] += 1
+                    logger.warning("resilience.breaker_opened", tool=tool_name)
+                raise
+
+            if result.get("ok") or not is_retryable(result):
+                breaker.record_success()
+                return result
+
+            if breaker.record_failure():
+                self.stats["breaker_opened"] += 1
+                logger.warning("resilience.breaker_opened", tool=tool_name)
+
+            if attempt + 1 >= attempts:
+                break
+            if not self.retry_budget.try_withdraw():
+                self.stats["retry_budget_exhausted"] += 1
+                logger.warning("resilience.retry_budget_exhausted", tool=tool_name)
+                break
+
+            self.stats["retries"] += 1
+            await asyncio.sleep(jittered_backoff(attempt, self.backoff_base, self.backoff_cap))
+
+        return result
+
+    async def _attempt(self, fn: Callable[[], Awaitable[Envelope]], hedge: bool) -> Envelope:
+        if not hedge or self.hedge_delay <= 0:
+            return await fn()
+
+        def allow_hedge() -> bool:
+            if not self.retry_budget.try_withdraw():
+                return False
+            self.stats["hedges"] += 1
+            return True
+
+        result, hedge_won = await hedged(fn, self.hedge_delay, allow_hedge)
+        if hedge_won:
+            self.stats["hedge_wins"] += 1
+        return result
+
+
+def _circuit_open_error(tool_name: str) -> Envelope:
+    return {
+        "ok": False,
+        "error": {
+            "code": "UPSTREAM_ERROR",
+            "message": f"Circuit open for {tool_name}",
+        },
+    }
+
+
+# Resilience 单例
+_resilience: Resilience | None = None
+
+
+def get_resilience() -> Resilience:
+    """获取 Resilience 单例"""
+    global _resilience
+    if _resilience is None:
+        _resilience = Resilience.from_settings()
+    return _resilience
+
+
+def set_resilience(resilience: Resilience | None) -> None:
+    """替换 Resilience 单例（测试或自定义参数）"""
+    global _resilience
+    _resilience = resilience
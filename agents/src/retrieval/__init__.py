@@ -0,0 +1,31 @@
+"""
+本地检索模块
+
+进程内的商品检索引擎（BM25 倒排索引 + 过滤位图），可选叠加向量近邻（IVF）的混合召回，
+作为 catalog.search_offers 的本地后端（CATALOG_SEARCH_BACKEND=local）。
+"""
+
+from .catalog_index import CatalogIndex, get_catalog_index, set_catalog_index
+from .embeddings import HashingTextEmbedder, get_text_embedder
+from .hybrid import (
+    HybridRetriever,
+    get_hybrid_retriever,
+    reciprocal_rank_fusion,
+    set_hybrid_retriever,
+)
+from .text import tokenize
+from .vector_index import IVFIndex
+
+__all__ = [
+    "CatalogIndex",
+    "HashingTextEmbedder",
+    "HybridRetriever",
+    "IVFIndex",
+    "get_catalog_index",
+    "get_hybrid_retriever",
+    "get_text_embedder",
+    "reciprocal_rank_fusion",
+    "set_catalog_index",
+    "set_hybrid_retriever",
+    "tokenize",
+]
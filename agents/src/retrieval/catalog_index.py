@@ -0,0 +1,401 @@
+"""
+本地商品检索引擎
+
+基于 AROC 种子数据（data/seeds/sample_aroc.json）或数据库导出（JSONL，每行一个 offer）
+在进程内构建：
+- BM25 倒排索引：中英文标题（权重 2）、品牌、类目名（含祖先类目）、属性值
+- 过滤位图：类目（含子类目）/ 品牌 / 价格区间 / 有货，均为 numpy bool 数组
+- Top-K：命中文档的得分累加到 numpy 数组，np.partition 预筛后 heapq 选出前 K 个
+
+支持增量构建：add_offer() 只追加到构建侧结构，下一次查询前才重算 IDF 与位图。
+同一 offer_id 再次加入时替换旧文档。
+"""
+
+import heapq
+import math
+from collections import defaultdict
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import orjson
+import structlog
+
+from ..config import get_settings
+from ..seeds import SEEDS_DIR
+from .text import tokenize
+
+logger = structlog.get_logger()
+
+DEFAULT_AROC_PATH = SEEDS_DIR / "sample_aroc.json"
+DEFAULT_CATEGORIES_PATH = SEEDS_DIR / "categories.json"
+
+# 字段权重：标题命中比属性命中更重要
+TITLE_WEIGHT = 2.0
+BRAND_WEIGHT = 2.0
+FIELD_WEIGHT = 1.0
+
+SORTS = ("relevance", "price", "rating", "sales")
+
+
+def _offer_price(offer: dict[str, Any]) -> float:
+    """最低变体价，没有变体时用 price.amount"""
+    prices = [v["price"] for v in offer.get("variants") or [] if v.get("price") is not None]
+    if prices:
+        return float(min(prices))
+    return float((offer.get("price") or {}).get("amount") or 0.0)
+
+
+def _offer_in_stock(offer: dict[str, Any]) -> bool:
+    variants = offer.get("variants") or []
+    if not variants:
+        return True
+    return any((v.get("stock") or 0) > 0 for v in variants)
+
+
+def _brand_keys(offer: dict[str, Any]) -> set[str]:
+    brand = offer.get("brand") or {}
+    keys = set()
+    if brand.get("normalized_id"):
+        keys.add(brand["normalized_id"])
+    if brand.get("name"):
+        keys.add(brand["name"].lower())
+    return keys
+
+
+def attribute_text(offer: dict[str, Any]) -> list[str]:
+    """属性值展开为文本（列表值逐项展开）"""
+    texts = []
+    for attr in offer.get("attributes") or []:
+        value = attr.get("value")
+        if isinstance(value, list):
+            texts.extend(str(v) for v in value)
+        elif value is not None:
+            texts.append(str(value))
+    return texts
+
+
+class CategoryTree:
+    """类目树：类目 ID → 名称与祖先链（用于类目名参与检索、类目过滤包含子类目）"""
+
+    def __init__(self, categories: list[dict[str, Any]] | None = None):
+        self.names: dict[str, list[str]] = {}
+        self.parents: dict[str, str | None] = {}
+        for node in categories or []:
+            self._walk(node, None)
+
+    def _walk(self, node: dict[str, Any], parent_id: str | None) -> None:
+        category_id = node["id"]
+        name = node.get("name") or {}
+        self.names[category_id] = [n for n in (name.get("en"), name.get("zh")) if n]
+        self.parents[category_id] = node.get("parent_id", parent_id)
+        for child in node.get("children") or []:
+            self._walk(child, category_id)
+
+    @classmethod
+    def from_file(cls, path: str | Path) -> "CategoryTree":
+        data = orjson.loads(Path(path).read_bytes())
+        return cls(data.get("categories") if isinstance(data, dict) else data)
+
+    def lineage(self, category_id: str) -> list[str]:
+        """类目自身及所有祖先"""
+        chain = []
+        seen = set()
+        current: str | None = category_id
+        while current and current not in seen:
+            seen.add(current)
+            chain.append(current)
+            current = self.parents.get(current)
+        return chain
+
+
+class CatalogIndex:
+    """
+    进程内 BM25 检索 + 过滤位图
+
+    Args:
+        categories: 类目树（可选）；提供时类目名参与检索，类目过滤包含子类目
+        k1: BM25 词频饱和参数
+        b: BM25 文档长度归一参数
+    """
+
+    def __init__(self, categories: CategoryTree | None = None, k1: float = 1.2, b: float = 0.75):
+        self.categories = categories or CategoryTree()
+        self.k1 = k1
+        self.b = b
+
+        # 构建侧：按文档追加
+        self.offer_ids: list[str] = []
+        self._offers: list[dict[str, Any]] = []
+        self._doc_ids: dict[str, int] = {}
+        self._postings: dict[str, dict[int, float]] = defaultdict(dict)
+        self._doc_len: list[float] = []
+        self._alive: list[bool] = []
+        self._category_docs: dict[str, list[int]] = defaultdict(list)
+        self._brand_docs: dict[str, list[int]] = defaultdict(list)
+
+        # 查询侧：_finalize() 根据构建侧结构重算
+        self._dirty = True
+        self._weights: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        self._alive_mask = np.zeros(0, dtype=bool)
+        self._price = np.zeros(0, dtype=np.float64)
+        self._in_stock = np.zeros(0, dtype=bool)
+        self._rating = np.zeros(0, dtype=np.float64)
+        self._sales = np.zeros(0, dtype=np.float64)
+        self._category_masks: dict[str, np.ndarray] = {}
+        self._brand_masks: dict[str, np.ndarray] = {}
+
+    # ==============================================
+    # 构建
+    # ==============================================
+    @classmethod
+    def from_aroc_file(
+        cls,
+        path: str | Path = DEFAULT_AROC_PATH,
+        categories_path: str | Path | None = DEFAULT_CATEGORIES_PATH,
+    ) -> "CatalogIndex":
+        """
+        从 AROC 文件构建
+
+        支持 {"offers": [...]}、offer 数组，以及数据库导出的 JSONL（每行一个 offer）。
+        """
+        categories = None
+        if categories_path and Path(categories_path).exists():
+            categories = CategoryTree.from_file(categories_path)
+
+        index = cls(categories)
+        raw = Path(path).read_bytes()
+        if str(path).endswith(".jsonl"):
+            offers = [orjson.loads(line) for line in raw.splitlines() if line.strip()]
+        else:
+            data = orjson.loads(raw)
+            offers = data.get("offers", []) if isinstance(data, dict) else data
+        index.add_offers(offers)
+        logger.info("catalog_index.loaded", path=str(path), offers=len(index))
+        return index
+
+    def add_offers(self, offers: Iterable[dict[str, Any]]) -> None:
+        for offer in offers:
+            self.add_offer(offer)
+
+    def add_offer(self, offer: dict[str, Any]) -> None:
+        """加入一个 offer（同一 offer_id 替换旧文档）"""
+        offer_id = offer["offer_id"]
+        previous = self._doc_ids.get(offer_id)
+        if previous is not None:
+            self._alive[previous] = False
+
+        doc = len(self.offer_ids)
+        self.offer_ids.append(offer_id)
+        self._offers.append(offer)
+        self._doc_ids[offer_id] = doc
+        self._alive.append(True)
+
+        term_freqs: dict[str, float] = defaultdict(float)
+        titles = offer.get("titles") or {}
+        for text in titles.values():
+            for token in tokenize(text):
+                term_freqs[token] += TITLE_WEIGHT
+        for token in tokenize((offer.get("brand") or {}).get("name") or ""):
+            term_freqs[token] += BRAND_WEIGHT
+
+        category_id = offer.get("category_id")
+        lineage = self.categories.lineage(category_id) if category_id else []
+        field_texts = attribute_text(offer)
+        for category in lineage:
+            field_texts.extend(self.categories.names.get(category, []))
+        for text in field_texts:
+            for token in tokenize(text):
+                term_freqs[token] += FIELD_WEIGHT
+
+        for token, tf in term_freqs.items():
+            self._postings[token][doc] = tf
+        self._doc_len.append(sum(term_freqs.values()))
+
+        for category in lineage:
+            self._category_docs[category].append(doc)
+        for key in _brand_keys(offer):
+            self._brand_docs[key].append(doc)
+        self._dirty = True
+
+    def _finalize(self) -> None:
+        """重算 BM25 权重与过滤位图"""
+        n_docs = len(self.offer_ids)
+        alive = np.array(self._alive, dtype=bool)
+        doc_len = np.array(self._doc_len, dtype=np.float64)
+        n_alive = int(alive.sum())
+        avg_len = float(doc_len[alive].mean()) if n_alive else 1.0
+        norm = self.k1 * (1 - self.b + self.b * doc_len / avg_len)
+
+        weights = {}
+        for token, postings in self._postings.items():
+            docs = np.fromiter(postings.keys(), dtype=np.int64, count=len(postings))
+            docs = docs[alive[docs]]
+            if not len(docs):
+                continue
+            tf = np.array([postings[d] for d in docs.tolist()], dtype=np.float64)
+            idf = math.log(1 + (n_alive - len(docs) + 0.5) / (len(docs) + 0.5))
+            weights[token] = (
+                docs,
+                (idf * tf * (self.k1 + 1) / (tf + norm[docs])).astype(np.float32),
+            )
+        self._weights = weights
+
+        def mask(docs: list[int]) -> np.ndarray:
+            bitmap = np.zeros(n_docs, dtype=bool)
+            bitmap[docs] = True
+            return bitmap & alive
+
+        self._category_masks = {k: mask(v) for k, v in self._category_docs.items()}
+        self._brand_masks = {k: mask(v) for k, v in self._brand_docs.items()}
+        self._alive_mask = alive
+        self._price = np.array([_offer_price(o) for o in self._offers], dtype=np.float64)
+        self._in_stock = np.array([_offer_in_stock(o) for o in self._offers], dtype=bool)
+        self._rating = np.array([o.get("rating") or 0.0 for o in self._offers], dtype=np.float64)
+        self._sales = np.array(
+            [o.get("reviews_count") or 0 for o in self._offers], dtype=np.float64
+        )
+        self._dirty = False
+
+    def __len__(self) -> int:
+        return sum(self._alive)
+
+    def get(self, offer_id: str) -> dict[str, Any] | None:
+        doc = self._doc_ids.get(offer_id)
+        return self._offers[doc] if doc is not None else None
+
+    def doc_index(self, offer_id: str) -> int | None:
+        """offer_id 在过滤位图 / 得分数组中的下标"""
+        return self._doc_ids.get(offer_id)
+
+    def offers(self) -> list[dict[str, Any]]:
+        """全部存活的 offer（按加入顺序）"""
+        return [offer for offer, alive in zip(self._offers, self._alive, strict=True) if alive]
+
+    # ==============================================
+    # 查询
+    # ==============================================
+    def filter_mask(
+        self,
+        category_id: str | None = None,
+        brand: str | None = None,
+        price_min: float | None = None,
+        price_max: float | None = None,
+        must_in_stock: bool = False,
+    ) -> np.ndarray:
+        """组合过滤位图（未知类目 / 品牌得到全 False）"""
+        if self._dirty:
+            self._finalize()
+        empty = np.zeros(len(self.offer_ids), dtype=bool)
+        mask = self._alive_mask.copy()
+        if category_id:
+            mask &= self._category_masks.get(category_id, empty)
+        if brand:
+            mask &= self._brand_masks.get(brand, self._brand_masks.get(brand.lower(), empty))
+        if price_min is not None:
+            mask &= self._price >= price_min
+        if price_max is not None:
+            mask &= self._price <= price_max
+        if must_in_stock:
+            mask &= self._in_stock
+        return mask
+
+    def bm25_scores(self, query: str) -> np.ndarray | None:
+        """每个文档的 BM25 得分；query 没有可检索的词时返回 None"""
+        if self._dirty:
+            self._finalize()
+        terms = set(tokenize(query))
+        if not terms:
+            return None
+        scores = np.zeros(len(self.offer_ids), dtype=np.float32)
+        for term in terms:
+            entry = self._weights.get(term)
+            if entry is not None:
+                docs, weights = entry
+                scores[docs] += weights
+        return scores
+
+    def search(
+        self,
+        query: str,
+        category_id: str | None = None,
+        brand: str | None = None,
+        price_min: float | None = None,
+        price_max: float | None = None,
+        must_in_stock: bool = True,
+        sort: str = "relevance",
+        limit: int = 50,
+    ) -> dict[str, Any]:
+        """
+        检索 offer
+
+        query 为空（或没有可检索的词）时退化为按过滤条件浏览，按评分排序。
+
+        Returns:
+            {"offer_ids", "scores"（0-1，相对最高分）, "total_count"}
+        """
+        if sort not in SORTS:
+            raise ValueError(f"Unknown sort: {sort}")
+
+        mask = self.filter_mask(category_id, brand, price_min, price_max, must_in_stock)
+        scores = self.bm25_scores(query)
+        if scores is None:
+            candidates = np.flatnonzero(mask)
+            relevance = self._rating[candidates]
+            if sort == "relevance":
+                sort = "rating"
+        else:
+            candidates = np.flatnonzero((scores > 0) & mask)
+            relevance = scores[candidates]
+
+        total = len(candidates)
+        if not total or limit <= 0:
+            return {"offer_ids": [], "scores": [], "total_count": total}
+
+        # 排序键越大越靠前；同分按文档顺序
+        if sort == "price":
+            keys = -self._price[candidates]
+        elif sort == "rating":
+            keys = self._rating[candidates]
+        elif sort == "sales":
+            keys = self._sales[candidates]
+        else:
+            keys = relevance
+        max_relevance = float(relevance.max()) or 1.0
+
+        # 命中很多时先用 np.partition 求第 K 大的键，只把不低于它的（含同分）交给堆
+        if total > limit * 4:
+            kth = np.partition(keys, total - limit)[total - limit]
+            keep = keys >= kth
+            candidates, keys, relevance = candidates[keep], keys[keep], relevance[keep]
+        top = heapq.nlargest(
+            limit,
+            zip(keys.tolist(), (-candidates).tolist(), relevance.tolist(), strict=True),
+        )
+        return {
+            "offer_ids": [self.offer_ids[-neg_doc] for _, neg_doc, _ in top],
+            "scores": [round(rel / max_relevance, 4) for _, _, rel in top],
+            "total_count": total,
+        }
+
+
+# ==============================================
+# 全局索引
+# ==============================================
+_catalog_index: CatalogIndex | None = None
+
+
+def get_catalog_index() -> CatalogIndex:
+    """获取本地检索索引（首次调用时从 CATALOG_INDEX_PATH 加载）"""
+    global _catalog_index
+    if _catalog_index is None:
+        path = get_settings().catalog_index_path or DEFAULT_AROC_PATH
+        _catalog_index = CatalogIndex.from_aroc_file(path)
+    return _catalog_index
+
+
+def set_catalog_index(index: CatalogIndex | None) -> None:
+    """替换全局索引（测试或热更新用）；None 表示下次使用时重新加载"""
+    global _catalog_index
+    _catalog_index = index
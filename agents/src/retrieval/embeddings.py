@@ -0,0 +1,115 @@
+"""
+Offer / 查询文本的 embedding
+
+- hashing：本地 feature hashing（检索词 + 英文词的字符 3-gram + 中文单字），
+  不依赖模型或网络；字符 n-gram 让 "charging" 与 "charger"、"耳机" 与 "蓝牙耳塞" 这类
+  BM25 词项对不上的文本也有相似度
+- openai：OpenAI 兼容的 embeddings 接口（OPENAI_BASE_URL / OPENAI_API_KEY）
+
+所有 embedder 返回 L2 归一化的 float32 矩阵（每行一个文本），内积即余弦相似度。
+"""
+
+import hashlib
+import re
+from typing import Any, Protocol
+
+import numpy as np
+
+from ..config import get_settings
+from .catalog_index import attribute_text
+from .text import tokenize
+
+_CJK_RE = re.compile(r"[一-鿿]")
+_WORD_RE = re.compile(r"[a-z]{4,}")
+
+# 字符 n-gram 特征的权重（低于完整词项）
+CHAR_GRAM_WEIGHT = 0.5
+
+
+class TextEmbedder(Protocol):
+    """文本批量 → 单位向量矩阵"""
+
+    dim: int
+
+    async def aembed(self, texts: list[str]) -> np.ndarray: ...
+
+    def embed(self, texts: list[str]) -> np.ndarray: ...
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32)
+
+
+class HashingTextEmbedder:
+    """本地确定性 embedding"""
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def _features(self, text: str) -> list[tuple[str, float]]:
+        lowered = text.lower()
+        features = [(token, 1.0) for token in tokenize(lowered)]
+        for word in _WORD_RE.findall(lowered):
+            padded = f"#{word}#"
+            features.extend((padded[i : i + 3], CHAR_GRAM_WEIGHT) for i in range(len(padded) - 2))
+        features.extend((char, CHAR_GRAM_WEIGHT) for char in _CJK_RE.findall(lowered))
+        return features
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, weight in self._features(text):
+                digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+                index = int.from_bytes(digest[:4], "little") % self.dim
+                matrix[row, index] += weight if digest[4] & 1 else -weight
+        return _normalize_rows(matrix)
+
+    async def aembed(self, texts: list[str]) -> np.ndarray:
+        return self.embed(texts)
+
+
+class OpenAITextEmbedder:
+    """OpenAI 兼容 embeddings 接口"""
+
+    def __init__(self, model: str, dim: int):
+        from langchain_openai import OpenAIEmbeddings
+
+        settings = get_settings()
+        self.dim = dim
+        self._client = OpenAIEmbeddings(
+            model=model,
+            dimensions=dim,
+            api_key=settings.openai_api_key,
+            base_url=settings.openai_base_url,
+            max_retries=settings.llm_max_retries,
+        )
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        return _normalize_rows(np.array(self._client.embed_documents(texts), dtype=np.float32))
+
+    async def aembed(self, texts: list[str]) -> np.ndarray:
+        vectors = await self._client.aembed_documents(texts)
+        return _normalize_rows(np.array(vectors, dtype=np.float32))
+
+
+def get_text_embedder() -> TextEmbedder:
+    """按 CATALOG_VECTOR_EMBEDDING 选择 embedder"""
+    settings = get_settings()
+    if settings.catalog_vector_embedding == "openai":
+        return OpenAITextEmbedder(
+            settings.catalog_vector_embedding_model, settings.catalog_vector_dim
+        )
+    return HashingTextEmbedder(settings.catalog_vector_dim)
+
+
+def offer_text(offer: dict[str, Any], category_names: list[str] | None = None) -> str:
+    """用于 embedding 的 offer 文本：中英文标题、品牌、类目名、属性值"""
+    parts = list((offer.get("titles") or {}).values())
+    brand = (offer.get("brand") or {}).get("name")
+    if brand:
+        parts.append(brand)
+    parts.extend(category_names or [])
+    parts.extend(attribute_text(offer))
+    return " ".join(parts)
@@ -0,0 +1,196 @@
+"""
+混合召回：BM25 + 向量
+
+同一组过滤条件下分别取 BM25 与向量近邻的前 N 个，按 Reciprocal Rank Fusion 融合：
+    score(d) = Σ weight_i / (rrf_k + rank_i(d))
+BM25 保证精确词项（型号、品牌）排在前面，向量召回补上措辞不同的长尾自然语言查询。
+向量结果按 offer_id 回到 CatalogIndex 的过滤位图做后过滤，相似度低于阈值的丢弃。
+"""
+
+from typing import Any
+
+import structlog
+
+from ..config import get_settings
+from .catalog_index import CatalogIndex, get_catalog_index
+from .embeddings import TextEmbedder, get_text_embedder, offer_text
+from .vector_index import IVFIndex
+
+logger = structlog.get_logger()
+
+# 每一路取 limit * OVERSAMPLE 个参与融合（至少 MIN_POOL 个）
+OVERSAMPLE = 4
+MIN_POOL = 50
+EMBED_BATCH_SIZE = 256
+
+
+def reciprocal_rank_fusion(
+    rankings: list[list[str]],
+    k: int = 60,
+    weights: list[float] | None = None,
+) -> list[tuple[str, float]]:
+    """融合多路排序结果，返回 [(id, 融合得分)]，按得分降序（同分按首次出现顺序）"""
+    weights = weights or [1.0] * len(rankings)
+    fused: dict[str, float] = {}
+    for ranking, weight in zip(rankings, weights, strict=True):
+        for rank, item in enumerate(ranking, start=1):
+            fused[item] = fused.get(item, 0.0) + weight / (k + rank)
+    return sorted(fused.items(), key=lambda entry: entry[1], reverse=True)
+
+
+class HybridRetriever:
+    """
+    BM25 + 向量近邻的混合检索
+
+    Args:
+        catalog: BM25 索引与过滤位图
+        vectors: offer embedding 的近邻索引
+        embedder: 文本 embedder（offer 与查询共用）
+        rrf_k: RRF 平滑常数
+        min_similarity: 向量召回的最低余弦相似度
+    """
+
+    def __init__(
+        self,
+        catalog: CatalogIndex,
+        vectors: IVFIndex,
+        embedder: TextEmbedder,
+        rrf_k: int = 60,
+        min_similarity: float = 0.15,
+    ):
+        self.catalog = catalog
+        self.vectors = vectors
+        self.embedder = embedder
+        self.rrf_k = rrf_k
+        self.min_similarity = min_similarity
+
+    def _offer_text(self, offer: dict[str, Any]) -> str:
+        categories = self.catalog.categories
+        category_id = offer.get("category_id")
+        names = [
+            name
+            for category in (categories.lineage(category_id) if category_id else [])
+            for name in categories.names.get(category, [])
+        ]
+        return offer_text(offer, names)
+
+    def sync(self) -> int:
+        """为 catalog 中尚未入向量索引的 offer 计算 embedding，返回新增数量"""
+        missing = [o for o in self.catalog.offers() if o["offer_id"] not in self.vectors]
+        for start in range(0, len(missing), EMBED_BATCH_SIZE):
+            batch = missing[start : start + EMBED_BATCH_SIZE]
+            self.vectors.add(
+                [o["offer_id"] for o in batch],
+                self.embedder.embed([self._offer_text(o) for o in batch]),
+            )
+        return len(missing)
+
+    def add_offer(self, offer: dict[str, Any]) -> None:
+        """增量加入一个 offer（两个索引同时更新）"""
+        self.catalog.add_offer(offer)
+        self.vectors.add([offer["offer_id"]], self.embedder.embed([self._offer_text(offer)]))
+
+    async def search(
+        self,
+        query: str,
+        category_id: str | None = None,
+        brand: str | None = None,
+        price_min: float | None = None,
+        price_max: float | None = None,
+        must_in_stock: bool = True,
+        sort: str = "relevance",
+        limit: int = 50,
+    ) -> dict[str, Any]:
+        """与 CatalogIndex.search 相同的参数与返回；只有按相关度排序的关键词查询走融合"""
+        filters = {
+            "category_id": category_id,
+            "brand": brand,
+            "price_min": price_min,
+            "price_max": price_max,
+            "must_in_stock": must_in_stock,
+        }
+        if sort != "relevance" or not query.strip():
+            return self.catalog.search(query, sort=sort, limit=limit, **filters)
+
+        pool = max(limit * OVERSAMPLE, MIN_POOL)
+        keyword = self.catalog.search(query, limit=pool, **filters)["offer_ids"]
+
+        mask = self.catalog.filter_mask(**filters)
+        query_vector = (await self.embedder.aembed([query]))[0]
+        semantic = []
+        for offer_id, similarity in self.vectors.search(query_vector, pool):
+            doc = self.catalog.doc_index(offer_id)
+            if similarity >= self.min_similarity and doc is not None and mask[doc]:
+                semantic.append(offer_id)
+
+        fused = reciprocal_rank_fusion([keyword, semantic], k=self.rrf_k)
+        top = fused[:limit]
+        best = top[0][1] if top else 1.0
+        logger.debug(
+            "hybrid_search.fused",
+            keyword_hits=len(keyword),
+            semantic_hits=len(semantic),
+            fused=len(fused),
+        )
+        return {
+            "offer_ids": [offer_id for offer_id, _ in top],
+            "scores": [round(score / best, 4) for _, score in top],
+            "total_count": len(fused),
+        }
+
+
+# ==============================================
+# 全局实例
+# ==============================================
+_hybrid_retriever: HybridRetriever | None = None
+
+
+def get_hybrid_retriever() -> HybridRetriever:
+    """
+    获取混合检索器（首次调用时构建）
+
+    CATALOG_VECTOR_INDEX_DIR 非空时向量索引保存在该目录：已有索引直接映射，
+    只为新增的 offer 计算 embedding，然后写回。
+    """
+    global _hybrid_retriever
+    if _hybrid_retriever is None:
+        settings = get_settings()
+        embedder = get_text_embedder()
+        index_dir = settings.catalog_vector_index_dir
+        vectors = None
+        if index_dir:
+            try:
+                vectors = IVFIndex.open(index_dir, n_probe=settings.catalog_vector_n_probe)
+            except FileNotFoundError:
+                pass
+            if vectors is not None and vectors.dim != embedder.dim:
+                logger.warning(
+                    "hybrid_search.dim_mismatch",
+                    saved=vectors.dim,
+                    expected=embedder.dim,
+                )
+                vectors = None
+        if vectors is None:
+            vectors = IVFIndex(
+                embedder.dim, index_dir or None, n_probe=settings.catalog_vector_n_probe
+            )
+
+        retriever = HybridRetriever(
+            get_catalog_index(),
+            vectors,
+            embedder,
+            rrf_k=settings.catalog_hybrid_rrf_k,
+            min_similarity=settings.catalog_vector_min_similarity,
+        )
+        added = retriever.sync()
+        if index_dir and added:
+            vectors.save()
+        logger.info("hybrid_search.ready", vectors=len(vectors), embedded=added)
+        _hybrid_retriever = retriever
+    return _hybrid_retriever
+
+
+def set_hybrid_retriever(retriever: HybridRetriever | None) -> None:
+    """替换全局混合检索器（测试用）；None 表示下次使用时重新构建"""
+    global _hybrid_retriever
+    _hybrid_retriever = retriever
@@ -0,0 +1,31 @@
+"""
+检索分词
+
+- 英文 / 数字：小写后按字母数字切分（"USB-C" → usb, c），去掉简单复数后缀
+- 中文：连续汉字切成二元组（"无线耳机" → 无线, 线耳, 耳机），单个汉字保留为一元
+"""
+
+import re
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+|[一-鿿]+")
+
+
+def _stem(word: str) -> str:
+    """极简词干：去掉复数 s（chargers → charger），保留 ss / 短词 / 纯数字"""
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss") and not word[0].isdigit():
+        return word[:-1]
+    return word
+
+
+def tokenize(text: str) -> list[str]:
+    """把一段中英混合文本切成检索词"""
+    tokens: list[str] = []
+    for match in _TOKEN_RE.finditer(text.lower()):
+        run = match.group()
+        if run[0].isascii():
+            tokens.append(_stem(run))
+        elif len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i : i + 2] for i in range(len(run) - 1))
+    return tokens
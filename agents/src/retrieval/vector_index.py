@@ -0,0 +1,296 @@
+"""
+向量近邻索引（IVF）
+
+offer embedding 的近似最近邻检索，与 infra/docker/init-db.sql 中 pgvector 的 ivfflat 同一思路：
+- 向量按行追加到 float32 矩阵；指定目录时矩阵是磁盘上的 np.memmap（容量按倍数增长），
+  进程重启后 IVFIndex.open() 直接映射，不需要重新计算 embedding
+- 向量数达到 n_lists * TRAIN_POINTS_PER_LIST 时用球面 k-means 训练聚类中心，
+  之后新增的向量直接分配到最近的中心（增量构建）；向量数每增长 RETRAIN_GROWTH 倍重新训练一次
+- 查询只扫描与查询最相近的 n_probe 个倒排桶；训练前（小规模）退化为精确扫描
+
+同一 offer_id 再次加入时旧行置为墓碑（assignment = -1），不再参与检索。
+"""
+
+import math
+from pathlib import Path
+
+import numpy as np
+import orjson
+import structlog
+
+logger = structlog.get_logger()
+
+TRAIN_POINTS_PER_LIST = 8
+RETRAIN_GROWTH = 4
+KMEANS_ITERATIONS = 10
+
+_DEAD = -1
+_UNASSIGNED = -2
+
+
+def kmeans(
+    vectors: np.ndarray,
+    n_clusters: int,
+    iterations: int = KMEANS_ITERATIONS,
+    seed: int = 0,
+) -> np.ndarray:
+    """球面 k-means（向量与中心均为单位向量，按内积分配），返回中心矩阵"""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), n_clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        # 空簇保留原中心
+        empty = norms[:, 0] == 0
+        sums[empty] = centroids[empty]
+        norms[empty] = 1.0
+        centroids = (sums / norms).astype(np.float32)
+    return centroids
+
+
+class _VectorStore:
+    """可增长的 float32 行矩阵（内存或 memmap）"""
+
+    def __init__(self, dim: int, path: Path | None = None, capacity: int = 1024, count: int = 0):
+        self.dim = dim
+        self.path = path
+        self.count = count
+        self._data = self._allocate(max(capacity, count, 1), existing=count > 0)
+
+    def _allocate(self, capacity: int, existing: bool) -> np.ndarray:
+        if self.path is None:
+            return np.zeros((capacity, self.dim), dtype=np.float32)
+        nbytes = capacity * self.dim * 4
+        mode = "r+b" if existing and self.path.exists() else "w+b"
+        with open(self.path, mode) as f:
+            f.truncate(nbytes)
+        return np.memmap(self.path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+
+    @property
+    def capacity(self) -> int:
+        return self._data.shape[0]
+
+    def append(self, vectors: np.ndarray) -> int:
+        """追加若干行，返回第一行的行号"""
+        start = self.count
+        needed = start + len(vectors)
+        if needed > self.capacity:
+            capacity = self.capacity
+            while capacity < needed:
+                capacity *= 2
+            if self.path is None:
+                grown = np.zeros((capacity, self.dim), dtype=np.float32)
+                grown[:start] = self._data[:start]
+                self._data = grown
+            else:
+                self._data.flush()
+                del self._data
+                self._data = self._allocate(capacity, existing=True)
+        self._data[start:needed] = vectors
+        self.count = needed
+        return start
+
+    @property
+    def rows(self) -> np.ndarray:
+        return self._data[: self.count]
+
+    def flush(self) -> None:
+        if isinstance(self._data, np.memmap):
+            self._data.flush()
+
+
+class IVFIndex:
+    """
+    IVF 近似最近邻索引（内积 / 余弦）
+
+    Args:
+        dim: 向量维度
+        path: 索引目录（None 表示纯内存）
+        n_lists: 倒排桶数；0 表示按 sqrt(向量数) 自动选择
+        n_probe: 查询扫描的桶数
+    """
+
+    def __init__(
+        self,
+        dim: int,
+        path: str | Path | None = None,
+        n_lists: int = 0,
+        n_probe: int = 16,
+    ):
+        self.dim = dim
+        self.path = Path(path) if path else None
+        if self.path:
+            self.path.mkdir(parents=True, exist_ok=True)
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+
+        self.ids: list[str] = []
+        self._rows: dict[str, int] = {}
+        self._store = _VectorStore(dim, self.path / "vectors.f32" if self.path else None)
+        self._assignment = np.zeros(0, dtype=np.int32)
+        self._centroids: np.ndarray | None = None
+        self._trained_at = 0
+        # 倒排桶：构建侧为行号列表，查询前转成 numpy 数组
+        self._lists: list[list[int]] = []
+        self._list_arrays: list[np.ndarray] | None = None
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, offer_id: str) -> bool:
+        return offer_id in self._rows
+
+    @property
+    def trained(self) -> bool:
+        return self._centroids is not None
+
+    # ==============================================
+    # 构建
+    # ==============================================
+    def add(self, ids: list[str], vectors: np.ndarray) -> None:
+        """追加向量（须为单位向量）；同一 id 替换旧向量"""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        for offer_id in ids:
+            previous = self._rows.get(offer_id)
+            if previous is not None:
+                self._retire(previous)
+
+        start = self._store.append(vectors)
+        self.ids.extend(ids)
+        for offset, offer_id in enumerate(ids):
+            self._rows[offer_id] = start + offset
+
+        assignment = np.full(len(ids), _UNASSIGNED, dtype=np.int32)
+        if self.trained:
+            assignment = np.argmax(vectors @ self._centroids.T, axis=1).astype(np.int32)
+            for offset, list_id in enumerate(assignment.tolist()):
+                self._lists[list_id].append(start + offset)
+            self._list_arrays = None
+        self._assignment = np.concatenate([self._assignment, assignment])
+
+        live = len(self._rows)
+        if live >= self._target_lists(live) * TRAIN_POINTS_PER_LIST and (
+            not self.trained or live >= self._trained_at * RETRAIN_GROWTH
+        ):
+            self.train()
+
+    def _retire(self, row: int) -> None:
+        list_id = int(self._assignment[row])
+        if list_id >= 0:
+            self._lists[list_id].remove(row)
+            self._list_arrays = None
+        self._assignment[row] = _DEAD
+
+    def _target_lists(self, live: int) -> int:
+        return self.n_lists or max(1, int(math.sqrt(live)))
+
+    def train(self) -> None:
+        """在全部存活向量上训练聚类中心并重新分配"""
+        live_rows = np.flatnonzero(self._assignment != _DEAD)
+        if not len(live_rows):
+            return
+        vectors = np.asarray(self._store.rows[live_rows])
+        n_lists = min(self._target_lists(len(live_rows)), len(live_rows))
+        self._centroids = kmeans(vectors, n_lists)
+        assignment = np.argmax(vectors @ self._centroids.T, axis=1).astype(np.int32)
+        self._assignment[live_rows] = assignment
+        self._lists = [[] for _ in range(n_lists)]
+        for row, list_id in zip(live_rows.tolist(), assignment.tolist(), strict=True):
+            self._lists[list_id].append(row)
+        self._list_arrays = None
+        self._trained_at = len(live_rows)
+        logger.info("vector_index.trained", vectors=len(live_rows), n_lists=n_lists)
+
+    # ==============================================
+    # 查询
+    # ==============================================
+    def search(
+        self, query: np.ndarray, k: int, n_probe: int | None = None
+    ) -> list[tuple[str, float]]:
+        """近似 Top-K：[(offer_id, 余弦相似度)]，按相似度降序"""
+        if not self._rows or k <= 0:
+            return []
+        if not self.trained:
+            return self.brute_force(query, k)
+
+        if self._list_arrays is None:
+            self._list_arrays = [np.array(rows, dtype=np.int64) for rows in self._lists]
+        n_probe = min(n_probe or self.n_probe, len(self._lists))
+        centroid_scores = self._centroids @ query
+        probe = np.argpartition(-centroid_scores, n_probe - 1)[:n_probe]
+        rows = np.concatenate([self._list_arrays[list_id] for list_id in probe.tolist()])
+        return self._top_k(rows, query, k)
+
+    def brute_force(self, query: np.ndarray, k: int) -> list[tuple[str, float]]:
+        """精确 Top-K（训练前的检索路径，也是 recall@k 的基准）"""
+        if not self._rows or k <= 0:
+            return []
+        # 整块矩阵直接乘，避免按行号 gather 复制
+        scores = self._store.rows @ query
+        dead = self._assignment == _DEAD
+        if dead.any():
+            scores[dead] = -np.inf
+        return self._select(np.arange(len(scores)), scores, min(k, len(self._rows)))
+
+    def _top_k(self, rows: np.ndarray, query: np.ndarray, k: int) -> list[tuple[str, float]]:
+        if not len(rows):
+            return []
+        return self._select(rows, self._store.rows[rows] @ query, k)
+
+    def _select(self, rows: np.ndarray, scores: np.ndarray, k: int) -> list[tuple[str, float]]:
+        if len(rows) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(rows))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(self.ids[rows[i]], float(scores[i])) for i in top.tolist()]
+
+    # ==============================================
+    # 持久化
+    # ==============================================
+    def save(self) -> None:
+        """把向量刷到磁盘，并写入 id / 分配 / 聚类中心"""
+        if self.path is None:
+            raise ValueError("IVFIndex.save() requires a path")
+        self._store.flush()
+        np.save(self.path / "assignment.npy", self._assignment)
+        if self._centroids is not None:
+            np.save(self.path / "centroids.npy", self._centroids)
+        meta = {
+            "dim": self.dim,
+            "count": self._store.count,
+            "ids": self.ids,
+            "n_lists": self.n_lists,
+            "trained_at": self._trained_at,
+        }
+        (self.path / "meta.json").write_bytes(orjson.dumps(meta))
+
+    @classmethod
+    def open(cls, path: str | Path, n_probe: int = 16) -> "IVFIndex":
+        """映射已保存的索引（向量不读入内存）"""
+        path = Path(path)
+        meta = orjson.loads((path / "meta.json").read_bytes())
+        index = cls.__new__(cls)
+        index.dim = meta["dim"]
+        index.path = path
+        index.n_lists = meta["n_lists"]
+        index.n_probe = n_probe
+        index.ids = meta["ids"]
+        index._store = _VectorStore(index.dim, path / "vectors.f32", count=meta["count"])
+        index._assignment = np.load(path / "assignment.npy")
+        index._trained_at = meta["trained_at"]
+        index._rows = {
+            offer_id: row
+            for row, offer_id in enumerate(index.ids)
+            if index._assignment[row] != _DEAD
+        }
+        centroids_path = path / "centroids.npy"
+        index._centroids = np.load(centroids_path) if centroids_path.exists() else None
+        index._lists = [[] for _ in range(0 if index._centroids is None else len(index._centroids))]
+        for row, list_id in enumerate(index._assignment.tolist()):
+            if list_id >= 0:
+                index._lists[list_id].append(row)
+        index._list_arrays = None
+        return index
@@ -0,0 +1,19 @@
+"""
+种子数据位置与国家代码规范化
+
+合规、运费、到手成本与商品检索共用 data/seeds 下的数据文件，
+国家代码统一按 ISO 3166-1 alpha-2 大写（UK → GB）查表。
+"""
+
+from pathlib import Path
+
+# 仓库自带的种子数据
+SEEDS_DIR = Path(__file__).resolve().parents[2] / "data" / "seeds"
+
+_COUNTRY_ALIASES = {"UK": "GB"}
+
+
+def normalize_country(code: str) -> str:
+    """国家代码转大写，并把常见别名映射为 ISO 代码"""
+    code = code.upper()
+    return _COUNTRY_ALIASES.get(code, code)
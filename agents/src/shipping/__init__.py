@@ -0,0 +1,32 @@
+"""
+物流报价模块
+
+本地包裹画像与费率表，作为 shipping.quote_options 的本地后端（SHIPPING_QUOTE_BACKEND=local）：
+费率表覆盖的目的国在进程内报价，其余按包裹画像缓存网关报价。
+多商品方案按 (商家, 发货地) 合并发货，各组物流选项的组合由动态规划选出。
+"""
+
+from .consolidation import (
+    ShipmentGroup,
+    ShippingSelection,
+    group_items,
+    select_shipping,
+    shipping_frontier,
+)
+from .parcel import Parcel, consolidate, packaging_of, postal_prefix
+from .rates import RateTable, get_rate_table, set_rate_table
+
+__all__ = [
+    "Parcel",
+    "RateTable",
+    "ShipmentGroup",
+    "ShippingSelection",
+    "consolidate",
+    "get_rate_table",
+    "group_items",
+    "packaging_of",
+    "postal_prefix",
+    "select_shipping",
+    "set_rate_table",
+    "shipping_frontier",
+]
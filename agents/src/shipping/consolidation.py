@@ -0,0 +1,130 @@
+"""
+多商品合并发货
+
+一个方案里的商品按 (商家, 发货地) 分组：同组商品合并为一个包裹，只报价一次；
+不同组各自发货，订单运费为各组运费之和，送达时间取最慢的一组。
+
+各组物流选项的组合用动态规划求解：状态为"目前为止最晚的 eta_max_days"，
+每个状态只保留最低运费，逐组展开后得到 (送达天数, 运费) 的 Pareto 前沿——
+选项数为 k、分组数为 g 时复杂度 O(g · d · k)（d 为不同送达天数的个数），
+不需要枚举 k^g 种组合。
+"""
+
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Any, Literal
+
+Objective = Literal["cheapest", "fastest"]
+
+
+@dataclass
+class ShipmentGroup:
+    """同一商家、同一发货地的商品，合并为一个包裹报价"""
+
+    merchant_id: str
+    ship_from: str
+    items: list[dict[str, Any]] = field(default_factory=list)
+    options: list[dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def key(self) -> tuple[str, str]:
+        return self.merchant_id, self.ship_from
+
+
+@dataclass(frozen=True)
+class ShippingSelection:
+    """每组选定的物流选项（与分组按位置对齐）及订单级运费 / 时效"""
+
+    options: tuple[dict[str, Any], ...]
+    total_price: float
+    eta_min_days: int
+    eta_max_days: int
+
+
+def group_items(items: Iterable[dict[str, Any]]) -> list[ShipmentGroup]:
+    """
+    按 (merchant_id, ship_from) 分组，保持首次出现的顺序
+
+    items 为 quote_shipping_options 的条目，附带 merchant_id / ship_from（缺失视为空串）。
+    """
+    groups: dict[tuple[str, str], ShipmentGroup] = {}
+    for item in items:
+        key = (item.get("merchant_id") or "", item.get("ship_from") or "")
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = ShipmentGroup(merchant_id=key[0], ship_from=key[1])
+        group.items.append(item)
+    return list(groups.values())
+
+
+def shipping_frontier(groups: list[ShipmentGroup]) -> list[ShippingSelection]:
+    """
+    所有分组选项组合的 Pareto 前沿，按 eta_max_days 升序（运费严格递减）
+
+    任一分组没有可用选项时返回空列表。
+    """
+    if not groups:
+        return []
+
+    # eta_max → (运费, eta_min, 各组选项下标)
+    states: dict[int, tuple[float, int, tuple[int, ...]]] = {0: (0.0, 0, ())}
+    for group in groups:
+        next_states: dict[int, tuple[float, int, tuple[int, ...]]] = {}
+        for eta_max, (cost, eta_min, picks) in states.items():
+            for index, option in enumerate(group.options):
+                state_eta = max(eta_max, int(option.get("eta_max_days", 0)))
+                state = (
+                    cost + float(option.get("price", 0.0)),
+                    max(eta_min, int(option.get("eta_min_days", 0))),
+                    (*picks, index),
+                )
+                best = next_states.get(state_eta)
+                if best is None or state[:2] < best[:2]:
+                    next_states[state_eta] = state
+        states = _prune(next_states)
+        if not states:
+            return []
+
+    return [
+        ShippingSelection(
+            options=tuple(group.options[i] for group, i in zip(groups, picks, strict=True)),
+            total_price=round(cost, 2),
+            eta_min_days=eta_min,
+            eta_max_days=eta_max,
+        )
+        for eta_max, (cost, eta_min, picks) in sorted(states.items())
+    ]
+
+
+def select_shipping(
+    groups: list[ShipmentGroup],
+    objective: Objective = "cheapest",
+    max_days: int | None = None,
+) -> ShippingSelection | None:
+    """
+    按目标选择组合
+
+    - cheapest：满足 max_days（eta_max_days 不超过期限）的最低运费；没有组合能满足时取最快
+    - fastest：最早送达，同一送达天数取最低运费
+    """
+    frontier = shipping_frontier(groups)
+    if not frontier:
+        return None
+    if objective == "fastest":
+        return frontier[0]
+    feasible = [s for s in frontier if max_days is None or s.eta_max_days <= max_days]
+    return feasible[-1] if feasible else frontier[0]
+
+
+def _prune(
+    states: dict[int, tuple[float, int, tuple[int, ...]]],
+) -> dict[int, tuple[float, int, tuple[int, ...]]]:
+    """去掉被支配的状态：更晚送达但运费不更低"""
+    pruned = {}
+    best_cost = float("inf")
+    for eta_max in sorted(states):
+        state = states[eta_max]
+        if state[0] < best_cost:
+            pruned[eta_max] = state
+            best_cost = state[0]
+    return pruned
@@ -0,0 +1,117 @@
+"""
+包裹画像
+
+把商品的包装信息（offer card 的 packaging.weight_g / dim_mm，种子 AROC 的 weight_g /
+dimensions_mm）合并为一个包裹，并计算体积重。
+
+物流报价主要取决于目的地、重量和尺寸，与具体 SKU 无关：包裹按重量档 / 尺寸档取上界后
+作为报价缓存键，同一档内的包裹共享一次网关报价。
+"""
+
+import math
+from bisect import bisect_left
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+# 重量档上界（g）；超过最大档后按 5kg 取整
+WEIGHT_BANDS_G = (
+    100, 250, 500, 750, 1000, 1500, 2000, 3000, 5000, 7500, 10000, 15000, 20000, 30000,
+)
+_WEIGHT_BAND_OVER_G = 5000
+
+# 尺寸档：每条边向上取整到 50mm
+DIM_BAND_MM = 50
+
+# 邮编前缀长度（美国 ZIP3 分区 / 英国邮区 / 加拿大 FSA）
+POSTAL_PREFIX_LEN = 3
+
+
+@dataclass(frozen=True)
+class Parcel:
+    """一个包裹：总重量与外箱尺寸（降序：长 ≥ 宽 ≥ 高）"""
+
+    weight_g: float
+    dims_mm: tuple[float, float, float]
+
+    @property
+    def longest_side_mm(self) -> float:
+        return self.dims_mm[0]
+
+    @property
+    def volume_mm3(self) -> float:
+        return self.dims_mm[0] * self.dims_mm[1] * self.dims_mm[2]
+
+    def dim_weight_g(self, divisor: float | None) -> float:
+        """体积重：长×宽×高(cm³) / divisor 得到 kg，换算到 mm³ / g 后即 mm³ / divisor"""
+        return self.volume_mm3 / divisor if divisor else 0.0
+
+    def chargeable_weight_g(self, divisor: float | None) -> float:
+        """计费重 = max(实重, 体积重)；divisor 为空表示该服务不计体积重"""
+        return max(self.weight_g, self.dim_weight_g(divisor))
+
+    def band(self) -> "Parcel":
+        """所在重量档 / 尺寸档的上界，同一档内的包裹得到相同的 band"""
+        index = bisect_left(WEIGHT_BANDS_G, self.weight_g)
+        if index < len(WEIGHT_BANDS_G):
+            weight = float(WEIGHT_BANDS_G[index])
+        else:
+            weight = float(math.ceil(self.weight_g / _WEIGHT_BAND_OVER_G) * _WEIGHT_BAND_OVER_G)
+        longest, middle, shortest = (
+            float(math.ceil(d / DIM_BAND_MM) * DIM_BAND_MM) for d in self.dims_mm
+        )
+        return Parcel(weight_g=weight, dims_mm=(longest, middle, shortest))
+
+
+def postal_prefix(postal_code: str | None) -> str:
+    """规范化的邮编前缀（去空格、大写），用于分区与缓存键"""
+    if not postal_code:
+        return ""
+    return postal_code.replace(" ", "").upper()[:POSTAL_PREFIX_LEN]
+
+
+def packaging_of(item: dict[str, Any], sku_id: str | None = None) -> dict[str, Any] | None:
+    """
+    商品单件的包装信息 {"weight_g", "dim_mm"}，可直接并入 quote_shipping_options 的 items
+
+    兼容 offer card（variants.skus[].packaging，按 sku_id 取对应 SKU，默认第一个）
+    与种子 AROC（weight_g / dimensions_mm）。缺少重量或尺寸时返回 None。
+    """
+    variants = item.get("variants")
+    skus = variants.get("skus", []) if isinstance(variants, dict) else []
+    sku = next((s for s in skus if s.get("sku_id") == sku_id), skus[0] if skus else {})
+    packaging = sku.get("packaging") or {}
+
+    weight_g = packaging.get("weight_g") or item.get("weight_g")
+    dims = packaging.get("dim_mm") or item.get("dim_mm") or item.get("dimensions_mm")
+    if isinstance(dims, dict):
+        dims = [dims.get("l"), dims.get("w"), dims.get("h")]
+    if not weight_g or not dims or len(dims) != 3 or not all(dims):
+        return None
+    return {"weight_g": float(weight_g), "dim_mm": [float(d) for d in dims]}
+
+
+def consolidate(items: Iterable[dict[str, Any]]) -> Parcel | None:
+    """
+    把 quote_shipping_options 的 items（带 weight_g / dim_mm）合并为一个包裹
+
+    各件按最长边 / 次长边取最大，最短边按件数叠放；任一条目缺少包装信息时返回 None。
+    """
+    packed = []
+    for item in items:
+        packaging = packaging_of(item)
+        if packaging is None:
+            return None
+        packed.append((packaging, max(1, int(item.get("qty", 1)))))
+    if not packed:
+        return None
+
+    weight = length = width = height = 0.0
+    for packaging, qty in packed:
+        longest, middle, shortest = sorted(packaging["dim_mm"], reverse=True)
+        weight += packaging["weight_g"] * qty
+        length = max(length, longest)
+        width = max(width, middle)
+        height += shortest * qty
+    longest, middle, shortest = sorted((length, width, height), reverse=True)
+    return Parcel(weight_g=weight, dims_mm=(longest, middle, shortest))
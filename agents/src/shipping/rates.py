@@ -0,0 +1,195 @@
+"""
+本地物流费率表
+
+从 data/seeds/shipping_rates.json 加载各物流服务的分区阶梯价，在进程内完成报价：
+
+- 目的国映射到分区（zones），每个服务在每个分区有时效与重量阶梯（上界 g → 价格）
+- 计费重 = max(实重, 体积重)，体积重按服务的 dim_divisor 计算（空表示不计体积重）
+- 超过最高阶梯时按 per_kg_over 逐 kg 加价；没有 per_kg_over 或超出服务的重量 / 边长上限则不可用
+- 偏远地区按邮编前缀加收附加费
+
+费率表未覆盖的目的国返回 None，由调用方回退到网关报价。
+"""
+
+import math
+from bisect import bisect_left
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import orjson
+import structlog
+
+from ..config import get_settings
+from ..seeds import SEEDS_DIR, normalize_country
+from .parcel import Parcel
+
+logger = structlog.get_logger()
+
+DEFAULT_RATES_PATH = SEEDS_DIR / "shipping_rates.json"
+
+
+@dataclass(frozen=True)
+class ZoneRate:
+    """某服务在某分区的时效与阶梯价"""
+
+    eta_days: tuple[int, int]
+    limits_g: tuple[float, ...]
+    prices: tuple[float, ...]
+    per_kg_over: float | None = None
+
+    def price(self, chargeable_g: float) -> float | None:
+        """计费重对应的运费，超出阶梯且不支持续重时返回 None"""
+        index = bisect_left(self.limits_g, chargeable_g)
+        if index < len(self.limits_g):
+            return self.prices[index]
+        if self.per_kg_over is None:
+            return None
+        extra_kg = math.ceil((chargeable_g - self.limits_g[-1]) / 1000)
+        return self.prices[-1] + extra_kg * self.per_kg_over
+
+
+@dataclass(frozen=True)
+class ServiceRate:
+    """一个物流服务（承运商 + 服务等级）"""
+
+    service_id: str
+    carrier: str
+    service_level: str
+    dim_divisor: float | None
+    max_weight_g: float
+    max_side_mm: float
+    tracking_supported: bool
+    zones: dict[str, ZoneRate]
+
+
+class RateTable:
+    """物流费率表"""
+
+    def __init__(self, data: dict[str, Any]):
+        self.version: str = data.get("version", "")
+        self.currency: str = data.get("currency", "USD")
+        self.zones: dict[str, str] = {c.upper(): z for c, z in data.get("zones", {}).items()}
+        self.services = [_parse_service(s) for s in data.get("services", [])]
+        # 国家 → [(邮编前缀, 附加费)]
+        self.surcharges: dict[str, list[tuple[str, float]]] = {}
+        for surcharge in data.get("surcharges", []):
+            entries = self.surcharges.setdefault(surcharge["country"].upper(), [])
+            amount = float(surcharge["amount"])
+            entries.extend((prefix.upper(), amount) for prefix in surcharge["postal_prefixes"])
+
+    @classmethod
+    def from_file(cls, path: str | Path = DEFAULT_RATES_PATH) -> "RateTable":
+        table = cls(orjson.loads(Path(path).read_bytes()))
+        logger.info(
+            "shipping.rate_table_loaded",
+            version=table.version,
+            services=len(table.services),
+            countries=len(table.zones),
+        )
+        return table
+
+    def covers(self, country: str) -> bool:
+        return normalize_country(country) in self.zones
+
+    def surcharge(self, country: str, postal_code: str | None) -> float:
+        """偏远地区附加费（按邮编前缀匹配）"""
+        if not postal_code:
+            return 0.0
+        code = postal_code.replace(" ", "").upper()
+        for prefix, amount in self.surcharges.get(normalize_country(country), []):
+            if code.startswith(prefix):
+                return amount
+        return 0.0
+
+    def quote(
+        self,
+        parcel: Parcel,
+        destination_country: str,
+        postal_code: str | None = None,
+        service_level: str | None = None,
+    ) -> list[dict[str, Any]] | None:
+        """
+        本地报价，结果与 shipping.quote_options 的 data.options 同构，按价格升序
+
+        目的国不在费率表中时返回 None；包裹超出所有服务的限制时返回空列表。
+        """
+        zone = self.zones.get(normalize_country(destination_country))
+        if zone is None:
+            return None
+
+        surcharge = self.surcharge(destination_country, postal_code)
+        options = []
+        for service in self.services:
+            if service_level and service.service_level != service_level:
+                continue
+            rate = service.zones.get(zone)
+            if rate is None or parcel.longest_side_mm > service.max_side_mm:
+                continue
+            chargeable = parcel.chargeable_weight_g(service.dim_divisor)
+            if chargeable > service.max_weight_g:
+                continue
+            price = rate.price(chargeable)
+            if price is None:
+                continue
+
+            constraints = []
+            if chargeable > parcel.weight_g:
+                constraints.append("dim_weight_applied")
+            if surcharge:
+                constraints.append("remote_area_surcharge")
+            options.append({
+                "shipping_option_id": service.service_id,
+                "carrier": service.carrier,
+                "service_level": service.service_level,
+                "price": round(price + surcharge, 2),
+                "currency": self.currency,
+                "eta_min_days": rate.eta_days[0],
+                "eta_max_days": rate.eta_days[1],
+                "tracking_supported": service.tracking_supported,
+                "constraints": constraints,
+                "chargeable_weight_g": round(chargeable),
+            })
+
+        options.sort(key=lambda o: o["price"])
+        return options
+
+
+def _parse_service(data: dict[str, Any]) -> ServiceRate:
+    zones = {}
+    for zone, rate in data.get("zones", {}).items():
+        brackets = sorted(rate["brackets"])
+        zones[zone] = ZoneRate(
+            eta_days=(rate["eta_days"][0], rate["eta_days"][1]),
+            limits_g=tuple(float(limit) for limit, _ in brackets),
+            prices=tuple(float(price) for _, price in brackets),
+            per_kg_over=rate.get("per_kg_over"),
+        )
+    return ServiceRate(
+        service_id=data["service_id"],
+        carrier=data.get("carrier", data["service_id"]),
+        service_level=data.get("service_level", "standard"),
+        dim_divisor=data.get("dim_divisor"),
+        max_weight_g=float(data.get("max_weight_g", math.inf)),
+        max_side_mm=float(data.get("max_side_mm", math.inf)),
+        tracking_supported=data.get("tracking_supported", True),
+        zones=zones,
+    )
+
+
+# RateTable 单例
+_rate_table: RateTable | None = None
+
+
+def get_rate_table() -> RateTable:
+    """加载费率表单例（SHIPPING_RATES_PATH 留空使用仓库自带的种子费率）"""
+    global _rate_table
+    if _rate_table is None:
+        _rate_table = RateTable.from_file(get_settings().shipping_rates_path or DEFAULT_RATES_PATH)
+    return _rate_table
+
+
+def set_rate_table(table: RateTable | None) -> None:
+    """替换费率表单例（测试或热更新），None 表示下次使用时重新加载"""
+    global _rate_table
+    _rate_table = table
@@ -5,17 +5,20 @@ Tool wrappers for calling MCP servers.
 所有工具都返回标准 Envelope 格式。
 """
 
-from .catalog import get_offer_card, search_offers
+from .catalog import get_offer_card, get_offer_cards, search_offers
 from .checkout import add_to_cart, create_cart, create_draft_order
 from .compliance import check_compliance
 from .evidence import create_evidence_snapshot
-from .pricing import get_realtime_quote
+from .http_client import shutdown_gateway_client, startup_gateway_client
+from .pricing import get_realtime_quote, get_realtime_quotes
 from .shipping import quote_shipping_options, validate_address
 
 __all__ = [
     "search_offers",
     "get_offer_card",
+    "get_offer_cards",
     "get_realtime_quote",
+    "get_realtime_quotes",
     "quote_shipping_options",
     "validate_address",
     "check_compliance",
@@ -23,5 +26,7 @@ __all__ = [
     "add_to_cart",
     "create_draft_order",
     "create_evidence_snapshot",
+    "startup_gateway_client",
+    "shutdown_gateway_client",
 ]
 
@@ -4,27 +4,30 @@ Base tool utilities.
 
 import hashlib
 import os
+import time
 import uuid
+from collections.abc import Awaitable
 from datetime import datetime
 from typing import Any
 
 import httpx
 import structlog
+from opentelemetry.trace import Status, StatusCode
 
 from ..config import get_settings
+from ..observability import get_telemetry
+from ..resilience import get_resilience
+from .cache import get_response_cache
+from .http_client import get_gateway_client
+from .registry import is_read_only
+from .singleflight import get_single_flight
 
 logger = structlog.get_logger()
 
-# HTTP client 单例
-_http_client: httpx.AsyncClient | None = None
-
 
 async def get_http_client() -> httpx.AsyncClient:
-    """获取 HTTP client 单例"""
-    global _http_client
-    if _http_client is None:
-        _http_client = httpx.AsyncClient(timeout=30.0)
-    return _http_client
+    """获取当前 event loop 的共享 HTTP client（见 tools/http_client.py）"""
+    return get_gateway_client().get_client()
 
 
 def create_request_envelope(
@@ -78,6 +81,11 @@ async def call_tool(
     """
     统一工具调用接口
 
+    每次调用记录 span 与延迟/次数指标（见 observability/）。
+    只读工具的成功响应会经过 ResponseCache 复用（见 tools/cache.py），
+    缓存未命中时相同的并发请求经 SingleFlight 合并为一次（见 tools/singleflight.py），
+    实际请求经过熔断/重试预算/对冲（见 resilience.py）。
+
     Args:
         mcp_server: MCP server 类型 (core, checkout)
         tool_name: 工具名称
@@ -88,8 +96,50 @@ async def call_tool(
     Returns:
         标准响应 Envelope
     """
+    read_only = is_read_only(tool_name)
+
+    def invoke() -> Awaitable[dict[str, Any]]:
+        return get_resilience().call(
+            tool_name,
+            lambda: _invoke_tool(mcp_server, tool_name, params, user_id, idempotency_key),
+            idempotent=read_only or idempotency_key is not None,
+            hedge=read_only,
+        )
+
+    single_flight = get_single_flight()
+
+    def fetch() -> Awaitable[dict[str, Any]]:
+        if single_flight is not None and single_flight.enabled_for(tool_name):
+            return single_flight.do(tool_name, params, invoke)
+        return invoke()
+
+    telemetry = get_telemetry()
+    started = time.perf_counter()
+    with telemetry.span(f"tool.{tool_name}", tool=tool_name, mcp_server=mcp_server) as span:
+        cache = get_response_cache()
+        if cache is not None and cache.is_cacheable(tool_name):
+            result = await cache.get_or_fetch(tool_name, params, fetch)
+        else:
+            result = await fetch()
+        if not result.get("ok"):
+            error = result.get("error", {})
+            span.set_status(Status(StatusCode.ERROR, error.get("message", "")))
+            span.set_attribute("error_code", error.get("code", "UNKNOWN"))
+
+    telemetry.record_tool(tool_name, (time.perf_counter() - started) * 1000, result)
+    return result
+
+
+async def _invoke_tool(
+    mcp_server: str,
+    tool_name: str,
+    params: dict[str, Any],
+    user_id: str | None,
+    idempotency_key: str | None,
+) -> dict[str, Any]:
+    """向 Tool Gateway 发起一次实际请求"""
     settings = get_settings()
-    client = await get_http_client()
+    gateway = get_gateway_client()
 
     # 构建请求 URL
     # MVP 阶段直接调用 Tool Gateway
@@ -113,7 +163,7 @@ async def call_tool(
     )
 
     try:
-        response = await client.post(url, json=request_body)
+        response = await gateway.post(tool_name, url, json=request_body)
         response.raise_for_status()
         result = response.json()
 
@@ -141,6 +191,7 @@ async def call_tool(
             "error": {
                 "code": "UPSTREAM_ERROR",
                 "message": f"HTTP {e.response.status_code}",
+                "http_status": e.response.status_code,
             },
         }
     except httpx.TimeoutException:
@@ -152,6 +203,15 @@ async def call_tool(
                 "message": "Request timed out",
             },
         }
+    except httpx.TransportError as e:
+        logger.error("tool.transport_error", tool=tool_name, error=str(e))
+        return {
+            "ok": False,
+            "error": {
+                "code": "UPSTREAM_ERROR",
+                "message": f"Gateway unreachable: {e}",
+            },
+        }
     except Exception as e:
         logger.error("tool.error", tool=tool_name, error=str(e))
         return {
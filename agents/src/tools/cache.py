@@ -0,0 +1,257 @@
+"""
+Tool 响应缓存
+
+按 (tool_name, 规范化 params) 缓存只读工具的成功响应：
+- TTL 以响应中的 ttl_seconds 为准，缺失时使用 registry 中的默认值
+- 过期后的 stale 窗口内先返回旧值，同时在后台刷新（stale-while-revalidate）
+- 有副作用的工具（cart/checkout/evidence）永远不缓存
+
+后端可插拔：进程内 LRU（默认）或 Redis 共享存储。
+"""
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any, Protocol
+
+import orjson
+import structlog
+
+from ..config import get_settings
+from ..observability import get_telemetry
+from .registry import READ_ONLY_TOOLS, is_read_only
+
+logger = structlog.get_logger()
+
+Fetcher = Callable[[], Awaitable[dict[str, Any]]]
+
+
+@dataclass
+class CacheEntry:
+    """缓存条目，value 为序列化后的响应，避免调用方修改缓存内容"""
+
+    value: bytes
+    fresh_until: float
+    stale_until: float
+
+
+class CacheBackend(Protocol):
+    """缓存后端接口"""
+
+    async def get(self, key: str) -> CacheEntry | None: ...
+
+    async def set(self, key: str, entry: CacheEntry) -> None: ...
+
+    async def delete(self, key: str) -> None: ...
+
+
+class LRUCacheBackend:
+    """进程内 LRU 缓存"""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> CacheEntry | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.stale_until <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    async def set(self, key: str, entry: CacheEntry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+
+class RedisCacheBackend:
+    """
+    Redis 共享缓存，多个 worker 进程之间复用报价
+
+    需要安装 redis（pip install -e ".[cache]"），也可以直接传入 redis.asyncio 客户端。
+    """
+
+    def __init__(self, url: str | None = None, client: Any = None, prefix: str = "tool:"):
+        if client is None:
+            try:
+                import redis.asyncio as redis
+            except ImportError as e:
+                raise ImportError(
+                    "RedisCacheBackend requires the 'redis' package: pip install -e \".[cache]\""
+                ) from e
+            client = redis.from_url(url or "redis://localhost:6379/0")
+        self._client = client
+        self._prefix = prefix
+
+    async def get(self, key: str) -> CacheEntry | None:
+        raw = await self._client.get(self._prefix + key)
+        if raw is None:
+            return None
+        data = orjson.loads(raw)
+        return CacheEntry(
+            value=data["v"].encode(),
+            fresh_until=data["f"],
+            stale_until=data["s"],
+        )
+
+    async def set(self, key: str, entry: CacheEntry) -> None:
+        expire = max(1, int(entry.stale_until - time.time()))
+        payload = orjson.dumps({
+            "v": entry.value.decode(),
+            "f": entry.fresh_until,
+            "s": entry.stale_until,
+        })
+        await self._client.set(self._prefix + key, payload, ex=expire)
+
+    async def delete(self, key: str) -> None:
+        await self._client.delete(self._prefix + key)
+
+
+class ResponseCache:
+    """只读工具响应缓存"""
+
+    def __init__(self, backend: CacheBackend, stale_seconds: float = 30.0):
+        self.backend = backend
+        self.stale_seconds = stale_seconds
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "stores": 0, "refreshes": 0}
+        self._refreshing: set[str] = set()
+        self._background: set[asyncio.Task] = set()
+
+    @staticmethod
+    def make_key(tool_name: str, params: dict[str, Any]) -> str:
+        """tool_name + 规范化 params（去掉 None、按 key 排序）"""
+        normalized = orjson.dumps(_normalize(params), option=orjson.OPT_SORT_KEYS)
+        return f"{tool_name}:{hashlib.sha256(normalized).hexdigest()[:32]}"
+
+    @staticmethod
+    def is_cacheable(tool_name: str) -> bool:
+        return is_read_only(tool_name)
+
+    async def get_or_fetch(
+        self,
+        tool_name: str,
+        params: dict[str, Any],
+        fetch: Fetcher,
+    ) -> dict[str, Any]:
+        """命中直接返回；stale 返回旧值并后台刷新；未命中则调用 fetch 并写入"""
+        if not self.is_cacheable(tool_name):
+            return await fetch()
+
+        key = self.make_key(tool_name, params)
+        try:
+            entry = await self.backend.get(key)
+        except Exception as e:
+            logger.warning("tool_cache.get_failed", tool=tool_name, error=str(e))
+            entry = None
+
+        now = time.time()
+        if entry is not None and now < entry.fresh_until:
+            self.stats["hits"] += 1
+            get_telemetry().record_cache(tool_name, "hit")
+            return orjson.loads(entry.value)
+
+        if entry is not None and now < entry.stale_until:
+            self.stats["stale_hits"] += 1
+            get_telemetry().record_cache(tool_name, "stale")
+            self._schedule_refresh(key, tool_name, fetch)
+            return orjson.loads(entry.value)
+
+        self.stats["misses"] += 1
+        get_telemetry().record_cache(tool_name, "miss")
+        result = await fetch()
+        await self._store(key, tool_name, result)
+        return result
+
+    async def _store(self, key: str, tool_name: str, result: dict[str, Any]) -> None:
+        """只缓存成功响应，TTL 以响应中的 ttl_seconds 为准"""
+        if not result.get("ok"):
+            return
+        ttl = result.get("ttl_seconds", READ_ONLY_TOOLS.get(tool_name, 0))
+        if not ttl or ttl <= 0:
+            return
+
+        now = time.time()
+        entry = CacheEntry(
+            value=orjson.dumps(result),
+            fresh_until=now + ttl,
+            stale_until=now + ttl + self.stale_seconds,
+        )
+        try:
+            await self.backend.set(key, entry)
+            self.stats["stores"] += 1
+        except Exception as e:
+            logger.warning("tool_cache.set_failed", tool=tool_name, error=str(e))
+
+    def _schedule_refresh(self, key: str, tool_name: str, fetch: Fetcher) -> None:
+        """同一个 key 同时只有一个后台刷新"""
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+
+        async def refresh() -> None:
+            try:
+                result = await fetch()
+                await self._store(key, tool_name, result)
+                self.stats["refreshes"] += 1
+            except Exception as e:
+                logger.warning("tool_cache.refresh_failed", tool=tool_name, error=str(e))
+            finally:
+                self._refreshing.discard(key)
+
+        task = asyncio.create_task(refresh())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+
+def _normalize(value: Any) -> Any:
+    """递归去掉值为 None 的字段，使等价参数得到相同的 key"""
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items() if v is not None}
+    if isinstance(value, list | tuple):
+        return [_normalize(v) for v in value]
+    return value
+
+
+# ResponseCache 单例
+_response_cache: ResponseCache | None = None
+_response_cache_initialized = False
+
+
+def get_response_cache() -> ResponseCache | None:
+    """根据配置创建缓存单例，TOOL_CACHE_BACKEND=none 时返回 None"""
+    global _response_cache, _response_cache_initialized
+    if not _response_cache_initialized:
+        settings = get_settings()
+        backend_name = settings.tool_cache_backend.lower()
+        backend: CacheBackend | None
+        if backend_name == "memory":
+            backend = LRUCacheBackend(max_entries=settings.tool_cache_max_entries)
+        elif backend_name == "redis":
+            backend = RedisCacheBackend(url=settings.tool_cache_redis_url)
+        else:
+            backend = None
+        if backend is not None:
+            _response_cache = ResponseCache(backend, stale_seconds=settings.tool_cache_stale_seconds)
+        _response_cache_initialized = True
+    return _response_cache
+
+
+def set_response_cache(cache: ResponseCache | None) -> None:
+    """替换缓存单例（测试或自定义后端）"""
+    global _response_cache, _response_cache_initialized
+    _response_cache = cache
+    _response_cache_initialized = True
@@ -2,10 +2,25 @@
 Catalog tools - 商品搜索与检索
 """
 
+import asyncio
+import time
 from typing import Any
 
+import structlog
+
+from ..config import get_settings
+from ..observability import get_telemetry
+from ..resilience import is_retryable
+from ..retrieval import get_catalog_index, get_hybrid_retriever
 from .base import MOCK_MODE, call_tool, mock_response
 
+logger = structlog.get_logger()
+
+# 网关批量接口是否可用：None 表示尚未探测
+_batch_supported: bool | None = None
+
+_BATCH_UNSUPPORTED_STATUSES = (404, 405, 501)
+
 
 async def search_offers(
     query: str,
@@ -36,6 +51,11 @@ async def search_offers(
     Returns:
         标准响应 Envelope，data 包含 offer_ids 和 scores
     """
+    if get_settings().catalog_search_backend == "local":
+        return await _search_offers_local(
+            query, category_id, price_min, price_max, brand, must_in_stock, sort, limit
+        )
+
     if MOCK_MODE:
         # Mock 数据
         mock_offers = [
@@ -70,6 +90,45 @@ async def search_offers(
     )
 
 
+async def _search_offers_local(
+    query: str,
+    category_id: str | None,
+    price_min: float | None,
+    price_max: float | None,
+    brand: str | None,
+    must_in_stock: bool,
+    sort: str,
+    limit: int,
+) -> dict[str, Any]:
+    """
+    本地后端：进程内 BM25 索引（见 retrieval/），返回与网关相同的 Envelope
+
+    CATALOG_VECTOR_ENABLED 时走 BM25 + 向量近邻的混合召回。
+    """
+    started = time.perf_counter()
+    params = {
+        "category_id": category_id,
+        "brand": brand,
+        "price_min": price_min,
+        "price_max": price_max,
+        "must_in_stock": must_in_stock,
+        "sort": sort,
+        "limit": limit,
+    }
+    if get_settings().catalog_vector_enabled:
+        result = await get_hybrid_retriever().search(query, **params)
+    else:
+        result = get_catalog_index().search(query, **params)
+    response = mock_response({
+        **result,
+        "has_more": result["total_count"] > len(result["offer_ids"]),
+    })
+    get_telemetry().record_tool(
+        "catalog.search_offers", (time.perf_counter() - started) * 1000, response
+    )
+    return response
+
+
 async def get_offer_card(
     offer_id: str,
     user_id: str | None = None,
@@ -84,57 +143,7 @@ async def get_offer_card(
         标准响应 Envelope，data 包含完整 AROC
     """
     if MOCK_MODE:
-        # Mock AROC 数据
-        return mock_response({
-            "aroc_version": "0.1",
-            "offer_id": offer_id,
-            "spu_id": f"spu_{offer_id[3:]}",
-            "merchant_id": "m_001",
-            "titles": [
-                {"lang": "en", "text": f"Test Product {offer_id}"},
-                {"lang": "zh", "text": f"测试商品 {offer_id}"},
-            ],
-            "brand": {
-                "name": "TestBrand",
-                "normalized_id": "brand_test",
-                "confidence": "high",
-            },
-            "category": {
-                "cat_id": "c_electronics",
-                "path": ["Electronics", "Gadgets"],
-            },
-            "attributes": [
-                {
-                    "attr_id": "color",
-                    "name": {"en": "Color", "zh": "颜色"},
-                    "value": {"type": "enum", "normalized": "Black"},
-                    "confidence": 0.95,
-                },
-            ],
-            "variants": {
-                "axes": [{"axis": "color", "values": ["Black", "White"]}],
-                "skus": [
-                    {
-                        "sku_id": f"sku_{offer_id[3:]}_001",
-                        "options": {"color": "Black"},
-                        "packaging": {"weight_g": 200, "dim_mm": [100, 80, 30]},
-                        "risk_tags": [],
-                        "compliance_tags": [],
-                    },
-                ],
-            },
-            "policies": {
-                "return_policy_id": "rp_standard",
-                "warranty_policy_id": "wp_1year",
-                "policy_summary": {"en": "30-day return", "zh": "30天退货"},
-            },
-            "risk_profile": {
-                "fragile": False,
-                "sizing_uncertainty": "low",
-                "counterfeit_risk": "low",
-                "after_sale_complexity": "low",
-            },
-        })
+        return mock_response(_mock_offer_card(offer_id))
 
     return await call_tool(
         mcp_server="core",
@@ -143,3 +152,169 @@ async def get_offer_card(
         user_id=user_id,
     )
 
+
+async def get_offer_cards(
+    offer_ids: list[str],
+    user_id: str | None = None,
+) -> dict[str, Any]:
+    """
+    catalog.get_offer_cards - 批量获取 AROC
+
+    优先调用网关批量接口；网关不支持时（404/405/501）退化为
+    受 catalog_fetch_concurrency 限制的并发 get_offer_card。批量请求遇到可重试错误
+    （超时、5xx、连接失败、熔断）时本次同样退化，单个商品失败不影响其他商品。
+
+    Args:
+        offer_ids: 商品 ID 列表
+
+    Returns:
+        标准响应 Envelope，data.offer_cards 与 offer_ids 按位置对齐，
+        获取失败的位置为 None，失败原因记录在 data.errors[offer_id]
+    """
+    global _batch_supported
+
+    if MOCK_MODE:
+        return mock_response({
+            "offer_cards": [_mock_offer_card(offer_id) for offer_id in offer_ids],
+            "errors": {},
+        })
+
+    if not offer_ids:
+        return {"ok": True, "data": {"offer_cards": [], "errors": {}}}
+
+    if _batch_supported is not False:
+        result = await call_tool(
+            mcp_server="core",
+            tool_name="catalog.get_offer_cards",
+            params={"offer_ids": offer_ids},
+            user_id=user_id,
+        )
+        if result.get("ok"):
+            _batch_supported = True
+            return _align_offer_cards(result, offer_ids)
+
+        error = result.get("error", {})
+        http_status = error.get("http_status")
+        if http_status in _BATCH_UNSUPPORTED_STATUSES:
+            _batch_supported = False
+            logger.info("catalog.get_offer_cards.batch_unsupported", http_status=http_status)
+        elif is_retryable(result):
+            logger.warning(
+                "catalog.get_offer_cards.batch_failed",
+                error_code=error.get("code"),
+                http_status=http_status,
+            )
+        else:
+            return result
+
+    return await _get_offer_cards_concurrently(offer_ids, user_id=user_id)
+
+
+def _align_offer_cards(result: dict[str, Any], offer_ids: list[str]) -> dict[str, Any]:
+    """将批量接口返回的 AROC 按 offer_ids 位置对齐"""
+    data = result.get("data", {})
+    by_id = {
+        card.get("offer_id"): card
+        for card in data.get("offer_cards", [])
+        if card
+    }
+    errors = dict(data.get("errors", {}))
+    for offer_id in offer_ids:
+        if offer_id not in by_id and offer_id not in errors:
+            errors[offer_id] = {"code": "NOT_FOUND", "message": "Offer not returned"}
+
+    return {
+        **result,
+        "data": {
+            "offer_cards": [by_id.get(offer_id) for offer_id in offer_ids],
+            "errors": errors,
+        },
+    }
+
+
+async def _get_offer_cards_concurrently(
+    offer_ids: list[str],
+    user_id: str | None = None,
+) -> dict[str, Any]:
+    """并发逐个获取 AROC（批量接口不可用时的退化路径）"""
+    semaphore = asyncio.Semaphore(max(1, get_settings().catalog_fetch_concurrency))
+
+    async def fetch(offer_id: str) -> dict[str, Any]:
+        async with semaphore:
+            return await get_offer_card(offer_id=offer_id, user_id=user_id)
+
+    results = await asyncio.gather(
+        *(fetch(offer_id) for offer_id in offer_ids),
+        return_exceptions=True,
+    )
+
+    offer_cards: list[dict[str, Any] | None] = []
+    errors: dict[str, Any] = {}
+    for offer_id, result in zip(offer_ids, results, strict=True):
+        if isinstance(result, BaseException):
+            offer_cards.append(None)
+            errors[offer_id] = {"code": "INTERNAL_ERROR", "message": str(result)}
+        elif not result.get("ok"):
+            offer_cards.append(None)
+            errors[offer_id] = result.get("error", {})
+        else:
+            offer_cards.append(result.get("data", {}))
+
+    return {
+        "ok": True,
+        "data": {"offer_cards": offer_cards, "errors": errors},
+    }
+
+
+def _mock_offer_card(offer_id: str) -> dict[str, Any]:
+    """Mock AROC 数据"""
+    return {
+        "aroc_version": "0.1",
+        "offer_id": offer_id,
+        "spu_id": f"spu_{offer_id[3:]}",
+        "merchant_id": "m_001",
+        "titles": [
+            {"lang": "en", "text": f"Test Product {offer_id}"},
+            {"lang": "zh", "text": f"测试商品 {offer_id}"},
+        ],
+        "brand": {
+            "name": "TestBrand",
+            "normalized_id": "brand_test",
+            "confidence": "high",
+        },
+        "category": {
+            "cat_id": "c_electronics",
+            "path": ["Electronics", "Gadgets"],
+        },
+        "attributes": [
+            {
+                "attr_id": "color",
+                "name": {"en": "Color", "zh": "颜色"},
+                "value": {"type": "enum", "normalized": "Black"},
+                "confidence": 0.95,
+            },
+        ],
+        "variants": {
+            "axes": [{"axis": "color", "values": ["Black", "White"]}],
+            "skus": [
+                {
+                    "sku_id": f"sku_{offer_id[3:]}_001",
+                    "options": {"color": "Black"},
+                    "packaging": {"weight_g": 200, "dim_mm": [100, 80, 30]},
+                    "risk_tags": [],
+                    "compliance_tags": [],
+                },
+            ],
+        },
+        "policies": {
+            "return_policy_id": "rp_standard",
+            "warranty_policy_id": "wp_1year",
+            "policy_summary": {"en": "30-day return", "zh": "30天退货"},
+        },
+        "risk_profile": {
+            "fragile": False,
+            "sizing_uncertainty": "low",
+            "counterfeit_risk": "low",
+            "after_sale_complexity": "low",
+        },
+    }
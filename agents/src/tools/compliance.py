@@ -2,16 +2,28 @@
 Compliance tools - 合规检查
 """
 
+import time
 from typing import Any
 
+import structlog
+
+from ..compliance.engine import ComplianceEngine, get_compliance_engine
+from ..config import get_settings
+from ..observability import get_telemetry
 from .base import MOCK_MODE, call_tool, mock_response
 
+logger = structlog.get_logger()
+
+# 本地引擎使用的规则版本：(version, 取得时间)
+_ruleset_version: tuple[str, float] | None = None
+
 
 async def check_compliance(
     sku_id: str,
     destination_country: str,
     shipping_option_id: str | None = None,
     user_id: str | None = None,
+    item: dict[str, Any] | None = None,
 ) -> dict[str, Any]:
     """
     compliance.check_item - 检查商品合规性
@@ -20,10 +32,23 @@ async def check_compliance(
         sku_id: SKU ID
         destination_country: 目的国
         shipping_option_id: 物流选项（可选）
+        item: 商品 AROC / offer card（可选）；COMPLIANCE_BACKEND=local 时据此在本地评估，
+            不发网关请求
 
     Returns:
         标准响应 Envelope，data 包含合规结果
     """
+    if item is not None and get_settings().compliance_backend == "local":
+        started = time.perf_counter()
+        engine = await get_local_engine(user_id)
+        data = engine.check(item, destination_country, shipping_method=shipping_option_id)
+        data["sku_id"] = data["sku_id"] or sku_id
+        response = mock_response(data)
+        get_telemetry().record_tool(
+            "compliance.check_item", (time.perf_counter() - started) * 1000, response
+        )
+        return response
+
     if MOCK_MODE:
         return mock_response({
             "allowed": True,
@@ -67,3 +92,37 @@ async def get_policy_ruleset_version(
         user_id=user_id,
     )
 
+
+async def get_local_engine(user_id: str | None = None) -> ComplianceEngine:
+    """
+    当前规则版本对应的本地引擎
+
+    规则版本来自 compliance.policy_ruleset_version，按 COMPLIANCE_RULESET_TTL_SECONDS 缓存，
+    版本变化时重新编译规则文件。查询失败时沿用上一次的版本；从未成功过则使用规则文件自身的版本。
+    """
+    global _ruleset_version
+    settings = get_settings()
+    rules_path = settings.compliance_rules_path or None
+    now = time.monotonic()
+    ttl = settings.compliance_ruleset_ttl_seconds
+    if _ruleset_version is None or now - _ruleset_version[1] >= ttl:
+        version = None
+        try:
+            result = await get_policy_ruleset_version(user_id)
+            if result.get("ok"):
+                version = result.get("data", {}).get("version")
+        except Exception as e:
+            logger.warning("compliance.ruleset_version_failed", error=str(e))
+        if version:
+            _ruleset_version = (version, now)
+        elif _ruleset_version is not None:
+            _ruleset_version = (_ruleset_version[0], now)
+        else:
+            return get_compliance_engine(None, rules_path)
+    return get_compliance_engine(_ruleset_version[0], rules_path)
+
+
+def reset_ruleset_version() -> None:
+    """丢弃缓存的规则版本，下次检查时重新查询（测试用）"""
+    global _ruleset_version
+    _ruleset_version = None
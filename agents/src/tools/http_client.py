@@ -0,0 +1,227 @@
+"""
+Tool Gateway HTTP client 管理
+
+- 连接池大小 / keepalive 由 config.Settings 配置
+- 可选 HTTP/2 多路复用（需要安装 h2：pip install "httpx[http2]"）
+- 按工具区分 connect/read 超时
+- 每个 event loop 一个 client（httpx.AsyncClient 不能跨 loop 使用），创建过程加锁
+- 显式的 startup/shutdown 钩子与连接池使用率统计
+"""
+
+import asyncio
+import threading
+import weakref
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+import httpx
+import structlog
+
+from ..config import get_settings
+
+logger = structlog.get_logger()
+
+# 工具级超时 (connect, read)，未列出的工具使用全局配置
+DEFAULT_TOOL_TIMEOUTS: dict[str, tuple[float, float]] = {
+    "pricing.get_realtime_quote": (2.0, 5.0),
+    "pricing.get_realtime_quotes": (2.0, 10.0),
+    "compliance.check_item": (2.0, 5.0),
+    "shipping.quote_options": (2.0, 10.0),
+    "catalog.search_offers": (2.0, 10.0),
+    "catalog.get_offer_card": (2.0, 5.0),
+    "catalog.get_offer_cards": (2.0, 15.0),
+}
+
+
+class GatewayClient:
+    """Tool Gateway 共享 HTTP client"""
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0,
+        pool_timeout: float = 5.0,
+        http2: bool = False,
+        tool_timeouts: dict[str, tuple[float, float]] | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.pool_timeout = pool_timeout
+        self.http2 = http2 and _h2_available()
+        self.tool_timeouts = {**DEFAULT_TOOL_TIMEOUTS, **(tool_timeouts or {})}
+        self.transport = transport
+
+        self.stats = {"requests": 0, "in_flight": 0, "peak_in_flight": 0, "pool_timeouts": 0}
+        self._clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient] = (
+            weakref.WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+
+        if http2 and not self.http2:
+            logger.warning("gateway_client.http2_unavailable", msg="h2 not installed, using HTTP/1.1")
+
+    @classmethod
+    def from_settings(cls) -> "GatewayClient":
+        settings = get_settings()
+        return cls(
+            max_connections=settings.gateway_max_connections,
+            max_keepalive_connections=settings.gateway_max_keepalive_connections,
+            keepalive_expiry=settings.gateway_keepalive_expiry,
+            connect_timeout=settings.gateway_connect_timeout,
+            read_timeout=settings.gateway_read_timeout,
+            pool_timeout=settings.gateway_pool_timeout,
+            http2=settings.gateway_http2,
+            tool_timeouts=parse_tool_timeouts(settings.gateway_tool_timeouts),
+        )
+
+    def get_client(self) -> httpx.AsyncClient:
+        """返回当前 event loop 的 client，不存在则创建"""
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None or client.is_closed:
+            with self._lock:
+                client = self._clients.get(loop)
+                if client is None or client.is_closed:
+                    client = self._create_client()
+                    self._clients[loop] = client
+                    logger.info(
+                        "gateway_client.created",
+                        max_connections=self.limits.max_connections,
+                        http2=self.http2,
+                    )
+        return client
+
+    def _create_client(self) -> httpx.AsyncClient:
+        kwargs: dict[str, Any] = {
+            "timeout": httpx.Timeout(
+                self.read_timeout,
+                connect=self.connect_timeout,
+                pool=self.pool_timeout,
+            ),
+            "limits": self.limits,
+            "http2": self.http2,
+        }
+        if self.transport is not None:
+            kwargs["transport"] = self.transport
+        return httpx.AsyncClient(**kwargs)
+
+    def timeout_for(self, tool_name: str) -> httpx.Timeout:
+        """工具级超时"""
+        connect, read = self.tool_timeouts.get(
+            tool_name, (self.connect_timeout, self.read_timeout)
+        )
+        return httpx.Timeout(read, connect=connect, pool=self.pool_timeout)
+
+    async def post(self, tool_name: str, url: str, json: dict[str, Any]) -> httpx.Response:
+        """发送请求并记录连接池使用情况"""
+        client = self.get_client()
+        async with self._track():
+            return await client.post(url, json=json, timeout=self.timeout_for(tool_name))
+
+    @asynccontextmanager
+    async def _track(self) -> AsyncIterator[None]:
+        self.stats["requests"] += 1
+        self.stats["in_flight"] += 1
+        self.stats["peak_in_flight"] = max(self.stats["peak_in_flight"], self.stats["in_flight"])
+        try:
+            yield
+        except httpx.PoolTimeout:
+            self.stats["pool_timeouts"] += 1
+            logger.warning("gateway_client.pool_exhausted", in_flight=self.stats["in_flight"])
+            raise
+        finally:
+            self.stats["in_flight"] -= 1
+
+    def pool_metrics(self) -> dict[str, Any]:
+        """连接池使用率快照"""
+        max_connections = self.limits.max_connections or 0
+        return {
+            **self.stats,
+            "max_connections": max_connections,
+            "utilization": (
+                self.stats["in_flight"] / max_connections if max_connections else 0.0
+            ),
+            "clients": len(self._clients),
+        }
+
+    async def aclose(self) -> None:
+        """关闭当前 event loop 的 client；其他 loop 的 client 随 loop 一起释放"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._clients.pop(loop, None)
+        if client is not None and not client.is_closed:
+            await client.aclose()
+            logger.info("gateway_client.closed")
+
+
+def parse_tool_timeouts(spec: str) -> dict[str, tuple[float, float]]:
+    """
+    解析 GATEWAY_TOOL_TIMEOUTS
+
+    格式: "pricing.get_realtime_quote=2/5,shipping.quote_options=2/10"（connect/read 秒）
+    """
+    timeouts: dict[str, tuple[float, float]] = {}
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        try:
+            name, value = item.split("=", 1)
+            connect, read = value.split("/", 1)
+            timeouts[name.strip()] = (float(connect), float(read))
+        except ValueError:
+            logger.warning("gateway_client.invalid_tool_timeout", spec=item)
+    return timeouts
+
+
+def _h2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+# GatewayClient 单例
+_gateway_client: GatewayClient | None = None
+_gateway_client_lock = threading.Lock()
+
+
+def get_gateway_client() -> GatewayClient:
+    """获取 GatewayClient 单例"""
+    global _gateway_client
+    if _gateway_client is None:
+        with _gateway_client_lock:
+            if _gateway_client is None:
+                _gateway_client = GatewayClient.from_settings()
+    return _gateway_client
+
+
+def set_gateway_client(client: GatewayClient | None) -> None:
+    """替换 GatewayClient 单例（测试、基准或自定义 transport）"""
+    global _gateway_client
+    with _gateway_client_lock:
+        _gateway_client = client
+
+
+async def startup_gateway_client() -> GatewayClient:
+    """启动钩子：提前创建连接池"""
+    gateway = get_gateway_client()
+    gateway.get_client()
+    return gateway
+
+
+async def shutdown_gateway_client() -> None:
+    """关闭钩子：释放当前 event loop 的连接"""
+    if _gateway_client is not None:
+        await _gateway_client.aclose()
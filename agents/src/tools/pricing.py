@@ -2,10 +2,23 @@
 Pricing tools - 实时价格查询
 """
 
+import asyncio
+import random
 from typing import Any
 
+import structlog
+
+from ..config import get_settings
+from ..resilience import is_retryable
 from .base import MOCK_MODE, call_tool, mock_response
 
+logger = structlog.get_logger()
+
+# 网关批量报价接口是否可用：None 表示尚未探测
+_batch_supported: bool | None = None
+
+_BATCH_UNSUPPORTED_STATUSES = (404, 405, 501)
+
 
 async def get_realtime_quote(
     sku_id: str,
@@ -25,24 +38,8 @@ async def get_realtime_quote(
         标准响应 Envelope，data 包含价格信息
     """
     if MOCK_MODE:
-        import random
-        base_price = random.uniform(10, 100)
         return mock_response(
-            {
-                "sku_id": sku_id,
-                "quantity": quantity,
-                "unit_price": round(base_price, 2),
-                "currency": "USD",
-                "price_components": [
-                    {"type": "base_price", "amount": round(base_price * 1.1, 2)},
-                    {"type": "discount", "amount": round(-base_price * 0.1, 2)},
-                ],
-                "stock": {
-                    "status": "in_stock",
-                    "quantity_available": random.randint(10, 100),
-                },
-                "quote_expire_at": "2024-12-24T18:00:00Z",
-            },
+            _mock_quote(sku_id, quantity),
             ttl_seconds=60,  # 报价有效期 1 分钟
         )
 
@@ -57,3 +54,148 @@ async def get_realtime_quote(
         user_id=user_id,
     )
 
+
+async def get_realtime_quotes(
+    items: list[dict[str, Any]],
+    destination_country: str = "US",
+    user_id: str | None = None,
+) -> dict[str, Any]:
+    """
+    pricing.get_realtime_quotes - 批量获取实时报价
+
+    所有条目共享同一个目的国，一次请求报完整批 SKU；网关不支持时（404/405/501）
+    退化为受 pricing_quote_concurrency 限制的并发 get_realtime_quote。
+
+    Args:
+        items: 报价条目 [{"sku_id": ..., "qty": ...}]
+        destination_country: 目的国
+
+    Returns:
+        标准响应 Envelope，data.quotes 与 items 按位置对齐，
+        报价失败的位置为 None，失败原因记录在 data.errors[sku_id]
+    """
+    global _batch_supported
+
+    if MOCK_MODE:
+        return mock_response(
+            {
+                "quotes": [_mock_quote(item["sku_id"], item.get("qty", 1)) for item in items],
+                "errors": {},
+            },
+            ttl_seconds=60,
+        )
+
+    if not items:
+        return {"ok": True, "data": {"quotes": [], "errors": {}}}
+
+    if _batch_supported is not False:
+        result = await call_tool(
+            mcp_server="core",
+            tool_name="pricing.get_realtime_quotes",
+            params={
+                "items": [
+                    {"sku_id": item["sku_id"], "quantity": item.get("qty", 1)} for item in items
+                ],
+                "destination_country": destination_country,
+            },
+            user_id=user_id,
+        )
+        if result.get("ok"):
+            _batch_supported = True
+            return _align_quotes(result, items)
+
+        error = result.get("error", {})
+        http_status = error.get("http_status")
+        if http_status in _BATCH_UNSUPPORTED_STATUSES:
+            _batch_supported = False
+            logger.info("pricing.get_realtime_quotes.batch_unsupported", http_status=http_status)
+        elif is_retryable(result):
+            logger.warning(
+                "pricing.get_realtime_quotes.batch_failed",
+                error_code=error.get("code"),
+                http_status=http_status,
+            )
+        else:
+            return result
+
+    return await _get_realtime_quotes_concurrently(
+        items, destination_country=destination_country, user_id=user_id
+    )
+
+
+def _align_quotes(result: dict[str, Any], items: list[dict[str, Any]]) -> dict[str, Any]:
+    """将批量接口返回的报价按 items 位置对齐（同一 SKU 不同数量分别对应）"""
+    data = result.get("data", {})
+    by_key = {
+        (quote.get("sku_id"), quote.get("quantity", 1)): quote
+        for quote in data.get("quotes", [])
+        if quote
+    }
+    errors = dict(data.get("errors", {}))
+    quotes = []
+    for item in items:
+        quote = by_key.get((item["sku_id"], item.get("qty", 1)))
+        if quote is None and item["sku_id"] not in errors:
+            errors[item["sku_id"]] = {"code": "NOT_FOUND", "message": "Quote not returned"}
+        quotes.append(quote)
+
+    return {
+        **result,
+        "data": {"quotes": quotes, "errors": errors},
+    }
+
+
+async def _get_realtime_quotes_concurrently(
+    items: list[dict[str, Any]],
+    destination_country: str,
+    user_id: str | None = None,
+) -> dict[str, Any]:
+    """并发逐个报价（批量接口不可用时的退化路径）"""
+    semaphore = asyncio.Semaphore(max(1, get_settings().pricing_quote_concurrency))
+
+    async def fetch(item: dict[str, Any]) -> dict[str, Any]:
+        async with semaphore:
+            return await get_realtime_quote(
+                sku_id=item["sku_id"],
+                quantity=item.get("qty", 1),
+                destination_country=destination_country,
+                user_id=user_id,
+            )
+
+    results = await asyncio.gather(*(fetch(item) for item in items), return_exceptions=True)
+
+    quotes: list[dict[str, Any] | None] = []
+    errors: dict[str, Any] = {}
+    for item, result in zip(items, results, strict=True):
+        if isinstance(result, BaseException):
+            quotes.append(None)
+            errors[item["sku_id"]] = {"code": "INTERNAL_ERROR", "message": str(result)}
+        elif not result.get("ok"):
+            quotes.append(None)
+            errors[item["sku_id"]] = result.get("error", {})
+        else:
+            quotes.append(result.get("data", {}))
+
+    return {
+        "ok": True,
+        "data": {"quotes": quotes, "errors": errors},
+    }
+
+
+def _mock_quote(sku_id: str, quantity: int) -> dict[str, Any]:
+    base_price = random.uniform(10, 100)
+    return {
+        "sku_id": sku_id,
+        "quantity": quantity,
+        "unit_price": round(base_price, 2),
+        "currency": "USD",
+        "price_components": [
+            {"type": "base_price", "amount": round(base_price * 1.1, 2)},
+            {"type": "discount", "amount": round(-base_price * 0.1, 2)},
+        ],
+        "stock": {
+            "status": "in_stock",
+            "quantity_available": random.randint(10, 100),
+        },
+        "quote_expire_at": "2024-12-24T18:00:00Z",
+    }
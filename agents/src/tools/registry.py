@@ -0,0 +1,33 @@
+"""
+Tool 分类表
+
+区分只读工具与有副作用的工具。缓存、请求合并等优化只允许作用于只读工具，
+购物车/结算/证据类工具无论如何配置都不会被复用。
+"""
+
+# 只读工具 → 默认 TTL（秒）
+# 响应中携带 ttl_seconds 时以响应为准；默认值只在响应缺失 ttl_seconds 时使用
+READ_ONLY_TOOLS: dict[str, int] = {
+    "catalog.search_offers": 60,
+    "catalog.get_offer_card": 300,
+    "catalog.get_offer_cards": 300,
+    "pricing.get_realtime_quote": 60,
+    "pricing.get_realtime_quotes": 60,
+    "shipping.quote_options": 300,
+    "shipping.validate_address": 3600,
+    "compliance.check_item": 300,
+    "compliance.policy_ruleset_version": 60,
+}
+
+# 有副作用的工具前缀，永远不缓存、不合并
+MUTATING_TOOL_PREFIXES: tuple[str, ...] = ("cart.", "checkout.", "evidence.")
+
+
+def is_mutating(tool_name: str) -> bool:
+    """是否为有副作用的工具"""
+    return tool_name.startswith(MUTATING_TOOL_PREFIXES)
+
+
+def is_read_only(tool_name: str) -> bool:
+    """是否为可安全复用结果的只读工具"""
+    return tool_name in READ_ONLY_TOOLS and not is_mutating(tool_name)
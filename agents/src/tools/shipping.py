@@ -2,9 +2,21 @@
 Shipping tools - 物流与地址
 """
 
+import time
+from datetime import UTC, datetime, timedelta
 from typing import Any
 
+from ..config import get_settings
+from ..observability import get_telemetry
+from ..shipping import Parcel, consolidate, get_rate_table, postal_prefix
 from .base import MOCK_MODE, call_tool, mock_response
+from .cache import LRUCacheBackend, ResponseCache
+
+# 物流报价有效期（秒）
+QUOTE_TTL_SECONDS = 300
+
+# 按包裹画像缓存的网关报价（SHIPPING_QUOTE_BACKEND=local）
+_profile_cache: ResponseCache | None = None
 
 
 async def validate_address(
@@ -53,20 +65,91 @@ async def quote_shipping_options(
     destination_country: str = "US",
     destination_postal_code: str | None = None,
     user_id: str | None = None,
+    service_level: str | None = None,
 ) -> dict[str, Any]:
     """
     shipping.quote_options - 获取物流选项
 
+    SHIPPING_QUOTE_BACKEND=local 且 items 都带包装信息时，先合并为包裹：
+    费率表覆盖的目的国在本地报价，否则按包裹画像缓存网关报价，只有未命中时才请求网关。
+
     Args:
-        items: 商品列表 [{"sku_id": "...", "qty": 1}]
+        items: 商品列表 [{"sku_id": "...", "qty": 1}]，可附带单件包装 "weight_g" / "dim_mm"
         destination_country: 目的国
         destination_postal_code: 目的地邮编
+        service_level: 只返回该服务等级（standard / express / economy）的选项
 
     Returns:
         标准响应 Envelope，data 包含物流选项
     """
+    if get_settings().shipping_quote_backend == "local":
+        parcel = consolidate(items)
+        if parcel is not None:
+            return await _quote_by_parcel(
+                parcel, items, destination_country, destination_postal_code, service_level, user_id
+            )
+
+    return await _quote_gateway(
+        items, destination_country, destination_postal_code, service_level, user_id
+    )
+
+
+async def _quote_by_parcel(
+    parcel: Parcel,
+    items: list[dict],
+    destination_country: str,
+    destination_postal_code: str | None,
+    service_level: str | None,
+    user_id: str | None,
+) -> dict[str, Any]:
+    """本地后端：费率表报价，未覆盖的目的国按包裹画像缓存网关报价"""
+    settings = get_settings()
+    if settings.shipping_rate_tables_enabled:
+        started = time.perf_counter()
+        table = get_rate_table()
+        options = table.quote(parcel, destination_country, destination_postal_code, service_level)
+        if options is not None:
+            expire_at = datetime.now(UTC) + timedelta(seconds=QUOTE_TTL_SECONDS)
+            response = mock_response(
+                {
+                    "options": options,
+                    "quote_expire_at": expire_at.isoformat(),
+                    "rate_table_version": table.version,
+                },
+                ttl_seconds=QUOTE_TTL_SECONDS,
+            )
+            get_telemetry().record_tool(
+                "shipping.quote_options", (time.perf_counter() - started) * 1000, response
+            )
+            return response
+
+    band = parcel.band()
+    profile = {
+        "country": destination_country.upper(),
+        "postal_prefix": postal_prefix(destination_postal_code),
+        "weight_band_g": band.weight_g,
+        "dim_band_mm": list(band.dims_mm),
+        "service_level": service_level,
+    }
+    return await get_profile_cache().get_or_fetch(
+        "shipping.quote_options",
+        {"profile": profile},
+        lambda: _quote_gateway(
+            items, destination_country, destination_postal_code, service_level, user_id
+        ),
+    )
+
+
+async def _quote_gateway(
+    items: list[dict],
+    destination_country: str,
+    destination_postal_code: str | None,
+    service_level: str | None,
+    user_id: str | None,
+) -> dict[str, Any]:
+    """shipping.quote_options 网关调用（包装信息不下发），按服务等级过滤选项"""
     if MOCK_MODE:
-        return mock_response(
+        result = mock_response(
             {
                 "options": [
                     {
@@ -94,19 +177,44 @@ async def quote_shipping_options(
                 ],
                 "quote_expire_at": "2024-12-24T18:00:00Z",
             },
-            ttl_seconds=300,  # 物流报价有效期 5 分钟
+            ttl_seconds=QUOTE_TTL_SECONDS,  # 物流报价有效期 5 分钟
         )
-
-    return await call_tool(
-        mcp_server="core",
-        tool_name="shipping.quote_options",
-        params={
-            "items": items,
-            "destination": {
-                "country": destination_country,
-                "postal_code": destination_postal_code,
+    else:
+        result = await call_tool(
+            mcp_server="core",
+            tool_name="shipping.quote_options",
+            params={
+                "items": [
+                    {"sku_id": item.get("sku_id"), "qty": item.get("qty", 1)} for item in items
+                ],
+                "destination": {
+                    "country": destination_country,
+                    "postal_code": destination_postal_code,
+                },
             },
-        },
-        user_id=user_id,
-    )
+            user_id=user_id,
+        )
+
+    if service_level and result.get("ok"):
+        data = result.get("data", {})
+        options = [o for o in data.get("options", []) if o.get("service_level") == service_level]
+        result = {**result, "data": {**data, "options": options}}
+    return result
+
+
+def get_profile_cache() -> ResponseCache:
+    """包裹画像报价缓存单例（进程内 LRU，TTL 以网关响应的 ttl_seconds 为准）"""
+    global _profile_cache
+    if _profile_cache is None:
+        settings = get_settings()
+        _profile_cache = ResponseCache(
+            LRUCacheBackend(max_entries=settings.shipping_quote_cache_max_entries),
+            stale_seconds=settings.tool_cache_stale_seconds,
+        )
+    return _profile_cache
+
 
+def set_profile_cache(cache: ResponseCache | None) -> None:
+    """替换包裹画像报价缓存（测试用），None 表示下次使用时按配置重建"""
+    global _profile_cache
+    _profile_cache = cache
@@ -0,0 +1,98 @@
+"""
+Single-flight 请求合并
+
+相同 key 的并发调用共享同一个 Future，只有第一个调用方真正发起请求，
+其余调用方等待同一结果。用于合并热门商品上的重复只读工具调用。
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+import orjson
+
+from ..config import get_settings
+from .cache import ResponseCache
+from .registry import is_read_only
+
+
+class SingleFlight:
+    """按 key 合并进行中的调用"""
+
+    def __init__(self, tools: set[str] | None = None):
+        # 允许合并的工具（per-tool opt-in）；None 表示所有只读工具
+        self.tools = tools
+        self.stats = {"leaders": 0, "coalesced": 0}
+        self.coalesced_by_tool: dict[str, int] = {}
+        self._inflight: dict[str, _Call] = {}
+
+    def enabled_for(self, tool_name: str) -> bool:
+        if not is_read_only(tool_name):
+            return False
+        return self.tools is None or tool_name in self.tools
+
+    @property
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+    async def do(
+        self,
+        tool_name: str,
+        params: dict[str, Any],
+        fn: Callable[[], Awaitable[dict[str, Any]]],
+    ) -> dict[str, Any]:
+        """执行 fn，如已有相同请求在进行中则等待其结果"""
+        if not self.enabled_for(tool_name):
+            return await fn()
+
+        key = ResponseCache.make_key(tool_name, params)
+        call = self._inflight.get(key)
+        if call is None:
+            # 请求在独立 task 中执行：发起方被取消时，其他等待方仍能拿到结果
+            call = _Call(asyncio.ensure_future(fn()))
+            self._inflight[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+            self.stats["leaders"] += 1
+            result = await asyncio.shield(call.task)
+            # 有等待方共享同一结果时，发起方也拿拷贝，避免互相修改
+            return _copy_result(result) if call.shared else result
+
+        call.shared = True
+        self.stats["coalesced"] += 1
+        self.coalesced_by_tool[tool_name] = self.coalesced_by_tool.get(tool_name, 0) + 1
+        result = await asyncio.shield(call.task)
+        return _copy_result(result)
+
+    def _forget(self, key: str, call: "_Call") -> None:
+        if self._inflight.get(key) is call:
+            del self._inflight[key]
+
+
+@dataclass
+class _Call:
+    """一次进行中的调用"""
+
+    task: asyncio.Future
+    shared: bool = False
+
+
+def _copy_result(result: dict[str, Any]) -> dict[str, Any]:
+    """共享结果的独立拷贝"""
+    return orjson.loads(orjson.dumps(result))
+
+
+# SingleFlight 单例
+_single_flight: SingleFlight | None = None
+
+
+def get_single_flight() -> SingleFlight | None:
+    """根据配置创建单例，TOOL_SINGLE_FLIGHT=false 时返回 None"""
+    global _single_flight
+    if _single_flight is None:
+        settings = get_settings()
+        if not settings.tool_single_flight:
+            return None
+        tools = {t.strip() for t in settings.tool_single_flight_tools.split(",") if t.strip()}
+        _single_flight = SingleFlight(tools=tools or None)
+    return _single_flight
@@ -4,17 +4,25 @@ Verifier Agent Node implementation.
 对候选商品进行实时核验。
 """
 
+import asyncio
+import functools
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
 from datetime import UTC
+from typing import Any
 
 import structlog
 
 from ..config import get_settings
 from ..graph.state import AgentState
+from ..graph.streaming import get_event_writer
+from ..llm.budget import TokenBudget
 from ..llm.client import call_llm_and_parse
 from ..llm.prompts import VERIFIER_PROMPT
 from ..llm.schemas import VerificationResult
+from ..shipping import packaging_of
 from ..tools.compliance import check_compliance
-from ..tools.pricing import get_realtime_quote
+from ..tools.pricing import get_realtime_quotes
 from ..tools.shipping import quote_shipping_options
 
 logger = structlog.get_logger()
@@ -24,7 +32,9 @@ async def verifier_node(state: AgentState) -> AgentState:
     """
     Verifier Agent 节点
 
-    对候选进行实时核验
+    对候选进行实时核验。整批候选的价格由一次批量报价获取，
+    合规/物流检查并发执行，受 verify_concurrency 信号量限制；超过 verify_deadline_seconds
+    仍未完成的候选会被标记为超时，返回已完成的部分结果。
     """
     logger.info("verifier_node.start")
 
@@ -48,147 +58,58 @@ async def verifier_node(state: AgentState) -> AgentState:
                 "current_step": "verifier",
             }
 
-        destination_country = mission.get("destination_country", "US")
-        budget_amount = mission.get("budget_amount", float("inf"))
+        settings = get_settings()
+        semaphore = asyncio.Semaphore(max(1, settings.verify_concurrency))
 
         verified_candidates = []
         rejected_candidates = []
         tool_calls = state.get("tool_calls", [])
 
-        # 对每个候选进行核验（限制数量以控制成本）
-        for candidate in candidates[:10]:
-            offer_id = candidate.get("offer_id")
-            sku_id = None
-
-            # 获取默认 SKU
-            skus = candidate.get("variants", {}).get("skus", [])
-            if skus:
-                sku_id = skus[0].get("sku_id")
-
-            logger.info("verifier_node.checking", offer_id=offer_id, sku_id=sku_id)
-
-            verification_result = {
-                "offer_id": offer_id,
-                "sku_id": sku_id,
-                "candidate": candidate,
-                "checks": {},
-                "passed": True,
-                "warnings": [],
-                "rejection_reason": None,
-            }
-
-            # 1. 价格核验
-            try:
-                price_result = await get_realtime_quote(
-                    sku_id=sku_id or offer_id,
-                    quantity=mission.get("quantity", 1),
-                    destination_country=destination_country,
-                )
-
-                if price_result.get("ok"):
-                    price_data = price_result.get("data", {})
-                    total_price = price_data.get("total_price", 0)
-                    verification_result["checks"]["pricing"] = {
-                        "passed": True,
-                        "unit_price": price_data.get("unit_price"),
-                        "total_price": total_price,
-                        "stock": price_data.get("stock_available"),
-                    }
-
-                    # 检查是否超预算
-                    if total_price > budget_amount:
-                        verification_result["passed"] = False
-                        verification_result["rejection_reason"] = f"Price ${total_price} exceeds budget ${budget_amount}"
-
-                    tool_calls.append({
-                        "tool_name": "pricing.get_realtime_quote",
-                        "request": {"sku_id": sku_id, "offer_id": offer_id},
-                        "response_summary": {"total_price": total_price},
-                        "called_at": _now_iso(),
-                    })
-                else:
-                    verification_result["checks"]["pricing"] = {"passed": False, "error": "Quote failed"}
-                    verification_result["warnings"].append("Could not get real-time price")
-
-            except Exception as e:
-                logger.warning("verifier_node.price_check_failed", offer_id=offer_id, error=str(e))
-                verification_result["checks"]["pricing"] = {"passed": False, "error": str(e)}
-
-            # 2. 合规检查
-            try:
-                compliance_result = await check_compliance(
-                    sku_id=sku_id or offer_id,
-                    destination_country=destination_country,
-                )
-
-                if compliance_result.get("ok"):
-                    compliance_data = compliance_result.get("data", {})
-                    is_allowed = compliance_data.get("allowed", True)
-                    verification_result["checks"]["compliance"] = {
-                        "passed": is_allowed,
-                        "issues": compliance_data.get("issues", []),
-                        "required_docs": compliance_data.get("required_docs", []),
-                        "warnings": compliance_data.get("warnings", []),
-                    }
-
-                    if not is_allowed:
-                        verification_result["passed"] = False
-                        issues = compliance_data.get("issues", [])
-                        reason = issues[0].get("message_en") if issues else "Compliance blocked"
-                        verification_result["rejection_reason"] = reason
-
-                    # 添加警告
-                    for warning in compliance_data.get("warnings", []):
-                        verification_result["warnings"].append(warning)
-
-                    tool_calls.append({
-                        "tool_name": "compliance.check_item",
-                        "request": {"offer_id": offer_id, "destination_country": destination_country},
-                        "response_summary": {"allowed": is_allowed},
-                        "called_at": _now_iso(),
-                    })
-
-            except Exception as e:
-                logger.warning("verifier_node.compliance_check_failed", offer_id=offer_id, error=str(e))
-                verification_result["checks"]["compliance"] = {"passed": True, "error": str(e)}
-                verification_result["warnings"].append("Compliance check unavailable")
-
-            # 3. 运输检查
-            try:
-                shipping_result = await quote_shipping_options(
-                    items=[{"sku_id": sku_id or offer_id, "qty": mission.get("quantity", 1)}],
-                    destination_country=destination_country,
-                )
-
-                if shipping_result.get("ok"):
-                    shipping_data = shipping_result.get("data", {})
-                    options = shipping_data.get("options", [])
-                    verification_result["checks"]["shipping"] = {
-                        "passed": len(options) > 0,
-                        "options_count": len(options),
-                        "fastest_days": min((o.get("eta_min_days", 99) for o in options), default=99),
-                        "cheapest_price": min((o.get("price", 999) for o in options), default=999),
-                    }
-
-                    # 检查是否能在期限内送达
-                    arrival_max = mission.get("arrival_days_max")
-                    if arrival_max:
-                        fastest = min((o.get("eta_min_days", 99) for o in options), default=99)
-                        if fastest > arrival_max:
-                            verification_result["warnings"].append(
-                                f"Fastest shipping ({fastest} days) exceeds deadline ({arrival_max} days)"
-                            )
-
-                    tool_calls.append({
-                        "tool_name": "shipping.quote_options",
-                        "request": {"destination_country": destination_country},
-                        "response_summary": {"options_count": len(options)},
-                        "called_at": _now_iso(),
-                    })
+        # 对每个候选并发核验（限制数量以控制成本）
+        # 多商品任务的候选按槽位轮流排列，至少保证每个槽位核验一个
+        limit = max(settings.verify_max_candidates, len(mission.get("basket") or []))
+        batch = candidates[:limit]
+        # 整批候选共享一次批量报价，各候选的价格检查按位置取结果
+        quotes = asyncio.create_task(
+            get_realtime_quotes(
+                items=[
+                    {"sku_id": _default_sku_ref(candidate), "qty": _quantity(candidate, mission)}
+                    for candidate in batch
+                ],
+                destination_country=mission.get("destination_country", "US"),
+            )
+        )
+        tasks = [
+            asyncio.create_task(_verify_candidate(candidate, mission, semaphore, quotes, index))
+            for index, candidate in enumerate(batch)
+        ]
+        # 流式运行时每个候选核验完成即推送，不等待整批
+        write_event = get_event_writer()
+        for index, task in enumerate(tasks):
+            task.add_done_callback(functools.partial(_emit_verified, write_event, index))
+        done, pending = await asyncio.wait(tasks, timeout=settings.verify_deadline_seconds)
+        for task in pending:
+            task.cancel()
+        if pending:
+            # 超时候选可能仍在等待批量报价，一并取消
+            quotes.cancel()
+            await asyncio.gather(*pending, quotes, return_exceptions=True)
+            logger.warning(
+                "verifier_node.deadline_exceeded",
+                deadline_seconds=settings.verify_deadline_seconds,
+                completed=len(done),
+                timed_out=len(pending),
+            )
+
+        # 按候选原始顺序合并结果，保证输出确定
+        for candidate, task in zip(batch, tasks, strict=True):
+            if task in pending:
+                verification_result = _timed_out_result(candidate, mission)
+                candidate_calls = []
+            else:
+                verification_result, candidate_calls = task.result()
 
-            except Exception as e:
-                logger.warning("verifier_node.shipping_check_failed", offer_id=offer_id, error=str(e))
-                verification_result["checks"]["shipping"] = {"passed": True, "error": str(e)}
+            tool_calls.extend(candidate_calls)
 
             # 分类结果
             if verification_result["passed"]:
@@ -196,11 +117,11 @@ async def verifier_node(state: AgentState) -> AgentState:
             else:
                 rejected_candidates.append(verification_result)
 
-        # 使用 LLM 进行综合排序和推荐（如果有 API Key）
-        settings = get_settings()
+        # 使用 LLM 进行综合排序和推荐（如果有 API Key 且预算足够）
+        budget = TokenBudget.from_state(state)
         if settings.openai_api_key and verified_candidates:
             try:
-                llm_result = await _llm_rank_candidates(mission, verified_candidates)
+                llm_result = await _llm_rank_candidates(mission, verified_candidates, budget)
                 if llm_result:
                     verified_candidates = llm_result.get("ranked_candidates", verified_candidates)
             except Exception as e:
@@ -215,6 +136,7 @@ async def verifier_node(state: AgentState) -> AgentState:
             "verifier_node.complete",
             verified_count=len(verified_candidates),
             rejected_count=len(rejected_candidates),
+            timed_out_count=len(pending),
         )
 
         return {
@@ -224,6 +146,7 @@ async def verifier_node(state: AgentState) -> AgentState:
             "tool_calls": tool_calls,
             "current_step": "verifier_complete",
             "error": None,
+            **budget.state_updates(),
         }
 
     except Exception as e:
@@ -236,8 +159,288 @@ async def verifier_node(state: AgentState) -> AgentState:
         }
 
 
-async def _llm_rank_candidates(mission: dict, candidates: list) -> dict | None:
-    """使用 LLM 对候选进行综合排序"""
+@dataclass
+class _CheckOutcome:
+    """单项检查结果，由 _verify_candidate 按固定顺序合并"""
+
+    check: dict | None = None
+    rejection_reason: str | None = None
+    warnings: list[str] = field(default_factory=list)
+    tool_call: dict | None = None
+
+
+async def _verify_candidate(
+    candidate: dict,
+    mission: dict,
+    semaphore: asyncio.Semaphore,
+    quotes: asyncio.Task,
+    index: int,
+) -> tuple[dict, list[dict]]:
+    """
+    并发执行单个候选的三项检查，返回 (核验结果, 工具调用记录)
+
+    价格检查不占用信号量：只等待整批共享的批量报价 quotes，取第 index 个结果。
+    """
+    offer_id = candidate.get("offer_id")
+    sku_id = _default_sku_id(candidate)
+
+    logger.info("verifier_node.checking", offer_id=offer_id, sku_id=sku_id)
+
+    destination_country = mission.get("destination_country", "US")
+    quantity = _quantity(candidate, mission)
+    sku_ref = _default_sku_ref(candidate)
+
+    verification_result = {
+        "offer_id": offer_id,
+        "sku_id": sku_id,
+        "quantity": quantity,
+        "candidate": candidate,
+        "checks": {},
+        "passed": True,
+        "warnings": [],
+        "rejection_reason": None,
+    }
+
+    outcomes = await asyncio.gather(
+        _check_pricing(offer_id, sku_id, sku_ref, mission, quotes, index),
+        _limited(semaphore, _check_compliance, offer_id, sku_ref, destination_country, candidate),
+        _limited(semaphore, _check_shipping, offer_id, sku_ref, quantity, mission, candidate),
+    )
+
+    # 合并顺序固定为 价格 → 合规 → 运输，与串行实现一致
+    tool_calls = []
+    for name, outcome in zip(("pricing", "compliance", "shipping"), outcomes, strict=True):
+        if outcome.check is not None:
+            verification_result["checks"][name] = outcome.check
+        if outcome.rejection_reason is not None:
+            verification_result["passed"] = False
+            verification_result["rejection_reason"] = outcome.rejection_reason
+        verification_result["warnings"].extend(outcome.warnings)
+        if outcome.tool_call is not None:
+            tool_calls.append(outcome.tool_call)
+
+    return verification_result, tool_calls
+
+
+def _quantity(candidate: dict, mission: dict) -> int:
+    """核验数量：多商品任务的候选按所属槽位的数量"""
+    return candidate.get("basket_quantity") or mission.get("quantity", 1)
+
+
+def _default_sku_id(candidate: dict) -> str | None:
+    """候选的默认 SKU（第一个变体）"""
+    skus = candidate.get("variants", {}).get("skus", [])
+    return skus[0].get("sku_id") if skus else None
+
+
+def _default_sku_ref(candidate: dict) -> str | None:
+    """工具调用使用的 SKU 引用：没有变体时用 offer_id"""
+    return _default_sku_id(candidate) or candidate.get("offer_id")
+
+
+def _emit_verified(write_event: Callable[..., None], index: int, task: asyncio.Task) -> None:
+    """候选核验 task 完成回调：推送 candidate_verified 事件（超时取消的不推送）"""
+    if task.cancelled() or task.exception() is not None:
+        return
+    result, _ = task.result()
+    write_event(
+        "candidate_verified",
+        node="verify",
+        index=index,
+        offer_id=result["offer_id"],
+        sku_id=result["sku_id"],
+        passed=result["passed"],
+        rejection_reason=result["rejection_reason"],
+        total_price=result["checks"].get("pricing", {}).get("total_price"),
+        warnings=result["warnings"],
+    )
+
+
+async def _limited(
+    semaphore: asyncio.Semaphore,
+    check: Callable[..., Awaitable[_CheckOutcome]],
+    *args: Any,
+) -> _CheckOutcome:
+    """在信号量保护下执行检查"""
+    async with semaphore:
+        return await check(*args)
+
+
+async def _check_pricing(
+    offer_id: str | None,
+    sku_id: str | None,
+    sku_ref: str | None,
+    mission: dict,
+    quotes: asyncio.Task,
+    index: int,
+) -> _CheckOutcome:
+    """1. 价格核验（从整批报价结果中取本候选的报价）"""
+    outcome = _CheckOutcome()
+    # 没有预算（None）视为不限
+    budget_amount = mission.get("budget_amount") or float("inf")
+    try:
+        # shield：单个候选超时取消时不影响其他候选共享的批量报价
+        price_result = _quote_at(await asyncio.shield(quotes), index, sku_ref)
+
+        if price_result.get("ok"):
+            price_data = price_result.get("data", {})
+            total_price = price_data.get("total_price", 0)
+            outcome.check = {
+                "passed": True,
+                "unit_price": price_data.get("unit_price"),
+                "total_price": total_price,
+                "stock": price_data.get("stock_available"),
+            }
+
+            # 检查是否超预算
+            if total_price > budget_amount:
+                outcome.rejection_reason = f"Price ${total_price} exceeds budget ${budget_amount}"
+
+            outcome.tool_call = {
+                "tool_name": "pricing.get_realtime_quotes",
+                "request": {"sku_id": sku_id, "offer_id": offer_id},
+                "response_summary": {"total_price": total_price},
+                "called_at": _now_iso(),
+            }
+        else:
+            outcome.check = {"passed": False, "error": "Quote failed"}
+            outcome.warnings.append("Could not get real-time price")
+
+    except Exception as e:
+        logger.warning("verifier_node.price_check_failed", offer_id=offer_id, error=str(e))
+        outcome.check = {"passed": False, "error": str(e)}
+
+    return outcome
+
+
+def _quote_at(batch_result: dict, index: int, sku_ref: str | None) -> dict:
+    """把批量报价中第 index 个条目还原为单条报价的 Envelope，保留逐条错误"""
+    if not batch_result.get("ok"):
+        return batch_result
+    data = batch_result.get("data", {})
+    quote = data.get("quotes", [])[index]
+    if quote is None:
+        return {"ok": False, "error": data.get("errors", {}).get(sku_ref, {})}
+    return {"ok": True, "data": quote}
+
+
+async def _check_compliance(
+    offer_id: str | None,
+    sku_ref: str | None,
+    destination_country: str,
+    candidate: dict,
+) -> _CheckOutcome:
+    """2. 合规检查（COMPLIANCE_BACKEND=local 时用候选的 AROC 在本地评估）"""
+    outcome = _CheckOutcome()
+    try:
+        compliance_result = await check_compliance(
+            sku_id=sku_ref,
+            destination_country=destination_country,
+            item=candidate,
+        )
+
+        if compliance_result.get("ok"):
+            compliance_data = compliance_result.get("data", {})
+            is_allowed = compliance_data.get("allowed", True)
+            outcome.check = {
+                "passed": is_allowed,
+                "issues": compliance_data.get("issues", []),
+                "required_docs": compliance_data.get("required_docs", []),
+                "warnings": compliance_data.get("warnings", []),
+            }
+
+            if not is_allowed:
+                issues = compliance_data.get("issues", [])
+                outcome.rejection_reason = (
+                    issues[0].get("message_en") if issues else "Compliance blocked"
+                )
+
+            # 添加警告
+            outcome.warnings.extend(compliance_data.get("warnings", []))
+
+            outcome.tool_call = {
+                "tool_name": "compliance.check_item",
+                "request": {"offer_id": offer_id, "destination_country": destination_country},
+                "response_summary": {"allowed": is_allowed},
+                "called_at": _now_iso(),
+            }
+
+    except Exception as e:
+        logger.warning("verifier_node.compliance_check_failed", offer_id=offer_id, error=str(e))
+        outcome.check = {"passed": True, "error": str(e)}
+        outcome.warnings.append("Compliance check unavailable")
+
+    return outcome
+
+
+async def _check_shipping(
+    offer_id: str | None,
+    sku_ref: str | None,
+    quantity: int,
+    mission: dict,
+    candidate: dict,
+) -> _CheckOutcome:
+    """3. 运输检查（带上候选的包装信息，SHIPPING_QUOTE_BACKEND=local 时按包裹画像报价）"""
+    outcome = _CheckOutcome()
+    destination_country = mission.get("destination_country", "US")
+    item = {"sku_id": sku_ref, "qty": quantity, **(packaging_of(candidate, sku_ref) or {})}
+    try:
+        shipping_result = await quote_shipping_options(
+            items=[item],
+            destination_country=destination_country,
+            destination_postal_code=mission.get("destination_postal_code"),
+        )
+
+        if shipping_result.get("ok"):
+            shipping_data = shipping_result.get("data", {})
+            options = shipping_data.get("options", [])
+            fastest = min((o.get("eta_min_days", 99) for o in options), default=99)
+            outcome.check = {
+                "passed": len(options) > 0,
+                "options_count": len(options),
+                "fastest_days": fastest,
+                "cheapest_price": min((o.get("price", 999) for o in options), default=999),
+                # 方案阶段据此选择物流组合，单商品方案无需重新报价
+                "options": options,
+            }
+
+            # 检查是否能在期限内送达
+            arrival_max = mission.get("arrival_days_max")
+            if arrival_max and fastest > arrival_max:
+                outcome.warnings.append(
+                    f"Fastest shipping ({fastest} days) exceeds deadline ({arrival_max} days)"
+                )
+
+            outcome.tool_call = {
+                "tool_name": "shipping.quote_options",
+                "request": {"destination_country": destination_country},
+                "response_summary": {"options_count": len(options)},
+                "called_at": _now_iso(),
+            }
+
+    except Exception as e:
+        logger.warning("verifier_node.shipping_check_failed", offer_id=offer_id, error=str(e))
+        outcome.check = {"passed": True, "error": str(e)}
+
+    return outcome
+
+
+def _timed_out_result(candidate: dict, mission: dict) -> dict:
+    """超过核验 deadline 的候选，按未通过处理；字段与正常核验结果一致"""
+    return {
+        "offer_id": candidate.get("offer_id"),
+        "sku_id": _default_sku_id(candidate),
+        "quantity": _quantity(candidate, mission),
+        "candidate": candidate,
+        "checks": {},
+        "passed": False,
+        "warnings": [],
+        "rejection_reason": "Verification deadline exceeded",
+    }
+
+
+async def _llm_rank_candidates(mission: dict, candidates: list, budget: TokenBudget) -> dict | None:
+    """使用 LLM 对候选进行综合排序；预算不足时跳过，返回 None"""
     try:
         # 简化候选信息
         simplified_candidates = []
@@ -255,12 +458,18 @@ async def _llm_rank_candidates(mission: dict, candidates: list) -> dict | None:
             {"role": "user", "content": f"Mission: {mission}\n\nCandidates: {simplified_candidates}"},
         ]
 
+        if not budget.allows("verify.rank", messages):
+            return None
+
+        usage: dict[str, int] = {}
         result = await call_llm_and_parse(
             messages=messages,
             output_schema=VerificationResult,
             model_type="planner",
             temperature=0.0,
+            usage=usage,
         )
+        budget.record("verify", usage)
 
         if result:
             return {"ranked_candidates": candidates, "llm_recommendation": result}
@@ -74,6 +74,92 @@ class TestAgentFlow:
         assert result["error"] is None or result.get("candidates") is not None
         assert result["current_step"] in ["candidate_complete", "candidate"]
 
+    @pytest.fixture
+    def verify_state(self):
+        """核验节点输入状态"""
+        return {
+            "mission": {
+                "destination_country": "US",
+                "budget_amount": 100.0,
+                "quantity": 1,
+            },
+            "candidates": [
+                {
+                    "offer_id": f"of_{i:03d}",
+                    "variants": {"skus": [{"sku_id": f"sku_{i:03d}"}]},
+                }
+                for i in range(5)
+            ],
+            "tool_calls": [],
+        }
+
+    @pytest.mark.asyncio
+    async def test_verifier_node_mock(self, verify_state, monkeypatch):
+        """测试 Verifier 节点（mock 模式）"""
+        from src.verifier import node
+
+        quote_batches = []
+        original_quotes = node.get_realtime_quotes
+
+        async def counting_quotes(items, **kwargs):
+            quote_batches.append(items)
+            return await original_quotes(items, **kwargs)
+
+        monkeypatch.setattr(node, "get_realtime_quotes", counting_quotes)
+
+        result = await node.verifier_node(verify_state)
+
+        assert result["error"] is None
+        assert result["current_step"] == "verifier_complete"
+        assert len(result["verified_candidates"]) == 5
+        assert {"pricing", "compliance", "shipping"} <= set(
+            result["verified_candidates"][0]["checks"]
+        )
+        # 每个候选 3 次工具调用
+        assert len(result["tool_calls"]) == 15
+        # 整批候选只发起一次批量报价
+        assert len(quote_batches) == 1
+        assert [item["sku_id"] for item in quote_batches[0]] == [f"sku_{i:03d}" for i in range(5)]
+
+    @pytest.mark.asyncio
+    async def test_verifier_node_without_budget(self, verify_state):
+        """没有预算（budget_amount 为 None）时不限价格"""
+        from src.verifier import node
+
+        verify_state["mission"]["budget_amount"] = None
+
+        result = await node.verifier_node(verify_state)
+
+        assert result["error"] is None
+        assert len(result["verified_candidates"]) == 5
+
+    @pytest.mark.asyncio
+    async def test_verifier_node_deadline(self, verify_state, monkeypatch):
+        """测试核验 deadline：超时候选被拒绝，其余候选正常返回"""
+        import asyncio
+
+        from src.config import get_settings
+        from src.verifier import node
+
+        original_check = node.check_compliance
+
+        async def slow_check(sku_id, **kwargs):
+            if sku_id == "sku_002":
+                await asyncio.sleep(5)
+            return await original_check(sku_id=sku_id, **kwargs)
+
+        monkeypatch.setattr(node, "check_compliance", slow_check)
+        monkeypatch.setattr(get_settings(), "verify_deadline_seconds", 0.2)
+
+        result = await node.verifier_node(verify_state)
+
+        assert result["current_step"] == "verifier_complete"
+        assert len(result["verified_candidates"]) == 4
+        assert [r["offer_id"] for r in result["rejected_candidates"]] == ["of_002"]
+        timed_out = result["rejected_candidates"][0]
+        assert timed_out["rejection_reason"] == "Verification deadline exceeded"
+        assert timed_out["quantity"] == verify_state["mission"]["quantity"]
+
     @pytest.mark.asyncio
     async def test_plan_node_mock(self):
         """测试 Plan 节点"""
@@ -0,0 +1,131 @@
+"""
+多商品篮子规划测试
+"""
+
+import importlib
+import itertools
+import os
+import random
+
+import pytest
+
+os.environ["MOCK_TOOLS"] = "true"
+
+from src.execution.basket import BasketOption, basket_cost, solve_basket  # noqa: E402
+from src.intent.rules import parse_intent  # noqa: E402
+
+# execution/__init__ 导出的 plan_node 函数与模块同名，按模块路径取
+plan_module = importlib.import_module("src.execution.plan_node")
+
+
+def test_parse_basket_slots():
+    result = parse_intent("iPhone charger, 3 usb-c cables and a case under $60 to US").result
+    assert [(s.category, s.search_query, s.quantity) for s in result.basket] == [
+        ("charger", "iPhone charger", 1),
+        ("cable", "USB-C cable", 3),
+        ("phone_case", "phone case", 1),
+    ]
+    assert result.budget_amount == 60.0
+    # 单一品类不是篮子
+    assert parse_intent("2 wireless chargers to US under $50").result.basket == []
+
+
+def test_solve_basket_matches_brute_force():
+    rng = random.Random(11)
+    for _ in range(200):
+        slots = [
+            [
+                BasketOption(
+                    price=round(rng.uniform(5, 60), 2),
+                    shipping=round(rng.uniform(2, 15), 2),
+                    group=(f"m{rng.randrange(3)}", "CN"),
+                )
+                for _ in range(rng.randint(1, 5))
+            ]
+            for _ in range(rng.randint(1, 4))
+        ]
+        best = min(basket_cost(combo) for combo in itertools.product(*slots))
+        budget = rng.choice([None, rng.uniform(20, 150)])
+
+        solution = solve_basket(slots, budget)
+        if budget is not None and best > budget:
+            assert solution is None
+            continue
+        assert solution.optimal
+        assert solution.cost == pytest.approx(best, abs=0.01)
+        picked = [slots[s][i] for s, i in enumerate(solution.picks)]
+        assert basket_cost(picked) == pytest.approx(best)
+
+    # 节点上限内没有证明最优时返回启发式解
+    row = [BasketOption(price=10.0 + i, shipping=5.0, group=(f"m{i}", "CN")) for i in range(5)]
+    slots = [row] * 6
+    heuristic = solve_basket(slots, max_nodes=0)
+    assert not heuristic.optimal and heuristic.cost == 65.0
+    assert solve_basket([[], slots[0]]) is None
+
+
+@pytest.mark.asyncio
+async def test_basket_plans_consolidate_merchants(monkeypatch):
+    quoted = []
+
+    async def fake_quote(items, **kwargs):
+        quoted.append(sorted(item["sku_id"] for item in items))
+        return {
+            "ok": True,
+            "data": {
+                "options": [
+                    {"shipping_option_id": "ship_standard", "carrier": "Standard Shipping",
+                     "price": 6.0, "eta_min_days": 5, "eta_max_days": 9},
+                ],
+            },
+        }
+
+    def verified(offer_id: str, slot: int, merchant_id: str, price: float, options: list) -> dict:
+        return {
+            "offer_id": offer_id,
+            "sku_id": f"sku_{offer_id}",
+            "quantity": 1,
+            "candidate": {"offer_id": offer_id, "merchant_id": merchant_id, "basket_slot": slot},
+            "checks": {
+                "pricing": {"unit_price": price, "total_price": price},
+                "shipping": {"options": options},
+            },
+            "warnings": [],
+        }
+
+    standard = [{"shipping_option_id": "ship_standard", "carrier": "Standard Shipping",
+                 "price": 6.0, "eta_min_days": 5, "eta_max_days": 9}]
+    express = [{"shipping_option_id": "ship_express", "carrier": "Express Shipping",
+                "price": 14.0, "eta_min_days": 2, "eta_max_days": 3}]
+    candidates = [
+        # 充电器：m_1 略贵但可以与 m_1 的数据线合并发货
+        verified("charger_m1", 0, "m_1", 20.0, standard),
+        verified("charger_m2", 0, "m_2", 18.0, standard),
+        verified("cable_m1", 1, "m_1", 8.0, standard),
+        verified("cable_m3", 1, "m_3", 7.0, standard + express),
+    ]
+    mission = {
+        "destination_country": "US",
+        "budget_amount": 60.0,
+        "arrival_days_max": 10,
+        "basket": [
+            {"category": "charger", "search_query": "charger", "quantity": 1},
+            {"category": "cable", "search_query": "cable", "quantity": 1},
+            {"category": "phone_case", "search_query": "phone case", "quantity": 1},
+        ],
+    }
+    monkeypatch.setattr(plan_module, "quote_shipping_options", fake_quote)
+
+    plans = await plan_module._basket_plans(candidates, mission)
+
+    budget = plans[0]
+    assert budget.plan_name == "Budget Saver"
+    assert [i.offer_id for i in budget.items] == ["charger_m1", "cable_m1"]
+    assert quoted[0] == ["sku_cable_m1", "sku_charger_m1"]
+    assert budget.total.subtotal == 28.0 and budget.total.shipping_cost == 6.0
+    assert "No verified candidate for: phone case" in budget.risks
+    # 缺少槽位的篮子不是完整方案，置信度随之降低
+    assert budget.confidence == 0.6
+
+    # 最早到齐为第 9 天（充电器没有快递），与不限期限的组合相同，Best Value 也一样：只有一个方案
+    assert len(plans) == 1
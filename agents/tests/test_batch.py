@@ -0,0 +1,117 @@
+"""
+批量运行器测试
+"""
+
+import asyncio
+import io
+import os
+
+import orjson
+import pytest
+
+from src.batch import BatchRunner, MissionInput, parse_line, percentile, read_missions
+
+os.environ["MOCK_TOOLS"] = "true"
+
+
+def test_parse_line():
+    assert parse_line('{"id": "a", "message": "hi"}', 1) == MissionInput("a", "hi")
+    assert parse_line('{"query": "hi"}', 7) == MissionInput("7", "hi")
+    assert parse_line('"hi"', 3) == MissionInput("3", "hi")
+    assert parse_line("  ", 4) is None
+    with pytest.raises(ValueError):
+        parse_line('{"id": "x"}', 5)
+
+
+def test_percentile():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile(values, 99) == 99
+    assert percentile([], 50) == 0
+
+
+@pytest.mark.asyncio
+async def test_bounded_concurrency_timeouts_and_errors():
+    active = 0
+    peak = 0
+
+    async def runner(message: str) -> dict:
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        try:
+            if message == "slow":
+                await asyncio.sleep(1)
+            await asyncio.sleep(0.01)
+            if message == "boom":
+                raise RuntimeError("boom")
+            if message == "bad":
+                return {"error": "no plan", "error_code": "NOT_FOUND"}
+            return {"current_step": "waiting_user", "plans": [{}]}
+        finally:
+            active -= 1
+
+    messages = ["ok"] * 8 + ["slow", "boom", "bad"]
+    missions = (MissionInput(str(i), m) for i, m in enumerate(messages))
+    output = io.BytesIO()
+
+    report = await BatchRunner(runner, concurrency=3, timeout=0.2).run(missions, output)
+
+    assert peak == 3
+    assert (report.total, report.ok, report.errors, report.timeouts) == (11, 8, 2, 1)
+    assert report.error_rate == pytest.approx(3 / 11)
+    assert report.error_codes == {"TIMEOUT": 1, "INTERNAL_ERROR": 1, "NOT_FOUND": 1}
+    assert report.latency_ms["p50"] > 0
+
+    rows = [orjson.loads(line) for line in output.getvalue().splitlines()]
+    assert sorted(r["id"] for r in rows) == sorted(str(i) for i in range(11))
+    assert next(r for r in rows if r["id"] == "0")["plans_count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_runs_missions_through_graph(tmp_path):
+    os.environ.pop("OPENAI_API_KEY", None)
+    path = tmp_path / "missions.jsonl"
+    path.write_text(
+        '{"id": "de", "message": "wireless charger, budget $50, shipping to Germany"}\n'
+        "\n"
+        '{"id": "jp", "message": "phone case, budget $20, shipping to Japan"}\n',
+        encoding="utf-8",
+    )
+
+    report = await BatchRunner(concurrency=2).run(read_missions(path))
+
+    assert report.total == 2
+    assert report.error_rate == 0
+    assert report.throughput_per_second > 0
+
+
+@pytest.mark.asyncio
+async def test_invalid_lines_do_not_stall_the_batch(tmp_path):
+    async def runner(message: str) -> dict:
+        return {"current_step": "waiting_user"}
+
+    path = tmp_path / "missions.jsonl"
+    path.write_text(
+        '{"id": "a", "message": "hi"}\n{not json\n{"id": "b"}\n[1,2]\n42\n', encoding="utf-8"
+    )
+    output = io.BytesIO()
+
+    report = await asyncio.wait_for(
+        BatchRunner(runner, concurrency=2).run(read_missions(path), output), 3
+    )
+
+    assert (report.total, report.ok, report.errors) == (5, 1, 4)
+    assert report.error_codes == {"INVALID_ARGUMENT": 4}
+    rows = {r["id"]: r for r in map(orjson.loads, output.getvalue().splitlines())}
+    assert rows["2"]["status"] == "error" and rows["3"]["error_code"] == "INVALID_ARGUMENT"
+    assert rows["4"]["status"] == rows["5"]["status"] == "error"
+
+    # 输入迭代器本身抛错：worker 正常退出，异常由 run 抛出而不是挂起
+    def broken():
+        yield MissionInput("a", "hi")
+        raise OSError("disk gone")
+
+    with pytest.raises(OSError):
+        await asyncio.wait_for(BatchRunner(runner, concurrency=2).run(broken()), 3)
@@ -0,0 +1,86 @@
+"""
+基准套件的 Tool Gateway 替身测试
+"""
+
+import pytest
+
+from benchmarks.gateway import GatewayProfile, MockGateway
+from benchmarks.run import compare
+from src.resilience import Resilience, get_resilience, set_resilience
+from src.tools.base import call_tool
+from src.tools.cache import get_response_cache, set_response_cache
+from src.tools.http_client import get_gateway_client, set_gateway_client
+
+
+@pytest.fixture
+def install_gateway():
+    """安装替身网关，关闭缓存、重试与熔断，结束后恢复原有单例"""
+    previous = (get_gateway_client(), get_response_cache(), get_resilience())
+
+    def install(profile: GatewayProfile) -> MockGateway:
+        gateway = MockGateway(profile)
+        gateway.install()
+        set_response_cache(None)
+        set_resilience(Resilience(max_attempts=1, failure_threshold=1000))
+        return gateway
+
+    yield install
+
+    set_gateway_client(previous[0])
+    set_response_cache(previous[1])
+    set_resilience(previous[2])
+
+
+@pytest.mark.asyncio
+async def test_serves_tool_routes(install_gateway):
+    gateway = install_gateway(GatewayProfile(latency_ms=1))
+
+    search = await call_tool("core", "catalog.search_offers", {"query": "x", "limit": 3})
+    cards = await call_tool("core", "catalog.get_offer_cards", {"offer_ids": ["of_000001"]})
+    quote = await call_tool("core", "pricing.get_realtime_quote", {"sku_id": "sku_1"})
+    missing = await call_tool("core", "catalog.unknown", {})
+
+    assert search["data"]["offer_ids"] == ["of_000001", "of_000002", "of_000003"]
+    assert cards["data"]["offer_cards"][0]["offer_id"] == "of_000001"
+    assert quote["data"]["unit_price"] == (await call_tool(
+        "core", "pricing.get_realtime_quote", {"sku_id": "sku_1"}
+    ))["data"]["unit_price"]
+    assert missing["error"]["http_status"] == 404
+    assert gateway.requests["pricing.get_realtime_quote"] == 2
+
+
+@pytest.mark.asyncio
+async def test_injects_errors_and_timeouts(install_gateway):
+    gateway = install_gateway(GatewayProfile(error_rate=0.5, timeout_rate=0.5))
+
+    results = [
+        await call_tool("core", "compliance.check_item", {"sku_id": f"sku_{i}"})
+        for i in range(20)
+    ]
+
+    codes = {r["error"]["code"] for r in results}
+    assert codes == {"UPSTREAM_ERROR", "TIMEOUT"}
+    assert sum(gateway.injected_errors.values()) == 20
+
+
+def test_compare_skips_small_node_latencies():
+    baseline = {
+        "node.plan.p50_ms": 2.2,
+        "node.verify.p50_ms": 28.0,
+        "e2e_p99_ms": 100.0,
+        "tool_calls_per_mission": 23.0,
+        "throughput_per_second": 30.0,
+    }
+    metrics = {
+        "node.plan.p50_ms": 3.6,
+        "node.verify.p50_ms": 40.0,
+        "e2e_p99_ms": 300.0,
+        "tool_calls_per_mission": 23.0,
+        "throughput_per_second": 20.0,
+    }
+
+    # 几毫秒的节点延迟与 p99 只展示；其余指标照常按容差判断
+    assert compare(metrics, baseline, 0.25) == [
+        "node.verify.p50_ms: 28.00 -> 40.00 (+43%)",
+        "throughput_per_second: 30.00 -> 20.00 (-33%)",
+    ]
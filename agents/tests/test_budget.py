@@ -0,0 +1,112 @@
+"""
+Token 预算测试
+"""
+
+import importlib
+import os
+
+import pytest
+
+os.environ["MOCK_TOOLS"] = "true"
+
+from src.llm.budget import TokenBudget, estimate_tokens  # noqa: E402
+from src.llm.schemas import PlanRecommendation  # noqa: E402
+
+
+def _plan_state(**overrides) -> dict:
+    state = {
+        "mission": {
+            "destination_country": "US",
+            "budget_amount": 100.0,
+            "quantity": 1,
+            "objective_weights": {"price": 0.4, "speed": 0.3, "risk": 0.3},
+        },
+        "verified_candidates": [
+            {
+                "offer_id": "of_001",
+                "sku_id": "sku_001",
+                "candidate": {"titles": [{"lang": "en", "text": "Test Product"}]},
+                "checks": {
+                    "pricing": {"passed": True, "unit_price": 29.99, "total_price": 29.99},
+                    "shipping": {"passed": True, "fastest_days": 5, "cheapest_price": 9.99},
+                    "compliance": {"passed": True, "issues": []},
+                },
+                "warnings": [],
+                "passed": True,
+            },
+        ],
+        "current_step": "verifier_complete",
+        "token_budget": 50000,
+        "token_used": 300,
+        "token_usage_by_stage": {
+            "intent": {"input_tokens": 250, "output_tokens": 50, "total_tokens": 300, "calls": 1}
+        },
+    }
+    state.update(overrides)
+    return state
+
+
+def test_token_budget_records_and_skips():
+    budget = TokenBudget(total=2000, used=100, output_reserve=500)
+    messages = [{"role": "system", "content": "x" * 400}, ("user", "y" * 400)]
+
+    assert estimate_tokens(messages) == 208
+    assert budget.allows("verify.rank", messages)
+
+    budget.record("verify", {"input_tokens": 1200, "output_tokens": 100, "total_tokens": 1300})
+    assert budget.remaining == 600
+    assert not budget.allows("plan.optimize", messages)
+
+    updates = budget.state_updates()
+    assert updates["token_used"] == 1400
+    assert updates["token_usage_by_stage"]["verify"]["calls"] == 1
+    assert updates["budget_skipped_steps"] == ["plan.optimize"]
+
+
+@pytest.fixture
+def fake_plan_llm(monkeypatch):
+    from src.config import get_settings
+
+    module = importlib.import_module("src.execution.plan_node")
+
+    calls = []
+
+    async def fake(messages, output_schema, usage=None, **kwargs):
+        calls.append(messages)
+        usage.update({"input_tokens": 400, "output_tokens": 40, "total_tokens": 440})
+        return PlanRecommendation(recommended_plan="Speed", recommendation_reason="fast")
+
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr(module, "call_llm_and_parse", fake)
+    get_settings.cache_clear()
+    yield calls
+    get_settings.cache_clear()
+
+
+@pytest.mark.asyncio
+async def test_plan_node_records_actual_usage(fake_plan_llm):
+    from src.execution.plan_node import plan_node
+
+    result = await plan_node(_plan_state())
+
+    assert len(fake_plan_llm) == 1
+    assert result["token_used"] == 740
+    assert result["token_usage_by_stage"]["plan"] == {
+        "input_tokens": 400, "output_tokens": 40, "total_tokens": 440, "calls": 1,
+    }
+    assert result["token_usage_by_stage"]["intent"]["total_tokens"] == 300
+    assert result["budget_skipped_steps"] == []
+
+
+@pytest.mark.asyncio
+async def test_plan_node_skips_llm_when_budget_tight(fake_plan_llm):
+    from src.execution.plan_node import plan_node
+
+    result = await plan_node(_plan_state(token_budget=1000))
+
+    # 规则方案照常生成，只是没有 LLM 推荐
+    assert fake_plan_llm == []
+    assert result["error"] is None
+    assert result["plans"]
+    assert result["token_used"] == 300
+    assert result["budget_skipped_steps"] == ["plan.optimize"]
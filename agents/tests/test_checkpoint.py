@@ -0,0 +1,142 @@
+"""
+Checkpointer 后端测试
+
+验证有界内存后端的保留上限 / LRU / TTL，以及 SQLite 后端的持久化与恢复。
+"""
+
+import os
+
+import pytest
+from langchain_core.messages import HumanMessage
+from langgraph.checkpoint.base import empty_checkpoint
+
+from src.graph.checkpoint import BoundedMemorySaver, SqliteCheckpointSaver, create_checkpointer
+
+os.environ["MOCK_TOOLS"] = "true"
+
+
+def _put_steps(saver, thread_id: str, steps: int) -> dict:
+    """模拟 steps 次节点转移，每步只更新 step channel"""
+    config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+    version = None
+    for step in range(steps):
+        checkpoint = empty_checkpoint()
+        version = saver.get_next_version(version, None)
+        checkpoint["channel_values"] = {"step": step, "static": "x"}
+        checkpoint["channel_versions"] = {"step": version, "static": "1"}
+        new_versions = {"step": version}
+        if step == 0:
+            new_versions["static"] = "1"
+        config = saver.put(config, checkpoint, {"step": step}, new_versions)
+        saver.put_writes(config, [("step", step + 1)], task_id=f"task-{step}")
+    return config
+
+
+def test_bounded_saver_retains_recent_checkpoints():
+    saver = BoundedMemorySaver(max_checkpoints_per_thread=3, ttl_seconds=None)
+    _put_steps(saver, "t1", 10)
+
+    history = list(saver.list({"configurable": {"thread_id": "t1"}}))
+    assert [c.metadata["step"] for c in history] == [9, 8, 7]
+
+    latest = saver.get_tuple({"configurable": {"thread_id": "t1"}})
+    assert latest.checkpoint["channel_values"] == {"step": 9, "static": "x"}
+    assert latest.pending_writes == [("task-9", "step", 10)]
+
+    stats = saver.stats()
+    assert stats["checkpoints"] == 3
+    assert stats["blobs"] == 4  # 3 个 step 版本 + 仍被引用的 static
+    assert stats["pruned_checkpoints"] == 7
+
+
+def test_bounded_saver_evicts_lru_and_expired_threads(monkeypatch):
+    from src.graph import checkpoint as module
+
+    now = [0.0]
+    monkeypatch.setattr(module.time, "monotonic", lambda: now[0])
+    saver = BoundedMemorySaver(max_threads=2, ttl_seconds=60)
+
+    _put_steps(saver, "a", 1)
+    _put_steps(saver, "b", 1)
+    saver.get_tuple({"configurable": {"thread_id": "a"}})  # a 变为最近访问
+    _put_steps(saver, "c", 1)
+
+    assert saver.get_tuple({"configurable": {"thread_id": "b"}}) is None
+    assert saver.stats()["lru"] == 1
+
+    now[0] += 61
+    assert saver.get_tuple({"configurable": {"thread_id": "a"}}) is None
+    assert saver.stats()["threads"] == 0
+    assert saver.stats()["ttl"] == 2
+
+
+def test_sqlite_saver_persists_across_instances(tmp_path):
+    path = str(tmp_path / "checkpoints.db")
+    saver = SqliteCheckpointSaver(path, max_checkpoints_per_thread=2)
+    _put_steps(saver, "t1", 5)
+    saver.close()
+
+    reopened = SqliteCheckpointSaver(path)
+    latest = reopened.get_tuple({"configurable": {"thread_id": "t1"}})
+    assert latest.checkpoint["channel_values"] == {"step": 4, "static": "x"}
+    assert latest.metadata["step"] == 4
+    assert latest.pending_writes == [("task-4", "step", 5)]
+    assert latest.parent_config is not None
+
+    assert len(list(reopened.list({"configurable": {"thread_id": "t1"}}))) == 2
+    blobs = reopened.conn.execute("SELECT COUNT(*) FROM blobs").fetchone()[0]
+    assert blobs == 3
+
+    reopened.delete_thread("t1")
+    assert reopened.get_tuple({"configurable": {"thread_id": "t1"}}) is None
+
+
+def test_create_checkpointer_backends(tmp_path):
+    assert isinstance(create_checkpointer("memory_lru"), BoundedMemorySaver)
+
+    os.environ["CHECKPOINT_SQLITE_PATH"] = str(tmp_path / "c.db")
+    try:
+        from src.config import get_settings
+
+        get_settings.cache_clear()
+        assert isinstance(create_checkpointer("sqlite"), SqliteCheckpointSaver)
+    finally:
+        os.environ.pop("CHECKPOINT_SQLITE_PATH")
+        get_settings.cache_clear()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", ["memory_lru", "sqlite"])
+async def test_graph_runs_on_backend(backend, tmp_path):
+    """两种后端都能驱动完整的 Agent Graph"""
+    os.environ.pop("OPENAI_API_KEY", None)
+
+    from src.graph.builder import build_agent_graph
+    from src.graph.runtime import GraphRuntime
+
+    saver = (
+        SqliteCheckpointSaver(str(tmp_path / "graph.db"), max_checkpoints_per_thread=2)
+        if backend == "sqlite"
+        else BoundedMemorySaver(max_checkpoints_per_thread=2)
+    )
+    graph = build_agent_graph().builder.compile(checkpointer=saver)
+    config = GraphRuntime.new_config("t1")
+
+    result = await graph.ainvoke(
+        {
+            "messages": [HumanMessage(content="phone case, budget $20, shipping to Japan")],
+            "mission": None,
+            "candidates": [],
+            "verified_candidates": [],
+            "plans": [],
+            "current_step": "start",
+            "token_used": 0,
+            "error": None,
+        },
+        config,
+    )
+
+    assert result["mission"]["destination_country"] == "JP"
+    state = await graph.aget_state(config)
+    assert state.values["current_step"] == result["current_step"]
+    assert len([s async for s in graph.aget_state_history(config)]) == 2
@@ -0,0 +1,205 @@
+"""
+本地合规规则引擎测试
+"""
+
+import os
+
+import orjson
+import pytest
+
+os.environ["MOCK_TOOLS"] = "true"
+
+from src.compliance import ComplianceEngine, clear_compliance_engines  # noqa: E402
+from src.compliance.engine import compile_condition  # noqa: E402
+from src.config import get_settings  # noqa: E402
+from src.retrieval.catalog_index import DEFAULT_AROC_PATH  # noqa: E402
+from src.tools import compliance  # noqa: E402
+from src.tools.catalog import _mock_offer_card  # noqa: E402
+
+OFFERS = {o["offer_id"]: o for o in orjson.loads(DEFAULT_AROC_PATH.read_bytes())["offers"]}
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return ComplianceEngine.from_file(ruleset_version="cr_test")
+
+
+def test_rules_indexed_by_country_and_category(engine):
+    rule_ids = {
+        r.rule_id
+        for r in engine.rules_for("JP", ("cat_blenders", "cat_kitchen_appliances", "cat_home"))
+    }
+
+    # 只取目的国 / 类目链命中的规则（含通配），不扫描整个规则集
+    assert rule_ids == {"cr_008", "cr_014", "cr_015", "cr_018"}
+    # UK / GB 视为同一个国家
+    assert engine.rules_for("UK", ("cat_electronics",)) == engine.rules_for(
+        "GB", ("cat_electronics",)
+    )
+
+
+def test_check_seed_offers(engine):
+    # 缺少 CE（error）与 RoHS（warning）：两条都是 issue，只有 CE 阻断
+    case_de = engine.check(OFFERS["of_001"], "DE")
+    assert not case_de["allowed"]
+    assert case_de["reason_codes"] == ["cr_003"]
+    assert [i["rule_id"] for i in case_de["issues"]] == ["cr_003", "cr_019"]
+    assert case_de["required_docs"] == ["CE", "RoHS"]
+    assert case_de["ruleset_version"] == "cr_test"
+
+    # 证书齐全时要求被满足；add_warning 只是提示（110V 搅拌机发往德国）
+    assert engine.check(OFFERS["of_002"], "DE")["required_docs"] == []
+    blender_de = engine.check(OFFERS["of_009"], "DE")
+    assert blender_de["allowed"] and blender_de["issues"] == []
+    assert blender_de["warnings"][0].startswith("This product (110V) is not compatible")
+
+    charger_jp = engine.check(OFFERS["of_002"], "JP")
+    assert charger_jp["reason_codes"] == ["cr_008"]
+    assert charger_jp["issues"][0]["message_en"].startswith("PSE")
+
+    # 锂电池（risk_tags: battery_included）限制航空快递：指定该运输方式时变为阻断
+    earbuds = engine.check(OFFERS["of_003"], "US")
+    assert earbuds["allowed"] and earbuds["blocked_shipping_methods"] == ["air_express"]
+    assert not engine.check(OFFERS["of_003"], "US", shipping_method="air_express")["allowed"]
+
+    results = engine.check_many(OFFERS.values(), "DE")
+    assert [r["allowed"] for r in results] == [
+        engine.check(o, "DE")["allowed"] for o in OFFERS.values()
+    ]
+
+
+def _item(category_id: str, **fields) -> dict:
+    attributes = fields.pop("attributes", {})
+    return {
+        "offer_id": "of_x",
+        "category_id": category_id,
+        "attributes": [{"attr_id": k, "value": v} for k, v in attributes.items()],
+        "certifications": fields.pop("certifications", []),
+        "risk_tags": fields.pop("risk_tags", []),
+        **fields,
+    }
+
+
+# 与网关 compliance.check_item 相同结论的用例：
+# (商品, 目的国, 运输方式, allowed, reason_codes, required_docs, 期望包含的 warning)
+GATEWAY_CASES = [
+    # add_warning（即使规则 severity 为 error）只产生警告
+    (
+        _item("cat_kitchen_appliances", attributes={"attr_voltage": "110V"}),
+        "DE", None, True, [], [], "This product (110V) is not compatible with local voltage (220V)",
+    ),
+    # require_document 只进入 required_docs
+    (
+        _item("cat_electronics", attributes={"attr_battery_capacity": 150}, certifications=["FCC"]),
+        "US", None, True, [], ["UN38.3"], None,
+    ),
+    # risk_tags 映射为属性：battery_included 命中 cr_001，liquid 命中 cr_007
+    (_item("cat_electronics", risk_tags=["battery_included"]), "US", "air_express",
+     False, ["cr_001"], [], None),
+    (_item("cat_electronics", risk_tags=["battery_included"]), "US", "sea", True, [], [], None),
+    (_item("cat_beauty", risk_tags=["contains_liquid"]), "FR", "air_express",
+     False, ["cr_007"], [], None),
+    (_item("cat_toys", risk_tags=["small_parts"], certifications=["ASTM"]), "US", None,
+     True, [], [], "CHOKING HAZARD - Small parts. Not for children under 3 years."),
+    # require_certification：缺证书时阻断并列入 required_docs，齐全时什么都不加
+    (_item("cat_toys"), "US", None, False, ["cr_012"], ["ASTM"], None),
+    (_item("cat_toys", certifications=["ASTM"]), "US", None, True, [], [], None),
+]
+
+
+@pytest.mark.parametrize(
+    "item, country, method, allowed, reason_codes, required_docs, warning", GATEWAY_CASES
+)
+def test_actions_match_gateway(
+    engine, item, country, method, allowed, reason_codes, required_docs, warning
+):
+    result = engine.check(item, country, shipping_method=method)
+
+    assert result["allowed"] is allowed
+    assert result["reason_codes"] == reason_codes
+    assert result["required_docs"] == required_docs
+    if warning:
+        assert warning in result["warnings"]
+
+
+def test_restrict_shipping_without_method_does_not_block():
+    engine = ComplianceEngine({
+        "rules": [{
+            "id": "r_air",
+            "severity": "error",
+            "condition": {},
+            "applies_to": {"categories": ["*"], "countries": ["*"]},
+            "action": {"type": "restrict_shipping", "blocked_methods": ["air_express"]},
+        }],
+    })
+
+    assert engine.check(_item("cat_toys"), "US")["allowed"]
+    assert not engine.check(_item("cat_toys"), "US", shipping_method="air_express")["allowed"]
+
+
+def test_custom_condition_and_offer_card_shape(engine):
+    oversized = compile_condition(
+        {"custom": "longest_side > 1200 OR (length + 2*width + 2*height) > 3000"}
+    )
+    facts = engine.facts({**OFFERS["of_006"], "dimensions_mm": {"l": 1300, "w": 100, "h": 100}})
+    assert oversized(facts)
+    assert not oversized(engine.facts(OFFERS["of_006"]))
+    with pytest.raises(ValueError):
+        compile_condition({"custom": "__import__('os').system('true')"})
+
+    card = _mock_offer_card("of_000001")
+    facts = engine.facts(card)
+    assert facts.sku_id == "sku_000001_001"
+    assert facts.attributes["attr_color"] == "Black"
+    assert facts.attributes["attr_weight"] == 200
+    assert engine.check(card, "US")["allowed"]
+
+
+@pytest.mark.asyncio
+async def test_check_compliance_local_backend_keyed_by_version(monkeypatch):
+    versions = iter(["cr_v1", "cr_v1", "cr_v2", "cr_v2"])
+
+    async def fake_version(user_id=None):
+        return {"ok": True, "data": {"version": next(versions)}}
+
+    monkeypatch.setenv("COMPLIANCE_BACKEND", "local")
+    monkeypatch.setenv("COMPLIANCE_RULESET_TTL_SECONDS", "0")
+    monkeypatch.setattr(compliance, "get_policy_ruleset_version", fake_version)
+    get_settings.cache_clear()
+    compliance.reset_ruleset_version()
+    clear_compliance_engines()
+    try:
+        first = await compliance.check_compliance("sku_001", "DE", item=OFFERS["of_001"])
+        engine_v1 = await compliance.get_local_engine()
+        second = await compliance.check_compliance("sku_001", "DE", item=OFFERS["of_001"])
+        engine_v2 = await compliance.get_local_engine()
+    finally:
+        get_settings.cache_clear()
+        compliance.reset_ruleset_version()
+        clear_compliance_engines()
+
+    assert first["ok"] and not first["data"]["allowed"]
+    assert first["data"]["ruleset_version"] == "cr_v1"
+    # 实际编译的是本地规则文件，其自身版本一并记录
+    assert first["data"]["rules_file_version"] == "1.0.0"
+    # 版本变化后重新编译
+    assert second["data"]["ruleset_version"] == "cr_v2"
+    assert engine_v1 is not engine_v2
+
+
+def test_engine_cache_keyed_by_rules_path(tmp_path):
+    from src.compliance.engine import DEFAULT_RULES_PATH, get_compliance_engine
+
+    custom = tmp_path / "rules.json"
+    custom.write_bytes(orjson.dumps({"version": "local_v9", "rules": []}))
+    clear_compliance_engines()
+    try:
+        default = get_compliance_engine("cr_v1", DEFAULT_RULES_PATH)
+        other = get_compliance_engine("cr_v1", custom)
+        assert get_compliance_engine("cr_v1", DEFAULT_RULES_PATH) is default
+    finally:
+        clear_compliance_engines()
+
+    assert other is not default
+    assert (other.ruleset_version, other.rules_file_version) == ("cr_v1", "local_v9")
+    assert other.rules == []
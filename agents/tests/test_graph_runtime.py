@@ -0,0 +1,87 @@
+"""
+Graph runtime 测试
+
+验证 graph 只编译一次，并且可以被并发运行共享。
+"""
+
+import asyncio
+import os
+import threading
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+os.environ["MOCK_TOOLS"] = "true"
+
+
+def test_compiles_once_across_threads():
+    """多线程并发访问时只编译一次"""
+    from src.graph.runtime import GraphRuntime
+
+    calls = []
+    barrier = threading.Barrier(8)
+
+    def builder():
+        calls.append(1)
+        return object()
+
+    runtime = GraphRuntime(builder=builder)
+    graphs = []
+
+    def worker():
+        barrier.wait()
+        graphs.append(runtime.graph)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert all(g is graphs[0] for g in graphs)
+    assert runtime.compile_seconds is not None
+
+
+def test_new_config_uses_distinct_threads():
+    from src.graph.runtime import GraphRuntime
+
+    first = GraphRuntime.new_config()["configurable"]["thread_id"]
+    second = GraphRuntime.new_config()["configurable"]["thread_id"]
+    assert first != second
+    assert GraphRuntime.new_config("t1") == {"configurable": {"thread_id": "t1"}}
+
+
+@pytest.mark.asyncio
+async def test_shared_graph_concurrent_runs():
+    """共享的已编译 graph 上并发运行多个 mission，互不干扰"""
+    os.environ.pop("OPENAI_API_KEY", None)
+
+    from src.graph import get_agent_graph, get_graph_runtime
+
+    runtime = get_graph_runtime()
+    assert get_agent_graph() is runtime.graph
+
+    queries = {
+        "DE": "wireless charger for iPhone, budget $50, shipping to Germany",
+        "JP": "phone case, budget $20, shipping to Japan",
+    }
+
+    async def run(query: str) -> dict:
+        state = {
+            "messages": [HumanMessage(content=query)],
+            "mission": None,
+            "candidates": [],
+            "verified_candidates": [],
+            "plans": [],
+            "current_step": "start",
+            "token_used": 0,
+            "error": None,
+        }
+        return await runtime.ainvoke(state)
+
+    results = await asyncio.gather(*(run(q) for q in queries.values()))
+
+    for country, result in zip(queries, results, strict=True):
+        assert result["mission"]["destination_country"] == country
+        assert len(result["messages"]) == 1
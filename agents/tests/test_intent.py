@@ -0,0 +1,143 @@
+"""
+Intent 规则解析测试
+"""
+
+import os
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+os.environ["MOCK_TOOLS"] = "true"
+
+from src.intent.rules import parse_intent  # noqa: E402
+
+
+def test_parse_english_request():
+    parsed = parse_intent(
+        "Buy 2 phone cases for Samsung Galaxy, ship to Japan within 5 days, under 30 EUR"
+    )
+    result = parsed.result
+
+    assert parsed.confidence >= 0.85
+    assert result.destination_country == "JP"
+    assert (result.budget_amount, result.budget_currency) == (30.0, "EUR")
+    assert result.quantity == 2
+    assert result.arrival_days_max == 5
+    assert [(c.type, c.value) for c in result.hard_constraints] == [
+        ("compatibility", "Samsung"),
+        ("category", "phone_case"),
+    ]
+    assert result.search_query == "phone case Samsung"
+
+
+def test_parse_chinese_request():
+    result = parse_intent("帮我买两个无线充电器，寄到德国，预算300元，一周内到").result
+
+    assert result.destination_country == "DE"
+    assert (result.budget_amount, result.budget_currency) == (300.0, "CNY")
+    assert result.quantity == 2
+    assert result.arrival_days_max == 7
+    assert {c.value for c in result.hard_constraints} == {"wireless", "charger"}
+
+
+def test_parse_origin_negation_and_objectives():
+    result = parse_intent("ship 3 pcs USB-C cable from China to the UK, cheapest, no Anker").result
+
+    assert result.destination_country == "GB"
+    assert result.quantity == 3
+    assert result.budget_amount is None
+    assert {"type": "brand", "value": "Anker", "operator": "ne"} in [
+        c.model_dump() for c in result.hard_constraints
+    ]
+    assert result.objective_weights.price == 0.6
+
+
+def test_negated_color_is_excluded():
+    result = parse_intent("phone case, not black, prefer red, ship to US under $20").result
+
+    assert {"type": "color", "value": "black", "operator": "ne"} in [
+        c.model_dump() for c in result.hard_constraints
+    ]
+    assert [(p.type, p.value) for p in result.soft_preferences] == [("color", "red")]
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "iPhone 15 case budget $20 to usa",
+        "Pixel 8 case under $20 to US",
+        "iPhone 15 Pro charger budget $30 to US",
+        "Switch 2 charger budget $40 to Japan",
+        "buy 3 iPhone 15 cases budget $50 to US",
+    ],
+)
+def test_model_number_is_not_quantity(text):
+    parsed = parse_intent(text)
+
+    # 型号数字不当作数量；无法确定时压低覆盖率交给 LLM
+    assert parsed.result.quantity == 1
+    assert parsed.coverage == 0.0
+    assert parsed.confidence < 0.85
+
+
+def test_standalone_count_before_model():
+    assert parse_intent("Galaxy S24 case budget $20 to US").result.quantity == 1
+    result = parse_intent("iPhone 15 case and 2 chargers to US under $60").result
+    assert [(slot.category, slot.quantity) for slot in result.basket] == [
+        ("phone_case", 1),
+        ("charger", 2),
+    ]
+
+
+def test_free_form_request_has_low_confidence():
+    assert parse_intent("something nice for my mom's birthday").confidence < 0.5
+    assert parse_intent(
+        "I want a gift for my nephew who likes dinosaurs and space, ship to US"
+    ).confidence < 0.85
+
+
+@pytest.mark.asyncio
+async def test_intent_node_skips_llm_when_confident(monkeypatch):
+    from src.config import get_settings
+    from src.intent import node
+
+    calls = []
+
+    async def fake_llm(**kwargs):
+        calls.append(kwargs)
+        return None
+
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr(node, "call_llm_and_parse", fake_llm)
+    get_settings.cache_clear()
+    try:
+        confident = await node.intent_node(
+            {"messages": [HumanMessage(content="wireless charger for iPhone, $50, to Germany")]}
+        )
+        # 置信度够但没有预算：仍交给 LLM，回退时补默认预算
+        no_budget = await node.intent_node(
+            {"messages": [HumanMessage(content="I need a phone case for my mom in Canada")]}
+        )
+        model_number = await node.intent_node(
+            {"messages": [HumanMessage(content="iPhone 15 case budget $20 to usa")]}
+        )
+        multi_turn = await node.intent_node(
+            {
+                "messages": [
+                    HumanMessage(content="a charger"),
+                    AIMessage(content="Where should it ship?"),
+                    HumanMessage(content="wireless charger for iPhone, $50, to Germany"),
+                ]
+            }
+        )
+    finally:
+        get_settings.cache_clear()
+
+    assert confident["mission"]["destination_country"] == "DE"
+    assert confident["mission"]["search_query"] == "wireless charger iPhone"
+    # 多轮对话交给 LLM（这里返回 None，回退到规则 + 默认值）
+    assert parse_intent("I need a phone case for my mom in Canada").confidence >= 0.85
+    assert no_budget["mission"]["budget_amount"] == 100.0
+    assert model_number["mission"]["quantity"] == 1
+    assert len(calls) == 3
+    assert multi_turn["mission"]["destination_country"] == "DE"
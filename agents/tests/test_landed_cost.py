@@ -0,0 +1,138 @@
+"""
+到手成本计算测试
+"""
+
+import importlib
+import os
+import random
+from decimal import ROUND_HALF_UP, Decimal
+
+import numpy as np
+import pytest
+
+os.environ["MOCK_TOOLS"] = "true"
+
+from src.landed_cost import LandedCostTable, to_cents  # noqa: E402
+from src.shipping.consolidation import ShipmentGroup, ShippingSelection  # noqa: E402
+
+# execution/__init__ 导出的 plan_node 函数与模块同名，按模块路径取
+plan_module = importlib.import_module("src.execution.plan_node")
+
+CENT = Decimal("0.01")
+
+
+@pytest.fixture(scope="module")
+def table() -> LandedCostTable:
+    return LandedCostTable.from_file()
+
+
+def test_duty_and_tax_by_country(table):
+    # DE：关税按 CIF（货值 + 运费）计征，VAT 税基含运费与关税
+    de = table.calculate("DE", goods=[200.0], shipping=[10.0], categories=["cat_phone_cases"])
+    assert de.breakdown(0) == {
+        "goods": Decimal("200.00"),
+        "shipping": Decimal("10.00"),
+        "duty": Decimal("13.65"),
+        "tax": Decimal("42.49"),
+        "total": Decimal("266.14"),
+    }
+
+    # US：销售税只算商品货值，关税 FOB；类目沿祖先链查找（耳机 → 音频）
+    us = table.calculate(
+        "us", goods=[20.0, 50.0], shipping=[5.0, 5.0], categories=["cat_phone_cases", "cat_earbuds"]
+    )
+    assert us.duty.tolist() == [68, 245]
+    assert us.tax.tolist() == [160, 400]
+
+    # 未覆盖的国家：商品货值的 15%，无关税
+    other = table.calculate("ZZ", goods=[19.99], shipping=[4.0], categories=[None])
+    assert not table.covers("ZZ")
+    assert other.breakdown(0)["tax"] == Decimal("3.00")
+    assert other.breakdown(0)["duty"] == Decimal("0.00")
+
+
+def test_de_minimis_per_consignment(table):
+    goods, categories = [100.0, 100.0], ["cat_sports", "cat_sports"]
+
+    # 分两个包裹：各自货值 100 不超过免税额 160，免关税，VAT 照征
+    split = table.calculate("DE", goods, shipping=[10.0, 10.0], categories=categories)
+    assert split.duty.tolist() == [0, 0]
+    assert split.tax.tolist() == [2090, 2090]
+
+    # 合并为一个包裹：货值 200 超过免税额
+    merged = table.calculate(
+        "DE", goods, shipping=[10.0], categories=categories, consignments=[0, 0]
+    )
+    assert len(merged) == 1
+    assert merged.duty.tolist() == [567]
+    assert merged.breakdown()["total"] == Decimal("256.65")
+
+
+def test_rounding_matches_decimal_reference(table):
+    rng = random.Random(7)
+    goods = [round(rng.uniform(1, 500), 2) for _ in range(2000)]
+    shipping = [round(rng.uniform(0, 30), 2) for _ in range(2000)]
+    costs = table.calculate("GB", goods, shipping, categories=["cat_phone_cases"] * 2000)
+
+    for i, (value, freight) in enumerate(zip(goods, shipping, strict=True)):
+        value, freight = Decimal(str(value)), Decimal(str(freight))
+        duty = Decimal(0)
+        if value > 170:
+            duty = ((value + freight) * Decimal("0.06")).quantize(CENT, ROUND_HALF_UP)
+        tax = ((value + freight + duty) * Decimal("0.2")).quantize(CENT, ROUND_HALF_UP)
+        assert costs.breakdown(i) == {
+            "goods": value,
+            "shipping": freight,
+            "duty": duty,
+            "tax": tax,
+            "total": value + freight + duty + tax,
+        }
+
+    # 不是整分的金额按 Decimal 四舍五入
+    assert to_cents([1.005, 2.675, 0.1 + 0.2, np.float64(19.99)]).tolist() == [101, 268, 30, 1999]
+    with pytest.raises(ValueError):
+        LandedCostTable({"countries": {"US": {"tax_rate": 0.08125}}})
+
+
+def test_create_plan_uses_landed_cost():
+    def verified(offer_id: str, price: float, category_id: str) -> dict:
+        return {
+            "offer_id": offer_id,
+            "sku_id": f"sku_{offer_id}",
+            "candidate": {"offer_id": offer_id, "category_id": category_id},
+            "checks": {"pricing": {"unit_price": price, "total_price": price}},
+            "warnings": [],
+        }
+
+    case = verified("case", 120.0, "cat_phone_cases")
+    charger = verified("charger", 60.0, "cat_chargers")
+    option = {
+        "shipping_option_id": "ship_standard",
+        "carrier": "Standard Shipping",
+        "price": 12.0,
+        "eta_min_days": 5,
+        "eta_max_days": 9,
+    }
+    group = ShipmentGroup(
+        merchant_id="m_1",
+        ship_from="CN",
+        items=[
+            {"sku_id": "sku_case", "verified": case},
+            {"sku_id": "sku_charger", "verified": charger},
+        ],
+        options=[option],
+    )
+    selection = ShippingSelection(
+        options=(option,), total_price=12.0, eta_min_days=5, eta_max_days=9
+    )
+
+    plan = plan_module._create_plan(
+        [(case, 1), (charger, 1)], "Budget Saver", "cheapest", "DE", [group], selection
+    )
+
+    # 关税 = 120 × 6.5% × 192 / 180 = 8.32；VAT = (180 + 12 + 8.32) × 19% = 38.06
+    assert plan.total.subtotal == 180.0
+    assert plan.total.shipping_cost == 12.0
+    assert plan.total.duty_estimate == 8.32
+    assert plan.total.tax_estimate == 38.06
+    assert plan.total.total_landed_cost == 238.38
@@ -0,0 +1,167 @@
+"""
+LLM client 池测试
+"""
+
+import httpx
+import pytest
+from pydantic import BaseModel
+
+from src.llm.pool import LLMClientPool, set_llm_pool
+
+
+@pytest.fixture
+def api_key(monkeypatch):
+    from src.config import get_settings
+
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setenv("OPENAI_BASE_URL", "http://llm.test/v1")
+    get_settings.cache_clear()
+    yield
+    get_settings.cache_clear()
+
+
+def _chat_completion(content: str) -> dict:
+    return {
+        "id": "chatcmpl-1",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "test",
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {"prompt_tokens": 5, "completion_tokens": 3, "total_tokens": 8},
+    }
+
+
+@pytest.mark.asyncio
+async def test_instances_keyed_and_share_http_client(api_key):
+    pool = LLMClientPool()
+
+    planner = pool.get("planner", 0.0)
+    assert pool.get("planner", 0.0) is planner
+    assert pool.get("planner", 0.3) is not planner
+    verifier = pool.get("verifier", 0.0)
+
+    assert verifier is not planner
+    assert verifier.http_async_client is planner.http_async_client
+    assert pool.key_for("planner", 0.0).base_url == "http://llm.test/v1"
+    assert pool.stats == {"created": 3, "reused": 1}
+
+    client = planner.http_async_client
+    await pool.aclose()
+    assert client.is_closed
+    assert pool.get("planner", 0.0) is not planner
+
+
+@pytest.mark.asyncio
+async def test_call_llm_and_parse_reuses_pooled_client(api_key):
+    from src.llm.client import call_llm_and_parse
+
+    class Answer(BaseModel):
+        value: int
+
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url.path)
+        return httpx.Response(200, json=_chat_completion('{"value": 3}'))
+
+    pool = LLMClientPool(transport=httpx.MockTransport(handler))
+    set_llm_pool(pool)
+    try:
+        for _ in range(3):
+            result = await call_llm_and_parse([("user", "hi")], Answer)
+            assert result.value == 3
+    finally:
+        await pool.aclose()
+        set_llm_pool(None)
+
+    assert requests == ["/v1/chat/completions"] * 3
+    assert pool.stats == {"created": 1, "reused": 2}
+
+
+def test_response_cache_exact_and_eviction():
+    from src.llm.cache import LLMResponseCache
+
+    cache = LLMResponseCache(schemas={"Answer"}, max_entries=2)
+    messages = [("system", "parse"), ("user", "hi")]
+
+    assert cache.get("Answer", "m", messages) is None
+    cache.put("Answer", "m", messages, '{"value": 1}')
+    assert cache.get("Answer", "m", messages) == ('{"value": 1}', "exact")
+    # model / temperature / schema 不同都不共享
+    assert cache.get("Answer", "other", messages) is None
+    assert cache.get("Answer", "m", messages, temperature=0.5) is None
+    cache.put("Other", "m", messages, "{}")
+    assert cache.get("Other", "m", messages) is None
+
+    cache.put("Answer", "m", [("user", "a")], "{}")
+    cache.put("Answer", "m", [("user", "b")], "{}")
+    assert len(cache) == 2
+    assert cache.stats["evictions"] == 1
+    assert cache.get("Answer", "m", messages) is None
+
+
+def test_response_cache_semantic_tier():
+    from src.llm.cache import HashingEmbedder, LLMResponseCache
+
+    embedder = HashingEmbedder()
+    a = embedder.embed("Buy 2 phone cases, ship to Germany within 5 days")
+    b = embedder.embed("buy 2 phone cases, ship to germany within 5 days!")
+    c = embedder.embed("3 USB-C chargers to California")
+    assert float(a @ b) > 0.99
+    assert float(a @ c) < 0.5
+
+    cache = LLMResponseCache(
+        schemas={"Answer"}, semantic_schemas={"Answer"}, similarity_threshold=0.95
+    )
+    system = ("system", "parse the mission")
+    cache.put("Answer", "m", [system, ("user", "Buy 2 phone cases. Ship to Germany")], "{}")
+
+    hit = cache.get("Answer", "m", [system, ("user", "buy 2 phone cases, ship to germany")])
+    assert hit == ("{}", "semantic")
+    # 上下文（system prompt）不同时不做语义匹配
+    assert cache.get("Answer", "m", [("system", "x"), ("user", "buy 2 phone cases")]) is None
+    assert cache.get("Answer", "m", [system, ("user", "3 USB-C chargers to California")]) is None
+    assert cache.stats["semantic_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_call_llm_and_parse_uses_cache(api_key):
+    from src.llm.cache import LLMResponseCache, set_llm_cache
+    from src.llm.client import call_llm_and_parse
+    from src.observability import Telemetry, set_telemetry
+
+    class Answer(BaseModel):
+        value: int
+
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url.path)
+        return httpx.Response(200, json=_chat_completion('{"value": 7}'))
+
+    pool = LLMClientPool(transport=httpx.MockTransport(handler))
+    telemetry = Telemetry.in_memory(spans=False)
+    set_llm_pool(pool)
+    set_llm_cache(LLMResponseCache(schemas={"Answer"}))
+    set_telemetry(telemetry)
+    try:
+        first = await call_llm_and_parse([("user", "hi")], Answer)
+        second = await call_llm_and_parse([("user", "hi")], Answer)
+        await call_llm_and_parse([("user", "hi")], Answer, model_type="verifier")
+    finally:
+        await pool.aclose()
+        set_llm_pool(None)
+        set_llm_cache(None)
+        set_telemetry(None)
+
+    assert first.value == second.value == 7
+    assert first is not second
+    assert len(requests) == 2
+    assert telemetry.metric_total("agent.llm.cache", result="exact_hit") == 1
+    assert telemetry.metric_total("agent.llm.cache", result="miss") == 2
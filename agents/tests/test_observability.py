@@ -0,0 +1,123 @@
+"""
+Tracing / Metrics 测试
+
+使用 Telemetry.in_memory() 断言节点、工具调用、缓存与 LLM 调用的 span 和指标。
+"""
+
+import os
+
+import httpx
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from pydantic import BaseModel
+
+from src.observability import Telemetry, set_telemetry
+
+os.environ["MOCK_TOOLS"] = "true"
+
+
+@pytest.fixture
+def telemetry():
+    telemetry = Telemetry.in_memory()
+    set_telemetry(telemetry)
+    yield telemetry
+    set_telemetry(None)
+
+
+@pytest.mark.asyncio
+async def test_graph_nodes_emit_spans_and_latency(telemetry):
+    os.environ.pop("OPENAI_API_KEY", None)
+    from src.graph.runtime import get_graph_runtime
+
+    runtime = get_graph_runtime()
+    await runtime.ainvoke({
+        "messages": [HumanMessage(content="phone case, budget $20, shipping to Japan")],
+        "mission": None,
+        "candidates": [],
+        "verified_candidates": [],
+        "plans": [],
+        "current_step": "start",
+        "token_used": 0,
+        "error": None,
+    })
+
+    names = [span.name for span in telemetry.finished_spans()]
+    assert names == ["node.intent", "node.candidate", "node.verify", "node.plan", "node.wait_user"]
+    assert telemetry.metric_total("agent.node.duration", node="verify") == 1
+
+
+@pytest.mark.asyncio
+async def test_call_tool_spans_and_cache_counters(telemetry):
+    from src.resilience import Resilience, get_resilience, set_resilience
+    from src.tools.base import call_tool
+    from src.tools.cache import (
+        LRUCacheBackend,
+        ResponseCache,
+        get_response_cache,
+        set_response_cache,
+    )
+    from src.tools.http_client import GatewayClient, get_gateway_client, set_gateway_client
+
+    def handler(request):
+        if "compliance" in request.url.path:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"ok": True, "data": {"x": 1}, "ttl_seconds": 60})
+
+    previous = (get_gateway_client(), get_response_cache(), get_resilience())
+    set_gateway_client(GatewayClient(transport=httpx.MockTransport(handler)))
+    set_response_cache(ResponseCache(LRUCacheBackend()))
+    set_resilience(Resilience(max_attempts=1))
+    try:
+        await call_tool("core", "pricing.get_realtime_quote", {"sku_id": "s1"})
+        await call_tool("core", "pricing.get_realtime_quote", {"sku_id": "s1"})
+        failed = await call_tool("core", "compliance.check_item", {"sku_id": "s1"})
+    finally:
+        set_gateway_client(previous[0])
+        set_response_cache(previous[1])
+        set_resilience(previous[2])
+
+    assert not failed["ok"]
+    spans = {span.name: span for span in telemetry.finished_spans()}
+    assert spans["tool.compliance.check_item"].status.is_ok is False
+    assert spans["tool.compliance.check_item"].attributes["error_code"] == "UPSTREAM_ERROR"
+
+    quote = "pricing.get_realtime_quote"
+    assert telemetry.metric_total("agent.tool.calls", tool=quote) == 2
+    assert telemetry.metric_total("agent.tool.cache", tool=quote, result="hit") == 1
+    assert telemetry.metric_total("agent.tool.cache", tool=quote, result="miss") == 1
+    assert telemetry.metric_total("agent.tool.duration", ok=False) == 1
+
+
+@pytest.mark.asyncio
+async def test_llm_span_and_token_counters(telemetry, monkeypatch):
+    from src.llm import client
+
+    class Answer(BaseModel):
+        value: int
+
+    responses = iter([
+        AIMessage(content="not json", usage_metadata={
+            "input_tokens": 10, "output_tokens": 2, "total_tokens": 12,
+        }),
+        AIMessage(content='{"value": 7}', usage_metadata={
+            "input_tokens": 10, "output_tokens": 5, "total_tokens": 15,
+        }),
+    ])
+
+    class FakeLLM:
+        async def ainvoke(self, messages):
+            return next(responses)
+
+    monkeypatch.setattr(client, "get_llm", lambda **kwargs: FakeLLM())
+    monkeypatch.setattr(client, "jittered_backoff", lambda *args, **kwargs: 0)
+
+    result = await client.call_llm_and_parse([], Answer, model_type="verifier")
+
+    assert result.value == 7
+    (span,) = telemetry.finished_spans()
+    assert span.name == "llm.Answer"
+    assert span.attributes["attempts"] == 2
+    assert span.attributes["llm.total_tokens"] == 27
+    assert telemetry.metric_total("agent.llm.tokens", kind="input") == 20
+    assert telemetry.metric_total("agent.llm.tokens", kind="output") == 7
+    assert telemetry.metric_total("agent.llm.duration", schema="Answer", ok=True) == 1
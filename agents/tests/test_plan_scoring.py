@@ -0,0 +1,88 @@
+"""
+方案多目标评分测试
+"""
+
+import numpy as np
+import pytest
+
+from src.execution.plan_node import plan_node
+from src.execution.scoring import normalize, pareto_frontier, score_candidates
+
+
+def _verified(offer_id: str, price: float, days: int, warnings: int = 0) -> dict:
+    return {
+        "offer_id": offer_id,
+        "sku_id": f"sku_{offer_id}",
+        "checks": {
+            "pricing": {"passed": True, "unit_price": price, "total_price": price},
+            "shipping": {"passed": True, "fastest_days": days, "cheapest_price": 5.0},
+        },
+        "warnings": [f"w{i}" for i in range(warnings)],
+        "passed": True,
+    }
+
+
+def _brute_force_frontier(price, eta_days, risk) -> np.ndarray:
+    points = np.stack([price, eta_days, risk], axis=1)
+    mask = np.ones(len(points), dtype=bool)
+    for i, point in enumerate(points):
+        better_or_equal = (points <= point).all(axis=1)
+        strictly_better = (points < point).any(axis=1)
+        mask[i] = not (better_or_equal & strictly_better).any()
+    return mask
+
+
+def test_pareto_frontier_matches_brute_force():
+    rng = np.random.default_rng(3)
+    for trial in range(200):
+        n = int(rng.integers(1, 60))
+        # 取值范围小，制造大量并列 / 完全重合的点
+        price = rng.integers(0, 8, n).astype(float)
+        eta_days = rng.integers(1, 8, n).astype(float)
+        risk = rng.integers(0, 3, n).astype(float)
+        if trial % 4 == 0:
+            eta_days[rng.integers(n)] = np.inf
+        np.testing.assert_array_equal(
+            pareto_frontier(price, eta_days, risk), _brute_force_frontier(price, eta_days, risk)
+        )
+
+
+def test_scores_normalize_against_candidate_distribution():
+    np.testing.assert_allclose(normalize(np.array([10.0, 20.0, np.inf, 15.0])), [0, 1, 1, 0.5])
+    assert normalize(np.array([3.0, 3.0])).tolist() == [0.0, 0.0]
+
+    candidates = [
+        _verified("of_cheap", 10.0, 12),
+        _verified("of_fast", 40.0, 2),
+        _verified("of_mid", 20.0, 4),
+        _verified("of_dominated", 45.0, 12, warnings=1),
+    ]
+    scores = score_candidates(candidates, {"price": 0.5, "speed": 0.5, "risk": 0.0})
+
+    assert scores.price.tolist() == [15.0, 45.0, 25.0, 50.0]
+    assert scores.pareto.tolist() == [True, True, True, False]
+    assert scores.cheapest() == 0 and scores.fastest() == 1
+    # 价格与时效都处在中段的候选综合得分最高
+    assert scores.best_value() == 2
+
+
+@pytest.mark.asyncio
+async def test_plan_node_selects_from_hundreds_of_candidates():
+    rng = np.random.default_rng(0)
+    candidates = [
+        _verified(f"of_{i:03d}", float(rng.uniform(20, 200)), int(rng.integers(3, 30)))
+        for i in range(500)
+    ]
+    candidates.append(_verified("of_cheapest", 5.0, 25))
+    candidates.append(_verified("of_fastest", 150.0, 1))
+    state = {
+        "mission": {"destination_country": "US", "quantity": 1},
+        "verified_candidates": candidates,
+    }
+
+    result = await plan_node(state)
+
+    plans = {p["plan_type"]: p for p in result["plans"]}
+    assert plans["cheapest"]["items"][0]["offer_id"] == "of_cheapest"
+    assert plans["fastest"]["items"][0]["offer_id"] == "of_fastest"
+    assert plans["best_value"]["items"][0]["offer_id"] not in {"of_cheapest", "of_fastest"}
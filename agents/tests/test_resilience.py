@@ -0,0 +1,146 @@
+"""
+容错层测试：熔断、重试预算、对冲
+"""
+
+import asyncio
+
+import pytest
+
+from src.resilience import CircuitBreaker, Resilience, RetryBudget, is_retryable
+
+
+def _error(code: str = "UPSTREAM_ERROR", http_status: int | None = 503) -> dict:
+    return {"ok": False, "error": {"code": code, "message": "x", "http_status": http_status}}
+
+
+def _scripted(*results):
+    """按顺序返回结果的假请求"""
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        return results[min(len(calls), len(results)) - 1]
+
+    return fn, calls
+
+
+@pytest.fixture
+def resilience():
+    return Resilience(max_attempts=3, backoff_base=0, backoff_cap=0, failure_threshold=3)
+
+
+def test_is_retryable():
+    assert is_retryable(_error())
+    assert is_retryable(_error("TIMEOUT", None))
+    assert is_retryable(_error(http_status=429))
+    assert not is_retryable(_error(http_status=404))
+    assert not is_retryable(_error("INVALID_ARGUMENT", None))
+    assert not is_retryable({"ok": True})
+
+
+@pytest.mark.asyncio
+async def test_retries_transient_failures(resilience):
+    fn, calls = _scripted(_error(), {"ok": True, "data": {}})
+
+    result = await resilience.call("pricing.get_realtime_quote", fn, idempotent=True)
+
+    assert result["ok"]
+    assert len(calls) == 2
+    assert resilience.stats["retries"] == 1
+
+
+@pytest.mark.asyncio
+async def test_no_retry_for_client_errors_or_non_idempotent(resilience):
+    fn, calls = _scripted(_error(http_status=404))
+    await resilience.call("catalog.get_offer_cards", fn, idempotent=True)
+    assert len(calls) == 1
+
+    fn, calls = _scripted(_error())
+    await resilience.call("cart.add_item", fn, idempotent=False)
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_retry_budget_limits_retries():
+    resilience = Resilience(
+        max_attempts=5,
+        backoff_base=0,
+        retry_budget=RetryBudget(ratio=0.0, max_tokens=2),
+        failure_threshold=100,
+    )
+    fn, calls = _scripted(_error())
+
+    await resilience.call("pricing.get_realtime_quote", fn, idempotent=True)
+
+    assert len(calls) == 3  # 1 次正常请求 + 预算内 2 次重试
+    assert resilience.stats["retry_budget_exhausted"] == 1
+
+
+@pytest.mark.asyncio
+async def test_breaker_opens_and_recovers(resilience, monkeypatch):
+    from src import resilience as module
+
+    now = [100.0]
+    monkeypatch.setattr(module.time, "monotonic", lambda: now[0])
+    failing, calls = _scripted(_error())
+
+    await resilience.call("shipping.quote_options", failing, idempotent=True)
+    assert resilience.breaker_for("shipping.quote_options").state == CircuitBreaker.OPEN
+    assert resilience.stats["breaker_opened"] == 1
+
+    result = await resilience.call("shipping.quote_options", failing, idempotent=True)
+    assert result["error"]["message"].startswith("Circuit open")
+    assert len(calls) == 3
+
+    now[0] += 31  # 冷却结束，半开试探成功后恢复
+    ok, _ = _scripted({"ok": True})
+    assert (await resilience.call("shipping.quote_options", ok, idempotent=True))["ok"]
+    assert resilience.breaker_for("shipping.quote_options").state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_half_open_probe_released_when_attempt_raises(resilience):
+    failing, _ = _scripted(_error())
+    await resilience.call("shipping.quote_options", failing, idempotent=True)
+    breaker = resilience.breaker_for("shipping.quote_options")
+    # 事件循环也依赖 time.monotonic，这里直接把熔断时间往前拨
+    breaker.opened_at -= 31
+
+    # 半开试探被取消：归还试探名额，熔断器仍可再试探
+    async def hang():
+        await asyncio.sleep(1)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(resilience.call("shipping.quote_options", hang, True), 0.01)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+    # 半开试探抛异常：计为失败，重新熔断
+    async def boom():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        await resilience.call("shipping.quote_options", boom, idempotent=True)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    breaker.opened_at -= 31
+    ok, _ = _scripted({"ok": True})
+    assert (await resilience.call("shipping.quote_options", ok, idempotent=True))["ok"]
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_hedged_request_wins_when_primary_is_slow():
+    resilience = Resilience(hedge_delay=0.01)
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        if len(calls) == 1:
+            await asyncio.sleep(1)
+        return {"ok": True, "data": {"n": len(calls)}}
+
+    result = await resilience.call("compliance.check_item", fn, idempotent=True, hedge=True)
+
+    assert result["data"]["n"] == 2
+    assert resilience.stats["hedges"] == 1
+    assert resilience.stats["hedge_wins"] == 1
@@ -0,0 +1,155 @@
+"""
+本地商品检索测试
+"""
+
+import os
+
+import numpy as np
+import orjson
+import pytest
+
+os.environ["MOCK_TOOLS"] = "true"
+
+from src.config import get_settings  # noqa: E402
+from src.retrieval import (  # noqa: E402
+    CatalogIndex,
+    HashingTextEmbedder,
+    HybridRetriever,
+    IVFIndex,
+    reciprocal_rank_fusion,
+    set_catalog_index,
+    tokenize,
+)
+from src.retrieval.catalog_index import DEFAULT_AROC_PATH  # noqa: E402
+from src.tools.catalog import search_offers  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def index():
+    return CatalogIndex.from_aroc_file()
+
+
+def test_tokenize_mixed_text():
+    assert tokenize("65W GaN USB-C Chargers") == ["65w", "gan", "usb", "c", "charger"]
+    assert tokenize("无线降噪耳机Pro") == ["无线", "线降", "降噪", "噪耳", "耳机", "pro"]
+
+
+def test_bm25_ranks_english_and_chinese_titles(index):
+    english = index.search("wireless earbuds noise cancelling")
+    chinese = index.search("无线耳机")
+
+    assert english["offer_ids"][0] == "of_003"
+    assert english["scores"][0] == 1.0
+    assert chinese["offer_ids"][0] == "of_003"
+    # 类目名参与检索："手机壳" 命中手机壳类目下的商品
+    assert index.search("手机壳")["offer_ids"][0] == "of_001"
+    assert index.search("no such product")["offer_ids"] == []
+
+
+def test_filters_and_sorts(index):
+    # 类目过滤包含子类目
+    electronics = index.search("", category_id="cat_electronics", limit=50)
+    assert "of_001" in electronics["offer_ids"]
+    assert "of_004" not in electronics["offer_ids"]
+
+    assert index.search("case", brand="CasePro")["offer_ids"] == ["of_001"]
+    assert index.search("case", brand="brand_casepro")["offer_ids"] == ["of_001"]
+    assert index.search("case", brand="unknown")["offer_ids"] == []
+
+    cheap = index.search("", price_max=20.0, sort="price", limit=50)
+    prices = [index.get(offer_id)["price"]["amount"] for offer_id in cheap["offer_ids"]]
+    assert prices == sorted(prices) and max(prices) <= 20.0
+
+    limited = index.search("", limit=3)
+    assert len(limited["offer_ids"]) == 3
+    assert limited["total_count"] == 10
+
+
+def test_incremental_add_and_replace():
+    offers = orjson.loads(DEFAULT_AROC_PATH.read_bytes())["offers"]
+    index = CatalogIndex()
+    index.add_offers(offers[:2])
+    assert index.search("earbuds")["offer_ids"] == []
+
+    index.add_offer(offers[2])
+    assert index.search("earbuds")["offer_ids"] == ["of_003"]
+
+    # 同一 offer_id 再次加入时替换旧文档，库存变化反映到过滤位图
+    sold_out = {
+        **offers[2],
+        "variants": [{**v, "stock": 0} for v in offers[2]["variants"]],
+    }
+    index.add_offer(sold_out)
+    assert len(index) == 3
+    assert index.search("earbuds", must_in_stock=True)["offer_ids"] == []
+    assert index.search("earbuds", must_in_stock=False)["offer_ids"] == ["of_003"]
+
+
+@pytest.mark.asyncio
+async def test_search_offers_local_backend(monkeypatch, index):
+    monkeypatch.setenv("CATALOG_SEARCH_BACKEND", "local")
+    get_settings.cache_clear()
+    set_catalog_index(index)
+    try:
+        result = await search_offers("wireless charger", price_max=50.0, limit=2)
+    finally:
+        set_catalog_index(None)
+        get_settings.cache_clear()
+
+    assert result["ok"]
+    assert result["data"]["offer_ids"][0] == "of_002"
+    assert len(result["data"]["offer_ids"]) <= 2
+    assert result["data"]["has_more"] == (result["data"]["total_count"] > 2)
+
+
+def _clustered_vectors(n: int, dim: int, clusters: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    vectors = centers[rng.integers(clusters, size=n)] + 0.3 * rng.normal(size=(n, dim))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def test_ivf_recall_against_brute_force(tmp_path):
+    vectors = _clustered_vectors(2000, 32, clusters=20)
+    index = IVFIndex(32, tmp_path, n_probe=8)
+    # 分批增量加入：中途训练，之后的向量直接分配到最近的桶
+    for start in range(0, 2000, 250):
+        index.add([f"v{i}" for i in range(start, start + 250)], vectors[start : start + 250])
+    assert index.trained
+
+    queries = _clustered_vectors(50, 32, clusters=20, seed=1)
+    hits = 0
+    for query in queries:
+        exact = {offer_id for offer_id, _ in index.brute_force(query, 10)}
+        hits += len(exact & {offer_id for offer_id, _ in index.search(query, 10)})
+    assert hits / (10 * len(queries)) >= 0.9
+
+    # 同一 id 替换旧向量；保存后以 memmap 重新打开
+    index.add(["v0"], -vectors[:1])
+    index.save()
+    reopened = IVFIndex.open(tmp_path)
+    assert len(reopened) == 2000
+    top_id, top_score = reopened.brute_force(-vectors[0], 1)[0]
+    assert top_id == "v0" and top_score == pytest.approx(1.0, abs=1e-5)
+    assert reopened.search(query, 10) == index.search(query, 10)
+
+
+def test_reciprocal_rank_fusion():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "a"]], k=60)
+
+    assert [item for item, _ in fused] == ["a", "c", "b"]
+    assert fused[0][1] == pytest.approx(1 / 61 + 1 / 62)
+
+
+@pytest.mark.asyncio
+async def test_hybrid_recalls_long_tail_queries(index):
+    retriever = HybridRetriever(index, IVFIndex(256), HashingTextEmbedder(256))
+    assert retriever.sync() == 10
+
+    # BM25 词项对不上（合成词 / 近义词形），向量召回补上
+    assert index.search("smartwatch")["offer_ids"] == []
+    assert (await retriever.search("smartwatch"))["offer_ids"] == ["of_005"]
+    # 关键词能命中时结果与 BM25 一致，过滤条件同样作用于向量召回
+    assert (await retriever.search("lego"))["offer_ids"] == ["of_004"]
+    assert (await retriever.search("smartwatch", price_max=10.0))["offer_ids"] == []
+    assert (await retriever.search("no such product xyz"))["offer_ids"] == []
@@ -0,0 +1,244 @@
+"""
+物流报价测试（包裹画像 / 本地费率表 / 按画像缓存网关报价）
+"""
+
+import importlib
+import itertools
+import os
+import random
+
+import orjson
+import pytest
+
+os.environ["MOCK_TOOLS"] = "true"
+
+from src.config import get_settings  # noqa: E402
+from src.retrieval.catalog_index import DEFAULT_AROC_PATH  # noqa: E402
+from src.shipping import (  # noqa: E402
+    RateTable,
+    ShipmentGroup,
+    consolidate,
+    group_items,
+    packaging_of,
+    select_shipping,
+    shipping_frontier,
+)
+from src.tools import shipping  # noqa: E402
+from src.tools.catalog import _mock_offer_card  # noqa: E402
+
+# execution/__init__ 导出的 plan_node 函数与模块同名，按模块路径取
+plan_module = importlib.import_module("src.execution.plan_node")
+
+OFFERS = {o["offer_id"]: o for o in orjson.loads(DEFAULT_AROC_PATH.read_bytes())["offers"]}
+
+# 与 of_002（120g, 60×55×30mm）同一重量档 / 尺寸档的另一个 SKU
+TWIN = {"sku_id": "sku_twin", "qty": 1, "weight_g": 180, "dim_mm": [52, 58, 26]}
+
+
+def _item(offer_id: str, qty: int = 1) -> dict:
+    return {"sku_id": offer_id, "qty": qty, **packaging_of(OFFERS[offer_id])}
+
+
+@pytest.fixture(scope="module")
+def table():
+    return RateTable.from_file()
+
+
+def test_parcel_consolidation_and_bands():
+    card = _mock_offer_card("of_1")
+    assert packaging_of(card) == {"weight_g": 200.0, "dim_mm": [100.0, 80.0, 30.0]}
+    assert packaging_of({"sku_id": "x"}) is None
+
+    # 多件叠放：最长 / 次长边取最大，最短边按件数累加
+    parcel = consolidate([_item("of_001", qty=3), _item("of_002")])
+    assert parcel.weight_g == 35 * 3 + 120
+    assert parcel.dims_mm == (165.0, 85.0, 66.0)
+    assert consolidate([_item("of_001"), {"sku_id": "unknown", "qty": 1}]) is None
+
+    # 同一档内的包裹得到相同的 band
+    assert consolidate([_item("of_002")]).band() == consolidate([TWIN]).band()
+    assert consolidate([_item("of_002")]).band() != consolidate([_item("of_003")]).band()
+    assert consolidate([_item("of_004")]).band().weight_g == 5000
+
+
+def test_rate_table_dim_weight_and_surcharge(table):
+    small = consolidate([_item("of_001")])
+    options = {o["shipping_option_id"]: o for o in table.quote(small, "US")}
+    assert options["ship_standard"]["price"] == 5.99
+    assert options["ship_economy"]["eta_max_days"] == 15
+
+    # 体积重大于实重时按体积重计费；经济件超出尺寸 / 重量上限不可用
+    bulky = {o["shipping_option_id"]: o for o in table.quote(consolidate([_item("of_004")]), "US")}
+    assert set(bulky) == {"ship_standard", "ship_express"}
+    assert bulky["ship_express"]["chargeable_weight_g"] == 10022
+    assert bulky["ship_express"]["price"] == pytest.approx(64.99 + 5.5)
+    assert "dim_weight_applied" in bulky["ship_express"]["constraints"]
+
+    remote = table.quote(small, "US", postal_code="96813", service_level="standard")
+    assert [o["price"] for o in remote] == [5.99 + 8.0]
+    assert table.quote(small, "UK") == table.quote(small, "GB")
+    assert table.quote(small, "BR") is None
+
+
+@pytest.mark.asyncio
+async def test_local_backend_caches_gateway_quotes_by_profile(monkeypatch):
+    calls = []
+
+    async def fake_call_tool(mcp_server, tool_name, params, **kwargs):
+        calls.append(params)
+        return {
+            "ok": True,
+            "data": {
+                "options": [
+                    {"shipping_option_id": "br_post", "service_level": "economy", "price": 9.0},
+                    {"shipping_option_id": "br_express", "service_level": "express", "price": 30.0},
+                ],
+            },
+            "ttl_seconds": 300,
+        }
+
+    monkeypatch.setenv("SHIPPING_QUOTE_BACKEND", "local")
+    monkeypatch.setattr(shipping, "MOCK_MODE", False)
+    monkeypatch.setattr(shipping, "call_tool", fake_call_tool)
+    get_settings.cache_clear()
+    shipping.set_profile_cache(None)
+    try:
+        # 费率表覆盖的目的国不请求网关
+        local = await shipping.quote_shipping_options([_item("of_002")], "DE")
+        # 未覆盖的目的国：同一画像（重量档 / 尺寸档 / 邮编前缀）只请求一次网关
+        first = await shipping.quote_shipping_options([_item("of_002")], "BR", "01310-100")
+        same_band = await shipping.quote_shipping_options([TWIN], "BR", "01310-200")
+        other_band = await shipping.quote_shipping_options([_item("of_009")], "BR", "01310-100")
+        express = await shipping.quote_shipping_options(
+            [_item("of_002")], "BR", "01310-100", service_level="express"
+        )
+        # 缺少包装信息时直接走网关
+        await shipping.quote_shipping_options([{"sku_id": "sku_x", "qty": 1}], "BR")
+    finally:
+        shipping.set_profile_cache(None)
+        get_settings.cache_clear()
+
+    assert local["ok"] and local["data"]["rate_table_version"] == "sr_2025_12_01"
+    assert same_band == first
+    assert other_band["ok"]
+    assert [o["shipping_option_id"] for o in express["data"]["options"]] == ["br_express"]
+    assert len(calls) == 4
+    # 包装信息只用于本地画像，不下发网关
+    assert calls[0]["items"] == [{"sku_id": "of_002", "qty": 1}]
+
+
+def _random_groups(rng: random.Random, n_groups: int) -> list[ShipmentGroup]:
+    groups = []
+    for g in range(n_groups):
+        options = []
+        for k in range(rng.randint(1, 4)):
+            eta_min = rng.randint(2, 12)
+            options.append({
+                "shipping_option_id": f"g{g}_o{k}",
+                "price": round(rng.uniform(3, 40), 2),
+                "eta_min_days": eta_min,
+                "eta_max_days": eta_min + rng.randint(0, 8),
+            })
+        groups.append(ShipmentGroup(merchant_id=f"m{g}", ship_from="CN", options=options))
+    return groups
+
+
+def test_shipping_frontier_matches_brute_force():
+    rng = random.Random(7)
+    for _ in range(50):
+        groups = _random_groups(rng, rng.randint(1, 5))
+        combos = [
+            (max(o["eta_max_days"] for o in combo), sum(o["price"] for o in combo))
+            for combo in itertools.product(*(g.options for g in groups))
+        ]
+        frontier = shipping_frontier(groups)
+
+        # 每个前沿点都是该送达期限下的最低运费，且前沿之外的组合都被支配
+        for selection in frontier:
+            best = min(cost for eta, cost in combos if eta <= selection.eta_max_days)
+            assert selection.total_price == pytest.approx(best)
+        assert frontier[0].eta_max_days == min(eta for eta, _ in combos)
+        assert frontier[-1].total_price == pytest.approx(min(cost for _, cost in combos))
+
+        deadline = rng.randint(5, 20)
+        cheapest = select_shipping(groups, "cheapest", max_days=deadline)
+        feasible = [cost for eta, cost in combos if eta <= deadline]
+        if feasible:
+            assert cheapest.eta_max_days <= deadline
+            assert cheapest.total_price == pytest.approx(min(feasible))
+        else:
+            assert cheapest == frontier[0]
+
+    assert select_shipping([ShipmentGroup("m", "CN", options=[])]) is None
+
+
+@pytest.mark.asyncio
+async def test_plan_consolidates_items_by_merchant(monkeypatch):
+    quoted = []
+
+    async def fake_quote(items, **kwargs):
+        quoted.append([item["sku_id"] for item in items])
+        return {
+            "ok": True,
+            "data": {
+                "options": [
+                    {"shipping_option_id": "ship_standard", "carrier": "Standard Shipping",
+                     "price": 6.0, "eta_min_days": 7, "eta_max_days": 12},
+                    {"shipping_option_id": "ship_express", "carrier": "Express Shipping",
+                     "price": 18.0, "eta_min_days": 2, "eta_max_days": 4},
+                ],
+            },
+        }
+
+    def verified(offer_id: str, merchant_id: str, price: float) -> dict:
+        options = [
+            {"shipping_option_id": "ship_economy", "carrier": "Global Post",
+             "price": 3.0, "eta_min_days": 10, "eta_max_days": 20},
+        ]
+        return {
+            "offer_id": offer_id,
+            "sku_id": f"sku_{offer_id}",
+            "candidate": {"offer_id": offer_id, "merchant_id": merchant_id},
+            "checks": {
+                "pricing": {"unit_price": price, "total_price": price},
+                "shipping": {"options": options, "fastest_days": 10, "cheapest_price": 3.0},
+            },
+            "warnings": [],
+        }
+
+    monkeypatch.setattr(plan_module, "quote_shipping_options", fake_quote)
+    lines = [
+        (verified("of_a", "m_1", 10.0), 1),
+        (verified("of_b", "m_1", 20.0), 1),
+        (verified("of_c", "m_2", 5.0), 1),
+    ]
+    mission = {"destination_country": "US", "quantity": 1, "arrival_days_max": 15}
+
+    budget = await plan_module._build_plan(lines, "Budget Saver", "cheapest", mission)
+    fastest = await plan_module._build_plan(lines, "Express Delivery", "fastest", mission)
+    best = await plan_module._build_plan(lines, "Best Value", "best_value", mission)
+
+    # m_1 的两件合并报价一次；m_2 只有一件，复用核验阶段的报价
+    assert quoted == [["sku_of_a", "sku_of_b"]] * 3
+    assert [s.sku_ids for s in budget.shipments] == [["sku_of_a", "sku_of_b"], ["sku_of_c"]]
+    assert budget.total.shipping_cost == 6.0 + 3.0
+    assert budget.delivery.max_days == 20
+    assert budget.shipping_option_id == "ship_standard+ship_economy"
+    # m_2 只有 20 天送达的经济件：订单最早第 20 天到齐，m_1 付费加急没有意义
+    assert fastest.total.shipping_cost == 6.0 + 3.0
+    # 15 天期限内没有可行组合，退化为最快组合
+    assert best.delivery.max_days == 20 and best.total.shipping_cost == 9.0
+
+    # m_2 改为有快递选项后，最快方案两组都走快递
+    lines[2][0]["checks"]["shipping"]["options"].append(
+        {"shipping_option_id": "ship_express", "carrier": "Express Shipping",
+         "price": 12.0, "eta_min_days": 3, "eta_max_days": 5}
+    )
+    fastest = await plan_module._build_plan(lines, "Express Delivery", "fastest", mission)
+    best = await plan_module._build_plan(lines, "Best Value", "best_value", mission)
+    assert fastest.total.shipping_cost == 18.0 + 12.0
+    assert fastest.delivery.max_days == 5
+    # 15 天内最便宜：m_1 标准件（12 天）+ m_2 快递
+    assert best.total.shipping_cost == 6.0 + 12.0
+    assert best.delivery.max_days == 12
+    assert group_items([{"sku_id": "x"}])[0].key == ("", "")
@@ -0,0 +1,98 @@
+"""
+流式执行测试
+"""
+
+import asyncio
+import os
+from typing import TypedDict
+
+import pytest
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import END, StateGraph
+
+os.environ["MOCK_TOOLS"] = "true"
+
+from src.graph.streaming import get_event_writer, stream_graph  # noqa: E402
+
+
+class _State(TypedDict):
+    n: int
+
+
+def _chain(log: list[str], nodes: str = "abc", delay: float = 0.01):
+    """a → b → c，每个节点推送 2 个自定义事件"""
+
+    def make(name):
+        async def node(state):
+            log.append(f"{name}_start")
+            write = get_event_writer()
+            for i in range(2):
+                write("candidate_verified", node=name, i=i)
+            await asyncio.sleep(delay)
+            log.append(f"{name}_end")
+            return {"n": state["n"] + 1}
+
+        return node
+
+    graph = StateGraph(_State)
+    for name in nodes:
+        graph.add_node(name, make(name))
+    graph.set_entry_point(nodes[0])
+    for src, dst in zip(nodes, nodes[1:], strict=False):
+        graph.add_edge(src, dst)
+    graph.add_edge(nodes[-1], END)
+    return graph.compile(checkpointer=InMemorySaver())
+
+
+@pytest.mark.asyncio
+async def test_stream_agent_stage_events():
+    os.environ.pop("OPENAI_API_KEY", None)
+    from src.main import stream_agent
+
+    events = [e async for e in stream_agent("wireless charger for iPhone, budget $50, shipping to Germany")]
+    types = [e.type for e in events]
+
+    assert types[:2] == ["mission_parsed", "candidates_recalled"]
+    verified = [e for e in events if e.type == "candidate_verified"]
+    assert len(verified) == events[1].data["count"]
+    assert types.index("verification_complete") > types.index("candidate_verified")
+    assert types[-3:] == ["plans_ready", "stopped", "completed"]
+    assert [e.seq for e in events] == list(range(1, len(events) + 1))
+
+    completed = events[-1]
+    assert completed.state["current_step"] == "waiting_user"
+    assert completed.state["mission"]["destination_country"] == "DE"
+    assert "state" not in completed.to_dict()
+
+
+@pytest.mark.asyncio
+async def test_stream_backpressure_pauses_graph():
+    log: list[str] = []
+    stream = stream_graph(_chain(log), {"n": 0}, {"configurable": {"thread_id": "bp"}}, buffer_size=1)
+
+    first = await anext(stream)
+    await asyncio.sleep(0.1)
+    # 消费方停住时队列写满，graph 最多领先一个节点，不会一路跑完
+    assert first.node == "a"
+    assert "c_start" not in log
+
+    rest = [e async for e in stream]
+    assert log[-1] == "c_end"
+    assert rest[-1].type == "completed"
+    assert rest[-1].state == {"n": 3}
+
+
+@pytest.mark.asyncio
+async def test_stream_cancellation_stops_graph():
+    log: list[str] = []
+    stream = stream_graph(
+        _chain(log, delay=0.2), {"n": 0}, {"configurable": {"thread_id": "cancel"}}, buffer_size=8
+    )
+
+    await anext(stream)
+    await stream.aclose()
+    await asyncio.sleep(0.3)
+
+    # 正在执行的节点被取消，后续节点不再运行
+    assert "a_end" not in log
+    assert "b_start" not in log
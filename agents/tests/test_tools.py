@@ -0,0 +1,423 @@
+"""
+Tool 层测试
+
+覆盖 tools/ 下的批量接口、退化路径等不依赖真实网关的逻辑。
+"""
+
+import pytest
+
+
+def _ok(data: dict) -> dict:
+    return {"ok": True, "data": data}
+
+
+class TestGetOfferCards:
+    """测试 catalog.get_offer_cards"""
+
+    @pytest.fixture(autouse=True)
+    def live_mode(self, monkeypatch):
+        """关闭 mock 并重置批量接口探测状态"""
+        from src.tools import catalog
+
+        monkeypatch.setattr(catalog, "MOCK_MODE", False)
+        monkeypatch.setattr(catalog, "_batch_supported", None)
+        return catalog
+
+    @pytest.mark.asyncio
+    async def test_batch_endpoint_aligned(self, live_mode, monkeypatch):
+        """批量接口乱序返回时按 offer_ids 位置对齐"""
+        calls = []
+
+        async def fake_call_tool(mcp_server, tool_name, params, **kwargs):
+            calls.append(tool_name)
+            return _ok({"offer_cards": [{"offer_id": "of_2"}, {"offer_id": "of_1"}]})
+
+        monkeypatch.setattr(live_mode, "call_tool", fake_call_tool)
+
+        result = await live_mode.get_offer_cards(["of_1", "of_2", "of_3"])
+
+        assert calls == ["catalog.get_offer_cards"]
+        cards = result["data"]["offer_cards"]
+        assert [c and c["offer_id"] for c in cards] == ["of_1", "of_2", None]
+        assert result["data"]["errors"]["of_3"]["code"] == "NOT_FOUND"
+
+    @pytest.mark.asyncio
+    async def test_fallback_when_batch_unsupported(self, live_mode, monkeypatch):
+        """网关没有批量接口时退化为逐个并发获取，且只探测一次"""
+        calls = []
+
+        async def fake_call_tool(mcp_server, tool_name, params, **kwargs):
+            calls.append(tool_name)
+            if tool_name == "catalog.get_offer_cards":
+                return {
+                    "ok": False,
+                    "error": {"code": "UPSTREAM_ERROR", "message": "HTTP 404", "http_status": 404},
+                }
+            if params["offer_id"] == "of_bad":
+                return {"ok": False, "error": {"code": "NOT_FOUND", "message": "gone"}}
+            return _ok({"offer_id": params["offer_id"]})
+
+        monkeypatch.setattr(live_mode, "call_tool", fake_call_tool)
+
+        result = await live_mode.get_offer_cards(["of_1", "of_bad", "of_3"])
+        await live_mode.get_offer_cards(["of_4"])
+
+        assert calls.count("catalog.get_offer_cards") == 1
+        cards = result["data"]["offer_cards"]
+        assert [c and c["offer_id"] for c in cards] == ["of_1", None, "of_3"]
+        assert result["data"]["errors"]["of_bad"]["code"] == "NOT_FOUND"
+
+
+    @pytest.mark.asyncio
+    async def test_fallback_when_batch_fails_transiently(self, live_mode, monkeypatch):
+        """批量请求超时 / 熔断时本次退化为逐个获取，下次仍先尝试批量接口"""
+        calls = []
+
+        async def fake_call_tool(mcp_server, tool_name, params, **kwargs):
+            calls.append(tool_name)
+            if tool_name == "catalog.get_offer_cards":
+                return {"ok": False, "error": {"code": "TIMEOUT", "message": "timed out"}}
+            return _ok({"offer_id": params["offer_id"]})
+
+        monkeypatch.setattr(live_mode, "call_tool", fake_call_tool)
+
+        result = await live_mode.get_offer_cards(["of_1", "of_2"])
+        await live_mode.get_offer_cards(["of_3"])
+
+        assert result["ok"]
+        assert [c["offer_id"] for c in result["data"]["offer_cards"]] == ["of_1", "of_2"]
+        assert calls.count("catalog.get_offer_cards") == 2
+
+        # 不可重试的错误（参数错误）照常返回
+        async def invalid(mcp_server, tool_name, params, **kwargs):
+            return {"ok": False, "error": {"code": "INVALID_ARGUMENT", "http_status": 400}}
+
+        monkeypatch.setattr(live_mode, "call_tool", invalid)
+        assert not (await live_mode.get_offer_cards(["of_1"]))["ok"]
+
+
+class TestGetRealtimeQuotes:
+    """测试 pricing.get_realtime_quotes"""
+
+    @pytest.fixture(autouse=True)
+    def live_mode(self, monkeypatch):
+        """关闭 mock 并重置批量接口探测状态"""
+        from src.tools import pricing
+
+        monkeypatch.setattr(pricing, "MOCK_MODE", False)
+        monkeypatch.setattr(pricing, "_batch_supported", None)
+        return pricing
+
+    @pytest.mark.asyncio
+    async def test_batch_endpoint_aligned(self, live_mode, monkeypatch):
+        """一次请求报完整批，按 (sku, qty) 对齐，缺失条目记为逐条错误"""
+        calls = []
+
+        async def fake_call_tool(mcp_server, tool_name, params, **kwargs):
+            calls.append((tool_name, params))
+            return _ok({
+                "quotes": [
+                    {"sku_id": "s1", "quantity": 3, "unit_price": 9.0},
+                    {"sku_id": "s1", "quantity": 1, "unit_price": 10.0},
+                ],
+                "errors": {"s2": {"code": "OUT_OF_STOCK", "message": "sold out"}},
+            })
+
+        monkeypatch.setattr(live_mode, "call_tool", fake_call_tool)
+
+        items = [{"sku_id": "s1", "qty": 1}, {"sku_id": "s2", "qty": 1}, {"sku_id": "s1", "qty": 3}]
+        result = await live_mode.get_realtime_quotes(items, destination_country="DE")
+
+        assert [name for name, _ in calls] == ["pricing.get_realtime_quotes"]
+        assert calls[0][1]["destination_country"] == "DE"
+        quotes = result["data"]["quotes"]
+        assert [q and q["unit_price"] for q in quotes] == [10.0, None, 9.0]
+        assert result["data"]["errors"]["s2"]["code"] == "OUT_OF_STOCK"
+
+    @pytest.mark.asyncio
+    async def test_fallback_when_batch_unsupported(self, live_mode, monkeypatch):
+        """网关没有批量接口时退化为逐个并发报价，保留逐条错误，且只探测一次"""
+        calls = []
+
+        async def fake_call_tool(mcp_server, tool_name, params, **kwargs):
+            calls.append(tool_name)
+            if tool_name == "pricing.get_realtime_quotes":
+                return {
+                    "ok": False,
+                    "error": {"code": "UPSTREAM_ERROR", "message": "HTTP 501", "http_status": 501},
+                }
+            if params["sku_id"] == "s_bad":
+                raise RuntimeError("boom")
+            return _ok({"sku_id": params["sku_id"], "quantity": params["quantity"]})
+
+        monkeypatch.setattr(live_mode, "call_tool", fake_call_tool)
+
+        result = await live_mode.get_realtime_quotes(
+            [{"sku_id": "s1", "qty": 2}, {"sku_id": "s_bad", "qty": 1}]
+        )
+        await live_mode.get_realtime_quotes([{"sku_id": "s3", "qty": 1}])
+
+        assert calls.count("pricing.get_realtime_quotes") == 1
+        quotes = result["data"]["quotes"]
+        assert quotes[0] == {"sku_id": "s1", "quantity": 2} and quotes[1] is None
+        assert result["data"]["errors"]["s_bad"]["code"] == "INTERNAL_ERROR"
+
+    @pytest.mark.asyncio
+    async def test_fallback_when_batch_fails_transiently(self, live_mode, monkeypatch):
+        """批量报价超时 / 熔断时本次退化为逐个报价，下次仍先尝试批量接口"""
+        calls = []
+
+        async def fake_call_tool(mcp_server, tool_name, params, **kwargs):
+            calls.append(tool_name)
+            if tool_name == "pricing.get_realtime_quotes":
+                return {"ok": False, "error": {"code": "UPSTREAM_ERROR", "message": "circuit open"}}
+            return _ok({"sku_id": params["sku_id"], "quantity": params["quantity"]})
+
+        monkeypatch.setattr(live_mode, "call_tool", fake_call_tool)
+
+        result = await live_mode.get_realtime_quotes(
+            [{"sku_id": "s1", "qty": 2}, {"sku_id": "s2", "qty": 1}]
+        )
+        await live_mode.get_realtime_quotes([{"sku_id": "s3", "qty": 1}])
+
+        assert result["ok"]
+        assert [q["sku_id"] for q in result["data"]["quotes"]] == ["s1", "s2"]
+        assert calls.count("pricing.get_realtime_quotes") == 2
+
+        # 不可重试的错误（参数错误）照常返回
+        async def invalid(mcp_server, tool_name, params, **kwargs):
+            return {"ok": False, "error": {"code": "INVALID_ARGUMENT", "http_status": 400}}
+
+        monkeypatch.setattr(live_mode, "call_tool", invalid)
+        assert not (await live_mode.get_realtime_quotes([{"sku_id": "s1"}]))["ok"]
+
+
+class TestResponseCache:
+    """测试 Tool 响应缓存"""
+
+    @pytest.fixture
+    def cache(self):
+        from src.tools.cache import LRUCacheBackend, ResponseCache
+
+        return ResponseCache(LRUCacheBackend(max_entries=100), stale_seconds=30)
+
+    @staticmethod
+    def counting_fetch(ttl_seconds: int = 60):
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            return {"ok": True, "data": {"n": len(calls)}, "ttl_seconds": ttl_seconds}
+
+        return fetch, calls
+
+    @pytest.mark.asyncio
+    async def test_hit_with_normalized_params(self, cache):
+        """参数顺序与 None 字段不影响命中，返回值与缓存相互隔离"""
+        fetch, calls = self.counting_fetch()
+
+        first = await cache.get_or_fetch(
+            "pricing.get_realtime_quote", {"sku_id": "s1", "quantity": 1, "x": None}, fetch
+        )
+        first["data"]["n"] = 999
+        second = await cache.get_or_fetch(
+            "pricing.get_realtime_quote", {"quantity": 1, "sku_id": "s1"}, fetch
+        )
+
+        assert len(calls) == 1
+        assert second["data"]["n"] == 1
+        assert cache.stats["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_stale_while_revalidate(self, cache, monkeypatch):
+        """TTL 过期后在 stale 窗口内返回旧值并后台刷新"""
+        import asyncio
+
+        from src.tools import cache as cache_module
+
+        now = [1000.0]
+        monkeypatch.setattr(cache_module.time, "time", lambda: now[0])
+        fetch, calls = self.counting_fetch(ttl_seconds=60)
+
+        await cache.get_or_fetch("shipping.quote_options", {"sku": "s1"}, fetch)
+        now[0] += 70  # 已过期，但仍在 30s stale 窗口内
+        stale = await cache.get_or_fetch("shipping.quote_options", {"sku": "s1"}, fetch)
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        fresh = await cache.get_or_fetch("shipping.quote_options", {"sku": "s1"}, fetch)
+
+        assert stale["data"]["n"] == 1
+        assert fresh["data"]["n"] == 2
+        assert cache.stats["stale_hits"] == 1
+        assert cache.stats["refreshes"] == 1
+
+        now[0] += 200  # 超出 stale 窗口，同步回源
+        await cache.get_or_fetch("shipping.quote_options", {"sku": "s1"}, fetch)
+        assert len(calls) == 3
+
+    @pytest.mark.asyncio
+    async def test_never_caches_mutating_or_failed(self, cache):
+        """结算类工具与失败响应不缓存"""
+        fetch, calls = self.counting_fetch()
+        for _ in range(2):
+            await cache.get_or_fetch("checkout.create_draft_order", {"cart_id": "c1"}, fetch)
+        assert len(calls) == 2
+
+        async def failing():
+            calls.append(1)
+            return {"ok": False, "error": {"code": "TIMEOUT"}}
+
+        for _ in range(2):
+            await cache.get_or_fetch("compliance.check_item", {"sku_id": "s1"}, failing)
+        assert len(calls) == 4
+
+    @pytest.mark.asyncio
+    async def test_redis_backend_roundtrip(self):
+        """Redis 后端序列化（使用内存假客户端）"""
+        from src.tools.cache import RedisCacheBackend, ResponseCache
+
+        class FakeRedis:
+            def __init__(self):
+                self.store = {}
+
+            async def get(self, key):
+                return self.store.get(key)
+
+            async def set(self, key, value, ex=None):
+                self.store[key] = value
+
+            async def delete(self, key):
+                self.store.pop(key, None)
+
+        client = FakeRedis()
+        cache = ResponseCache(RedisCacheBackend(client=client))
+        fetch, calls = self.counting_fetch()
+
+        await cache.get_or_fetch("catalog.get_offer_card", {"offer_id": "of_1"}, fetch)
+        result = await cache.get_or_fetch("catalog.get_offer_card", {"offer_id": "of_1"}, fetch)
+
+        assert len(calls) == 1
+        assert result["data"]["n"] == 1
+        assert all(k.startswith("tool:catalog.get_offer_card:") for k in client.store)
+
+
+class TestSingleFlight:
+    """测试 Single-flight 请求合并"""
+
+    @staticmethod
+    def slow_fetch(delay: float = 0.05):
+        calls = []
+
+        async def fetch():
+            import asyncio
+
+            calls.append(1)
+            await asyncio.sleep(delay)
+            return {"ok": True, "data": {"allowed": True}}
+
+        return fetch, calls
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_coalesced(self):
+        """相同的并发请求只发一次，结果互相独立"""
+        import asyncio
+
+        from src.tools.singleflight import SingleFlight
+
+        flight = SingleFlight()
+        fetch, calls = self.slow_fetch()
+        params = {"sku_id": "s1", "destination_country": "US"}
+
+        results = await asyncio.gather(
+            *(flight.do("compliance.check_item", params, fetch) for _ in range(10))
+        )
+        results[0]["data"]["allowed"] = False
+
+        assert len(calls) == 1
+        assert flight.stats == {"leaders": 1, "coalesced": 9}
+        assert flight.coalesced_by_tool == {"compliance.check_item": 9}
+        assert all(r["data"]["allowed"] for r in results[1:])
+        assert flight.inflight == 0
+
+    @pytest.mark.asyncio
+    async def test_opt_in_and_mutating_tools(self):
+        """未 opt-in 的工具和有副作用的工具不合并"""
+        import asyncio
+
+        from src.tools.singleflight import SingleFlight
+
+        flight = SingleFlight(tools={"catalog.get_offer_card"})
+        fetch, calls = self.slow_fetch()
+
+        await asyncio.gather(
+            *(flight.do("compliance.check_item", {"sku_id": "s1"}, fetch) for _ in range(3)),
+            *(flight.do("cart.add_item", {"sku_id": "s1"}, fetch) for _ in range(3)),
+        )
+
+        assert len(calls) == 6
+        assert flight.stats["coalesced"] == 0
+
+    @pytest.mark.asyncio
+    async def test_leader_cancellation_does_not_fail_waiters(self):
+        """发起方被取消时，等待方仍拿到结果"""
+        import asyncio
+
+        from src.tools.singleflight import SingleFlight
+
+        flight = SingleFlight()
+        fetch, calls = self.slow_fetch()
+        params = {"offer_id": "of_1"}
+
+        leader = asyncio.create_task(flight.do("catalog.get_offer_card", params, fetch))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(flight.do("catalog.get_offer_card", params, fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        result = await waiter
+        assert result["ok"] is True
+        assert len(calls) == 1
+
+
+class TestGatewayClient:
+    """测试 Tool Gateway HTTP client 管理"""
+
+    @pytest.mark.asyncio
+    async def test_client_reused_and_metrics(self):
+        """同一 loop 复用 client，统计在途请求，关闭后重建"""
+        import httpx
+
+        from src.tools.http_client import GatewayClient
+
+        def handler(request):
+            return httpx.Response(200, json={"ok": True, "data": {}})
+
+        gateway = GatewayClient(max_connections=8, transport=httpx.MockTransport(handler))
+
+        assert gateway.get_client() is gateway.get_client()
+        response = await gateway.post("pricing.get_realtime_quote", "http://gw/tools/x", json={})
+
+        assert response.status_code == 200
+        metrics = gateway.pool_metrics()
+        assert metrics["requests"] == 1
+        assert metrics["in_flight"] == 0
+        assert metrics["peak_in_flight"] == 1
+        assert metrics["max_connections"] == 8
+
+        client = gateway.get_client()
+        await gateway.aclose()
+        assert client.is_closed
+        assert gateway.get_client() is not client
+        await gateway.aclose()
+
+    def test_tool_timeouts(self):
+        """工具级超时解析与覆盖"""
+        from src.tools.http_client import GatewayClient, parse_tool_timeouts
+
+        overrides = parse_tool_timeouts("pricing.get_realtime_quote=1/3, bad, x.y=0.5/2")
+        assert overrides == {"pricing.get_realtime_quote": (1.0, 3.0), "x.y": (0.5, 2.0)}
+
+        gateway = GatewayClient(connect_timeout=4, read_timeout=20, tool_timeouts=overrides)
+        assert gateway.timeout_for("pricing.get_realtime_quote").read == 3.0
+        assert gateway.timeout_for("pricing.get_realtime_quote").connect == 1.0
+        assert gateway.timeout_for("unknown.tool").read == 20